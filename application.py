@@ -4,19 +4,17 @@ import json
 import logging
 import secrets
 import pymysql
-import boto3
 import re
 from flask import Flask, render_template, request, flash, redirect, url_for, Response
 import markdown
 from pathlib import Path
 from datetime import datetime, timedelta
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadTimeSignature
-from botocore.exceptions import ClientError
-from threading import Thread
+from functools import lru_cache
 
 # 새로 분리된 공유 설정 로더를 임포트합니다.
 # 이 한 줄이 모든 환경 설정을 책임집니다. (initialize_environment() 호출)
-from common.config import config
+from common.config import config, DB_SECRET_KEYS
 
 # ----------------------------------------------------------------
 # [1] 기본 설정 및 경로
@@ -43,12 +41,7 @@ s = URLSafeTimedSerializer(application.secret_key)
 # ----------------------------------------------------------------
 # [2] 설정 로더 (AWS 환경변수 & Secrets Manager 통합)
 # ----------------------------------------------------------------
-# DB & S3 설정 로드
-DB_HOST = config.ensure_secret("DB_HOST")
-DB_PORT = int(config.ensure_secret("DB_PORT", "3306"))
-DB_USER = config.ensure_secret("DB_USER")
-DB_PASSWORD = config.ensure_secret("DB_PASSWORD")
-DB_NAME = config.ensure_secret("DB_NAME")
+# DB 시크릿은 부팅 시점이 아니라 첫 DB 접속 시 한 번만 로드합니다. (get_db_settings 참고)
 TARGET_BUCKET = "fincore-output-storage" # [하드코딩]
 
 # S3 Manager 초기화
@@ -57,6 +50,16 @@ if S3Manager:
     s3_manager = S3Manager(bucket_name=TARGET_BUCKET)
     print(f"[INFO] S3 Manager initialized. Bucket: {TARGET_BUCKET}")
 
+# 백그라운드 작업 큐 (요청마다 Thread를 띄우지 않고 고정 워커 풀로 처리)
+from common.job_queue import BackgroundJobQueue, QueueFullError
+job_queue = BackgroundJobQueue(
+    name="web-jobs",
+    workers=int(os.getenv("JOB_QUEUE_WORKERS", "4")),
+    max_queue=int(os.getenv("JOB_QUEUE_MAX_DEPTH", "200")),
+    max_retries=int(os.getenv("JOB_QUEUE_MAX_RETRIES", "3")),
+    spool_dir=os.getenv("JOB_QUEUE_SPOOL_DIR") or None,
+)
+
 # ----------------------------------------------------------------
 # [2.5] S3 비용 절감을 위한 메모리 캐시
 # ----------------------------------------------------------------
@@ -117,16 +120,30 @@ def load_column_data():
 # ----------------------------------------------------------------
 # [3] 헬퍼 함수들 (DB연결, 스크립트 실행, HTML 정제)
 # ----------------------------------------------------------------
+@lru_cache(maxsize=1)
+def get_db_settings() -> dict:
+    """DB 접속 정보를 Secrets Manager에서 최초 1회만 로드하고 이후에는 캐시를 반환합니다."""
+    values = config.ensure_secrets(DB_SECRET_KEYS)
+    return {
+        "host": values["DB_HOST"],
+        "port": int(values["DB_PORT"] or 3306),
+        "user": values["DB_USER"],
+        "password": values["DB_PASSWORD"],
+        "db": values["DB_NAME"],
+    }
+
 def get_db_connection():
     """DB 연결 객체 반환"""
     return pymysql.connect(
-        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD, db=DB_NAME,
+        **get_db_settings(),
         charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor
     )
 
+@lru_cache(maxsize=64)
 def clean_html_content(raw_html: str) -> tuple[str, str]:
     """
     S3 HTML에서 스타일과 본문 내용을 분리, 가독성 보정 및 푸터 제거를 수행합니다.
+    같은 렌더링 산출물(S3_CACHE에 보관된 동일 문자열)은 요청마다 다시 파싱하지 않습니다.
     Returns: A tuple of (styles, body_content).
     """
     if not raw_html: return (None, None)
@@ -174,28 +191,65 @@ def clean_html_content(raw_html: str) -> tuple[str, str]:
 
     return (style_tags, body_content.strip())
 
-def send_report_email_async(service_name, date_str, recipient_email):
-    """백그라운드에서 리포트 이메일을 발송하는 함수 (subprocess 제거 리팩토링)"""
+def _report_editions(service_name):
+    """잠금해제 시 발송할 리포트 판(edition) 목록. 판마다 별도 작업으로 발송해 재시도가 이미 보낸 판을 다시 보내지 않게 합니다."""
+    return [None] if service_name == 'signalist' else ["Morning", "Night"]
+
+def _report_artifacts(service_name, date_str, edition=None):
+    """
+    잠금해제 발송용: 아카이브와 같은 S3 렌더링 산출물(CSS 인라인 완료된 이메일 HTML)을 (제목 접두사, HTML) 목록으로 반환합니다.
+    edition(Morning/Night)을 주면 그 판만 반환합니다.
+    """
+    if service_name == 'signalist':
+        return [("[Signalist Daily]", get_s3_content_with_cache(f"iceage/out/Signalist_Daily_{date_str}.html"))]
+    return [
+        ("[Secret Note] 🐋", get_s3_content_with_cache(f"moneybag/data/out/Moneybag_Letter_{mode}_{date_str}.html"))
+        for mode in ("Morning", "Night") if edition in (None, mode)
+    ]
+
+def send_report_email_async(service_name, date_str, recipient_email, edition=None):
+    """
+    백그라운드에서 리포트 이메일을 발송하는 함수 (작업 큐 워커에서 실행, 실패 시 재시도)
+    edition을 주면 그 판 하나만 발송합니다. (한 작업에 여러 판을 묶으면 한 판의 실패 재시도가 다른 판을 중복 발송)
+    """
+    from common.email_dispatcher import SendGridDispatcher
+    from common.newsletter_render import extract_headline
+
     with app.app_context():
         try:
-            # 시크릿 로드 보장
-            config.ensure_secret("SENDGRID_API_KEY")
-            
-            # 환경 변수를 직접 설정하여 컨텍스트 전달
-            os.environ["NEWSLETTER_AUTO_SEND"] = "0"
-            os.environ["TEST_RECIPIENT"] = recipient_email
-
+            if not s3_manager:
+                raise RuntimeError("S3 Manager가 없어 리포트를 불러올 수 없습니다.")
+            api_key = config.ensure_secret("SENDGRID_API_KEY")
             if service_name == 'signalist':
-                from iceage.src.pipelines import send_newsletter as iceage_sender
-                logging.info(f"Sending Signalist report for {date_str} to {recipient_email}")
-                iceage_sender.main(date_str)
+                sender = f"{os.getenv('SIGNALIST_SENDER_NAME', 'Signalist Daily')} <{os.getenv('SIGNALIST_SENDER_ADDRESS', 'admin@fincore.co.kr')}>"
+                unsubscribe_service = "signalist"
             else: # moneybag or whalehunter
-                from moneybag.src.pipelines import send_email as moneybag_sender
-                logging.info(f"Sending Moneybag report for {date_str} to {recipient_email}")
-                moneybag_sender.main(date_str)
+                sender = f"{os.getenv('MONEYBAG_SENDER_NAME', 'The Whale Hunter')} <{os.getenv('MONEYBAG_SENDER_ADDRESS', 'admin@fincore.co.kr')}>"
+                unsubscribe_service = "moneybag"
+
+            # 파이프라인을 다시 돌리지 않고, 이미 렌더링되어 S3에 올라간 산출물을 그대로 발송
+            artifacts = [(prefix, html) for prefix, html in _report_artifacts(service_name, date_str, edition) if html]
+            if not artifacts:
+                if edition:
+                    # 아직 생성되지 않은 판(예: 오후의 Night)은 건너뜀 - 다른 판 작업은 따로 발송됨
+                    logging.warning(f"{service_name} {date_str} {edition} 리포트 HTML이 S3에 없어 건너뜁니다.")
+                    return
+                raise FileNotFoundError(f"{service_name} {date_str} 리포트 HTML이 S3에 없습니다.")
+
+            logging.info(f"Sending {service_name} report{' ' + edition if edition else ''} for {date_str} to {recipient_email}")
+            for prefix, html in artifacts:
+                subject = f"{prefix} {extract_headline(html)}"
+                dispatcher = SendGridDispatcher(
+                    api_key=api_key, from_email=sender, service_name=unsubscribe_service,
+                    campaign_id=f"unlock:{service_name}:{date_str}", journal_dir=None,
+                )
+                result = dispatcher.send([recipient_email], subject, html)
+                if result["failed"]:
+                    raise RuntimeError(f"Report email to {recipient_email} failed")
 
         except Exception as e:
             logging.error(f"Failed to send report email: {e}", exc_info=True)
+            raise
 
 def send_welcome_email_async(service_name, recipient_email):
     """[NEW] 신규 구독자에게 환영 메일을 발송하는 전용 함수"""
@@ -211,11 +265,18 @@ def send_welcome_email_async(service_name, recipient_email):
             logging.info(f"Welcome email sent to {recipient_email} for {service_name}")
         except Exception as e:
             logging.error(f"Failed to send welcome email: {e}", exc_info=True)
+            raise
 
 def send_inquiry_email_async(to_email, subject, body, sender_email):
     """[NEW] 백그라운드에서 제휴문의 이메일을 발송하는 함수 (앱 컨텍스트 포함)"""
     with app.app_context():
-        send_simple_email(to_email, subject, body, sender_email)
+        if not send_simple_email(to_email, subject, body, sender_email):
+            raise RuntimeError(f"Inquiry email to {to_email} failed")
+
+# 작업 큐에 핸들러 등록 (스풀 복구 시 이 이름으로 함수를 찾습니다)
+job_queue.register("report_email", send_report_email_async)
+job_queue.register("welcome_email", send_welcome_email_async)
+job_queue.register("inquiry_email", send_inquiry_email_async)
 
 def send_simple_email(to_email, subject, body, sender_email):
     """SendGrid를 사용하여 간단한 텍스트 이메일을 보냅니다."""
@@ -305,11 +366,14 @@ def index():
                 # [중요] 이메일 발송 전에 먼저 커밋해서 구독 정보 저장 확실히 하기
                 conn.commit()
 
-                # 신규 구독 서비스에 대한 환영 메일 발송
-                if sub_signalist:
-                    Thread(target=send_welcome_email_async, args=('iceage', email)).start()
-                if sub_moneybag:
-                    Thread(target=send_welcome_email_async, args=('moneybag', email)).start()
+                # 신규 구독 서비스에 대한 환영 메일 발송 (작업 큐, 동일 서비스/이메일은 중복 제거)
+                try:
+                    if sub_signalist:
+                        job_queue.submit("welcome_email", 'iceage', email)
+                    if sub_moneybag:
+                        job_queue.submit("welcome_email", 'moneybag', email)
+                except QueueFullError as e:
+                    logging.warning(f"Welcome email not queued for {email}: {e}")
 
         except Exception as e:
             print(f"[DB Error] {e}")
@@ -324,8 +388,15 @@ def index():
             # [유지] 잠금 해제 요청: 현재 보고 있는 '특정 날짜' 리포트 발송 (기존 로직 유지)
             service_name = request.form.get('service_name')
             date_str = request.form.get('date_str')
-            Thread(target=send_report_email_async, args=(service_name, date_str, email)).start()
-            flash(f"{email}으로 해당 리포트를 발송했습니다. 🚀", "info")
+            try:
+                for edition in _report_editions(service_name):
+                    if edition:
+                        job_queue.submit("report_email", service_name, date_str, email, edition)
+                    else:
+                        job_queue.submit("report_email", service_name, date_str, email)
+                flash(f"{email}으로 해당 리포트를 발송했습니다. 🚀", "info")
+            except QueueFullError:
+                flash("요청이 많아 리포트 발송이 지연되고 있습니다. 잠시 후 다시 시도해주세요.", "error")
         
         return redirect(redirect_url)
 
@@ -584,7 +655,11 @@ def inquiry():
 {message}
     """
     
-    Thread(target=send_inquiry_email_async, args=(admin_email, subject, body, sender_email)).start()
+    try:
+        job_queue.submit("inquiry_email", admin_email, subject, body, sender_email)
+    except QueueFullError:
+        flash("요청이 많아 문의 접수가 지연되고 있습니다. 잠시 후 다시 시도해주세요.", "error")
+        return redirect(redirect_url)
     flash("문의 내용이 성공적으로 전송되었습니다. 빠른 시일 내에 회신드리겠습니다. ✅", "success")
     return redirect(redirect_url)
 
@@ -662,6 +737,11 @@ def sitemap_xml():
 def health_check():
     return "OK", 200
 
+@application.route('/health/jobs')
+def health_jobs():
+    """백그라운드 작업 큐의 대기열 깊이 및 지연 지표"""
+    return Response(json.dumps(job_queue.metrics()), mimetype='application/json')
+
 @application.route('/privacy')
 def privacy_policy():
     """개인정보 처리방침 페이지 렌더링"""
@@ -732,14 +812,18 @@ def unsubscribe(service_name, token):
 # ================================================================
 # 🌐 [PART D] [NEW] 작업자(Worker) 전용 라우트
 # ================================================================
-from tasks.runner import run_iceage_task, run_moneybag_task, run_krx_batch_task, run_iceage_weekly_task, run_iceage_monthly_task
+# [성능] tasks.runner는 pandas/numpy/yfinance/ccxt/moviepy/openai 등 무거운 파이프라인을 끌어오므로,
+# 웹 워커 부팅 시가 아니라 /worker/* 라우트가 실제로 실행될 때 처음 임포트합니다.
+def _runner():
+    from tasks import runner
+    return runner
 
 @application.route('/worker/newsletter', methods=['POST'])
 def worker_newsletter():
     """모닝 리포트 및 뉴스레터 발송 태스크 (시그널리스트)"""
     try:
         # run_iceage.sh newsletter 와 동일
-        run_iceage_task("newsletter")
+        _runner().run_iceage_task("newsletter")
         return Response("Newsletter task processed.", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/newsletter failed: {e}", exc_info=True)
@@ -749,7 +833,7 @@ def worker_newsletter():
 def worker_moneybag_morning():
     """머니백 모닝 리포트 발송 태스크"""
     try:
-        run_moneybag_task("morning")
+        _runner().run_moneybag_task("morning")
         return Response("Moneybag Morning task processed.", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/moneybag-morning failed: {e}", exc_info=True)
@@ -759,7 +843,7 @@ def worker_moneybag_morning():
 def worker_moneybag_night():
     """머니백 나이트 리포트 발송 태스크"""
     try:
-        run_moneybag_task("night")
+        _runner().run_moneybag_task("night")
         return Response("Moneybag Night task processed.", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/moneybag-night failed: {e}", exc_info=True)
@@ -769,7 +853,7 @@ def worker_moneybag_night():
 def worker_krx_batch():
     """KRX 데이터 수집 배치 태스크"""
     try:
-        msg = run_krx_batch_task(days=3)
+        msg = _runner().run_krx_batch_task(days=3)
         return Response(f"KRX Batch task processed: {msg}", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/krx failed: {e}", exc_info=True)
@@ -779,7 +863,7 @@ def worker_krx_batch():
 def worker_iceage_weekly():
     """시그널리스트 주간 리포트 발송 태스크"""
     try:
-        run_iceage_weekly_task()
+        _runner().run_iceage_weekly_task()
         return Response("IceAge Weekly task processed.", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/iceage-weekly failed: {e}", exc_info=True)
@@ -789,7 +873,7 @@ def worker_iceage_weekly():
 def worker_iceage_monthly():
     """시그널리스트 월간 리포트 발송 태스크"""
     try:
-        run_iceage_monthly_task()
+        _runner().run_iceage_monthly_task()
         return Response("IceAge Monthly task processed.", status=200)
     except Exception as e:
         logging.error(f"Worker task /worker/iceage-monthly failed: {e}", exc_info=True)
@@ -799,5 +883,8 @@ def worker_iceage_monthly():
 # 애플리케이션 시작 시 칼럼 데이터 로드 (모듈 임포트 시점에 실행)
 load_column_data()
 
+# 작업 큐 워커 기동 (스풀에 남은 작업이 있으면 복구)
+job_queue.start()
+
 if __name__ == '__main__':
     application.run(port=5000, debug=True)
\ No newline at end of file
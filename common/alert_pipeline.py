@@ -0,0 +1,164 @@
+import time
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class AlertPipeline:
+    def __init__(self, name: str, compose: Callable[[Any], Optional[str]], send: Callable[[str], None],
+                 workers: int = 2, max_queue: int = 50, max_per_minute: int = 20, min_interval_sec: float = 1.0):
+        """
+        왓치독 알림 부수 작업(뉴스 수집, LLM 코멘트, 텔레그램 전송)을 감시 루프 밖에서 처리하는 파이프라인
+
+        - submit()은 절대 블로킹하지 않습니다. 대기열(max_queue)이 가득 차면 이벤트를 버리고 dropped로 셉니다.
+        - 같은 key(예: 심볼)의 이벤트가 아직 처리 전이면 최신 이벤트로 교체합니다. (버스트 병합)
+        - compose(event)는 워커 스레드에서 실행되어 메시지 본문을 만들고, send(text)는 전송 속도 제한
+          (분당 max_per_minute건, 최소 간격 min_interval_sec)을 지키며 한 번에 하나씩 호출됩니다.
+        - 알림 상태(쿨타임 등)는 호출자가 submit 시점에 갱신하므로, 감시 루프는 전송 완료를 기다리지 않습니다.
+        """
+        self.name = name
+        self.compose = compose
+        self.send = send
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.max_per_minute = max(1, int(max_per_minute))
+        self.min_interval_sec = float(min_interval_sec)
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._pending: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._sent_at = deque()
+        self._stop = threading.Event()
+        self._threads = []
+        self.stats = {"submitted": 0, "coalesced": 0, "dropped": 0, "sent": 0, "failed": 0,
+                      "latency_ms_total": 0.0, "latency_ms_max": 0.0, "throttled_sec": 0.0}
+
+    def start(self):
+        if self._threads:
+            return self
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"{self.name}-alert-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def shutdown(self, timeout: float = 10.0):
+        """대기 중인 알림을 timeout 동안 처리한 뒤 워커를 종료합니다."""
+        deadline = time.monotonic() + timeout
+        while self.depth() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ------------------------------------------------------------
+    # 등록
+    # ------------------------------------------------------------
+    def submit(self, key: str, event: Any) -> bool:
+        """
+        알림 이벤트를 넘기고 즉시 반환합니다.
+        Returns: True(대기열 등록 또는 대기 중 이벤트와 병합) / False(대기열 초과로 버림)
+        """
+        if not self._threads:
+            self.start()
+        with self._lock:
+            if key in self._pending:
+                # 아직 처리 전인 같은 key 이벤트는 최신 값으로 교체 (enqueued_at은 처음 시각 유지)
+                self._pending[key] = (self._pending[key][0], event)
+                self.stats["coalesced"] += 1
+                return True
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                print(f"⚠️ [{self.name}] 알림 대기열 초과 - {key} 이벤트 버림", flush=True)
+                return False
+            self._pending[key] = (time.monotonic(), event)
+            self.stats["submitted"] += 1
+            return True
+
+    # ------------------------------------------------------------
+    # 처리
+    # ------------------------------------------------------------
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                key = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                enqueued_at, event = self._pending.pop(key)
+            try:
+                text = self.compose(event)
+                if text:
+                    self._send_limited(text)
+                ok = True
+            except Exception as e:
+                ok = False
+                print(f"⚠️ [{self.name}] 알림 처리 실패 ({key}): {e}", flush=True)
+            latency_ms = (time.monotonic() - enqueued_at) * 1000
+            with self._lock:
+                self.stats["sent" if ok else "failed"] += 1
+                self.stats["latency_ms_total"] += latency_ms
+                self.stats["latency_ms_max"] = max(self.stats["latency_ms_max"], latency_ms)
+
+    def _send_limited(self, text: str):
+        """분당 max_per_minute건 + 최소 간격을 지키며 전송 (텔레그램 채팅방 rate limit 보호)"""
+        with self._send_lock:
+            now = time.monotonic()
+            while self._sent_at and now - self._sent_at[0] >= 60.0:
+                self._sent_at.popleft()
+            wait = 0.0
+            if len(self._sent_at) >= self.max_per_minute:
+                wait = 60.0 - (now - self._sent_at[0])
+            if self._sent_at:
+                wait = max(wait, self.min_interval_sec - (now - self._sent_at[-1]))
+            if wait > 0:
+                self.stats["throttled_sec"] += wait
+                time.sleep(wait)
+            self.send(text)
+            self._sent_at.append(time.monotonic())
+
+    def report(self) -> str:
+        s = self.stats
+        done = s["sent"] + s["failed"]
+        avg = s["latency_ms_total"] / done if done else 0.0
+        return (f"알림 {s['sent']}건 전송 (병합 {s['coalesced']}, 버림 {s['dropped']}, 실패 {s['failed']}), "
+                f"처리 지연 평균 {avg / 1000:.1f}s / 최대 {s['latency_ms_max'] / 1000:.1f}s")
+
+
+class CadenceMonitor:
+    def __init__(self, expected_sec: float, window: int = 360):
+        """
+        감시 루프 주기 측정기: 샘플링 간격이 기대 주기(expected_sec)를 넘은 만큼을 정체(stall)로 기록합니다.
+        루프가 매 샘플링마다 mark()를 호출하고, report()로 최근 window회의 정체 시간을 요약합니다.
+        """
+        self.expected_sec = expected_sec
+        self._last: Optional[float] = None
+        self._stalls = deque(maxlen=window)
+        self.max_stall_sec = 0.0
+        self.total_stall_sec = 0.0
+
+    def mark(self) -> float:
+        """이번 샘플링 시점을 기록하고 정체 시간(초)을 반환합니다."""
+        now = time.monotonic()
+        stall = 0.0
+        if self._last is not None:
+            stall = max(0.0, (now - self._last) - self.expected_sec)
+            self._stalls.append(stall)
+            self.max_stall_sec = max(self.max_stall_sec, stall)
+            self.total_stall_sec += stall
+        self._last = now
+        return stall
+
+    def report(self) -> str:
+        recent = sorted(self._stalls)
+        p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+        return (f"샘플링 정체 최근 p99 {p99:.2f}s / 최대 {self.max_stall_sec:.2f}s "
+                f"(누적 {self.total_stall_sec:.1f}s, 기대 주기 {self.expected_sec:g}s)")
@@ -0,0 +1,162 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageFont
+
+DEFAULT_WORKERS = int(os.getenv("CARD_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+class FontBook:
+    def __init__(self, font_dir, default_font: str):
+        """
+        카드 이미지용 폰트 캐시 (프로세스당 한 번 로드)
+
+        - 폰트 폴더 목록은 처음 한 번만 읽고, (이름, 크기)별 FreeTypeFont를 재사용합니다.
+        - 이름 매칭은 기존 _find_file_smart와 같습니다: 정확한 파일명 → 파일명에 키워드 포함
+        """
+        self.font_dir = Path(font_dir)
+        self.default_font = default_font
+        self._files: Optional[List[Path]] = None
+        self._paths: Dict[str, Optional[Path]] = {}
+        self._fonts: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+
+    def _find(self, stem: str) -> Optional[Path]:
+        if stem not in self._paths:
+            if self._files is None:
+                self._files = sorted(p for p in self.font_dir.iterdir()
+                                     if p.is_file() and p.suffix.lower() in (".ttf", ".otf")) if self.font_dir.exists() else []
+            exact = [p for p in self._files if p.stem == stem]
+            fuzzy = [p for p in self._files if stem.lower() in p.name.lower()]
+            self._paths[stem] = (exact or fuzzy or [None])[0]
+        return self._paths[stem]
+
+    def get(self, stem: str, size: int) -> ImageFont.FreeTypeFont:
+        key = (stem, size)
+        font = self._fonts.get(key)
+        if font is None:
+            path = self._find(stem)
+            try:
+                font = ImageFont.truetype(str(path) if path else self.default_font, size)
+            except IOError:
+                print(f"⚠️ 폰트 '{stem}' 로드 실패. 기본 폰트를 사용합니다.")
+                font = ImageFont.truetype(self.default_font, size)
+            self._fonts[key] = font
+        return font
+
+
+class BackgroundBook:
+    def __init__(self, template_dir, size: Tuple[int, int] = (1080, 1080), fill=(255, 255, 255)):
+        """
+        카드 배경 이미지 캐시: 키워드별 PNG를 한 번만 열어 리사이즈·RGBA 변환해 두고, 카드마다 복사본을 돌려줍니다.
+        """
+        self.template_dir = Path(template_dir)
+        self.size = size
+        self.fill = fill
+        self._images: Dict[Tuple[str, Tuple[int, int]], Optional[Image.Image]] = {}
+
+    def _find(self, keyword: str) -> Optional[Path]:
+        if not self.template_dir.exists():
+            return None
+        for ext in (".png", ".jpg", ".jpeg"):
+            f = self.template_dir / f"{keyword}{ext}"
+            if f.exists():
+                return f
+        for f in sorted(self.template_dir.iterdir()):
+            if f.is_file() and f.suffix.lower() in (".png", ".jpg", ".jpeg") and keyword.lower() in f.name.lower():
+                return f
+        return None
+
+    def get(self, keyword: str, size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        size = size or self.size
+        key = (keyword, size)
+        if key not in self._images:
+            path = self._find(keyword)
+            if path:
+                with Image.open(path) as src:
+                    self._images[key] = src.resize(size).convert("RGBA")
+            else:
+                print(f"⚠️ 배경 '{keyword}'을(를) 찾을 수 없어 흰색 배경을 사용합니다.")
+                self._images[key] = None
+        base = self._images[key]
+        return base.copy() if base is not None else Image.new("RGBA", size, self.fill)
+
+
+# ------------------------------------------------------------
+# 프로세스 풀 렌더링
+# ------------------------------------------------------------
+_WORKER_RENDERER = None
+
+
+def _worker_init(builder: Callable, args: tuple):
+    global _WORKER_RENDERER
+    _WORKER_RENDERER = builder(*args)
+
+
+def _worker_render(method: str, args: tuple, kwargs: dict):
+    started = time.perf_counter()
+    getattr(_WORKER_RENDERER, method)(*args, **kwargs)
+    return os.getpid(), time.perf_counter() - started
+
+
+class CardRenderPool:
+    def __init__(self, builder: Callable, builder_args: tuple = (), workers: int = DEFAULT_WORKERS):
+        """
+        카드 여러 장을 프로세스 풀에서 나눠 그리는 렌더러
+
+        - 워커마다 builder(*builder_args)로 렌더러 객체를 한 번 만들고(폰트·배경·차트 데이터 로드),
+          작업 (메서드명, args, kwargs)를 그 객체의 메서드 호출로 실행합니다. 각 메서드는 결과를 파일로 저장합니다.
+        - builder / 인자는 pickle 가능해야 합니다. (모듈 최상위 클래스·함수)
+        - workers <= 1, 작업 1개, 또는 풀 생성·실행 실패(BrokenProcessPool 등) 시 현재 프로세스에서 순서대로 그립니다.
+        """
+        self.builder = builder
+        self.builder_args = builder_args
+        self.workers = max(1, workers)
+        self.stats = {"cards": 0, "wall_sec": 0.0, "card_sec": {}, "workers_used": 0, "mode": ""}
+
+    def render(self, jobs: Sequence[Tuple[str, str, tuple, dict]]) -> Dict[str, float]:
+        """jobs: [(카드 이름, 메서드명, args, kwargs)] → {카드 이름: 렌더 시간(초)}"""
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        if self.workers > 1 and len(jobs) > 1:
+            try:
+                timings = self._render_parallel(jobs)
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠️ [CardRender] 프로세스 풀 실패, 순차 렌더링으로 전환: {e}")
+                timings = {}
+        if not timings:
+            timings = self._render_serial(jobs)
+        self.stats["cards"] = len(jobs)
+        self.stats["wall_sec"] = time.perf_counter() - started
+        self.stats["card_sec"] = timings
+        return timings
+
+    def _render_parallel(self, jobs):
+        workers = min(self.workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init,
+                                 initargs=(self.builder, self.builder_args)) as pool:
+            futures = [(name, pool.submit(_worker_render, method, args, kwargs)) for name, method, args, kwargs in jobs]
+            results = [(name, f.result()) for name, f in futures]
+        self.stats["workers_used"] = len({pid for _, (pid, _) in results})
+        self.stats["mode"] = "process"
+        return {name: sec for name, (_, sec) in results}
+
+    def _render_serial(self, jobs):
+        renderer = self.builder(*self.builder_args)
+        timings = {}
+        for name, method, args, kwargs in jobs:
+            t0 = time.perf_counter()
+            getattr(renderer, method)(*args, **kwargs)
+            timings[name] = time.perf_counter() - t0
+        self.stats["workers_used"] = 1
+        self.stats["mode"] = "serial"
+        return timings
+
+    def report(self) -> str:
+        s = self.stats
+        busy = sum(s["card_sec"].values())
+        return (f"카드 {s['cards']}장 렌더링 {s['wall_sec']:.2f}s (카드 합계 {busy:.2f}s, "
+                f"{s['mode']} × {s['workers_used']})")
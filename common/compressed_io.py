@@ -0,0 +1,121 @@
+import io
+import os
+import gzip
+import fnmatch
+import posixpath
+
+# zstandard는 선택 의존성입니다. 없으면 gzip으로 대체합니다.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 압축 포맷 식별용 매직 바이트 (파일/객체 맨 앞에 기록되는 content-type 마커)
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+ZSTD_LEVEL = int(os.getenv("DATA_ZSTD_LEVEL", "10"))
+GZIP_LEVEL = int(os.getenv("DATA_GZIP_LEVEL", "6"))
+
+# 압축 대상 데이터셋 (파일명 기준 fnmatch 패턴)
+DEFAULT_COMPRESS_PATTERNS = [
+    "kr_prices_*.csv",
+    "naver_themes_*.csv",
+    "kr_news_*.jsonl",
+    "kr_news_cleaned_*.jsonl",
+    "global_news_*.jsonl",
+    "kr_stock_event_news_*.jsonl",
+    "volume_anomaly*.csv",
+    "signalist_today_log.csv",
+]
+COMPRESS_PATTERNS = [p.strip() for p in os.getenv("DATA_COMPRESS_PATTERNS", ",".join(DEFAULT_COMPRESS_PATTERNS)).split(",") if p.strip()]
+
+
+def preferred_codec():
+    """
+    사용할 압축 코덱을 반환합니다. DATA_COMPRESS_CODEC=zstd|gzip|none (기본 zstd)
+    zstd를 요청했지만 zstandard 모듈이 없으면 gzip을 사용합니다.
+    """
+    codec = os.getenv("DATA_COMPRESS_CODEC", "zstd").strip().lower()
+    if codec in ("", "none", "off", "0"):
+        return None
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec if codec in ("zstd", "gzip") else "gzip"
+
+
+def should_compress(path_or_key, patterns=None):
+    name = posixpath.basename(str(path_or_key).replace("\\", "/"))
+    return any(fnmatch.fnmatch(name, p) for p in (patterns or COMPRESS_PATTERNS))
+
+
+def detect_codec(head: bytes):
+    """앞부분 바이트로 압축 포맷을 판별합니다. 평문(레거시)이면 None"""
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    return None
+
+
+def compress_bytes(data: bytes, codec=None) -> bytes:
+    codec = codec or preferred_codec()
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == "gzip":
+        # mtime=0: 같은 내용이면 항상 같은 바이트가 나오도록 (ETag 비교용)
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return data
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """압축 여부를 자동 판별하여 원본 바이트를 반환합니다. 평문이면 그대로 반환"""
+    codec = detect_codec(data[:4])
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 데이터입니다. zstandard 모듈을 설치하세요.")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def read_bytes(path) -> bytes:
+    with open(path, "rb") as f:
+        return decompress_bytes(f.read())
+
+
+def open_text(path, encoding="utf-8-sig"):
+    """압축/평문 파일을 모두 텍스트 스트림으로 엽니다. (csv/json 모듈, pandas에 그대로 전달 가능)"""
+    return io.TextIOWrapper(io.BytesIO(read_bytes(path)), encoding=encoding, newline="")
+
+
+def read_csv(path, **kwargs):
+    """pandas.read_csv의 투명 압축 버전 (레거시 평문 파일도 그대로 읽습니다)"""
+    import pandas as pd
+    kwargs.setdefault("encoding", "utf-8-sig")
+    return pd.read_csv(io.BytesIO(read_bytes(path)), **kwargs)
+
+
+def write_bytes(path, data: bytes, codec=None):
+    """데이터를 (필요 시 압축하여) 원자적으로 기록합니다. 파일명은 그대로 유지하고 매직 바이트로 구분합니다."""
+    payload = compress_bytes(data, codec) if codec != "none" else data
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def write_text(path, text: str, codec=None, encoding="utf-8-sig"):
+    return write_bytes(path, text.encode(encoding), codec)
+
+
+def decompress_file_inplace(path) -> bool:
+    """압축된 파일이면 평문으로 풀어 같은 경로에 다시 씁니다. (S3에서 받은 객체를 로컬 평문으로 복원)"""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if detect_codec(head) is None:
+        return False
+    write_bytes(path, read_bytes(path), codec="none")
+    return True
@@ -62,5 +62,16 @@ class ConfigLoader:
             logging.warning(f"Secret load failed for {key}: {e}")
             return value
 
+    def ensure_secrets(self, keys):
+        """
+        여러 시크릿을 한 번에 로드합니다. (한 번 해석된 값은 os.environ에 캐시됩니다)
+        :param keys: 키 리스트 또는 {키: 기본값} 딕셔너리
+        """
+        defaults = keys if isinstance(keys, dict) else dict.fromkeys(keys)
+        return {k: self.ensure_secret(k, d) for k, d in defaults.items()}
+
+# DB 접속에 필요한 시크릿 목록과 기본값 (웹/워커 공용)
+DB_SECRET_KEYS = {"DB_HOST": None, "DB_PORT": "3306", "DB_USER": None, "DB_PASSWORD": None, "DB_NAME": None}
+
 # 전역 설정 객체 생성
-config = ConfigLoader()
\ No newline at end of file
+config = ConfigLoader()
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+
+# 호스트 단위 영구 캐시 위치 (배포 시 앱 폴더가 교체되어도 유지되는 경로)
+DEFAULT_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "/var/cache/fincore/s3")
+DEFAULT_MAX_BYTES = int(float(os.getenv("DATA_CACHE_MAX_GB", "5")) * 1024 ** 3)
+
+_INDEX_NAME = "index.json"
+_CHUNK = 1024 * 1024
+
+
+class LocalDataCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        S3 ETag로 주소가 매겨지는 로컬 데이터 캐시 (같은 호스트의 실행 간 유지)
+
+        - blobs/<etag> 에 객체 내용을 저장하고, 같은 ETag면 다시 받지 않습니다.
+        - 중단된 다운로드는 blobs/<etag>.part 에서 Range 요청으로 이어받습니다.
+        - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 blob부터 삭제합니다(LRU).
+        """
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._etag_locks = {}
+        self.enabled = True
+        try:
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ [Cache] 캐시 폴더 생성 실패, 캐시 없이 진행: {e}")
+            self.enabled = False
+        self._index = self._read_index()
+        self.reset_stats()
+
+    # ------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------
+    def reset_stats(self):
+        self.stats = {"hits": 0, "misses": 0, "resumed": 0, "bytes_transferred": 0, "bytes_served": 0, "evicted": 0}
+
+    def hit_ratio(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def report(self, label="Cache"):
+        s = self.stats
+        print(f"📊 [{label}] 적중 {s['hits']} / 미적중 {s['misses']} (적중률 {self.hit_ratio():.0%}), "
+              f"전송 {s['bytes_transferred'] / 1024 / 1024:.1f}MB, 캐시 제공 {s['bytes_served'] / 1024 / 1024:.1f}MB, "
+              f"이어받기 {s['resumed']}, 삭제 {s['evicted']}")
+
+    # ------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------
+    def fetch(self, s3_client, bucket, key, etag, size, local_path):
+        """
+        S3 객체를 local_path로 가져옵니다. 캐시에 같은 ETag가 있으면 네트워크를 쓰지 않습니다.
+        Returns: 네트워크로 전송한 바이트 수
+        """
+        if not self.enabled or not etag:
+            s3_client.download_file(bucket, key, local_path)
+            with self._lock:
+                self.stats["misses"] += 1
+                self.stats["bytes_transferred"] += size or 0
+            return size or 0
+
+        blob = self._blob_path(etag)
+        with self._etag_lock(etag):
+            transferred = 0
+            if blob.exists() and blob.stat().st_size == size:
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["bytes_served"] += size
+            else:
+                transferred = self._download_blob(s3_client, bucket, key, etag, size, blob)
+                with self._lock:
+                    self.stats["misses"] += 1
+                    self.stats["bytes_transferred"] += transferred
+
+            # 파이프라인이 로컬 파일을 수정해도 캐시가 오염되지 않도록 링크가 아닌 복사본을 만듭니다.
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+            tmp_path = f"{local_path}.s3tmp"
+            shutil.copyfile(blob, tmp_path)
+            os.replace(tmp_path, local_path)
+
+            with self._lock:
+                self._index[etag] = {"key": key, "size": size, "last_access": time.time()}
+        return transferred
+
+    def _download_blob(self, s3_client, bucket, key, etag, size, blob):
+        part = blob.with_name(blob.name + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        if offset > size:
+            part.unlink()
+            offset = 0
+        if offset:
+            with self._lock:
+                self.stats["resumed"] += 1
+
+        transferred = 0
+        if offset < size:
+            kwargs = {"Bucket": bucket, "Key": key, "IfMatch": f'"{etag}"'}
+            if offset:
+                kwargs["Range"] = f"bytes={offset}-"
+            body = s3_client.get_object(**kwargs)["Body"]
+            with open(part, "ab") as f:
+                for chunk in iter(lambda: body.read(_CHUNK), b""):
+                    f.write(chunk)
+                    transferred += len(chunk)
+
+        if part.stat().st_size != size or not self._verify(part, etag):
+            part.unlink(missing_ok=True)
+            raise IOError(f"캐시 다운로드 검증 실패: {key} (etag={etag})")
+        os.replace(part, blob)
+        return transferred
+
+    @staticmethod
+    def _verify(path, etag):
+        """단일 업로드 객체(ETag=MD5)는 내용 해시를 검증합니다. 멀티파트 ETag는 크기 검증만 합니다."""
+        if "-" in etag:
+            return True
+        md5 = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                md5.update(chunk)
+        return md5.hexdigest() == etag
+
+    # ------------------------------------------------------------
+    # 정리 (LRU)
+    # ------------------------------------------------------------
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 blob부터 삭제합니다."""
+        if not self.enabled:
+            return
+        # 하루 이상 방치된 이어받기 파일(.part)도 함께 정리
+        for part in self.blob_dir.glob("*.part"):
+            try:
+                if time.time() - part.stat().st_mtime > 86400:
+                    part.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            entries = sorted(self._index.items(), key=lambda kv: kv[1].get("last_access", 0))
+            total = sum(e.get("size", 0) for _, e in entries)
+            for etag, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    self._blob_path(etag).unlink(missing_ok=True)
+                except OSError:
+                    continue
+                total -= entry.get("size", 0)
+                self._index.pop(etag, None)
+                self.stats["evicted"] += 1
+
+    def save(self):
+        """인덱스를 디스크에 기록합니다. (다른 프로세스가 기록한 항목과 병합)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            merged = self._read_index()
+            for etag, entry in self._index.items():
+                if entry.get("last_access", 0) >= merged.get(etag, {}).get("last_access", 0):
+                    merged[etag] = entry
+            # 삭제된 blob은 인덱스에서도 제거
+            self._index = {e: v for e, v in merged.items() if self._blob_path(e).exists()}
+            path = self.cache_dir / _INDEX_NAME
+            tmp = path.with_name(f"{_INDEX_NAME}.{os.getpid()}.tmp")
+            try:
+                tmp.write_text(json.dumps(self._index), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"⚠️ [Cache] 인덱스 저장 실패: {e}")
+
+    def close(self):
+        self.evict()
+        self.save()
+
+    # ------------------------------------------------------------
+    # 내부 구현
+    # ------------------------------------------------------------
+    def _blob_path(self, etag):
+        return self.blob_dir / etag.replace("/", "_")
+
+    def _etag_lock(self, etag):
+        with self._lock:
+            return self._etag_locks.setdefault(etag, threading.Lock())
+
+    def _read_index(self):
+        try:
+            return json.loads((self.cache_dir / _INDEX_NAME).read_text(encoding="utf-8"))
+        except Exception:
+            return {}
@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from urllib3.exceptions import NewConnectionError
+from itsdangerous import URLSafeTimedSerializer
+
+SENDGRID_API_BASE = os.getenv("SENDGRID_API_BASE", "https://api.sendgrid.com")
+DEFAULT_JOURNAL_DIR = os.getenv("EMAIL_JOURNAL_DIR", str(Path(__file__).resolve().parents[1] / "data" / "email_journal"))
+# 이 기간(일)보다 오래 수정되지 않은 캠페인 저널 파일은 삭제합니다.
+JOURNAL_TTL_DAYS = float(os.getenv("EMAIL_JOURNAL_TTL_DAYS", "14"))
+
+# SendGrid 한 요청당 personalization 최대 1,000개
+MAX_BATCH_SIZE = 1000
+
+
+def iter_subscriber_pages(conn, sql, page_size=None):
+    """
+    구독자 이메일을 email 기준 키셋 페이지로 나눠 읽습니다.
+    페이지를 모두 받아 커서를 닫은 뒤 내보내므로, 발송이 429/5xx 백오프로 오래 멈춰도
+    서버에 열린 결과셋이 남지 않습니다. (SSCursor 스트리밍은 net_write_timeout에 걸려 발송이 중간에 끊길 수 있음)
+    conn은 DictCursor 연결이어야 하며, sql은 email 컬럼을 반환하는 SELECT 문입니다.
+    """
+    page_size = max(1, int(page_size or os.getenv("SUBSCRIBER_PAGE_SIZE", "5000")))
+    paged_sql = f"SELECT email FROM ({sql}) AS s WHERE email > %s ORDER BY email LIMIT %s"
+    last = ""
+    while True:
+        conn.ping(reconnect=True)  # 페이지 사이 대기가 길어져 끊긴 연결 복구
+        with conn.cursor() as cursor:
+            cursor.execute(paged_sql, (last, page_size))
+            rows = cursor.fetchall()
+        for row in rows:
+            yield row['email']
+        if len(rows) < page_size:
+            return
+        last = rows[-1]['email']
+
+
+def iter_db_subscribers(sql, fallback=None, page_size=None):
+    """
+    구독자 이메일을 페이지 단위로 내보냅니다. (전체 목록을 메모리에 올리지 않음)
+    DB 접속 자체가 실패하면 fallback 목록을 대신 내보냅니다.
+    """
+    import pymysql
+    try:
+        conn = pymysql.connect(
+            host=os.getenv("DB_HOST"), port=int(os.getenv("DB_PORT", 3306)),
+            user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+            db=os.getenv("DB_NAME"), charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor
+        )
+    except Exception as e:
+        print(f"⚠️ [DB Error] 구독자 조회 실패: {e}")
+        yield from (fallback or [])
+        return
+
+    count = 0
+    try:
+        for email in iter_subscriber_pages(conn, sql, page_size):
+            count += 1
+            yield email
+        print(f"✅ [DB Load] 구독자 {count}명 조회 완료")
+    finally:
+        conn.close()
+
+
+class _RateLimiter:
+    """초당 요청 수 제한 (토큰 버킷, 스레드 공용)"""
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec and rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SendGridDispatcher:
+    def __init__(self, api_key, from_email, service_name, campaign_id,
+                 batch_size=MAX_BATCH_SIZE, concurrency=None, rate_per_sec=None, max_retries=5,
+                 api_base=SENDGRID_API_BASE, journal_dir=DEFAULT_JOURNAL_DIR, timeout=30,
+                 journal_ttl_days=JOURNAL_TTL_DAYS):
+        """
+        SendGrid 대량 발송기 (Moneybag & Signalist 공용)
+
+        - 구독자 이터레이터를 받아 1,000명 단위 배치로 묶고, 배치들을 동시에 전송합니다.
+        - 429/5xx 응답은 Retry-After 또는 지수 백오프(지터 포함)로 재시도합니다.
+        - campaign_id + 수신자 이메일로 만든 수신자별 멱등 키를 저널에 기록하고, 배치를 만들기 전에 저널에 있는
+          주소를 걸러냅니다. 프로세스가 죽었다 다시 실행되면 구독자 목록이 바뀌어 배치 경계가 달라져도
+          이미 보낸(또는 보내는 중이던) 수신자에게는 다시 보내지 않습니다.
+          campaign_id에는 날짜/실행 ID를 포함해야 같은 제목의 다른 발송이 건너뛰어지지 않습니다.
+        - journal_ttl_days보다 오래된 저널 파일은 생성 시 정리합니다.
+        """
+        self.api_key = (api_key or "").strip()
+        self.from_email = from_email
+        self.service_name = service_name
+        self.campaign_id = campaign_id
+        self.batch_size = max(1, min(int(batch_size), MAX_BATCH_SIZE))
+        self.concurrency = max(1, int(concurrency or os.getenv("SENDGRID_CONCURRENCY", "4")))
+        self.rate = _RateLimiter(float(rate_per_sec or os.getenv("SENDGRID_RATE_PER_SEC", "5")))
+        self.max_retries = max_retries
+        self.url = api_base.rstrip("/") + "/v3/mail/send"
+        self.timeout = timeout
+
+        # 배치 루프 밖에서 한 번만 준비 (기존에는 수신자마다 os.getenv / Serializer 생성)
+        self.web_base_url = os.getenv("WEB_BASE_URL", "https://www.fincore.co.kr").rstrip("/")
+        self.serializer = URLSafeTimedSerializer(os.getenv('SECRET_KEY', 'a-very-secret-key-that-is-secure'))
+
+        self._session = requests.Session()
+        self._session.headers.update({"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"})
+        self._journal_lock = threading.Lock()
+        self._journal_path = None
+        self._journal = {}
+        if journal_dir:
+            safe_id = hashlib.sha1(campaign_id.encode("utf-8")).hexdigest()[:16]
+            self._journal_path = Path(journal_dir) / f"{service_name}_{safe_id}.jsonl"
+            self._prune_journals(journal_ttl_days)
+            self._journal = self._load_journal()
+
+    # ------------------------------------------------------------
+    # 발송
+    # ------------------------------------------------------------
+    def send(self, recipients, subject, html_content):
+        """
+        recipients: 이메일 이터레이터 (리스트 또는 iter_db_subscribers 제너레이터)
+        Returns: 발송 결과 요약 dict (sent, failed, skipped, batches, elapsed, batch_timings)
+        """
+        started = time.time()
+        summary = {"sent": 0, "failed": 0, "skipped": 0, "uncertain": 0, "batches": 0, "batch_timings": []}
+        summary_lock = threading.Lock()
+        # 동시에 메모리에 올라가는 배치 수 제한 (스트리밍 유지)
+        in_flight = threading.BoundedSemaphore(self.concurrency * 2)
+
+        def _run(batch_no, batch):
+            try:
+                try:
+                    status, elapsed = self._send_batch(batch_no, batch, subject, html_content)
+                except Exception as e:
+                    print(f"❌ [Batch {batch_no}] 예외 발생: {e}")
+                    status, elapsed = "failed", 0.0
+                with summary_lock:
+                    summary["batches"] += 1
+                    summary["batch_timings"].append(round(elapsed, 3))
+                    key = {"done": "sent", "uncertain": "uncertain"}.get(status, "failed")
+                    summary[key] += len(batch)
+            finally:
+                in_flight.release()
+
+        queued = set()  # 이번 실행에서 이미 배치에 넣은 수신자 (목록 내 중복 주소)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            batch, batch_no = [], 0
+            for email in recipients:
+                if not email:
+                    continue
+                key = self._recipient_key(email)
+                if key in queued:
+                    continue
+                queued.add(key)
+                if self._journal.get(key) in ("done", "sending"):
+                    # "sending" 상태는 직전 실행이 전송 도중 죽은 경우 -> 중복 발송 방지를 위해 다시 보내지 않음
+                    with summary_lock:
+                        summary["skipped"] += 1
+                    continue
+                batch.append(email)
+                if len(batch) >= self.batch_size:
+                    in_flight.acquire()
+                    batch_no += 1
+                    pool.submit(_run, batch_no, batch)
+                    batch = []
+            if batch:
+                in_flight.acquire()
+                batch_no += 1
+                pool.submit(_run, batch_no, batch)
+
+        summary["elapsed"] = round(time.time() - started, 2)
+        print(f"🏁 [SendGrid] {self.service_name} 발송 완료. 성공: {summary['sent']}, 실패: {summary['failed']}, "
+              f"건너뜀(기발송): {summary['skipped']}, 불확실: {summary['uncertain']} "
+              f"({summary['batches']}개 배치, {summary['elapsed']:.2f}초)")
+        return summary
+
+    def _build_payload(self, batch, subject, html_content, idem_key):
+        personalizations = []
+        for email in batch:
+            try:
+                token = self.serializer.dumps(email, salt='email-unsubscribe')
+                unsubscribe_url = f"{self.web_base_url}/unsubscribe/{self.service_name}/{token}"
+            except Exception as e:
+                print(f"⚠️ 토큰 생성 실패: {email}, {e}")
+                unsubscribe_url = f"{self.web_base_url}/"
+            personalizations.append({
+                "to": [{"email": email}],
+                "substitutions": {"-email-": email, "-unsubscribe_url-": unsubscribe_url},
+            })
+        return {
+            "personalizations": personalizations,
+            "from": self._parse_from(self.from_email),
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}],
+            "custom_args": {"batch_key": idem_key},
+        }
+
+    @staticmethod
+    def _parse_from(from_email):
+        if "<" in from_email and from_email.endswith(">"):
+            name, addr = from_email[:-1].split("<", 1)
+            return {"email": addr.strip(), "name": name.strip()}
+        return {"email": from_email.strip()}
+
+    def _send_batch(self, batch_no, batch, subject, html_content):
+        keys = [self._recipient_key(email) for email in batch]
+        idem_key = self._batch_key(keys)
+        started = time.time()
+        payload = json.dumps(self._build_payload(batch, subject, html_content, idem_key), ensure_ascii=False)
+        self._record(keys, "sending")
+
+        for attempt in range(self.max_retries + 1):
+            self.rate.wait()
+            try:
+                response = self._session.post(self.url, data=payload.encode("utf-8"), timeout=(5, self.timeout))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self._request_not_sent(e):
+                    break
+                # 연결 자체가 안 된 경우는 요청이 전달되지 않았으므로 재시도해도 안전
+                delay = self._backoff(attempt)
+                print(f"⚠️ [Batch {batch_no}] 연결 실패, {delay:.1f}s 후 재시도: {e}")
+                time.sleep(delay)
+                continue
+
+            if 200 <= response.status_code < 300:
+                self._record(keys, "done")
+                elapsed = time.time() - started
+                print(f"✅ [Batch {batch_no}] {len(batch)}명 발송 성공 (소요 시간: {elapsed:.2f}초, Status: {response.status_code})")
+                return "done", elapsed
+            if response.status_code == 429 or response.status_code >= 500:
+                delay = self._retry_after(response) or self._backoff(attempt)
+                print(f"⚠️ [Batch {batch_no}] Status {response.status_code}, {delay:.1f}s 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+            # 4xx는 재시도해도 결과가 같으므로 즉시 실패 처리 (다음 실행에서 다시 시도할 수 있도록 저널 해제)
+            print(f"❌ [Batch {batch_no}] 발송 실패 (Status: {response.status_code})")
+            print(f"   -> SendGrid Body: {response.text[:500]}")
+            self._record(keys, "failed")
+            return "failed", time.time() - started
+        else:
+            self._record(keys, "failed")
+            print(f"❌ [Batch {batch_no}] 재시도 한도 초과")
+            return "failed", time.time() - started
+
+        # 응답 대기 중 타임아웃: 전송 여부를 알 수 없으므로 "sending" 상태로 남겨 재발송하지 않음
+        print(f"⚠️ [Batch {batch_no}] 응답 타임아웃 - 발송 여부 불확실 (key={idem_key[:12]}), 재발송하지 않습니다.")
+        return "uncertain", time.time() - started
+
+    @staticmethod
+    def _request_not_sent(error):
+        """연결 수립 단계에서 실패했는지 (요청 본문이 서버에 도달하지 않았는지) 판별합니다."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _backoff(attempt):
+        return min(60.0, (2 ** attempt)) * (0.5 + random.random())
+
+    # ------------------------------------------------------------
+    # 멱등 키 저널
+    # ------------------------------------------------------------
+    def _recipient_key(self, email):
+        return hashlib.sha256(f"{self.campaign_id}\0{email.strip().lower()}".encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _batch_key(keys):
+        """배치 추적용 키 (SendGrid custom_args / 로그). 중복 판정은 수신자 키로 합니다."""
+        return hashlib.sha256("".join(sorted(keys)).encode("utf-8")).hexdigest()
+
+    def _prune_journals(self, ttl_days):
+        if not ttl_days or ttl_days <= 0:
+            return
+        cutoff = time.time() - ttl_days * 86400
+        try:
+            for path in self._journal_path.parent.glob("*.jsonl"):
+                try:
+                    if path != self._journal_path and path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except OSError:
+                    continue
+        except OSError:
+            pass
+
+    def _load_journal(self):
+        states = {}
+        lines = 0
+        try:
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        rec = json.loads(line)
+                        states[rec["key"]] = rec["state"]
+                    except (ValueError, KeyError):
+                        continue
+        except FileNotFoundError:
+            return states
+
+        if lines > len(states):
+            # 재실행마다 쌓인 상태 변경 줄을 키당 최종 상태 한 줄로 압축
+            tmp = self._journal_path.with_suffix(".tmp")
+            now = time.time()
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, state in states.items():
+                    f.write(json.dumps({"key": key, "state": state, "ts": now}) + "\n")
+            os.replace(tmp, self._journal_path)
+        return states
+
+    def _record(self, keys, state):
+        """수신자 키들의 상태를 기록합니다. (배치당 한 번 append + fsync)"""
+        with self._journal_lock:
+            for key in keys:
+                self._journal[key] = state
+            if not self._journal_path:
+                return
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+            now = time.time()
+            data = "".join(json.dumps({"key": key, "state": state, "ts": now}) + "\n" for key in keys)
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
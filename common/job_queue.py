@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import queue
+import atexit
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+
+class QueueFullError(Exception):
+    """대기열이 최대 깊이(max_queue)에 도달해 작업을 받을 수 없을 때 발생합니다."""
+
+
+class BackgroundJobQueue:
+    def __init__(self, name="jobs", workers=4, max_queue=200, max_retries=3,
+                 backoff_base=2.0, backoff_max=60.0, spool_dir=None):
+        """
+        웹 프로세스 내부의 백그라운드 작업 큐 (고정 워커 풀 + 최대 대기열 깊이)
+
+        - 요청마다 Thread()를 띄우는 대신, 정해진 수의 워커가 대기열을 소비합니다.
+        - 동일한 dedup_key 작업이 대기/실행 중이면 중복 등록하지 않습니다.
+        - 실패한 작업은 지수 백오프로 max_retries 만큼 재시도합니다.
+        - spool_dir 지정 시 대기 중인 작업을 디스크에 기록해 재시작 후 복구합니다.
+        """
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.spool_root = Path(spool_dir) if spool_dir else None
+        self.spool_dir = None  # start()에서 프로세스별 하위 디렉토리로 지정
+
+        self._handlers = {}
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._keys = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._started = False
+
+        self._stats = {
+            "submitted": 0, "deduplicated": 0, "rejected": 0,
+            "succeeded": 0, "failed": 0, "retried": 0,
+            "wait_ms_total": 0.0, "run_ms_total": 0.0, "run_ms_max": 0.0,
+        }
+
+    # ------------------------------------------------------------
+    # 등록 / 시작 / 종료
+    # ------------------------------------------------------------
+    def register(self, job_type, func):
+        """작업 종류(job_type)에 실행 함수를 연결합니다. 스풀 복구 시 이 이름으로 함수를 찾습니다."""
+        self._handlers[job_type] = func
+        return func
+
+    def start(self):
+        """워커 스레드를 띄우고, 스풀에 남아있던 작업을 다시 적재합니다."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        if self.spool_root:
+            # 프로세스(gunicorn 워커)마다 하위 디렉토리를 따로 써서 서로의 스풀을 중복 재실행하지 않습니다.
+            # fork 이후의 pid를 쓰도록 생성자가 아닌 start()에서 정합니다.
+            self.spool_dir = self.spool_root / str(os.getpid())
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"{self.name}-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+        self._restore_spool()
+        atexit.register(self.shutdown)
+        print(f"[INFO] BackgroundJobQueue '{self.name}' started (workers={self.workers}, max_queue={self.max_queue})")
+
+    def shutdown(self, timeout=10.0):
+        """
+        새 작업 수신을 멈추고, 대기열이 비거나 timeout이 지날 때까지 기다린 뒤 워커를 종료합니다.
+        남은 작업은 스풀 파일로 유지되어 다음 기동 때 재실행됩니다.
+        """
+        if not self._started or self._stop.is_set():
+            return
+        deadline = time.monotonic() + timeout
+        while self.depth() > 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
+        print(f"[INFO] BackgroundJobQueue '{self.name}' stopped (remaining={self.depth()})")
+
+    # ------------------------------------------------------------
+    # 작업 등록
+    # ------------------------------------------------------------
+    def submit(self, job_type, *args, dedup_key=None):
+        """
+        작업을 대기열에 넣습니다.
+        Returns: True(등록됨) / False(동일 작업이 이미 대기 중이라 생략)
+        Raises: QueueFullError (대기열 초과), KeyError (등록되지 않은 job_type)
+        """
+        if job_type not in self._handlers:
+            raise KeyError(f"Unknown job type: {job_type}")
+        if not self._started:
+            self.start()
+
+        key = dedup_key or self._make_key(job_type, args)
+        with self._lock:
+            if key in self._keys:
+                self._stats["deduplicated"] += 1
+                return False
+            job = {"type": job_type, "args": list(args), "key": key, "attempt": 0, "enqueued_at": time.time()}
+            # 스풀 복구/다른 submit과 경합하지 않도록 적재까지 락 안에서 처리
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._stats["rejected"] += 1
+                raise QueueFullError(f"'{self.name}' queue is full ({self.max_queue})")
+            self._keys.add(key)
+            self._stats["submitted"] += 1
+            self._write_spool(job)
+        return True
+
+    # ------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------
+    def depth(self):
+        return self._queue.qsize()
+
+    def metrics(self):
+        """대기열 깊이와 대기/실행 지연(ms) 지표를 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = len(self._keys)
+        done = stats["succeeded"] + stats["failed"]
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "depth": self.depth(),
+            "in_flight": in_flight,
+            "submitted": stats["submitted"],
+            "deduplicated": stats["deduplicated"],
+            "rejected": stats["rejected"],
+            "succeeded": stats["succeeded"],
+            "failed": stats["failed"],
+            "retried": stats["retried"],
+            "avg_wait_ms": round(stats["wait_ms_total"] / done, 1) if done else 0.0,
+            "avg_run_ms": round(stats["run_ms_total"] / done, 1) if done else 0.0,
+            "max_run_ms": round(stats["run_ms_max"], 1),
+        }
+
+    # ------------------------------------------------------------
+    # 내부 구현
+    # ------------------------------------------------------------
+    @staticmethod
+    def _make_key(job_type, args):
+        raw = json.dumps([job_type, list(args)], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._run_job(job)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job):
+        func = self._handlers.get(job["type"])
+        wait_ms = (time.time() - job["enqueued_at"]) * 1000
+        last_error = None
+
+        while job["attempt"] <= self.max_retries and not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                func(*job["args"])
+                self._finish(job, wait_ms, (time.perf_counter() - started) * 1000, ok=True)
+                return
+            except Exception as e:
+                last_error = e
+                job["attempt"] += 1
+                if job["attempt"] > self.max_retries:
+                    break
+                delay = min(self.backoff_max, self.backoff_base ** job["attempt"])
+                with self._lock:
+                    self._stats["retried"] += 1
+                logging.warning(f"[{self.name}] {job['type']} 실패 ({job['attempt']}/{self.max_retries}), {delay:.1f}s 후 재시도: {e}")
+                self._write_spool(job)
+                # shutdown 시 즉시 깨어나도록 Event.wait 사용
+                if self._stop.wait(delay):
+                    return
+
+        if self._stop.is_set() and job["attempt"] <= self.max_retries:
+            # 종료 중 중단된 작업은 스풀에 남겨 다음 기동 때 이어서 처리
+            return
+        logging.error(f"[{self.name}] {job['type']} 최종 실패: {last_error}")
+        self._finish(job, wait_ms, 0.0, ok=False)
+
+    def _finish(self, job, wait_ms, run_ms, ok):
+        with self._lock:
+            self._keys.discard(job["key"])
+            self._stats["succeeded" if ok else "failed"] += 1
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["run_ms_total"] += run_ms
+            self._stats["run_ms_max"] = max(self._stats["run_ms_max"], run_ms)
+        self._remove_spool(job)
+
+    def _spool_path(self, job):
+        return self.spool_dir / f"{job['key']}.json"
+
+    def _write_spool(self, job):
+        if not self.spool_dir:
+            return
+        try:
+            path = self._spool_path(job)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(job, ensure_ascii=False, default=str), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            logging.warning(f"[{self.name}] 스풀 기록 실패: {e}")
+
+    def _remove_spool(self, job):
+        if not self.spool_dir:
+            return
+        try:
+            self._spool_path(job).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        return True
+
+    def _claim_spool_files(self):
+        """
+        재실행할 스풀 파일을 모읍니다.
+        - 자기 디렉토리(이전에 같은 pid를 쓰던 프로세스가 남긴 것)는 그대로 사용
+        - 종료된 프로세스의 디렉토리와 최상위(구버전) 파일은 os.rename으로 자기 디렉토리로 옮겨 선점
+          rename은 원자적이므로 여러 워커가 동시에 기동해도 한 프로세스만 파일을 가져갑니다.
+        """
+        claimed = list(self.spool_dir.glob("*.json"))
+        sources = [self.spool_root]
+        for d in self.spool_root.iterdir():
+            if not d.is_dir() or d == self.spool_dir:
+                continue
+            if d.name.isdigit() and self._pid_alive(int(d.name)):
+                continue
+            sources.append(d)
+
+        for src in sources:
+            for path in src.glob("*.json"):
+                target = self.spool_dir / path.name
+                try:
+                    os.rename(path, target)
+                except FileNotFoundError:
+                    continue  # 다른 프로세스가 먼저 가져감
+                except OSError as e:
+                    logging.warning(f"[{self.name}] 스풀 선점 실패 {path.name}: {e}")
+                    continue
+                claimed.append(target)
+            if src != self.spool_root:
+                try:
+                    src.rmdir()
+                except OSError:
+                    pass
+        return claimed
+
+    def _restore_spool(self):
+        if not self.spool_dir:
+            return
+        restored = 0
+        for path in sorted(self._claim_spool_files(), key=lambda p: p.stat().st_mtime):
+            try:
+                job = json.loads(path.read_text(encoding="utf-8"))
+                if job.get("type") not in self._handlers:
+                    continue
+                with self._lock:
+                    if job["key"] in self._keys:
+                        continue
+                    try:
+                        self._queue.put_nowait(job)
+                    except queue.Full:
+                        continue
+                    self._keys.add(job["key"])
+                restored += 1
+            except Exception as e:
+                logging.warning(f"[{self.name}] 스풀 복구 실패 {path.name}: {e}")
+        if restored:
+            print(f"[INFO] BackgroundJobQueue '{self.name}' restored {restored} spooled job(s)")
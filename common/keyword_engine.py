@@ -0,0 +1,196 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# pyahocorasick(C 확장)이 있으면 사용하고, 없으면 같은 동작의 순수 파이썬 오토마톤으로 대체합니다.
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    rule_id: str        # "네임스페이스:규칙명" (예: "event:실적/가이던스", "theme:AI 반도체")
+    namespace: str
+    name: str
+    priority: int       # 작을수록 우선 (규칙 정의 순서)
+    weight: float = 1.0
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    rule: KeywordRule
+    keyword: str
+    start: int
+    end: int            # 소문자 변환된 본문 기준 [start, end)
+
+
+class _PyAutomaton:
+    """순수 파이썬 Aho-Corasick (goto 딕셔너리 + 실패 링크, 출력은 실패 링크를 따라 미리 병합)"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        outs: List[List[int]] = [[]]
+        for pid, pat in enumerate(patterns):
+            state = 0
+            for ch in pat:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    outs.append([])
+                state = nxt
+            outs[state].append(pid)
+
+        self.fail = [0] * len(self.goto)
+        frontier = list(self.goto[0].values())
+        while frontier:
+            nxt_frontier = []
+            for state in frontier:
+                for ch, child in self.goto[state].items():
+                    f = self.fail[state]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    target = self.goto[f].get(ch, 0)
+                    self.fail[child] = target if target != child else 0
+                    outs[child].extend(outs[self.fail[child]])
+                    nxt_frontier.append(child)
+            frontier = nxt_frontier
+        self.out: List[Tuple[int, ...]] = [tuple(o) for o in outs]
+
+    def iter(self, text: str):
+        goto, fail, out = self.goto, self.fail, self.out
+        root = goto[0]
+        state = 0
+        for i, ch in enumerate(text):
+            if state == 0:
+                state = root.get(ch, 0)
+                if not state:
+                    continue
+            else:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                yield i, pid
+
+
+class _CAutomaton:
+    def __init__(self, patterns: Sequence[str]):
+        self._a = _ahocorasick.Automaton()
+        by_pattern: Dict[str, List[int]] = {}
+        for pid, pat in enumerate(patterns):
+            by_pattern.setdefault(pat, []).append(pid)
+        for pat, pids in by_pattern.items():
+            self._a.add_word(pat, tuple(pids))
+        if by_pattern:
+            self._a.make_automaton()
+        self._empty = not by_pattern
+
+    def iter(self, text: str):
+        if self._empty:
+            return
+        for end, pids in self._a.iter(text):
+            for pid in pids:
+                yield end, pid
+
+
+class KeywordEngine:
+    def __init__(self, use_c_extension: bool = True):
+        """
+        뉴스 키워드 규칙(이벤트 태그, 테마, 크립토 뉴스 점수 등) 공용 다중 패턴 매칭 엔진
+
+        - 각 모듈이 register(namespace, rules)로 (규칙명, [키워드...]) 묶음을 등록하면,
+          전체 키워드로 Aho-Corasick 오토마톤을 한 번만 만들어 문서당 한 번의 스캔으로 모든 규칙을 판정합니다.
+        - 매칭은 기존 `kw.lower() in text.lower()`와 같은 대소문자 무시 부분 문자열 기준입니다.
+        - 등록이 바뀌면 다음 스캔 때 다시 빌드합니다. (스캔은 여러 스레드에서 동시에 호출해도 안전)
+        """
+        self.use_c_extension = use_c_extension and _ahocorasick is not None
+        self._rules: Dict[str, List[Tuple[KeywordRule, List[str]]]] = {}
+        self._lock = threading.Lock()
+        self._compiled = None   # (오토마톤, 패턴, 패턴별 규칙, 원래 키워드) - 재빌드 중에도 한 묶음으로 교체
+        self.stats = {"builds": 0, "scans": 0, "patterns": 0}
+
+    # ------------------------------------------------------------
+    # 등록 / 빌드
+    # ------------------------------------------------------------
+    def register(self, namespace: str, rules: Iterable[Tuple[str, Iterable[str]]],
+                 weights: Optional[Dict[str, float]] = None) -> None:
+        """namespace의 규칙 묶음을 (다시) 등록합니다. 규칙 순서가 곧 우선순위입니다."""
+        weights = weights or {}
+        compiled = []
+        for priority, (name, keywords) in enumerate(rules):
+            rule = KeywordRule(f"{namespace}:{name}", namespace, name, priority, weights.get(name, 1.0))
+            compiled.append((rule, [str(k) for k in keywords if str(k)]))
+        with self._lock:
+            if self._rules.get(namespace) == compiled:
+                return  # 같은 규칙 재등록(인스턴스 생성마다 호출 등)은 재빌드하지 않음
+            self._rules[namespace] = compiled
+            self._compiled = None
+
+    def has(self, namespace: str) -> bool:
+        return namespace in self._rules
+
+    def rules(self, namespace: str) -> List[KeywordRule]:
+        return [rule for rule, _ in self._rules.get(namespace, [])]
+
+    def _build(self):
+        with self._lock:
+            if self._compiled is not None:
+                return self._compiled
+            patterns, pattern_rules, keywords = [], [], []
+            for compiled in self._rules.values():
+                for rule, kws in compiled:
+                    for kw in kws:
+                        patterns.append(kw.lower())
+                        pattern_rules.append(rule)
+                        keywords.append(kw)
+            automaton = _CAutomaton(patterns) if self.use_c_extension else _PyAutomaton(patterns)
+            self._compiled = (automaton, patterns, pattern_rules, keywords)
+            self.stats["builds"] += 1
+            self.stats["patterns"] = len(patterns)
+            return self._compiled
+
+    # ------------------------------------------------------------
+    # 스캔
+    # ------------------------------------------------------------
+    def scan(self, text: str, namespace: Optional[str] = None) -> List[KeywordHit]:
+        """본문의 모든 키워드 적중 (위치 순). namespace를 주면 해당 묶음만 반환합니다."""
+        automaton, patterns, pattern_rules, keywords = self._compiled or self._build()
+        self.stats["scans"] += 1
+        hits = []
+        for end, pid in automaton.iter((text or "").lower()):
+            rule = pattern_rules[pid]
+            if namespace is None or rule.namespace == namespace:
+                hits.append(KeywordHit(rule, keywords[pid], end - len(patterns[pid]) + 1, end + 1))
+        return hits
+
+    def matched_rules(self, text: str, namespace: Optional[str] = None) -> List[KeywordRule]:
+        """적중한 규칙 목록 (규칙당 한 번, 우선순위 순)"""
+        automaton, _patterns, pattern_rules, _keywords = self._compiled or self._build()
+        self.stats["scans"] += 1
+        seen: Set[str] = set()
+        matched = []
+        for _end, pid in automaton.iter((text or "").lower()):
+            rule = pattern_rules[pid]
+            if rule.rule_id in seen or (namespace is not None and rule.namespace != namespace):
+                continue
+            seen.add(rule.rule_id)
+            matched.append(rule)
+        matched.sort(key=lambda r: (r.namespace, r.priority))
+        return matched
+
+    def matched_names(self, text: str, namespace: str) -> List[str]:
+        return [rule.name for rule in self.matched_rules(text, namespace)]
+
+    def report(self) -> str:
+        backend = "pyahocorasick" if self.use_c_extension else "python"
+        s = self.stats
+        return (f"키워드 엔진({backend}) 규칙 묶음 {len(self._rules)}개, 패턴 {s['patterns']}개, "
+                f"빌드 {s['builds']}회, 스캔 {s['scans']:,}회")
+
+
+# 프로세스 공용 인스턴스
+keyword_engine = KeywordEngine()
@@ -0,0 +1,119 @@
+import os
+import time
+import random
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+class AsyncLLMRunner:
+    def __init__(self, max_concurrency=None, timeout=LLM_TIMEOUT, max_retries=None, backoff_base=1.0, backoff_max=20.0):
+        """
+        서로 독립적인 LLM 작업(프롬프트 호출 또는 LLM을 쓰는 파이프라인 스텝)을 동시에 실행하는 비동기 레이어
+
+        - 기존 동기 드라이버(_chat 등, common.llm_cache 포함)를 스레드에서 실행하므로 캐시/중복 제거가 그대로 적용됩니다.
+        - max_concurrency로 동시에 나가는 요청 수를 제한합니다. (API rate limit 보호)
+        - 작업별 timeout(None이면 무제한), 예외(또는 accept 검사 실패) 시 지터 포함 지수 백오프로 재시도합니다.
+        """
+        self.max_concurrency = max(1, int(max_concurrency or LLM_MAX_CONCURRENCY))
+        self.timeout = timeout
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # call()을 gather() 밖에서 단독으로 써도 되도록 첫 호출 때 준비합니다. (_ensure_resources)
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._executor = None
+
+    def _ensure_resources(self):
+        """현재 이벤트 루프용 세마포어와 스레드 풀을 (없으면) 만듭니다."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        if self._executor is None:
+            # 타임아웃된 작업의 스레드를 기다리지 않도록 전용 풀을 쓰고 close()에서 wait=False로 정리합니다.
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-fanout")
+
+    def close(self):
+        """call()을 단독으로 쓴 경우 스레드 풀을 정리합니다. (gather()는 끝날 때 자동으로 정리)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _backoff(self, attempt):
+        return min(self.backoff_max, self.backoff_base * (2 ** attempt)) * (0.5 + random.random())
+
+    async def call(self, name, func, *args, accept=None, **kwargs):
+        """
+        func(*args, **kwargs)를 스레드에서 실행합니다.
+        accept(result)가 False를 반환하면 (예: 빈 응답) 실패로 보고 재시도합니다.
+        """
+        self._ensure_resources()
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                try:
+                    loop = asyncio.get_running_loop()
+                    result = await asyncio.wait_for(
+                        loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs)), timeout=self.timeout
+                    )
+                    if accept is None or accept(result):
+                        return result
+                    last_error = ValueError(f"{name}: 응답 검증 실패")
+                except asyncio.TimeoutError:
+                    # 스레드 자체는 중단되지 않으므로, 드라이버 쪽 HTTP 타임아웃(OPENAI_TIMEOUT)도 함께 설정해야 합니다.
+                    last_error = TimeoutError(f"{name}: {self.timeout:g}초 타임아웃")
+                except Exception as e:
+                    last_error = e
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                print(f"⚠️ [LLM Fan-out] {name} 실패 ({last_error}), {delay:.1f}s 후 재시도 ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+        raise last_error
+
+    async def gather(self, jobs):
+        """
+        jobs: {이름: (func, args, kwargs)} 또는 {이름: func}
+        Returns: {이름: 결과 또는 예외}
+        """
+        self._ensure_resources()
+        timings = {}
+
+        async def _timed(name, spec):
+            if callable(spec):
+                func, args, kwargs = spec, (), {}
+            else:
+                func, args, kwargs = spec[0], tuple(spec[1]) if len(spec) > 1 else (), dict(spec[2]) if len(spec) > 2 else {}
+            started = time.time()
+            try:
+                return await self.call(name, func, *args, **kwargs)
+            finally:
+                timings[name] = time.time() - started
+
+        started = time.time()
+        try:
+            results = await asyncio.gather(*(_timed(n, s) for n, s in jobs.items()), return_exceptions=True)
+        finally:
+            self.close()
+        wall = time.time() - started
+        if timings:
+            detail = ", ".join(f"{n} {t:.1f}s" for n, t in timings.items())
+            print(f"⏱️ [LLM Fan-out] {len(jobs)}개 작업 동시 실행: 총 {wall:.1f}s "
+                  f"(순차 실행 시 {sum(timings.values()):.1f}s / 최장 {max(timings.values()):.1f}s) - {detail}")
+        return dict(zip(jobs.keys(), results))
+
+
+def fan_out(jobs, **runner_kwargs):
+    """
+    동기 코드(파이프라인)에서 독립 작업들을 동시에 실행하는 진입점.
+    전체 소요 시간이 각 작업 시간의 합이 아니라 가장 느린 작업 시간에 가까워집니다.
+    Returns: {이름: 결과 또는 예외}
+    """
+    if not jobs:
+        return {}
+    return asyncio.run(AsyncLLMRunner(**runner_kwargs).gather(jobs))
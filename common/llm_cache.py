@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import Future
+
+DEFAULT_CACHE_DIR = os.getenv("LLM_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "llm_cache"))
+DEFAULT_TTL_SECONDS = int(float(os.getenv("LLM_CACHE_TTL_HOURS", "72")) * 3600)
+
+_CALL_LOG_NAME = "calls.jsonl"
+# 호출 로그가 이 크기를 넘으면 calls.jsonl.1로 넘기고 새로 시작합니다. (직전 파일 1개만 보관)
+CALL_LOG_MAX_BYTES = int(os.getenv("LLM_CALL_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+
+
+def _env_enabled():
+    return os.getenv("LLM_CACHE", "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+class LLMResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS, enabled=None):
+        """
+        OpenAI chat.completions 응답 디스크 캐시 (iceage & moneybag 공용)
+
+        - 키: hash(model, messages(system/user), temperature, max_tokens, response_format)
+        - TTL이 지난 항목은 미적중으로 처리하고 다시 호출합니다.
+        - 같은 키의 요청이 동시에 들어오면 한 번만 호출하고 나머지는 그 결과를 기다립니다. (in-flight 중복 제거)
+        - 호출마다 지연 시간과 토큰 사용량을 calls.jsonl에 기록합니다. (CALL_LOG_MAX_BYTES마다 교체, 직전 파일 1개 보관)
+        - LLM_CACHE=0 으로 전체 비활성화, complete(..., use_cache=False)로 호출 단위 비활성화
+        - 결과 검증에 실패하면 evict()로 항목을 지우거나, refresh() 블록 안에서 다시 호출해 새 응답으로 덮어씁니다.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.enabled = _env_enabled() if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pruned = False
+        self._refresh_depth = 0
+        self.reset_stats()
+
+    # ------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------
+    def reset_stats(self):
+        self.stats = {"api_calls": 0, "cache_hits": 0, "deduped": 0, "errors": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0, "api_seconds": 0.0}
+
+    def report(self, label="LLM Cache"):
+        s = self.stats
+        print(f"📊 [{label}] API 호출 {s['api_calls']}회 ({s['api_seconds']:.1f}초), 캐시 적중 {s['cache_hits']}, "
+              f"중복 합류 {s['deduped']}, 오류 {s['errors']}, "
+              f"토큰 {s['prompt_tokens']:,} + {s['completion_tokens']:,}")
+
+    # ------------------------------------------------------------
+    # 호출
+    # ------------------------------------------------------------
+    @staticmethod
+    def make_key(model, messages, **params):
+        payload = {"model": model, "messages": messages,
+                   **{k: v for k, v in params.items() if v is not None}}
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def refresh(self):
+        """
+        블록 안의 호출은 캐시를 읽지 않고 API를 다시 호출한 뒤, 새 응답으로 캐시를 덮어씁니다.
+        (검증 실패 후 재시도할 때 같은 캐시 응답을 다시 받지 않도록, 여러 스레드의 호출에 모두 적용)
+        """
+        with self._lock:
+            self._refresh_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._refresh_depth -= 1
+
+    def evict(self, model, messages, **params):
+        """해당 요청의 캐시 항목을 삭제합니다. (파싱/검증에 실패한 응답이 TTL 동안 남지 않도록)"""
+        try:
+            self._entry_path(self.make_key(model, messages, **params)).unlink()
+            return True
+        except OSError:
+            return False
+
+    def complete(self, client, model, messages, use_cache=True, **params):
+        """
+        client.chat.completions.create(model=..., messages=..., **params)를 캐시와 함께 호출하고
+        응답 본문(message.content)을 반환합니다. 예외는 그대로 호출자에게 전달되며 캐시되지 않습니다.
+        """
+        key = self.make_key(model, messages, **params)
+        use_disk = self.enabled and use_cache
+        if use_disk and self._refresh_depth:
+            # refresh(): 캐시/진행 중 호출을 재사용하지 않고 새로 호출하되, 결과는 캐시에 기록
+            content = self._call_api(client, key, model, messages, params)
+            if content:
+                self._write(key, model, content)
+            return content
+
+        if use_disk:
+            cached = self._read(key)
+            if cached is not None:
+                with self._lock:
+                    self.stats["cache_hits"] += 1
+                self._log_call(key, model, "cache", 0.0, {})
+                return cached
+
+        # 같은 요청이 이미 진행 중이면 그 결과를 공유 (캐시 비활성 호출은 합류하지 않음)
+        with self._lock:
+            future = self._inflight.get(key) if use_disk else None
+            owner = future is None
+            if owner and use_disk:
+                future = self._inflight[key] = Future()
+        if not owner:
+            with self._lock:
+                self.stats["deduped"] += 1
+            result = future.result()
+            self._log_call(key, model, "inflight", 0.0, {})
+            return result
+
+        try:
+            # 디스크 조회와 합류 사이에 다른 스레드가 먼저 끝냈을 수 있으므로 한 번 더 확인
+            content = self._read(key) if use_disk else None
+            if content is not None:
+                future.set_result(content)
+                return content
+            content = self._call_api(client, key, model, messages, params)
+            if use_disk and content:
+                self._write(key, model, content)
+            if future is not None:
+                future.set_result(content)
+            return content
+        except BaseException as e:
+            if future is not None:
+                future.set_exception(e)
+            raise
+        finally:
+            if future is not None:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _call_api(self, client, key, model, messages, params):
+        started = time.time()
+        try:
+            resp = client.chat.completions.create(model=model, messages=messages, **params)
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            self._log_call(key, model, "error", time.time() - started, {})
+            raise
+        elapsed = time.time() - started
+        usage = getattr(resp, "usage", None)
+        tokens = {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        }
+        with self._lock:
+            self.stats["api_calls"] += 1
+            self.stats["api_seconds"] += elapsed
+            self.stats["prompt_tokens"] += tokens["prompt_tokens"]
+            self.stats["completion_tokens"] += tokens["completion_tokens"]
+        self._log_call(key, model, "api", elapsed, tokens)
+        return resp.choices[0].message.content or ""
+
+    # ------------------------------------------------------------
+    # 디스크 저장소
+    # ------------------------------------------------------------
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read(self, key):
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            return None
+        return entry.get("content")
+
+    def _write(self, key, model, content):
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps({"model": model, "created": time.time(), "content": content},
+                                      ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ [LLM Cache] 저장 실패: {e}")
+            return
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+
+    def prune(self):
+        """TTL이 지난 캐시 파일을 삭제합니다."""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for path in self.cache_dir.glob("??/*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _log_call(self, key, model, source, elapsed, tokens):
+        record = {"ts": round(time.time(), 3), "key": key[:16], "model": model, "source": source,
+                  "latency_ms": round(elapsed * 1000, 1), **tokens}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / _CALL_LOG_NAME
+            with self._lock:
+                try:
+                    if path.stat().st_size >= CALL_LOG_MAX_BYTES:
+                        # 상주 프로세스(워치독)에서도 로그가 무한히 커지지 않도록 크기 기준 교체
+                        os.replace(path, path.with_name(_CALL_LOG_NAME + ".1"))
+                except FileNotFoundError:
+                    pass
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+
+
+# 프로세스 공용 인스턴스
+llm_cache = LLMResponseCache()
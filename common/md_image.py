@@ -0,0 +1,409 @@
+import os
+import re
+import math
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from common.card_render import FontBook
+
+# 레이아웃 규칙을 바꾸면 올려서 미디어 캐시에 저장된 이미지를 무효화
+RENDERER_VERSION = "1"
+
+DEFAULT_FONT_DIR = os.getenv("IMAGE_FONT_DIR", str(Path(__file__).resolve().parents[1] / "iceage" / "assets" / "fonts"))
+
+# 폰트에 없는 글자 대체 (없으면 그 글자는 생략 - 이모지 등)
+_GLYPH_FALLBACK = {"•": "·", "—": "-", "–": "-", "…": "..."}
+
+_HTML_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r"</?[a-zA-Z][^<>]*>")
+_INLINE_RE = re.compile(r"(\*\*.+?\*\*|__.+?__|`[^`]+`|\[[^\]]+\]\([^)]*\))")
+_EMPH_RE = re.compile(r"(?<![\w*])[*_](\S(?:.*?\S)?)[*_](?![\w*])")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_HR_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_LIST_RE = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?[\s:|-]+\|?\s*$")
+
+
+@dataclass(frozen=True)
+class ImageTheme:
+    """요약 이미지 템플릿 (기존 HTML 템플릿 CSS 값을 옮긴 것)"""
+    width: int = 800
+    padding: int = 40
+    background: str = "#ffffff"
+    text: str = "#374151"
+    heading: str = "#111827"
+    h3: str = "#111827"
+    strong: str = "#000000"
+    accent: str = "#6b7280"
+    rule: str = "#eeeeee"
+    quote_bg: str = "#f3f4f6"
+    quote_bar: str = "#9ca3af"
+    table_header_bg: str = "#f3f4f6"
+    table_border: str = "#e5e7eb"
+    h1: int = 36
+    h2: int = 28
+    h3_size: int = 22
+    body: int = 18
+    line_height: float = 1.7
+    bold_font: str = "Bold"
+    regular_font: str = "Medium"
+    bottom_space: int = 60
+
+
+LIGHT_THEME = ImageTheme()
+DARK_THEME = ImageTheme(background="#191c24", text="#c5c8d3", heading="#ffffff", h3="#b46eff", strong="#ffffff",
+                        accent="#8b90a0", rule="#3a3f51", quote_bg="#262a35", quote_bar="#b46eff",
+                        table_header_bg="#262a35", table_border="#3a3f51", bottom_space=120)
+
+
+# ------------------------------------------------------------
+# 마크다운 → 블록
+# ------------------------------------------------------------
+def _clean_inline(text: str) -> str:
+    text = _HTML_BR_RE.sub(" ", text)
+    return _HTML_TAG_RE.sub("", text).replace("&nbsp;", " ").replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
+
+
+def parse_inline(text: str) -> List[Tuple[str, bool]]:
+    """인라인 마크다운을 (텍스트, 굵게 여부) 조각 목록으로 (링크는 글자만, 기울임·코드 표시는 제거)"""
+    text = _clean_inline(text)
+    runs: List[Tuple[str, bool]] = []
+    pos = 0
+    for m in _INLINE_RE.finditer(text):
+        if m.start() > pos:
+            runs.append((_EMPH_RE.sub(r"\1", text[pos:m.start()]), False))
+        tok = m.group(0)
+        if tok.startswith(("**", "__")):
+            runs.append((tok[2:-2], True))
+        elif tok.startswith("`"):
+            runs.append((tok[1:-1], False))
+        else:
+            runs.append((tok[1:tok.index("]")], False))
+        pos = m.end()
+    if pos < len(text):
+        runs.append((_EMPH_RE.sub(r"\1", text[pos:]), False))
+    return [(t, b) for t, b in runs if t]
+
+
+def _split_row(line: str) -> List[str]:
+    cells = line.strip()
+    if cells.startswith("|"):
+        cells = cells[1:]
+    if cells.endswith("|"):
+        cells = cells[:-1]
+    return [c.strip() for c in cells.split("|")]
+
+
+def parse_markdown(md: str) -> List[Tuple[str, object]]:
+    """
+    요약/카드용 마크다운 부분집합을 블록 목록으로 나눕니다.
+    h1~h3(그 이하는 h3), 문단, 글머리/번호 목록, 인용, 표, 구분선, 코드 블록
+    """
+    lines = (md or "").replace("\r\n", "\n").split("\n")
+    blocks: List[Tuple[str, object]] = []
+    para: List[str] = []
+
+    def flush():
+        if para:
+            blocks.append(("p", " ".join(s.strip() for s in para)))
+            para.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            flush()
+            i += 1
+            continue
+        if stripped.startswith("```"):
+            flush()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code.append(lines[i])
+                i += 1
+            blocks.append(("code", code))
+            i += 1
+            continue
+        m = _HEADING_RE.match(stripped)
+        if m:
+            flush()
+            blocks.append((f"h{min(len(m.group(1)), 3)}", m.group(2)))
+            i += 1
+            continue
+        if _HR_RE.match(stripped):
+            flush()
+            blocks.append(("hr", None))
+            i += 1
+            continue
+        if stripped.startswith("|"):
+            flush()
+            rows, header = [], False
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                if _TABLE_SEP_RE.match(lines[i]) and "-" in lines[i]:
+                    header = len(rows) == 1
+                else:
+                    rows.append(_split_row(lines[i]))
+                i += 1
+            blocks.append(("table", (rows, header)))
+            continue
+        if stripped.startswith(">"):
+            flush()
+            quote = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip()[1:].strip())
+                i += 1
+            blocks.append(("quote", [q for q in quote if q]))
+            continue
+        m = _LIST_RE.match(line)
+        if m:
+            flush()
+            items = []
+            while i < len(lines):
+                m = _LIST_RE.match(lines[i])
+                if m:
+                    marker = m.group(2)
+                    items.append([len(m.group(1).expandtabs(4)) // 2, None if marker in "-*+" else marker, m.group(3)])
+                elif lines[i].strip() and lines[i][:1].isspace() and items:
+                    items[-1][2] += " " + lines[i].strip()  # 들여쓴 이어지는 줄
+                else:
+                    break
+                i += 1
+            blocks.append(("list", [tuple(it) for it in items]))
+            continue
+        para.append(line)
+        i += 1
+    flush()
+    return blocks
+
+
+# ------------------------------------------------------------
+# 배치 / 래스터
+# ------------------------------------------------------------
+class MarkdownImageRenderer:
+    def __init__(self, theme: ImageTheme = LIGHT_THEME, fonts: Optional[FontBook] = None):
+        """
+        마크다운 요약본을 PNG로 그리는 Pillow 기반 렌더러 (브라우저·외부 API 없이 프로세스 안에서 처리)
+
+        - ApiFlash / Html2Image로 HTML을 스크린샷하던 요약·대시보드 이미지 대체용입니다.
+          제목, 문단, 목록, 인용, 표, 굵은 글씨, 구분선만 지원하는 제한된 레이아웃입니다.
+        - 먼저 전체 배치를 계산해 내용 높이에 딱 맞는 이미지를 만들고 한 번에 그립니다.
+        - 폰트는 저장소에 포함된 TTF만 쓰므로 같은 입력이면 항상 같은 PNG가 나옵니다. (골든 이미지 비교 가능)
+        - 폰트에 없는 글자(이모지 등)는 대체 문자로 바꾸거나 생략합니다.
+        """
+        self.theme = theme
+        self.fonts = fonts or FontBook(DEFAULT_FONT_DIR, "malgun.ttf")
+        self._glyph_ok: Dict[Tuple[int, str], bool] = {}
+        self.stats = {"images": 0, "render_ms": 0.0}
+
+    def _font(self, size: int, bold: bool = False):
+        return self.fonts.get(self.theme.bold_font if bold else self.theme.regular_font, size)
+
+    @staticmethod
+    def _glyph_bitmap(font, ch: str) -> Optional[bytes]:
+        """글자 비트맵 (빈 글리프면 None). 폰트에 없는 글자는 .notdef(사각형 등) 비트맵과 같게 나옴"""
+        size = int(font.size * 2)
+        img = Image.new("L", (size, size))
+        ImageDraw.Draw(img).text((0, 0), ch, font=font, fill=255)
+        return img.tobytes() if img.getbbox() else None
+
+    def _sanitize(self, text: str, font) -> str:
+        out = []
+        for ch in text:
+            if ch.isspace():
+                out.append(" ")
+                continue
+            key = (id(font), ch)
+            ok = self._glyph_ok.get(key)
+            if ok is None:
+                glyph = self._glyph_bitmap(font, ch)
+                ok = self._glyph_ok[key] = glyph is not None and glyph != self._glyph_bitmap(font, "\U000F0000")
+            if ok:
+                out.append(ch)
+            elif ch in _GLYPH_FALLBACK:
+                out.append(_GLYPH_FALLBACK[ch])
+        return "".join(out)
+
+    def _wrap(self, runs: List[Tuple[str, bool]], size: int, width: int) -> List[List[Tuple[str, bool, float]]]:
+        """(텍스트, 굵게) 조각을 width 안에 들어가는 줄 목록으로 나눕니다. 각 줄은 (텍스트, 굵게, x) 목록"""
+        tokens: List[Tuple[str, bool]] = []
+        for text, bold in runs:
+            text = self._sanitize(text, self._font(size, bold))
+            for tok in re.findall(r"\S+|\s+", text):
+                tokens.append((" " if tok.isspace() else tok, bold))
+
+        lines: List[List[Tuple[str, bool, float]]] = [[]]
+        x = 0.0
+        for tok, bold in tokens:
+            font = self._font(size, bold)
+            if tok == " ":
+                if lines[-1]:
+                    x += font.getlength(" ")
+                continue
+            w = font.getlength(tok)
+            if x + w > width and lines[-1]:
+                lines.append([])
+                x = 0.0
+            if w > width:
+                # 한 단어가 폭보다 길면 글자 단위로 자름
+                piece = ""
+                for ch in tok:
+                    if x + font.getlength(piece + ch) > width and (piece or lines[-1]):
+                        if piece:
+                            lines[-1].append((piece, bold, x))
+                        lines.append([])
+                        x, piece = 0.0, ""
+                    piece += ch
+                tok, w = piece, font.getlength(piece)
+            lines[-1].append((tok, bold, x))
+            x += w
+        return [ln for ln in lines if ln] or [[]]
+
+    def layout(self, md: str) -> Tuple[int, List[tuple]]:
+        """(전체 높이, 그리기 명령 목록)"""
+        t = self.theme
+        ops: List[tuple] = []
+        left, inner = t.padding, t.width - t.padding * 2
+        y = float(t.padding)
+
+        def text_block(runs, size, x0, width, color, strong_color, line_h, bold_all=False):
+            nonlocal y
+            for line in self._wrap([(s, b or bold_all) for s, b in runs], size, width):
+                for s, bold, dx in line:
+                    ops.append(("text", (x0 + dx, y + (line_h - size) / 2), s, size, bold,
+                                strong_color if bold and not bold_all else color))
+                y += line_h
+
+        for kind, payload in parse_markdown(md):
+            if kind in ("h1", "h2", "h3"):
+                size = {"h1": t.h1, "h2": t.h2, "h3": t.h3_size}[kind]
+                y += size * 0.5 if y > t.padding else 0
+                color = t.h3 if kind == "h3" else t.heading
+                text_block(parse_inline(payload), size, left, inner, color, color, size * 1.3, bold_all=True)
+                if kind == "h2":
+                    y += 5
+                    ops.append(("line", (left, y, left + inner, y), t.rule, 1))
+                y += 10
+            elif kind == "p":
+                text_block(parse_inline(payload), t.body, left, inner, t.text, t.strong, t.body * t.line_height)
+                y += t.body * 0.8
+            elif kind == "list":
+                for depth, marker, text in payload:
+                    x0 = left + 24 + depth * 24
+                    line_h = t.body * t.line_height
+                    if marker:
+                        label = self._sanitize(marker, self._font(t.body))
+                        ops.append(("text", (x0 - 6 - self._font(t.body).getlength(label), y + (line_h - t.body) / 2),
+                                    label, t.body, False, t.text))
+                    else:
+                        r = max(2, t.body // 6)
+                        cy = y + line_h / 2
+                        ops.append(("ellipse", (x0 - 14 - r, cy - r, x0 - 14 + r, cy + r), t.text))
+                    text_block(parse_inline(text), t.body, x0, inner - (x0 - left), t.text, t.strong, line_h)
+                y += t.body * 0.8
+            elif kind == "quote":
+                top = y
+                y += 15
+                for q in payload:
+                    text_block(parse_inline(q), t.body, left + 18, inner - 33, t.text, t.strong, t.body * t.line_height)
+                y += 15
+                ops.insert(0, ("rect", (left, top, left + inner, y), t.quote_bg))
+                ops.insert(1, ("rect", (left, top, left + 3, y), t.quote_bar))
+                y += 20
+            elif kind == "table":
+                y = self._layout_table(ops, payload, left, inner, y)
+            elif kind == "code":
+                top = y
+                y += 10
+                for line in payload or [""]:
+                    text_block([(line, False)], t.body - 2, left + 12, inner - 24, t.text, t.text, (t.body - 2) * 1.5)
+                y += 10
+                ops.insert(0, ("rect", (left, top, left + inner, y), t.quote_bg))
+                y += t.body * 0.8
+            elif kind == "hr":
+                y += 8
+                ops.append(("line", (left, y, left + inner, y), t.rule, 1))
+                y += 16
+        return int(y + t.bottom_space), ops
+
+    def _layout_table(self, ops, payload, left, inner, y):
+        t = self.theme
+        rows, header = payload
+        if not rows:
+            return y
+        ncol = max(len(r) for r in rows)
+        rows = [r + [""] * (ncol - len(r)) for r in rows]
+        size, pad = t.body - 2, 10
+        # 이 폰트는 굵은 글씨가 더 좁기도 하므로 두 굵기 중 넓은 쪽 기준
+        natural = [max(max(self._font(size, b).getlength(_clean_inline(r[c]).replace("**", "")) for b in (False, True))
+                       for r in rows) + pad * 2 for c in range(ncol)]
+        total = sum(natural)
+        widths = natural if total <= inner else [max(40.0, inner * w / total) for w in natural]
+        scale = inner / sum(widths) if sum(widths) > inner else 1.0
+        widths = [w * scale for w in widths]
+        line_h = size * 1.5
+        for ri, row in enumerate(rows):
+            is_head = header and ri == 0
+            wrapped = [self._wrap(parse_inline(cell), size, math.ceil(widths[c] - pad * 2)) for c, cell in enumerate(row)]
+            row_h = max(len(w) for w in wrapped) * line_h + pad
+            x = left
+            if is_head:
+                ops.append(("rect", (left, y, left + sum(widths), y + row_h), t.table_header_bg))
+            for c, lines in enumerate(wrapped):
+                for li, line in enumerate(lines):
+                    for s, bold, dx in line:
+                        ops.append(("text", (x + pad + dx, y + pad / 2 + li * line_h + (line_h - size) / 2), s, size,
+                                    bold or is_head, t.strong if bold or is_head else t.text))
+                x += widths[c]
+            ops.append(("line", (left, y + row_h, left + sum(widths), y + row_h), t.table_border, 1))
+            y += row_h
+        return y + t.body * 0.8
+
+    def render(self, md: str) -> Image.Image:
+        started = time.perf_counter()
+        height, ops = self.layout(md)
+        img = Image.new("RGB", (self.theme.width, max(height, self.theme.padding * 2)), self.theme.background)
+        draw = ImageDraw.Draw(img)
+        for op in ops:
+            kind = op[0]
+            if kind == "text":
+                _, (x, y), s, size, bold, color = op
+                draw.text((round(x), round(y)), s, font=self._font(size, bold), fill=color)
+            elif kind == "rect":
+                draw.rectangle([round(v) for v in op[1]], fill=op[2])
+            elif kind == "ellipse":
+                draw.ellipse([round(v) for v in op[1]], fill=op[2])
+            elif kind == "line":
+                draw.line([round(v) for v in op[1]], fill=op[2], width=op[3])
+        self.stats["images"] += 1
+        self.stats["render_ms"] += (time.perf_counter() - started) * 1000
+        return img
+
+    def save(self, md: str, path, cache=None) -> Path:
+        """
+        cache: common.media_cache.MediaCache - 마크다운·테마·폰트 파일이 같으면 렌더링 없이 저장된 PNG를 복사
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # optimize/메타데이터 없이 저장 → 같은 입력이면 바이트 단위로 같은 파일
+        if cache is None:
+            self.render(md).save(path, format="PNG")
+            return path
+        from common.media_cache import dir_digest
+        key = cache.make_key("summary_image", RENDERER_VERSION, {"md": md},
+                             {"theme": asdict(self.theme), "fonts": dir_digest(self.fonts.font_dir)})
+        return cache.fetch_or_build("summary_image", key, path, lambda tmp: self.render(md).save(tmp, format="PNG"))
+
+    def with_width(self, width: int) -> "MarkdownImageRenderer":
+        """같은 폰트 캐시를 공유하는 다른 폭의 렌더러"""
+        return MarkdownImageRenderer(replace(self.theme, width=width), self.fonts)
+
+    def report(self) -> str:
+        s = self.stats
+        avg = s["render_ms"] / s["images"] if s["images"] else 0.0
+        return f"요약 이미지 {s['images']}장 렌더링 (평균 {avg:.1f}ms)"
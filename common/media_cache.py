@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "media_cache"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("MEDIA_CACHE_MAX_GB", "5")) * 1024 ** 3)
+
+_RUN_LOG_NAME = "runs.jsonl"
+_CHUNK = 1024 * 1024
+
+
+def _env_enabled():
+    return os.getenv("MEDIA_CACHE", "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+_digest_memo: Dict[tuple, str] = {}
+
+
+def file_digest(path) -> str:
+    """파일 내용 SHA-256 (같은 프로세스에서 크기·수정시각이 같으면 다시 읽지 않음)"""
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        digest = _digest_memo[memo_key] = h.hexdigest()
+    return digest
+
+
+def dir_digest(directory, patterns=("*",)) -> str:
+    """폴더 안 파일들(이름 + 내용)의 묶음 해시 - 폰트·템플릿 교체 시 캐시 무효화용"""
+    directory = Path(directory)
+    h = hashlib.sha256()
+    if directory.exists():
+        files = sorted({p for pat in patterns for p in directory.glob(pat) if p.is_file()})
+        for p in files:
+            h.update(p.name.encode("utf-8"))
+            h.update(file_digest(p).encode("ascii"))
+    return h.hexdigest()
+
+
+class MediaCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=None):
+        """
+        TTS 음성 / 렌더링 이미지 / 영상 세그먼트용 내용 주소 캐시 (iceage & moneybag 공용)
+
+        - 키: hash(종류, 템플릿 버전, 입력, 렌더러 파라미터). 입력 파일은 file_digest()로 내용 해시를 넣습니다.
+        - blobs/<키 앞 2자>/<키><확장자> 에 산출물을, 같은 이름 .json 에 빌드 시간 등 메타데이터를 둡니다.
+        - 적중하면 저장된 파일을 바로 돌려주고, 그때 아낀 시간(저장 당시 빌드 시간)을 집계합니다.
+        - 전체 크기가 max_bytes를 넘으면 오래 쓰지 않은 blob부터 지웁니다. (사용 시 mtime 갱신 → LRU)
+        - MEDIA_CACHE=0 이면 조회를 끕니다. (항상 새로 만들고, 만든 결과로 캐시를 갱신)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.max_bytes = max_bytes
+        self.enabled = _env_enabled() if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._pruned = False
+        self.reset_stats()
+
+    # ------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------
+    def reset_stats(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _bump(self, kind, **delta):
+        with self._lock:
+            s = self.stats.setdefault(kind, {"hits": 0, "misses": 0, "build_sec": 0.0, "saved_sec": 0.0})
+            for k, v in delta.items():
+                s[k] += v
+
+    def hit_ratio(self, kind=None):
+        rows = [self.stats[kind]] if kind else list(self.stats.values())
+        hits = sum(r["hits"] for r in rows if r)
+        total = hits + sum(r["misses"] for r in rows if r)
+        return hits / total if total else 0.0
+
+    def report(self, label="Media Cache"):
+        """종류별 적중률 / 빌드 시간 / 아낀 시간을 출력하고 runs.jsonl에 남깁니다."""
+        if not self.stats:
+            return
+        parts = [f"{kind} 적중 {int(s['hits'])}/{int(s['hits'] + s['misses'])} ({self.hit_ratio(kind):.0%}), "
+                 f"빌드 {s['build_sec']:.1f}s, 절약 {s['saved_sec']:.1f}s"
+                 for kind, s in sorted(self.stats.items())]
+        print(f"📊 [{label}] " + " | ".join(parts))
+        record = {"ts": round(time.time(), 3), "label": label,
+                  "stats": {k: {n: round(v, 3) for n, v in s.items()} for k, s in self.stats.items()}}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.cache_dir / _RUN_LOG_NAME, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------
+    # 키 / 조회 / 저장
+    # ------------------------------------------------------------
+    @staticmethod
+    def make_key(kind: str, version: str, inputs, params=None) -> str:
+        payload = {"kind": kind, "version": str(version), "inputs": inputs, "params": params or {}}
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, key: str, suffix: str) -> Path:
+        return self.blob_dir / key[:2] / f"{key}{suffix}"
+
+    def lookup(self, kind: str, key: str, suffix: str) -> Optional[Path]:
+        """저장된 산출물 경로 (없으면 None). 적중 시 통계와 LRU 시각을 갱신합니다."""
+        if not self.enabled:
+            return None
+        blob = self._blob_path(key, suffix)
+        try:
+            if blob.stat().st_size <= 0:
+                return None
+            os.utime(blob)
+        except OSError:
+            return None
+        try:
+            meta = json.loads(blob.with_suffix(blob.suffix + ".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+        self._bump(kind, hits=1, saved_sec=float(meta.get("build_sec", 0.0)))
+        return blob
+
+    def put(self, kind: str, key: str, src, build_sec: float = 0.0, suffix: Optional[str] = None) -> Path:
+        """src 파일을 캐시에 복사해 넣고 blob 경로를 반환합니다. (src 정리는 호출자 몫)"""
+        src = Path(src)
+        suffix = suffix if suffix is not None else src.suffix
+        self._bump(kind, misses=1, build_sec=build_sec)
+        blob = self._blob_path(key, suffix)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"kind": kind, "build_sec": round(build_sec, 3), "size": src.stat().st_size, "created": time.time()}
+        tmp = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, blob)
+        blob.with_suffix(blob.suffix + ".json").write_text(json.dumps(meta), encoding="utf-8")
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+        return blob
+
+    def ensure(self, kind: str, key: str, build: Callable[[Path], None], suffix: str) -> Path:
+        """
+        캐시된 산출물 경로를 반환합니다. 없으면 build(임시 경로)로 만들어 넣습니다.
+        (임시 경로는 suffix 확장자를 유지하므로 ffmpeg/moviepy 포맷 판별에 그대로 쓸 수 있음)
+        """
+        hit = self.lookup(kind, key, suffix)
+        if hit is not None:
+            return hit
+        work = self.cache_dir / "tmp"
+        work.mkdir(parents=True, exist_ok=True)
+        tmp = work / f"{key}.{os.getpid()}.{threading.get_ident()}{suffix}"
+        started = time.perf_counter()
+        try:
+            build(tmp)
+            if not tmp.exists() or tmp.stat().st_size <= 0:
+                raise IOError(f"미디어 빌드 결과가 비어 있습니다: {kind} ({key[:12]})")
+            return self.put(kind, key, tmp, time.perf_counter() - started, suffix)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def fetch_or_build(self, kind: str, key: str, dest, build: Callable[[Path], None]) -> Path:
+        """dest에 산출물을 둡니다. 적중하면 복사만 하고, 아니면 만들어서 캐시에 넣은 뒤 복사합니다."""
+        dest = Path(dest)
+        blob = self.ensure(kind, key, build, dest.suffix)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        # 하류 단계가 결과 파일을 고쳐도 캐시가 오염되지 않도록 링크가 아닌 복사본을 만듭니다.
+        tmp = dest.with_name(f"{dest.name}.mctmp")
+        shutil.copyfile(blob, tmp)
+        os.replace(tmp, dest)
+        return dest
+
+    # ------------------------------------------------------------
+    # 정리 (LRU)
+    # ------------------------------------------------------------
+    def prune(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 쓰지 않은 blob부터 삭제합니다. 삭제한 개수를 반환"""
+        entries = []
+        for p in self.blob_dir.glob("??/*"):
+            if p.suffix in (".json", ".tmp"):
+                continue
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                p.with_suffix(p.suffix + ".json").unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+# 프로세스 공용 인스턴스
+media_cache = MediaCache()
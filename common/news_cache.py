@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+NEWS_MAX_WORKERS = int(os.getenv("NEWS_MAX_WORKERS", "8"))
+NEWS_PER_HOST = int(os.getenv("NEWS_PER_HOST", "2"))
+
+_DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+class _Source:
+    __slots__ = ("name", "fetch", "ttl_sec", "items", "fetched_at", "lock", "error")
+
+    def __init__(self, name, fetch, ttl_sec):
+        self.name = name
+        self.fetch = fetch
+        self.ttl_sec = ttl_sec
+        self.items: List[dict] = []
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.error = None
+
+
+class NewsCache:
+    def __init__(self, max_workers=NEWS_MAX_WORKERS, per_host=NEWS_PER_HOST, snippet_cache_size=512):
+        """
+        헤드라인/기사 요약 메모리 캐시 (왓치독 알림·브리핑 공용)
+
+        - register(name, fetch, ttl_sec)로 소스를 등록하면 get(name)이 TTL 동안 메모리에서 바로 반환합니다.
+        - start_refresher()를 호출하면 백그라운드 스레드가 TTL 만료 전에 미리 갱신해 항상 따뜻한 상태를 유지합니다.
+          (만료된 값은 갱신이 끝날 때까지 그대로 제공하고, 같은 소스 동시 갱신은 한 번만 수행)
+        - map()/fetch_url()로 피드·기사를 동시에 받되, 호스트별 동시 요청 수를 per_host로 제한합니다.
+        - snippet(url, extract)는 기사 URL당 한 번만 본문을 받아 요약을 추출하고 LRU로 보관합니다.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.per_host = max(1, int(per_host))
+        self.snippet_cache_size = snippet_cache_size
+
+        self._sources: Dict[str, _Source] = {}
+        self._snippets: "OrderedDict[str, str]" = OrderedDict()
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._session = requests.Session()
+        self._refresher = None
+        self._stop = threading.Event()
+        self.stats = {"hits": 0, "stale_hits": 0, "refreshes": 0, "refresh_errors": 0,
+                      "http_requests": 0, "snippet_hits": 0, "snippet_misses": 0}
+
+    # ------------------------------------------------------------
+    # 소스 등록 / 조회
+    # ------------------------------------------------------------
+    def register(self, name: str, fetch: Callable[[], List[dict]], ttl_sec: float) -> None:
+        with self._lock:
+            if name not in self._sources:
+                self._sources[name] = _Source(name, fetch, ttl_sec)
+
+    def get(self, name: str, wait: bool = True) -> List[dict]:
+        """
+        캐시된 항목을 반환합니다. 만료됐으면 (갱신 스레드가 없을 때) 이 자리에서 갱신합니다.
+        한 번도 받은 적이 없고 wait=False면 빈 목록을 반환합니다.
+        """
+        src = self._sources[name]
+        age = time.time() - src.fetched_at
+        if src.fetched_at and age < src.ttl_sec:
+            self.stats["hits"] += 1
+            return src.items
+        if src.fetched_at and self._refresher is not None:
+            # 백그라운드 갱신이 곧 따라잡으므로 기다리지 않고 직전 값을 제공
+            self.stats["stale_hits"] += 1
+            return src.items
+        if not src.fetched_at and not wait:
+            return []
+        self._refresh(src)
+        return src.items
+
+    def last_error(self, name: str) -> Optional[str]:
+        """마지막 갱신이 실패했으면 오류 메시지, 성공했으면 None"""
+        return self._sources[name].error
+
+    def _refresh(self, src: _Source) -> None:
+        fetched_before = src.fetched_at
+        with src.lock:
+            # 락을 기다리는 동안 다른 스레드가 이미 갱신했으면 생략
+            if src.fetched_at != fetched_before and time.time() - src.fetched_at < src.ttl_sec:
+                return
+            try:
+                items = src.fetch()
+                src.items = list(items or [])
+                src.error = None
+                self.stats["refreshes"] += 1
+            except Exception as e:
+                src.error = str(e)
+                self.stats["refresh_errors"] += 1
+                print(f"⚠️ [News Cache] {src.name} 갱신 실패: {e}", flush=True)
+            # 실패해도 fetched_at을 갱신해 TTL 동안은 재시도 폭주를 막습니다.
+            src.fetched_at = time.time()
+
+    # ------------------------------------------------------------
+    # 백그라운드 갱신
+    # ------------------------------------------------------------
+    def start_refresher(self, refresh_ahead: float = 0.8, interval_sec: float = 1.0):
+        """각 소스를 TTL × refresh_ahead 시점에 미리 갱신하는 데몬 스레드를 띄웁니다."""
+        if self._refresher is not None:
+            return self
+
+        def _loop():
+            while not self._stop.is_set():
+                for src in list(self._sources.values()):
+                    if self._stop.is_set():
+                        break
+                    if time.time() - src.fetched_at >= src.ttl_sec * refresh_ahead:
+                        self._refresh(src)
+                self._stop.wait(interval_sec)
+
+        self._refresher = threading.Thread(target=_loop, name="news-refresher", daemon=True)
+        self._refresher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------
+    # 동시 수집 (호스트별 제한)
+    # ------------------------------------------------------------
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.Semaphore(self.per_host)
+            return slot
+
+    def fetch_url(self, url: str, timeout: float = 5, headers: Optional[dict] = None) -> requests.Response:
+        """호스트별 동시 요청 수를 지키며 GET 요청 (연결은 Session으로 재사용)"""
+        with self._host_slot(url):
+            self.stats["http_requests"] += 1
+            return self._session.get(url, timeout=timeout, headers=headers or _DEFAULT_HEADERS)
+
+    def map(self, func: Callable, items: Iterable) -> list:
+        """func(item)을 공용 풀에서 동시에 실행하고 입력 순서대로 결과를 반환합니다. (예외는 결과 자리에 그대로)"""
+        items = list(items)
+        if len(items) <= 1:
+            return [self._safe(func, it) for it in items]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="news-fetch")
+        return list(self._pool.map(lambda it: self._safe(func, it), items))
+
+    @staticmethod
+    def _safe(func, item):
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    # ------------------------------------------------------------
+    # 기사 요약 (URL당 1회)
+    # ------------------------------------------------------------
+    def snippet(self, url: str, extract: Callable[[str], str], timeout: float = 5) -> str:
+        """기사 본문을 받아 extract(html)로 요약을 만들고 URL 기준으로 보관합니다. 실패 시 빈 문자열."""
+        with self._lock:
+            if url in self._snippets:
+                self._snippets.move_to_end(url)
+                self.stats["snippet_hits"] += 1
+                return self._snippets[url]
+        self.stats["snippet_misses"] += 1
+        try:
+            r = self.fetch_url(url, timeout=timeout)
+            r.raise_for_status()
+            text = extract(r.text) or ""
+        except Exception:
+            # 실패한 기사는 저장하지 않고 다음 갱신 때 다시 시도
+            return ""
+        with self._lock:
+            self._snippets[url] = text
+            while len(self._snippets) > self.snippet_cache_size:
+                self._snippets.popitem(last=False)
+        return text
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"뉴스 캐시 적중 {s['hits']} (만료분 제공 {s['stale_hits']}), 갱신 {s['refreshes']}회 (실패 {s['refresh_errors']}), "
+                f"HTTP {s['http_requests']}회, 기사 요약 재사용 {s['snippet_hits']} / 신규 {s['snippet_misses']}")
+
+
+# 프로세스 공용 인스턴스
+news_cache = NewsCache()
@@ -0,0 +1,207 @@
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"[^0-9a-z가-힣\s]")
+
+
+def word_shingles(text: str, k: int = 1, stopwords=frozenset()) -> set:
+    """소문자·특수문자 제거 후 단어 k-gram 집합 (영문 헤드라인용)"""
+    tokens = [t for t in _WORD_RE.sub(" ", (text or "").lower()).split() if t not in stopwords]
+    if k <= 1:
+        return set(tokens)
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def char_shingles(text: str, k: int = 3) -> set:
+    """공백·특수문자 제거 후 글자 k-gram 집합 (조사가 붙는 국문 헤드라인용)"""
+    s = _WORD_RE.sub("", (text or "").lower()).replace(" ", "")
+    if len(s) <= k:
+        return {s} if s else set()
+    return {s[i:i + k] for i in range(len(s) - k + 1)}
+
+
+def _stable_hash(s: str) -> int:
+    # 프로세스마다 달라지는 hash() 대신 CRC32 → 실행 간 같은 클러스터 ID 보장
+    return zlib.crc32(s.encode("utf-8"))
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+@dataclass
+class NewsCluster:
+    cluster_id: str                 # 구성 기사 지문 중 최솟값 기반 (입력 순서와 무관하게 안정적)
+    members: List[int]              # 입력 인덱스
+    representative: int
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.members)
+
+
+class MinHashDeduper:
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 32, seed: int = 1,
+                 chunk_shingles: int = 200_000, exact_below: int = 200):
+        """
+        MinHash + LSH 밴딩 기반 유사 중복(통신사 전재·재송고) 기사 묶음기 (NumPy만 사용)
+
+        - 기사별 shingle 집합을 num_perm개 MinHash 서명으로 줄이고, bands개 밴드로 나눠 같은 버킷에 들어온 쌍만
+          후보로 봅니다. 후보 쌍은 실제 Jaccard가 threshold 이상일 때만 같은 묶음으로 합칩니다. (거짓 양성 없음)
+        - 전체 비용은 기사 수에 거의 선형입니다. (모든 쌍을 비교하는 O(n²) 대신)
+        - 밴드 구성(rows = num_perm / bands)은 threshold보다 느슨하게 잡아 놓쳐지는 쌍을 줄입니다.
+          rows=2(기본 64/32)면 Jaccard 0.5 쌍을 놓칠 확률이 약 0.01%, 0.4는 약 0.4%입니다. 더 낮은 threshold는 rows=1로 잡으세요.
+        - 기사 수가 exact_below 미만이면 LSH 없이 모든 쌍을 직접 비교합니다. (수십 건이면 이쪽이 더 빠르고 놓치는 쌍이 없음)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.chunk_shingles = chunk_shingles
+        self.exact_below = exact_below
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.stats = {"docs": 0, "candidate_pairs": 0, "merged_pairs": 0}
+
+    # ------------------------------------------------------------
+    # 서명
+    # ------------------------------------------------------------
+    def signatures(self, shingle_sets: Sequence[set]) -> np.ndarray:
+        """(문서 수 × num_perm) MinHash 서명. 빈 문서는 최댓값으로 채워 어떤 문서와도 묶이지 않게 합니다."""
+        n = len(shingle_sets)
+        sig = np.full((n, self.num_perm), _MAX_HASH, dtype=np.uint64)
+        start = 0
+        while start < n:
+            # shingle 수 기준으로 잘라 (shingle × num_perm) 중간 행렬 메모리를 제한
+            end, total = start, 0
+            while end < n and (total == 0 or total + len(shingle_sets[end]) <= self.chunk_shingles):
+                total += len(shingle_sets[end])
+                end += 1
+            lengths = np.fromiter((len(shingle_sets[i]) for i in range(start, end)), dtype=np.int64, count=end - start)
+            if total:
+                hv = np.fromiter((_stable_hash(s) for i in range(start, end) for s in shingle_sets[i]),
+                                 dtype=np.uint64, count=total)
+                perm = ((hv[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+                nonempty = lengths > 0
+                offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[nonempty]
+                sig[start:end][nonempty] = np.minimum.reduceat(perm, offsets, axis=0)
+            start = end
+        return sig
+
+    # ------------------------------------------------------------
+    # 묶음
+    # ------------------------------------------------------------
+    def cluster(self, shingle_sets: Sequence[set]) -> List[int]:
+        """문서별 묶음 번호(대표 = 묶음 내 가장 작은 입력 인덱스)를 반환합니다."""
+        n = len(shingle_sets)
+        parent = list(range(n))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        if n < 2:
+            return parent
+        live = np.flatnonzero(np.fromiter((bool(s) for s in shingle_sets), dtype=bool, count=n))
+        if len(live) < self.exact_below:
+            members = live.tolist()
+            for pos, i in enumerate(members):
+                for j in members[:pos]:
+                    ri, rj = find(i), find(j)
+                    if ri == rj:
+                        continue
+                    self.stats["candidate_pairs"] += 1
+                    if _jaccard(shingle_sets[i], shingle_sets[j]) >= self.threshold:
+                        parent[max(ri, rj)] = min(ri, rj)
+                        self.stats["merged_pairs"] += 1
+            self.stats["docs"] += n
+            return [find(i) for i in range(n)]
+        sig = self.signatures([shingle_sets[i] for i in live])
+        checked = set()
+        for band in range(self.bands):
+            # 밴드의 rows개 값을 64비트 키 하나로 접어 1차원 정렬로 버킷을 찾음 (키 충돌은 아래 Jaccard 검증에서 걸러짐)
+            block = sig[:, band * self.rows:(band + 1) * self.rows]
+            key = block[:, 0].copy()
+            for r in range(1, self.rows):
+                key = key * np.uint64(0x100000001B3) ^ block[:, r]
+            order = np.argsort(key, kind="stable")
+            sorted_key = key[order]
+            starts = np.flatnonzero(np.concatenate([[True], sorted_key[1:] != sorted_key[:-1]]))
+            ends = np.append(starts[1:], len(order))
+            multi = (ends - starts) > 1
+            for s0, e0 in zip(starts[multi].tolist(), ends[multi].tolist()):
+                members = live[order[s0:e0]].tolist()
+                for pos, i in enumerate(members):
+                    for j in members[:pos]:
+                        ri, rj = find(i), find(j)
+                        if ri == rj:
+                            break
+                        pair = (j, i) if j < i else (i, j)
+                        if pair in checked:
+                            continue
+                        checked.add(pair)
+                        self.stats["candidate_pairs"] += 1
+                        if _jaccard(shingle_sets[i], shingle_sets[j]) >= self.threshold:
+                            parent[max(ri, rj)] = min(ri, rj)
+                            self.stats["merged_pairs"] += 1
+                            break
+        self.stats["docs"] += n
+        return [find(i) for i in range(n)]
+
+
+def cluster_articles(articles: List[Dict], text: Callable[[Dict], str], shingles: Callable[[str], set],
+                     rank_key: Callable[[Dict], tuple], deduper: Optional[MinHashDeduper] = None,
+                     source: Callable[[Dict], str] = lambda a: a.get("source") or "") -> List[NewsCluster]:
+    """
+    기사 목록을 유사 중복 묶음으로 나누고, 묶음마다 rank_key가 가장 큰 기사를 대표로 고릅니다.
+    (rank_key 예: (매체 우선순위, 발행 시각) → 같은 기사면 주요 매체 + 최신 송고본)
+    반환 순서는 입력에서 각 묶음이 처음 등장한 순서입니다.
+    """
+    deduper = deduper or MinHashDeduper()
+    texts = [text(a) for a in articles]
+    sets = [shingles(t) for t in texts]
+    roots = deduper.cluster(sets)
+
+    groups: Dict[int, List[int]] = {}
+    for i, r in enumerate(roots):
+        groups.setdefault(r, []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        rep = max(members, key=lambda i: (rank_key(articles[i]), -i))
+        fingerprint = min(_stable_hash(" ".join(sorted(sets[i])) or texts[i]) for i in members)
+        clusters.append(NewsCluster(
+            cluster_id=f"{fingerprint:08x}",
+            members=members,
+            representative=rep,
+            sources=sorted({source(articles[i]) for i in members} - {""}),
+        ))
+    return clusters
+
+
+def dedup_articles(articles: List[Dict], text: Callable[[Dict], str], shingles: Callable[[str], set],
+                   rank_key: Callable[[Dict], tuple], deduper: Optional[MinHashDeduper] = None) -> List[Dict]:
+    """묶음 대표 기사만 남기고 cluster_id / cluster_size / cluster_sources 필드를 붙여 반환합니다."""
+    out = []
+    for c in cluster_articles(articles, text, shingles, rank_key, deduper):
+        art = dict(articles[c.representative])
+        art["cluster_id"] = c.cluster_id
+        art["cluster_size"] = c.size
+        art["cluster_sources"] = c.sources
+        out.append(art)
+    return out
@@ -0,0 +1,374 @@
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 파티션 잠금은 POSIX(fcntl)에서만 프로세스 간에 걸립니다. (Windows 로컬 실행 시 프로세스 내부 잠금만 사용)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_STORE_DIR = os.getenv("NEWS_STORE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "news_store"))
+DEFAULT_INDEX_FIELDS = ("code", "kind")
+COMPACT_MIN_BYTES = int(os.getenv("NEWS_STORE_COMPACT_MIN_BYTES", str(256 * 1024)))
+
+_INDEX_NAME = "index.json"
+_LOCK_NAME = ".lock"
+
+# 기사 정규화 스키마 (kr_news_cleaner 출력 기준, 수집기별 별칭 필드를 흡수)
+_TEXT_FIELDS = ("title", "snippet", "source", "link", "published_at", "kind", "code", "name", "origin")
+
+# 기록 출처: kr_news_cleaner 결과(정제본, 기본값)와 수집기가 바로 넣은 원본을 구분합니다.
+# origin 필드가 없는 기존 행은 정제본으로 봅니다.
+ORIGIN_CLEANED = "cleaned"
+ORIGIN_RAW = "raw"
+
+
+def normalize_article(a: Dict) -> Optional[Dict]:
+    """
+    수집기마다 조금씩 다른 기사 dict를 저장소 공통 형태로 맞춥니다. 제목이 없으면 None
+    - published_at ← published_at | date,  name ← name | stock_name,  origin 기본값 cleaned
+    - 나머지 필드(cluster_id, fetched_at 등)는 그대로 보존
+    """
+    title = str(a.get("title") or "").strip()
+    if not title:
+        return None
+    out = dict(a)
+    out["published_at"] = a.get("published_at") or a.get("date") or ""
+    out["name"] = a.get("name") or a.get("stock_name") or ""
+    out["origin"] = a.get("origin") or ORIGIN_CLEANED
+    for f in _TEXT_FIELDS:
+        out[f] = str(out.get(f) or "").strip() if f != "title" else title
+    out.pop("date", None)
+    return out
+
+
+def article_key(a: Dict) -> str:
+    """기사 식별 키: 링크가 있으면 (kind, code, 링크), 없으면 (kind, code, 제목, 매체)"""
+    ident = a.get("link") or f"{a.get('title')}\x1f{a.get('source')}"
+    raw = f"{a.get('kind')}\x1f{a.get('code')}\x1f{ident}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _origin(a: Dict) -> str:
+    return a.get("origin") or ORIGIN_CLEANED
+
+
+def _storage_key(a: Dict) -> str:
+    """파티션 내 중복 판정 키: 출처가 다르면 같은 기사라도 따로 보관 (정제본은 기존 키 그대로)"""
+    key = article_key(a)
+    origin = _origin(a)
+    return key if origin == ORIGIN_CLEANED else f"{origin}:{key}"
+
+
+class NewsStore:
+    def __init__(self, root=DEFAULT_STORE_DIR, index_fields: Sequence[str] = DEFAULT_INDEX_FIELDS):
+        """
+        날짜 파티션 + 사이드카 인덱스 기반 뉴스 저장소 (iceage & moneybag 공용)
+
+        - 레이아웃: root/YYYY-MM-DD/seg-000001.jsonl ... + root/YYYY-MM-DD/index.json
+          (날짜 = 수집 기준일 ref_date → "날짜 → 세그먼트"는 디렉터리로, "코드 → 오프셋"은 index.json으로)
+        - append()는 호출마다 정규화된 기사를 새 세그먼트 하나로 기록하고 인덱스를 원자적으로 교체합니다.
+          같은 날짜에 이미 있는 기사(출처 + article_key 기준)는 다시 쓰지 않으므로 파이프라인 재실행에도 안전합니다.
+          수집기 원본(origin=raw)과 정제본(origin=cleaned)은 서로를 중복으로 지우지 않습니다.
+        - lookup()은 인덱스에서 (세그먼트, 오프셋, 길이)만 골라 seek/read 하므로 필요한 바이트만 읽습니다.
+          (연속 구간은 한 번에 읽음) 기본으로 정제본만 돌려주며, 여러 날짜에 걸쳐 수집된 같은 기사는 한 번만 나옵니다.
+        - append가 쌓여 생긴 작은 세그먼트는 compact()로 합칩니다. (python -m tasks.news_store compact)
+        """
+        self.root = Path(root)
+        self.index_fields = tuple(index_fields)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._index_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        self.stats = {"appended": 0, "skipped_dup": 0, "lookups": 0, "reads": 0,
+                      "bytes_read": 0, "records_read": 0, "compactions": 0}
+
+    # ------------------------------------------------------------
+    # 경로 / 인덱스
+    # ------------------------------------------------------------
+    def _partition(self, d: date) -> Path:
+        return self.root / d.isoformat()
+
+    def dates(self) -> List[date]:
+        """저장된 파티션 날짜 목록 (오름차순)"""
+        if not self.root.exists():
+            return []
+        out = []
+        for p in self.root.iterdir():
+            try:
+                if p.is_dir():
+                    out.append(date.fromisoformat(p.name))
+            except ValueError:
+                continue
+        return sorted(out)
+
+    @staticmethod
+    def _empty_index() -> Dict:
+        return {"next_seq": 1, "segments": [], "keys": [], "fields": {}}
+
+    def _load_index(self, part: Path) -> Dict:
+        path = part / _INDEX_NAME
+        try:
+            st = path.stat()
+        except OSError:
+            return self._empty_index()
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._index_cache.get(str(part))
+        if cached and cached[0] == sig:
+            return cached[1]
+        try:
+            index = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [NewsStore] 인덱스 읽기 실패 ({path}): {e}")
+            return self._empty_index()
+        with self._lock:
+            self._index_cache[str(part)] = (sig, index)
+        return index
+
+    def _save_index(self, part: Path, index: Dict) -> None:
+        path = part / _INDEX_NAME
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self._index_cache.pop(str(part), None)
+
+    @contextmanager
+    def _locked(self, part: Path):
+        """파티션 쓰기 잠금 (append / compact 끼리 직렬화, 읽기는 잠그지 않음)"""
+        part.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            with self._write_lock:
+                yield
+            return
+        with open(part / _LOCK_NAME, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write_segment(self, part: Path, index: Dict, lines: List[bytes]) -> Tuple[str, List[Tuple[int, int]]]:
+        """새 세그먼트 파일을 쓰고 (이름, 줄별 (오프셋, 길이))를 반환합니다. 인덱스 갱신은 호출자 몫"""
+        name = f"seg-{index['next_seq']:06d}.jsonl"
+        index["next_seq"] += 1
+        spans, offset = [], 0
+        for line in lines:
+            spans.append((offset, len(line)))
+            offset += len(line)
+        path = part / name
+        tmp = path.with_name(f"{name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(b"".join(lines))
+        os.replace(tmp, path)
+        return name, spans
+
+    def _index_record(self, index: Dict, seg: str, span: Tuple[int, int], rec: Dict) -> None:
+        for field in self.index_fields:
+            value = str(rec.get(field) or "")
+            if value:
+                index["fields"].setdefault(field, {}).setdefault(value, []).append([seg, span[0], span[1]])
+
+    # ------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------
+    def append(self, articles: Iterable[Dict], ref_date: date, origin: Optional[str] = None) -> int:
+        """
+        기사들을 ref_date 파티션에 새 세그먼트로 추가합니다. 실제로 기록한 건수를 반환
+        origin을 주면 모든 기사의 출처를 그 값으로 기록합니다. (수집기 원본은 ORIGIN_RAW)
+        """
+        part = self._partition(ref_date)
+        records = [r for r in (normalize_article(a) for a in articles) if r]
+        if origin:
+            for r in records:
+                r["origin"] = origin
+        if not records:
+            return 0
+        with self._locked(part):
+            index = self._load_index(part)
+            seen = set(index["keys"])
+            fresh, lines = [], []
+            for rec in records:
+                key = _storage_key(rec)
+                if key in seen:
+                    self.stats["skipped_dup"] += 1
+                    continue
+                seen.add(key)
+                fresh.append((key, rec))
+                lines.append((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+            if not fresh:
+                return 0
+            index = json.loads(json.dumps(index))  # 캐시된 인덱스를 직접 고치지 않도록 복사
+            seg, spans = self._write_segment(part, index, lines)
+            index["segments"].append({"name": seg, "bytes": sum(n for _, n in spans), "count": len(spans)})
+            for (key, rec), span in zip(fresh, spans):
+                index["keys"].append(key)
+                self._index_record(index, seg, span, rec)
+            self._save_index(part, index)
+        self.stats["appended"] += len(fresh)
+        return len(fresh)
+
+    # ------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------
+    def _read_spans(self, part: Path, index: Dict, entries: Iterable[Sequence]) -> Iterator[Dict]:
+        order = {s["name"]: i for i, s in enumerate(index["segments"])}
+        by_seg: Dict[str, List[Tuple[int, int]]] = {}
+        for seg, off, length in entries:
+            if seg in order:
+                by_seg.setdefault(seg, []).append((off, length))
+        for seg in sorted(by_seg, key=order.get):
+            spans = sorted(set(by_seg[seg]))
+            # 맞닿은 구간은 합쳐서 한 번에 읽음
+            runs: List[List[int]] = []
+            for off, length in spans:
+                if runs and runs[-1][0] + runs[-1][1] == off:
+                    runs[-1][1] += length
+                else:
+                    runs.append([off, length])
+            try:
+                with open(part / seg, "rb") as f:
+                    for off, length in runs:
+                        f.seek(off)
+                        chunk = f.read(length)
+                        self.stats["reads"] += 1
+                        self.stats["bytes_read"] += len(chunk)
+                        for line in chunk.splitlines():
+                            try:
+                                rec = json.loads(line)
+                            except ValueError:
+                                continue
+                            self.stats["records_read"] += 1
+                            yield rec
+            except OSError as e:
+                print(f"⚠️ [NewsStore] 세그먼트 읽기 실패 ({part / seg}): {e}")
+
+    def _range(self, start: date, end: date) -> List[date]:
+        return [d for d in self.dates() if start <= d <= end]
+
+    def lookup(self, field: str, value, start: date, end: Optional[date] = None,
+               origin: Optional[str] = ORIGIN_CLEANED, unique: bool = True) -> List[Dict]:
+        """
+        [start, end] 파티션에서 field == value 인 기사 (인덱스 필드만 가능, 날짜·추가 순)
+        - origin: 이 출처의 기사만 (None이면 전부)
+        - unique: 여러 날짜 파티션에 걸쳐 수집된 같은 기사(article_key)는 처음 것만 남김
+        """
+        if field not in self.index_fields:
+            raise ValueError(f"인덱스되지 않은 필드입니다: {field} (index_fields={self.index_fields})")
+        self.stats["lookups"] += 1
+        out, seen = [], set()
+        for d in self._range(start, end or start):
+            part = self._partition(d)
+            index = self._load_index(part)
+            entries = index["fields"].get(field, {}).get(str(value), [])
+            for rec in self._read_spans(part, index, entries):
+                if origin is not None and _origin(rec) != origin:
+                    continue
+                if unique:
+                    key = _storage_key(rec)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                out.append(rec)
+        return out
+
+    def by_code(self, code, days: int = 7, ref_date: Optional[date] = None,
+                origin: Optional[str] = ORIGIN_CLEANED) -> List[Dict]:
+        """종목 code의 최근 days일(ref_date 포함) 기사"""
+        ref_date = ref_date or date.today()
+        return self.lookup("code", code, ref_date - timedelta(days=days), ref_date, origin=origin)
+
+    def by_kind(self, kind: str, start: date, end: Optional[date] = None,
+                origin: Optional[str] = ORIGIN_CLEANED) -> List[Dict]:
+        return self.lookup("kind", kind, start, end, origin=origin)
+
+    def by_date(self, d: date) -> List[Dict]:
+        """d 파티션 전체 기사 (추가 순)"""
+        part = self._partition(d)
+        index = self._load_index(part)
+        entries = [(s["name"], 0, s["bytes"]) for s in index["segments"]]
+        return list(self._read_spans(part, index, entries))
+
+    def has_range(self, start: date, end: Optional[date] = None) -> bool:
+        """[start, end] 안에 파티션이 하나라도 있는지 (저장소 도입 전 날짜는 기존 파일로 폴백하기 위함)"""
+        return bool(self._range(start, end or start))
+
+    # ------------------------------------------------------------
+    # 압축 (작은 세그먼트 병합)
+    # ------------------------------------------------------------
+    def compact(self, d: date, min_bytes: int = COMPACT_MIN_BYTES) -> int:
+        """
+        d 파티션에서 min_bytes보다 작은 세그먼트들을 하나로 합칩니다. 합친 세그먼트 수를 반환
+        - 합친 세그먼트는 첫 작은 세그먼트 자리에 두어 기사 순서를 유지합니다.
+        - 인덱스를 먼저 교체한 뒤 옛 세그먼트를 지우므로, 도중에 죽어도 읽기는 항상 일관됩니다.
+        - 인덱스에 없는 고아 세그먼트(세그먼트 기록 후 인덱스 교체 전에 죽은 append)도 정리합니다.
+        """
+        part = self._partition(d)
+        if not (part / _INDEX_NAME).exists():
+            return 0
+        with self._locked(part):
+            index = json.loads(json.dumps(self._load_index(part)))
+            small = [s for s in index["segments"] if s["bytes"] < min_bytes]
+            merged_from = set()
+            if len(small) >= 2:
+                lines = []
+                for s in small:
+                    data = (part / s["name"]).read_bytes()
+                    lines.extend(data.splitlines(keepends=True))
+                seg, spans = self._write_segment(part, index, lines)
+                merged_from = {s["name"] for s in small}
+                at = index["segments"].index(small[0])
+                kept = [s for s in index["segments"] if s["name"] not in merged_from]
+                kept.insert(at, {"name": seg, "bytes": sum(n for _, n in spans), "count": len(spans)})
+                index["segments"] = kept
+
+                # 필드 인덱스 재구성: 옮겨진 줄은 새 오프셋으로
+                index["fields"] = {}
+                for s in index["segments"]:
+                    if s["name"] == seg:
+                        recs = [json.loads(line) for line in lines]
+                        seg_spans = spans
+                    else:
+                        data = (part / s["name"]).read_bytes()
+                        recs, seg_spans, off = [], [], 0
+                        for line in data.splitlines(keepends=True):
+                            recs.append(json.loads(line))
+                            seg_spans.append((off, len(line)))
+                            off += len(line)
+                    for rec, span in zip(recs, seg_spans):
+                        self._index_record(index, s["name"], span, rec)
+                self._save_index(part, index)
+                self.stats["compactions"] += 1
+
+            live = {s["name"] for s in index["segments"]}
+            for p in part.glob("seg-*.jsonl*"):
+                if p.name not in live:
+                    try:
+                        p.unlink()
+                    except OSError:
+                        pass
+        return len(merged_from)
+
+    def compact_all(self, min_bytes: int = COMPACT_MIN_BYTES) -> Dict[date, int]:
+        return {d: n for d in self.dates() if (n := self.compact(d, min_bytes))}
+
+    def describe(self, d: date) -> Dict:
+        index = self._load_index(self._partition(d))
+        return {"segments": len(index["segments"]), "articles": len(index["keys"]),
+                "bytes": sum(s["bytes"] for s in index["segments"]),
+                "codes": len(index["fields"].get("code", {}))}
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"뉴스 저장소 추가 {s['appended']:,}건 (중복 {s['skipped_dup']:,}), 조회 {s['lookups']}회, "
+                f"읽기 {s['reads']:,}회 / {s['bytes_read']:,}B / {s['records_read']:,}건, 압축 {s['compactions']}회")
+
+
+# 프로세스 공용 인스턴스
+news_store = NewsStore()
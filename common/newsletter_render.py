@@ -0,0 +1,149 @@
+import os
+import re
+import hashlib
+from pathlib import Path
+
+# 렌더링 결과 디스크 캐시 위치
+RENDER_CACHE_DIR = Path(os.getenv("RENDER_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "render_cache")))
+
+# 인라이너/미니파이어 로직이 바뀌면 올려서 기존 캐시를 무효화합니다.
+RENDERER_VERSION = "1"
+
+# 웹 아카이브(application.clean_html_content)가 <style>에서 제거하는 속성은 인라인하지 않습니다.
+# (인라인되면 아카이브에서 더 이상 지울 수 없으므로 <style>에만 남겨 둠)
+NON_INLINED_PROPERTIES = ("font-weight",)
+
+_STYLE_BLOCK_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_OPEN_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(/?)>")
+_CLASS_ATTR_RE = re.compile(r'\sclass\s*=\s*"([^"]*)"', re.IGNORECASE)
+_STYLE_ATTR_RE = re.compile(r"""\sstyle\s*=\s*(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+_SIMPLE_SELECTOR_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9]*|\.[\w-]+)$")
+_PRESERVE_RE = re.compile(r"(<pre[^>]*>.*?</pre>|<textarea[^>]*>.*?</textarea>)", re.DOTALL | re.IGNORECASE)
+
+
+# ------------------------------------------------------------
+# CSS 인라인 / 미니파이
+# ------------------------------------------------------------
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def _parse_rules(css: str, skip_properties=()):
+    """단순 선택자(태그, .클래스) 규칙만 추출합니다. 가상 클래스/자식 선택자 등은 <style>에 남겨 둡니다."""
+    rules = []
+    for order, (selectors, body) in enumerate(_CSS_RULE_RE.findall(_CSS_COMMENT_RE.sub("", css))):
+        decls = ";".join(
+            d for d in minify_css(body).rstrip(";").split(";")
+            if d and d.split(":", 1)[0].lower() not in skip_properties
+        ).replace('"', "'")  # style="..." 속성 안에 들어가므로 따옴표 통일
+        if not decls:
+            continue
+        for sel in (s.strip() for s in selectors.split(",")):
+            if _SIMPLE_SELECTOR_RE.match(sel):
+                # 클래스 선택자가 태그 선택자보다 우선 (specificity), 같은 종류는 선언 순서
+                rules.append((1 if sel.startswith(".") else 0, order, sel, decls))
+    rules.sort(key=lambda r: (r[0], r[1]))
+    return rules
+
+
+def inline_css(html: str, skip_properties=NON_INLINED_PROPERTIES) -> str:
+    """
+    <style> 블록의 단순 규칙을 각 태그의 style 속성으로 복사합니다.
+    (Gmail 등 <style>을 무시하는 메일 클라이언트 대응, 기존 인라인 style이 항상 우선)
+    """
+    css = "".join(_STYLE_BLOCK_RE.findall(html))
+    rules = _parse_rules(css, skip_properties)
+    if not rules:
+        return html
+
+    def _apply(match):
+        tag, attrs, self_close = match.group(1).lower(), match.group(2) or "", match.group(3)
+        classes = set()
+        cls = _CLASS_ATTR_RE.search(attrs)
+        if cls:
+            classes = {c for c in cls.group(1).split() if c}
+        decls = [d for _, _, sel, d in rules if sel == tag or (sel.startswith(".") and sel[1:] in classes)]
+        if not decls:
+            return match.group(0)
+        inherited = ";".join(decls)
+        existing = _STYLE_ATTR_RE.search(attrs)
+        if existing:
+            merged = f"{inherited};{existing.group(2)}".replace('"', "'")
+            attrs = attrs[:existing.start()] + f' style="{merged}"' + attrs[existing.end():]
+        else:
+            attrs = f'{attrs} style="{inherited}"'
+        return f"<{match.group(1)}{attrs}{self_close}>"
+
+    head_end = html.lower().find("<body")
+    if head_end == -1:
+        return _OPEN_TAG_RE.sub(_apply, html)
+    return html[:head_end] + _OPEN_TAG_RE.sub(_apply, html[head_end:])
+
+
+def minify_html(html: str) -> str:
+    """태그 사이 공백과 <style> 내용을 줄입니다. <pre>/<textarea> 내부는 보존합니다."""
+    html = _STYLE_BLOCK_RE.sub(lambda m: f"<style>{minify_css(m.group(1))}</style>", html)
+    parts = _PRESERVE_RE.split(html)
+    for i in range(0, len(parts), 2):
+        chunk = re.sub(r">\s+<", "><", parts[i])
+        parts[i] = re.sub(r"[ \t]*\n[ \t\n]*", "\n", chunk)
+    return "".join(parts).strip()
+
+
+# ------------------------------------------------------------
+# 렌더링 캐시
+# ------------------------------------------------------------
+def content_key(service, variant, template_version, md_text) -> str:
+    digest = hashlib.sha256()
+    for part in (RENDERER_VERSION, service, variant, template_version, md_text):
+        digest.update(str(part).encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def render_cached(service, date_str, variant, md_text, render_fn, template_version="1", inline=True):
+    """
+    (서비스, 날짜, 변형)별 뉴스레터 HTML을 한 번만 렌더링하고 디스크에 캐시합니다.
+
+    - render_fn(md_text) -> 완성된 HTML (마크다운 변환 + 푸터 정리 + 템플릿 래핑)
+    - 캐시 키: 마크다운 내용 해시 + 템플릿 버전 (내용이 같으면 다시 렌더링하지 않음)
+    - 결과는 CSS 인라인 + 미니파이된 최종 산출물이며, 이메일/아카이브/잠금해제 발송이 모두 이 결과를 사용합니다.
+    """
+    key = content_key(service, variant, template_version, md_text)
+    cache_path = RENDER_CACHE_DIR / service / f"{date_str}_{variant}_{key[:16]}.html"
+    if cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
+
+    html = render_fn(md_text)
+    if inline:
+        html = inline_css(html)
+    html = minify_html(html)
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # 같은 (서비스, 날짜, 변형)의 이전 버전은 정리
+        for stale in cache_path.parent.glob(f"{date_str}_{variant}_*.html"):
+            stale.unlink(missing_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(html, encoding="utf-8")
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"⚠️ [Render Cache] 저장 실패: {e}")
+    return html
+
+
+def extract_headline(html_content: str, default="새로운 리포트") -> str:
+    """렌더링된 HTML에서 제목(<title> 우선, 없으면 첫 <h1>)을 추출합니다."""
+    title_match = re.search(r'<title>(.*?)</title>', html_content, re.DOTALL | re.IGNORECASE)
+    if title_match and title_match.group(1).strip():
+        title = title_match.group(1).strip()
+        return title.split("FINCORE | ", 1)[1] if "FINCORE | " in title else title
+    h1_match = re.search(r'<h1[^>]*>(.*?)</h1>', html_content, re.DOTALL | re.IGNORECASE)
+    if h1_match:
+        return re.sub(r"<[^>]+>", "", h1_match.group(1)).strip()
+    return default
+
@@ -0,0 +1,180 @@
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def _to_ms(ts) -> int:
+    """datetime 또는 epoch 초(float)를 epoch 밀리초(int)로 변환"""
+    if isinstance(ts, datetime):
+        return int(ts.timestamp() * 1000)
+    return int(float(ts) * 1000)
+
+
+class _RollingWindow:
+    __slots__ = ("span_ms", "start", "pv_sum", "v_sum", "min_q", "max_q")
+
+    def __init__(self, span_ms):
+        self.span_ms = span_ms
+        self.start = 0          # 윈도우에 남아있는 가장 오래된 샘플의 순번
+        self.pv_sum = 0.0
+        self.v_sum = 0.0
+        self.min_q = deque()    # (순번, 가격) 가격 오름차순 단조 큐
+        self.max_q = deque()    # (순번, 가격) 가격 내림차순 단조 큐
+
+
+class PriceRingBuffer:
+    def __init__(self, capacity: int, windows=()):
+        """
+        시간 인덱스 가격 링 버퍼 (왓치독 가격 이력용, iceage & moneybag 공용)
+
+        - int64 epoch 밀리초 / float64 가격 / float64 거래량을 고정 크기 NumPy 배열에 순환 저장합니다.
+        - 시각 기준 조회(price_at_or_before, pct_change)는 정렬된 두 구간에 searchsorted를 쓰므로 O(log n)입니다.
+        - windows(초)로 등록한 윈도우는 append마다 최솟값/최댓값(단조 큐)과 VWAP(누적합)을 증분 갱신하여
+          window_stats()가 O(1)로 응답합니다. 등록하지 않은 윈도우는 해당 구간만 벡터 연산으로 계산합니다.
+        - 타임스탬프는 단조 증가를 가정하며, 과거 시각이 들어오면 마지막 시각으로 맞춥니다.
+        """
+        self.capacity = int(capacity)
+        self._ts = np.zeros(self.capacity, dtype=np.int64)
+        self._px = np.zeros(self.capacity, dtype=np.float64)
+        self._vol = np.zeros(self.capacity, dtype=np.float64)
+        self._count = 0  # 지금까지 추가된 샘플 수 (순번 s의 위치는 s % capacity)
+        self._last_ms = 0
+        self._windows: Dict[int, _RollingWindow] = {int(w): _RollingWindow(int(w) * 1000) for w in windows}
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def _oldest(self) -> int:
+        return max(0, self._count - self.capacity)
+
+    # ------------------------------------------------------------
+    # 추가
+    # ------------------------------------------------------------
+    def append(self, ts, price: float, volume: float = 0.0) -> None:
+        # 핫 패스: NumPy 스칼라 연산은 느리므로 .item()으로 꺼낸 파이썬 숫자로 계산합니다.
+        ms = max(_to_ms(ts), self._last_ms)
+        cap = self.capacity
+        seq = self._count
+        price = float(price)
+        volume = float(volume)
+        ts_item, px_item, vol_item = self._ts.item, self._px.item, self._vol.item
+
+        for w in self._windows.values():
+            # 시간 경과로 빠지는 샘플 + 이번 append로 덮어써질 샘플(순번 seq - capacity) 제거
+            cutoff = ms - w.span_ms
+            limit = seq - cap
+            start = w.start
+            while start < seq and (start <= limit or ts_item(start % cap) < cutoff):
+                i = start % cap
+                v = vol_item(i)
+                w.pv_sum -= px_item(i) * v
+                w.v_sum -= v
+                start += 1
+            if start != w.start:
+                w.start = start
+                while w.min_q and w.min_q[0][0] < start:
+                    w.min_q.popleft()
+                while w.max_q and w.max_q[0][0] < start:
+                    w.max_q.popleft()
+
+        i = seq % cap
+        self._ts[i] = ms
+        self._px[i] = price
+        self._vol[i] = volume
+        self._count = seq + 1
+        self._last_ms = ms
+
+        pv = price * volume
+        for w in self._windows.values():
+            w.pv_sum += pv
+            w.v_sum += volume
+            q = w.min_q
+            while q and q[-1][1] >= price:
+                q.pop()
+            q.append((seq, price))
+            q = w.max_q
+            while q and q[-1][1] <= price:
+                q.pop()
+            q.append((seq, price))
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def last(self) -> Optional[Tuple[float, float]]:
+        """(epoch 초, 가격) 또는 None"""
+        if not self._count:
+            return None
+        return self._last_ms / 1000.0, self._px.item((self._count - 1) % self.capacity)
+
+    def _seq_at_or_before(self, ms: int) -> Optional[int]:
+        """시각 ms 이전(포함)의 마지막 샘플 순번 (이진 탐색)"""
+        n = len(self)
+        if not n:
+            return None
+        head = self._count % self.capacity
+        if self._count <= self.capacity or head == 0:
+            k = int(np.searchsorted(self._ts[:n], ms, side="right")) - 1
+            return self._oldest + k if k >= 0 else None
+        # 버퍼가 한 바퀴 돈 상태: [head:] 가 오래된 구간, [:head] 가 최신 구간
+        if self._ts.item(0) <= ms:
+            k = int(np.searchsorted(self._ts[:head], ms, side="right")) - 1
+            return self._count - head + k
+        k = int(np.searchsorted(self._ts[head:], ms, side="right")) - 1
+        return self._oldest + k if k >= 0 else None
+
+    def price_at_or_before(self, ts) -> Optional[float]:
+        seq = self._seq_at_or_before(_to_ms(ts))
+        return None if seq is None else self._px.item(seq % self.capacity)
+
+    def pct_change(self, seconds: float, now=None) -> Optional[float]:
+        """
+        최신가와 (now - seconds) 시점 이전의 마지막 가격 사이 변동률(%)
+        now를 생략하면 마지막 샘플 시각을 기준으로 합니다.
+        """
+        if len(self) < 2:
+            return None
+        cur_ts, cur_price = self.last()
+        ref = (now.timestamp() if isinstance(now, datetime) else float(now)) if now is not None else cur_ts
+        old_price = self.price_at_or_before(ref - seconds)
+        if not old_price:
+            return None
+        return (cur_price - old_price) / old_price * 100.0
+
+    def window_stats(self, seconds: int) -> Optional[Dict[str, Optional[float]]]:
+        """
+        마지막 샘플 기준 최근 seconds초 구간의 {"min", "max", "vwap", "count"}
+        (거래량이 없으면 vwap은 None)
+        """
+        if not self._count:
+            return None
+        w = self._windows.get(int(seconds))
+        if w is not None:
+            return {
+                "min": w.min_q[0][1],
+                "max": w.max_q[0][1],
+                "vwap": w.pv_sum / w.v_sum if w.v_sum > 0 else None,
+                "count": self._count - w.start,
+            }
+
+        ts, px, vol = self.to_arrays()
+        k = int(np.searchsorted(ts, self._last_ms - int(seconds) * 1000, side="left"))
+        px, vol = px[k:], vol[k:]
+        v_sum = float(vol.sum())
+        return {
+            "min": float(px.min()),
+            "max": float(px.max()),
+            "vwap": float((px * vol).sum() / v_sum) if v_sum > 0 else None,
+            "count": len(px),
+        }
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """오래된 순으로 정렬된 (epoch 밀리초, 가격, 거래량) 배열 복사본"""
+        n = len(self)
+        head = self._count % self.capacity
+        if self._count <= self.capacity or head == 0:
+            return self._ts[:n].copy(), self._px[:n].copy(), self._vol[:n].copy()
+        order = np.r_[head:self.capacity, 0:head]
+        return self._ts[order], self._px[order], self._vol[order]
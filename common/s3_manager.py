@@ -2,18 +2,44 @@ import boto3
 from pathlib import Path, PurePosixPath
 import os
 import time
+import json
+import fnmatch
+import hashlib
 import posixpath
+import io
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import NoCredentialsError, ClientError
 
+from common.compressed_io import (
+    should_compress, preferred_codec, compress_bytes, decompress_bytes, decompress_file_inplace,
+)
+
+# 동기화 매니페스트 파일명 (로컬 폴더 최상단에 저장, 업로드 대상에서 제외)
+SYNC_MANIFEST_NAME = ".s3sync_manifest.json"
+
+# 멀티파트 기준 (ETag 계산도 동일한 청크 크기를 사용해야 S3 ETag와 일치합니다)
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+SYNC_MAX_WORKERS = int(os.getenv("S3_SYNC_MAX_WORKERS", "16"))
+
 class S3Manager:
-    def __init__(self, bucket_name="fincore-output-storage"):
+    def __init__(self, bucket_name="fincore-output-storage", s3_client=None):
         """
         AWS S3 연결 관리자 (Moneybag & Signalist 공용)
+        :param s3_client: 테스트용 클라이언트 주입 (moto/minio 등). 없으면 S3_ENDPOINT_URL 환경변수를 따릅니다.
         """
         self.bucket_name = bucket_name
-        self.s3 = boto3.client('s3', region_name='ap-northeast-2')
+        self.s3 = s3_client or boto3.client(
+            's3', region_name='ap-northeast-2', endpoint_url=os.getenv("S3_ENDPOINT_URL") or None
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_CHUNKSIZE,
+            max_concurrency=4,
+        )
 
     def upload_file(self, local_file_path, s3_file_path):
         """단일 파일 업로드"""
@@ -26,7 +52,7 @@ class S3Manager:
             # 화면에 출력할 로컬 경로도 S3처럼 '/' 구분자를 사용하도록 통일합니다.
             safe_local_path_for_print = str(local_file_path).replace('\\', '/')
             print(f"☁️ [Upload] {safe_local_path_for_print} -> {s3_key}")
-            self.s3.upload_file(local_file_path, self.bucket_name, s3_key)
+            self._put_file(local_file_path, s3_key)
             return True
         except Exception as e:
             print(f"❌ [Error] {e}")
@@ -39,7 +65,7 @@ class S3Manager:
         try:
             s3_key = s3_key.replace("\\", "/")
             response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
-            return response['Body'].read().decode('utf-8')
+            return decompress_bytes(response['Body'].read()).decode('utf-8')
         except self.s3.exceptions.NoSuchKey:
             return None
         except Exception as e:
@@ -55,7 +81,10 @@ class S3Manager:
                 os.makedirs(local_dir)
             
             print(f"📥 [Download] {s3_key} -> {local_file_path}")
-            self.s3.download_file(self.bucket_name, s3_key, local_file_path)
+            self.s3.download_file(self.bucket_name, s3_key, local_file_path, Config=self.transfer_config)
+            # 압축 저장된 데이터셋은 로컬에서는 평문으로 복원 (기존 pd.read_csv 호출부 호환)
+            if should_compress(s3_key):
+                decompress_file_inplace(local_file_path)
             return True
         except ClientError:
             return False
@@ -115,10 +144,13 @@ class S3Manager:
             print(f"❌ [S3 List Error] {e}")
             return []
 
-    def upload_directory(self, local_dir, s3_prefix, recent_days=2):
+    def upload_directory(self, local_dir, s3_prefix, recent_days=2, include=None):
         """
         📁 [스마트 동기화] 하위 폴더 포함, 날짜 기준 업로드
         :param recent_days: 0=당일(자정 이후), N=최근 N일, None=전체
+        :param include: 업로드할 파일 패턴 리스트 (예: ["kr_prices_*.csv"]), None=전체
+
+        날짜 필터를 통과한 파일도 S3 ETag와 내용 해시가 같으면 건너뜁니다. (sync_up 참고)
         """
         if not os.path.exists(local_dir):
             print(f"⚠️ [Skip] 로컬 폴더 없음: {local_dir}")
@@ -137,35 +169,265 @@ class S3Manager:
         else:
             cutoff_time = None
             print("   👉 옵션: 모든 파일 업로드")
-        
-        count = 0
-        skip_count = 0
-        
-        # os.walk로 모든 하위 폴더 재귀 탐색
+
+        result = self.sync_up(local_dir, s3_prefix, include=include, modified_after=cutoff_time, quiet=True)
+        print(f"✅ [Sync Done] 업로드: {result['uploaded']}개 / 건너뜀(구형): {result['skipped_old']}개 / "
+              f"건너뜀(변경없음): {result['unchanged']}개 / 실패: {result['failed']}개 ({result['elapsed']:.1f}초)")
+
+    # ------------------------------------------------------------
+    # [NEW] 해시 기반 병렬 동기화 엔진 (aws s3 sync 대체)
+    # ------------------------------------------------------------
+    @staticmethod
+    def _matches(rel_path, include=None, exclude=None):
+        """상대경로 또는 파일명이 패턴과 일치하는지 확인합니다."""
+        name = posixpath.basename(rel_path)
+        if name.startswith(SYNC_MANIFEST_NAME) or name.endswith(".s3tmp"):
+            return False
+        if exclude and any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in exclude):
+            return False
+        if include is None:
+            return True
+        return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in include)
+
+    @staticmethod
+    def compute_etag(path, chunk_size=MULTIPART_CHUNKSIZE, threshold=MULTIPART_THRESHOLD):
+        """
+        S3가 부여할 ETag를 로컬에서 계산합니다.
+        - 단일 업로드: 파일 MD5
+        - 멀티파트: 각 파트 MD5를 이어붙인 값의 MD5 + "-파트수"
+        """
+        with open(path, "rb") as f:
+            return S3Manager._etag_of_stream(f, os.path.getsize(path), chunk_size, threshold)
+
+    @staticmethod
+    def _etag_of_stream(f, size, chunk_size=MULTIPART_CHUNKSIZE, threshold=MULTIPART_THRESHOLD):
+        if size < threshold:
+            return hashlib.md5(f.read()).hexdigest()
+        digests = []
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digests.append(hashlib.md5(chunk).digest())
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+    def _put_file(self, local_path, s3_key):
+        """
+        파일을 업로드합니다. 압축 대상 데이터셋(common.compressed_io.COMPRESS_PATTERNS)은
+        zstd/gzip으로 압축하고 Content-Encoding을 지정합니다.
+        Returns: 전송한 바이트 수
+        """
+        codec = preferred_codec() if should_compress(s3_key) else None
+        if not codec:
+            self.s3.upload_file(local_path, self.bucket_name, s3_key, Config=self.transfer_config)
+            return os.path.getsize(local_path)
+
+        with open(local_path, "rb") as f:
+            payload = compress_bytes(f.read(), codec)
+        extra = {"ContentEncoding": codec, "Metadata": {"fincore-codec": codec}}
+        if s3_key.endswith(".csv"):
+            extra["ContentType"] = "text/csv; charset=utf-8"
+        elif s3_key.endswith(".jsonl"):
+            extra["ContentType"] = "application/x-ndjson; charset=utf-8"
+        self.s3.upload_fileobj(io.BytesIO(payload), self.bucket_name, s3_key, ExtraArgs=extra, Config=self.transfer_config)
+        return len(payload)
+
+    def _remote_etag_cached(self, local_path, rel_path, manifest, codec):
+        """압축 업로드 시 S3에 기록될 ETag(압축본 기준)를 매니페스트에 캐시합니다."""
+        entry = manifest[rel_path]
+        if entry.get("codec") == codec and entry.get("remote_etag"):
+            return entry["remote_etag"]
+        with open(local_path, "rb") as f:
+            payload = compress_bytes(f.read(), codec)
+        entry["codec"] = codec
+        entry["remote_etag"] = self._etag_of_stream(io.BytesIO(payload), len(payload))
+        return entry["remote_etag"]
+
+    def _load_manifest(self, local_dir):
+        path = Path(local_dir) / SYNC_MANIFEST_NAME
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def _save_manifest(self, local_dir, manifest):
+        path = Path(local_dir) / SYNC_MANIFEST_NAME
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps(manifest, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"⚠️ [Manifest] 저장 실패: {e}")
+
+    def _local_etag_cached(self, local_path, rel_path, manifest):
+        """크기/mtime이 매니페스트와 같으면 저장된 ETag를 재사용하고, 아니면 새로 계산합니다."""
+        st = os.stat(local_path)
+        entry = manifest.get(rel_path)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            return entry["etag"]
+        etag = self.compute_etag(local_path)
+        manifest[rel_path] = {"size": st.st_size, "mtime": st.st_mtime, "etag": etag}
+        return etag
+
+    def list_objects_with_etag(self, prefix):
+        """prefix 하위 객체를 {key: {"etag", "size"}} 형태로 반환합니다."""
+        objects = {}
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if key.endswith("/"):
+                    continue
+                objects[key] = {"etag": obj.get("ETag", "").strip('"'), "size": obj.get("Size", 0)}
+        return objects
+
+    def sync_up(self, local_dir, s3_prefix, include=None, exclude=None, modified_after=None,
+                max_workers=SYNC_MAX_WORKERS, quiet=False):
+        """
+        로컬 폴더 -> S3 병렬 동기화
+        - 내용 해시(ETag)가 S3와 같은 파일은 mtime이 바뀌어도 다시 올리지 않습니다.
+        - include/exclude: fnmatch 패턴 (상대경로 또는 파일명 기준)
+        - modified_after: datetime. 이 시각 이전에 수정된 파일은 검사조차 하지 않습니다.
+        """
+        started = time.time()
+        result = {"uploaded": 0, "unchanged": 0, "skipped_old": 0, "failed": 0, "bytes": 0}
+        if not os.path.exists(local_dir):
+            print(f"⚠️ [Skip] 로컬 폴더 없음: {local_dir}")
+            result["elapsed"] = 0.0
+            return result
+
+        s3_prefix = s3_prefix.replace("\\", "/").rstrip("/")
+        manifest = self._load_manifest(local_dir)
+        try:
+            remote = self.list_objects_with_etag(s3_prefix + "/")
+        except Exception as e:
+            print(f"⚠️ [S3 List Error] 원격 목록 조회 실패, 전체 업로드로 진행: {e}")
+            remote = {}
+
+        cutoff_ts = modified_after.timestamp() if modified_after else None
+        jobs = []
         for root, dirs, files in os.walk(local_dir):
             # 불필요한 시스템 폴더 제외
             if 'venv' in root or '.git' in root or '__pycache__' in root:
                 continue
-
             for filename in files:
                 local_path = os.path.join(root, filename)
-                
-                # 날짜 필터링
-                if cutoff_time:
-                    mtime = datetime.fromtimestamp(os.path.getmtime(local_path))
-                    if mtime < cutoff_time:
-                        skip_count += 1
-                        continue 
-
-                # S3 경로 계산 (상대 경로 유지)
-                # [버그 수정] 경로 깨짐 최종 해결. pathlib으로 상대경로를 구하고, posixpath로 안전하게 조합합니다.
-                relative_path_posix = Path(local_path).relative_to(local_dir).as_posix()
-                s3_path = posixpath.join(s3_prefix, relative_path_posix)
-
-                if self.upload_file(local_path, s3_path):
-                    count += 1
-        
-        print(f"✅ [Sync Done] 업로드: {count}개 / 건너뜀(구형): {skip_count}개")
+                rel_path = Path(local_path).relative_to(local_dir).as_posix()
+                if not self._matches(rel_path, include, exclude):
+                    continue
+                if cutoff_ts is not None and os.path.getmtime(local_path) < cutoff_ts:
+                    result["skipped_old"] += 1
+                    continue
+                s3_key = posixpath.join(s3_prefix, rel_path)
+                local_etag = self._local_etag_cached(local_path, rel_path, manifest)
+                codec = preferred_codec() if should_compress(rel_path) else None
+                if codec:
+                    local_etag = self._remote_etag_cached(local_path, rel_path, manifest, codec)
+                if remote.get(s3_key, {}).get("etag") == local_etag:
+                    result["unchanged"] += 1
+                    continue
+                jobs.append((local_path, s3_key))
+
+        def _upload(local_path, s3_key):
+            return self._put_file(local_path, s3_key)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(_upload, lp, key): (lp, key) for lp, key in jobs}
+            for fut in as_completed(futures):
+                local_path, s3_key = futures[fut]
+                try:
+                    result["bytes"] += fut.result()
+                    result["uploaded"] += 1
+                    if not quiet:
+                        print(f"☁️ [Upload] {local_path.replace(os.sep, '/')} -> {s3_key}")
+                except Exception as e:
+                    result["failed"] += 1
+                    print(f"❌ [Upload Error] {s3_key}: {e}")
+
+        self._save_manifest(local_dir, manifest)
+        result["elapsed"] = time.time() - started
+        if not quiet:
+            print(f"✅ [Sync Up] {s3_prefix}: 업로드 {result['uploaded']} / 변경없음 {result['unchanged']} / "
+                  f"실패 {result['failed']} ({result['bytes'] / 1024 / 1024:.1f}MB, {result['elapsed']:.1f}초)")
+        return result
+
+    def sync_down(self, s3_prefix, local_dir, include=None, exclude=None, max_workers=SYNC_MAX_WORKERS,
+                  quiet=False, cache=None):
+        """
+        S3 -> 로컬 폴더 병렬 동기화 (aws s3 sync --exclude "*" --include ... 대체)
+        - 매니페스트에 기록된 ETag가 원격과 같고 로컬 파일이 그대로면 다운로드하지 않습니다.
+        - cache: common.data_cache.LocalDataCache. 새 워커라도 호스트 캐시에 같은 ETag가 있으면 전송 없이 복사합니다.
+        """
+        started = time.time()
+        result = {"downloaded": 0, "unchanged": 0, "failed": 0, "bytes": 0}
+        s3_prefix = s3_prefix.replace("\\", "/").rstrip("/") + "/"
+        Path(local_dir).mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest(local_dir)
+
+        try:
+            remote = self.list_objects_with_etag(s3_prefix)
+        except Exception as e:
+            print(f"❌ [S3 List Error] {e}")
+            result["failed"] = -1
+            result["elapsed"] = time.time() - started
+            return result
+
+        jobs = []
+        for key, meta in remote.items():
+            rel_path = key[len(s3_prefix):]
+            if not rel_path or not self._matches(rel_path, include, exclude):
+                continue
+            local_path = os.path.join(local_dir, *rel_path.split("/"))
+            entry = manifest.get(rel_path)
+            if entry and entry.get("etag") == meta["etag"] and os.path.exists(local_path):
+                st = os.stat(local_path)
+                if entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+                    result["unchanged"] += 1
+                    continue
+                # 로컬 파일이 바뀌었지만 내용이 원격과 같으면 매니페스트만 갱신
+                if self._local_etag_cached(local_path, rel_path, manifest) == meta["etag"]:
+                    result["unchanged"] += 1
+                    continue
+            jobs.append((key, rel_path, local_path, meta))
+
+        def _download(key, local_path, meta):
+            if cache is not None:
+                transferred = cache.fetch(self.s3, self.bucket_name, key, meta["etag"], meta["size"], local_path)
+            else:
+                os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+                tmp_path = local_path + ".s3tmp"
+                self.s3.download_file(self.bucket_name, key, tmp_path, Config=self.transfer_config)
+                os.replace(tmp_path, local_path)
+                transferred = meta["size"]
+            # 압축 저장된 데이터셋은 로컬에서는 평문으로 복원 (레거시 평문 객체는 그대로)
+            if should_compress(key):
+                decompress_file_inplace(local_path)
+            return transferred
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(_download, key, lp, meta): (key, rel, lp, meta) for key, rel, lp, meta in jobs}
+            for fut in as_completed(futures):
+                key, rel_path, local_path, meta = futures[fut]
+                try:
+                    transferred = fut.result()
+                    st = os.stat(local_path)
+                    manifest[rel_path] = {"size": st.st_size, "mtime": st.st_mtime, "etag": meta["etag"]}
+                    result["downloaded"] += 1
+                    result["bytes"] += transferred
+                    if not quiet:
+                        print(f"📥 [Download] {key} -> {local_path}")
+                except Exception as e:
+                    result["failed"] += 1
+                    print(f"❌ [Download Error] {key}: {e}")
+
+        self._save_manifest(local_dir, manifest)
+        if cache is not None:
+            cache.close()
+        result["elapsed"] = time.time() - started
+        print(f"✅ [Sync Down] {s3_prefix}: 다운로드 {result['downloaded']} / 변경없음 {result['unchanged']} / "
+              f"실패 {result['failed']} ({result['bytes'] / 1024 / 1024:.1f}MB, {result['elapsed']:.1f}초)")
+        return result
 
 
 # --- 👇 로컬 테스트 실행 영역 ---
@@ -0,0 +1,412 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import hashlib
+import itertools
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+# 스풀 소유권 잠금은 POSIX(fcntl)에서만 프로세스 간에 걸립니다. (Windows 로컬 실행 시 자기 스풀만 복구)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+DEFAULT_SPOOL_DIR = os.getenv("TELEGRAM_SPOOL_DIR", str(Path(__file__).resolve().parents[1] / "data" / "telegram_outbox"))
+# 프로세스 종료 시 남은 메시지를 보내려고 기다리는 최대 시간 (못 보낸 것은 스풀에 남아 다음 실행 때 전송)
+EXIT_FLUSH_SEC = float(os.getenv("TELEGRAM_EXIT_FLUSH_SEC", "10"))
+
+MAX_MESSAGE_LEN = 4096
+_MERGE_SEP = "\n\n"
+_LOCK_NAME = ".lock"
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LEN) -> List[str]:
+    """텔레그램 한도(4096자)를 넘는 메시지를 줄 단위로 나눕니다. (한 줄이 한도보다 길면 강제로 자름)"""
+    if len(text) <= limit:
+        return [text]
+    chunks, buf = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if buf:
+                chunks.append(buf)
+                buf = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(buf) + len(line) > limit:
+            chunks.append(buf)
+            buf = ""
+        buf += line
+    if buf:
+        chunks.append(buf)
+    return [c.strip("\n") for c in chunks if c.strip()]
+
+
+class TelegramOutbox:
+    def __init__(self, token: str, api_base: str = API_BASE, spool_dir=DEFAULT_SPOOL_DIR,
+                 chat_interval_sec: float = 1.0, group_per_minute: int = 20, global_per_sec: int = 25,
+                 max_retries: int = 5, backoff_base: float = 2.0, backoff_max: float = 60.0, timeout: float = 15.0):
+        """
+        텔레그램 발신 대기열 (봇 토큰당 워커 하나)
+
+        - send()는 메시지를 대기열·스풀에 넣고 바로 반환합니다. 실제 전송은 토큰별 워커 스레드 하나가 순서대로 합니다.
+        - 속도 제한: 채팅방별 최소 간격(개인 chat_interval_sec, 그룹/채널은 분당 group_per_minute건)과
+          봇 전체 초당 global_per_sec건을 지킵니다. 같은 채팅방 메시지의 순서는 바뀌지 않습니다.
+        - 429 응답이면 retry_after 만큼 봇 전체 전송을 멈췄다가 다시 보냅니다. (시도 횟수에 포함하지 않음)
+          네트워크 오류·5xx는 지수 백오프로 max_retries 만큼 재시도하고, 그 밖의 4xx는 버립니다.
+        - Markdown 파싱 오류(400)가 나면 서식 없이 한 번 더 보냅니다.
+        - 4096자를 넘는 메시지는 줄 단위로 나누고, 같은 채팅방에 밀린 짧은 메시지들은 한도 안에서 하나로 합쳐 보냅니다.
+        - 대기 중인 메시지는 spool_dir/<토큰 해시>/<pid>/ 에 파일로 남습니다. 재시작하면 자기 스풀과
+          종료된 프로세스(잠금이 풀린 스풀)의 메시지를 이어서 보냅니다.
+        """
+        self.token = token
+        self.url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_interval_sec = float(chat_interval_sec)
+        self.group_interval_sec = 60.0 / max(1, int(group_per_minute))
+        self.global_interval_sec = 1.0 / max(1, int(global_per_sec))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.timeout = float(timeout)
+
+        token_dir = Path(spool_dir) / hashlib.sha1(token.encode("utf-8")).hexdigest()[:12] if spool_dir else None
+        self.token_dir = token_dir
+        self.spool_dir = token_dir / str(os.getpid()) if token_dir else None
+        self._lock_fh = None
+
+        self._pending: List[dict] = []
+        self._cv = threading.Condition()
+        self._inflight = 0
+        self._ids = itertools.count()
+        self._chat_next: Dict[str, float] = {}
+        self._global_next = 0.0
+        self._paused_until = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session = requests.Session()
+        self.stats = {"queued": 0, "sent": 0, "requests": 0, "split": 0, "merged": 0, "retried": 0,
+                      "rate_limited": 0, "failed": 0, "restored": 0,
+                      "latency_ms_total": 0.0, "latency_ms_max": 0.0}
+
+    # ------------------------------------------------------------
+    # 시작 / 종료
+    # ------------------------------------------------------------
+    def start(self):
+        with self._cv:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._worker_loop, name=f"telegram-outbox-{self.token[:6]}",
+                                            daemon=True)
+        self._restore_spool()
+        self._thread.start()
+        atexit.register(self.shutdown, EXIT_FLUSH_SEC)
+        return self
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """대기·전송 중인 메시지가 모두 처리될 때까지 기다립니다. 시간 안에 비면 True"""
+        deadline = time.monotonic() + timeout
+        with self._cv:
+            while self._pending or self._inflight:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cv.wait(min(left, 0.5))
+        return True
+
+    def shutdown(self, timeout: float = 10.0):
+        """남은 메시지를 timeout 동안 보내고 워커를 멈춥니다. 못 보낸 메시지는 스풀에 남습니다."""
+        if self._thread is None or self._stop.is_set():
+            return
+        self.flush(timeout)
+        with self._cv:
+            self._stop.set()
+            self._cv.notify_all()
+        self._thread.join(timeout=max(1.0, self.timeout))
+        if self._lock_fh is not None:
+            # 잠금을 풀어 두면 살아 있는 다른 프로세스가 남은 메시지를 가져가 보낼 수 있음
+            self._lock_fh.close()
+            self._lock_fh = None
+        if self._pending:
+            print(f"⚠️ [Telegram] 미전송 {len(self._pending)}건은 스풀에 남겨 다음 실행 때 보냅니다.", flush=True)
+
+    def depth(self) -> int:
+        with self._cv:
+            return len(self._pending) + self._inflight
+
+    # ------------------------------------------------------------
+    # 등록
+    # ------------------------------------------------------------
+    def send(self, chat_id, text: str, parse_mode: Optional[str] = None, disable_preview: bool = True) -> int:
+        """메시지를 대기열에 넣고 즉시 반환합니다. 나뉜 조각 수를 반환 (빈 메시지는 0)"""
+        if not text or not text.strip():
+            return 0
+        parts = split_message(text)
+        now = time.time()
+        with self._cv:
+            for part in parts:
+                msg = {"id": f"{time.time_ns():020d}-{next(self._ids):06d}", "chat_id": str(chat_id), "text": part,
+                       "parse_mode": parse_mode, "disable_preview": bool(disable_preview),
+                       "attempt": 0, "retry_at": 0.0, "enqueued_at": now}
+                self._write_spool(msg)
+                self._pending.append(msg)
+            self.stats["queued"] += len(parts)
+            self.stats["split"] += len(parts) - 1
+            self._cv.notify_all()
+        self.start()
+        return len(parts)
+
+    # ------------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------------
+    def report(self) -> str:
+        s = self.stats
+        avg = s["latency_ms_total"] / s["sent"] if s["sent"] else 0.0
+        return (f"전송 {s['sent']}/{s['queued']}건 (요청 {s['requests']}회, 합침 {s['merged']}, 나눔 {s['split']}, "
+                f"429 {s['rate_limited']}회, 재시도 {s['retried']}, 실패 {s['failed']}, 복구 {s['restored']}) "
+                f"평균 지연 {avg:.0f}ms / 최대 {s['latency_ms_max']:.0f}ms")
+
+    # ------------------------------------------------------------
+    # 워커
+    # ------------------------------------------------------------
+    def _chat_interval(self, chat_id: str) -> float:
+        # 그룹/채널 chat_id는 음수 (-100...) 또는 @채널명
+        return self.group_interval_sec if chat_id.startswith(("-", "@")) else self.chat_interval_sec
+
+    def _next_batch(self):
+        """
+        지금 보낼 수 있는 가장 오래된 메시지와, 같은 채팅방에 밀린 뒤 메시지들(한도 안에서 합침)을 꺼냅니다.
+        보낼 것이 없으면 (None, 다음 확인까지 대기 초)를 반환합니다. (self._cv 보유 상태에서 호출)
+        """
+        if not self._pending:
+            return None, None
+        now = time.time()
+        gate = max(self._global_next, self._paused_until)
+        blocked, earliest = set(), None
+        for i, msg in enumerate(self._pending):
+            chat = msg["chat_id"]
+            if chat in blocked:
+                continue
+            ready = max(gate, self._chat_next.get(chat, 0.0), msg["retry_at"])
+            if ready > now:
+                # 같은 채팅방의 뒤 메시지가 앞지르지 않도록 막음
+                blocked.add(chat)
+                earliest = ready if earliest is None else min(earliest, ready)
+                continue
+            batch, size = [msg], len(msg["text"])
+            for other in self._pending[i + 1:]:
+                if other["chat_id"] != chat:
+                    continue
+                if (other["parse_mode"] != msg["parse_mode"] or other["disable_preview"] != msg["disable_preview"]
+                        or other["retry_at"] > now or size + len(_MERGE_SEP) + len(other["text"]) > MAX_MESSAGE_LEN):
+                    break
+                batch.append(other)
+                size += len(_MERGE_SEP) + len(other["text"])
+            taken = {m["id"] for m in batch}
+            self._pending = [m for m in self._pending if m["id"] not in taken]
+            return batch, None
+        return None, max(0.0, earliest - now)
+
+    def _worker_loop(self):
+        while True:
+            with self._cv:
+                while True:
+                    if self._stop.is_set():
+                        return
+                    batch, wait = self._next_batch()
+                    if batch:
+                        self._inflight += len(batch)
+                        break
+                    self._cv.wait(wait)
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                print(f"❌ [Telegram Outbox] 전송 처리 오류: {e}", flush=True)
+                self._requeue(batch, retry=True)
+            finally:
+                with self._cv:
+                    self._inflight -= len(batch)
+                    self._cv.notify_all()
+
+    def _deliver(self, batch: List[dict]):
+        head = batch[0]
+        payload = {"chat_id": head["chat_id"], "text": _MERGE_SEP.join(m["text"] for m in batch),
+                   "disable_web_page_preview": head["disable_preview"]}
+        if head["parse_mode"]:
+            payload["parse_mode"] = head["parse_mode"]
+
+        now = time.time()
+        with self._cv:
+            self._global_next = now + self.global_interval_sec
+            self._chat_next[head["chat_id"]] = now + self._chat_interval(head["chat_id"])
+            self.stats["requests"] += 1
+
+        try:
+            r = self._session.post(self.url, json=payload, timeout=self.timeout)
+            status = r.status_code
+            try:
+                body = r.json()
+            except ValueError:
+                body = {"description": r.text[:200]}
+        except requests.RequestException as e:
+            status, body = None, {"description": str(e)}
+
+        desc = str(body.get("description", ""))
+        if status == 200:
+            self._finish(batch, ok=True)
+        elif status == 429:
+            retry_after = float((body.get("parameters") or {}).get("retry_after", 1))
+            with self._cv:
+                self._paused_until = max(self._paused_until, time.time() + retry_after)
+                self.stats["rate_limited"] += 1
+            print(f"⚠️ [Telegram] 429 Too Many Requests - {retry_after:.0f}s 후 재전송", flush=True)
+            self._requeue(batch, retry=False)
+        elif status == 400 and head["parse_mode"] and "parse" in desc.lower():
+            print(f"⚠️ [Telegram] 서식 파싱 실패, 일반 텍스트로 재전송: {desc}", flush=True)
+            for m in batch:
+                m["parse_mode"] = None
+            self._requeue(batch, retry=False)
+        elif status is None or status >= 500:
+            self._requeue(batch, retry=True, error=f"status={status} {desc}")
+        else:
+            print(f"❌ [Telegram Error] status={status} body={desc[:200]}", flush=True)
+            self._finish(batch, ok=False)
+
+    def _requeue(self, batch: List[dict], retry: bool, error: str = ""):
+        """꺼냈던 메시지를 원래 순서 자리로 되돌립니다. retry=True면 시도 횟수를 올리고 백오프"""
+        failed = []
+        with self._cv:
+            for m in batch:
+                if retry:
+                    m["attempt"] += 1
+                    if m["attempt"] > self.max_retries:
+                        failed.append(m)
+                        continue
+                    m["retry_at"] = time.time() + min(self.backoff_max, self.backoff_base ** m["attempt"])
+                    self.stats["retried"] += 1
+                self._write_spool(m)
+                ids = [x["id"] for x in self._pending]
+                self._pending.insert(bisect.bisect(ids, m["id"]), m)
+            self._cv.notify_all()
+        if retry and len(failed) < len(batch):
+            print(f"⚠️ [Telegram] 전송 실패, 재시도 예정 ({batch[0]['attempt']}/{self.max_retries}): {error}", flush=True)
+        if failed:
+            print(f"❌ [Telegram] 최종 실패 {len(failed)}건: {error}", flush=True)
+            self._finish(failed, ok=False)
+
+    def _finish(self, batch: List[dict], ok: bool):
+        now = time.time()
+        with self._cv:
+            if ok:
+                self.stats["sent"] += len(batch)
+                self.stats["merged"] += len(batch) - 1
+                for m in batch:
+                    latency = (now - m["enqueued_at"]) * 1000
+                    self.stats["latency_ms_total"] += latency
+                    self.stats["latency_ms_max"] = max(self.stats["latency_ms_max"], latency)
+            else:
+                self.stats["failed"] += len(batch)
+        for m in batch:
+            self._remove_spool(m)
+
+    # ------------------------------------------------------------
+    # 스풀
+    # ------------------------------------------------------------
+    def _write_spool(self, msg: dict):
+        if not self.spool_dir:
+            return
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spool_dir / f"{msg['id']}.json"
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(msg, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ [Telegram Outbox] 스풀 기록 실패: {e}", flush=True)
+
+    def _remove_spool(self, msg: dict):
+        if self.spool_dir:
+            (self.spool_dir / f"{msg['id']}.json").unlink(missing_ok=True)
+
+    def _claim(self, other: Path) -> bool:
+        """다른 pid의 스풀 잠금을 잡아 보고, 주인이 종료된 상태면 True (Windows는 가져오지 않음)"""
+        if fcntl is None:
+            return False
+        try:
+            with open(other / _LOCK_NAME, "a") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(fh, fcntl.LOCK_UN)
+            return True
+        except OSError:
+            return False
+
+    def _restore_spool(self):
+        """자기 스풀 잠금을 잡고, 자기·종료된 프로세스 스풀에 남은 메시지를 대기열로 되돌립니다."""
+        if not self.spool_dir:
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is not None:
+            self._lock_fh = open(self.spool_dir / _LOCK_NAME, "a")
+            try:
+                fcntl.flock(self._lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # 같은 프로세스의 이전 대기열이 아직 잡고 있음 - 잠금 없이 진행
+                self._lock_fh.close()
+                self._lock_fh = None
+
+        files = {}
+        for d in sorted(p for p in self.token_dir.iterdir() if p.is_dir()):
+            if d != self.spool_dir and not self._claim(d):
+                continue
+            for path in d.glob("*.json"):
+                if d != self.spool_dir:
+                    # 주인 없는 스풀은 자기 스풀로 옮겨 옴 (동시에 복구하는 다른 프로세스와는 rename으로 한쪽만 성공)
+                    target = self.spool_dir / path.name
+                    try:
+                        os.replace(path, target)
+                    except OSError:
+                        continue
+                    path = target
+                files[path.name] = path
+            if d != self.spool_dir:
+                (d / _LOCK_NAME).unlink(missing_ok=True)
+                try:
+                    d.rmdir()
+                except OSError:
+                    pass
+
+        with self._cv:
+            known = {m["id"] for m in self._pending}
+            restored = []
+            for path in files.values():
+                try:
+                    msg = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                if msg["id"] not in known:
+                    # 이전 프로세스의 백오프 대기는 이어받지 않고 바로 보냄
+                    msg["retry_at"] = 0.0
+                    restored.append(msg)
+            self._pending = sorted(self._pending + restored, key=lambda m: m["id"])
+            self.stats["restored"] += len(restored)
+            self.stats["queued"] += len(restored)
+        if restored:
+            print(f"📮 [Telegram Outbox] 스풀에서 미전송 메시지 {len(restored)}건 복구", flush=True)
+
+
+_outboxes: Dict[str, TelegramOutbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(token: str) -> TelegramOutbox:
+    """봇 토큰별 공용 대기열 (같은 프로세스에서 같은 토큰은 워커 하나를 공유)"""
+    with _outboxes_lock:
+        box = _outboxes.get(token)
+        if box is None:
+            box = _outboxes[token] = TelegramOutbox(token)
+        return box
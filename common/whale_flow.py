@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Sequence
+
+from common.whale_ingest import ConnectionPool, mysql_connect
+
+# 거래소 핫월렛 주소 (소문자). WHALE_EXCHANGE_ADDRESSES_FILE(JSON: {"주소": "라벨"})로 추가/교체할 수 있습니다.
+EXCHANGE_ADDRESSES = {
+    "0x28c6c06298d514db089934071355e5743bf21d60": "Binance 14",
+    "0x21a31ee1afc51d94c2efccaa2092ad1028285549": "Binance 15",
+    "0xdfd5293d8e347dfe59e90efd55b2956a1343963d": "Binance 16",
+    "0xa9d1e08c7793af67e9d92fe308d5697fb81d3e43": "Coinbase 10",
+    "0xda9dfa130df4de4673b89022ee50ff26f6ea73cf": "Kraken 13",
+    "0x6cc5f688a315f3dc28a7781717a9a798a59fda7b": "OKX",
+}
+
+# 조회 윈도우 (라벨, 시간)
+FLOW_WINDOWS = (("1h", 1), ("24h", 24), ("7d", 168))
+
+DIRECTIONS = ("in", "out", "internal", "transfer")
+
+
+def load_exchange_addresses() -> Dict[str, str]:
+    addresses = dict(EXCHANGE_ADDRESSES)
+    path = os.getenv("WHALE_EXCHANGE_ADDRESSES_FILE")
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                addresses.update({k.lower(): v for k, v in json.load(f).items()})
+        except Exception as e:
+            print(f"⚠️ [Whale Flow] 거래소 주소 파일 로드 실패: {e}")
+    return addresses
+
+
+def classify(from_addr: Optional[str], to_addr: Optional[str], exchanges: Dict[str, str]):
+    """
+    거래 방향과 거래소 관련 여부
+    in(거래소 입금) / out(거래소 출금) / internal(거래소 간) / transfer(지갑 간, exchange_flag=0)
+    """
+    from_ex = (from_addr or "").lower() in exchanges
+    to_ex = (to_addr or "").lower() in exchanges
+    if from_ex and to_ex:
+        return "internal", 1
+    if to_ex:
+        return "in", 1
+    if from_ex:
+        return "out", 1
+    return "transfer", 0
+
+
+def hour_bucket(ts) -> str:
+    """DATETIME(문자열 또는 datetime)을 시간 단위 버킷 문자열로 내림"""
+    if isinstance(ts, datetime):
+        return ts.strftime("%Y-%m-%d %H:00:00")
+    return f"{str(ts)[:13]}:00:00"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_SCHEMA = {
+    "mysql": [
+        """CREATE TABLE IF NOT EXISTS whale_flow_hourly (
+            bucket DATETIME NOT NULL,
+            symbol VARCHAR(32) NOT NULL,
+            direction VARCHAR(8) NOT NULL,
+            exchange_flag TINYINT NOT NULL,
+            tx_count INT NOT NULL,
+            amount_usd DOUBLE NOT NULL,
+            PRIMARY KEY (bucket, symbol, direction, exchange_flag)
+        )""",
+        """CREATE TABLE IF NOT EXISTS whale_flow_state (
+            name VARCHAR(32) PRIMARY KEY,
+            last_id BIGINT NOT NULL
+        )""",
+    ],
+    "sqlite": [
+        """CREATE TABLE IF NOT EXISTS whale_flow_hourly (
+            bucket TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            exchange_flag INTEGER NOT NULL,
+            tx_count INTEGER NOT NULL,
+            amount_usd REAL NOT NULL,
+            PRIMARY KEY (bucket, symbol, direction, exchange_flag)
+        )""",
+        """CREATE TABLE IF NOT EXISTS whale_flow_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )""",
+    ],
+}
+
+_UPSERT = {
+    "mysql": ("INSERT INTO whale_flow_hourly (bucket, symbol, direction, exchange_flag, tx_count, amount_usd) "
+              "VALUES (%s, %s, %s, %s, %s, %s) "
+              "ON DUPLICATE KEY UPDATE tx_count = tx_count + VALUES(tx_count), "
+              "amount_usd = amount_usd + VALUES(amount_usd)"),
+    "sqlite": ("INSERT INTO whale_flow_hourly (bucket, symbol, direction, exchange_flag, tx_count, amount_usd) "
+               "VALUES (?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (bucket, symbol, direction, exchange_flag) DO UPDATE SET "
+               "tx_count = tx_count + excluded.tx_count, amount_usd = amount_usd + excluded.amount_usd"),
+}
+
+
+def _fetch(cur) -> list:
+    """DictCursor(pymysql)와 튜플 커서(sqlite) 결과를 모두 튜플 목록으로"""
+    return [tuple(r.values()) if isinstance(r, dict) else tuple(r) for r in cur.fetchall()]
+
+
+class WhaleFlowRollup:
+    STATE_NAME = "hourly"
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, dialect: str = "mysql",
+                 exchanges: Optional[Dict[str, str]] = None, chunk_size: int = 5000):
+        """
+        고래 거래 시간별 집계(whale_flow_hourly) 관리자
+
+        - (시간 버킷, 심볼, 방향, 거래소 여부)별 건수·금액을 누적합니다.
+        - catch_up()은 원본 whale_transactions의 id 하이워터마크(whale_flow_state) 이후 행만 읽어 반영하므로,
+          INSERT IGNORE로 걸러진 중복 거래는 두 번 세지 않습니다. 수집기는 기록 직후 이를 호출합니다.
+        - flows()/volume_windows()는 원본 스캔 대신 버킷 행만 읽어 전 심볼을 한 번의 쿼리로 집계합니다.
+        - backfill()은 집계를 비우고 원본 전체로부터 다시 만듭니다.
+        - 집계 테이블은 첫 사용 때 CREATE TABLE IF NOT EXISTS로 만들어지므로 별도 준비 없이 바로 쓸 수 있습니다.
+        """
+        if dialect not in _UPSERT:
+            raise ValueError(f"지원하지 않는 dialect: {dialect}")
+        self.dialect = dialect
+        self.pool = pool or ConnectionPool(mysql_connect, size=1, validate=lambda c: c.ping(reconnect=True))
+        self.exchanges = exchanges if exchanges is not None else load_exchange_addresses()
+        self.chunk_size = max(1, int(chunk_size))
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self.stats = {"caught_up_rows": 0, "catch_ups": 0, "queries": 0}
+
+    def _q(self, sql: str) -> str:
+        return sql.replace("%s", "?") if self.dialect == "sqlite" else sql
+
+    def ensure_schema(self):
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            for ddl in _SCHEMA[self.dialect]:
+                cur.execute(ddl)
+            conn.commit()
+        self._schema_ready = True
+
+    def _ensure_ready(self):
+        """집계/상태 테이블이 없으면 만듭니다. (프로세스당 한 번, 실패 시 다음 호출에서 재시도)"""
+        if not self._schema_ready:
+            self.ensure_schema()
+
+    # ------------------------------------------------------------
+    # 증분 반영
+    # ------------------------------------------------------------
+    def _begin(self, cur) -> int:
+        """트랜잭션을 열고 하이워터마크 행을 잠근 뒤 값을 반환 (다른 프로세스의 동시 catch_up 방지)"""
+        if self.dialect == "sqlite":
+            cur.execute("BEGIN IMMEDIATE")
+            cur.execute("INSERT OR IGNORE INTO whale_flow_state (name, last_id) VALUES (?, 0)", (self.STATE_NAME,))
+        else:
+            cur.execute("INSERT IGNORE INTO whale_flow_state (name, last_id) VALUES (%s, 0)", (self.STATE_NAME,))
+        cur.execute(self._q("SELECT last_id FROM whale_flow_state WHERE name = %s"
+                            + (" FOR UPDATE" if self.dialect == "mysql" else "")), (self.STATE_NAME,))
+        return int(_fetch(cur)[0][0])
+
+    def aggregate(self, rows: Iterable[Sequence]) -> Dict[tuple, list]:
+        """(symbol, amount_usd, from, to, timestamp) 행들을 (버킷, 심볼, 방향, 거래소 여부) → [건수, 금액]으로 묶음"""
+        agg: Dict[tuple, list] = {}
+        for symbol, amount, from_addr, to_addr, ts in rows:
+            direction, flag = classify(from_addr, to_addr, self.exchanges)
+            slot = agg.setdefault((hour_bucket(ts), symbol, direction, flag), [0, 0.0])
+            slot[0] += 1
+            slot[1] += float(amount or 0)
+        return agg
+
+    def catch_up(self, max_chunks: Optional[int] = None) -> int:
+        """하이워터마크 이후 원본 행을 chunk_size씩 집계에 반영하고 반영한 행 수를 반환합니다."""
+        self._ensure_ready()
+        total, chunks = 0, 0
+        with self._lock, self.pool.connection() as conn:
+            cur = conn.cursor()
+            while max_chunks is None or chunks < max_chunks:
+                last_id = self._begin(cur)
+                cur.execute(self._q(
+                    "SELECT id, symbol, amount_usd, from_address, to_address, timestamp "
+                    "FROM whale_transactions WHERE id > %s ORDER BY id LIMIT %s"), (last_id, self.chunk_size))
+                rows = _fetch(cur)
+                if not rows:
+                    conn.commit()
+                    break
+                agg = self.aggregate(r[1:] for r in rows)
+                cur.executemany(_UPSERT[self.dialect], [k + tuple(v) for k, v in agg.items()])
+                cur.execute(self._q("UPDATE whale_flow_state SET last_id = %s WHERE name = %s"),
+                            (rows[-1][0], self.STATE_NAME))
+                conn.commit()
+                total += len(rows)
+                chunks += 1
+                if len(rows) < self.chunk_size:
+                    break
+        if total:
+            self.stats["caught_up_rows"] += total
+            self.stats["catch_ups"] += 1
+        return total
+
+    def backfill(self, verbose: bool = True) -> int:
+        """집계와 하이워터마크를 초기화하고 원본 전체로 다시 만듭니다."""
+        self._ensure_ready()
+        with self._lock, self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM whale_flow_hourly")
+            cur.execute(self._q("DELETE FROM whale_flow_state WHERE name = %s"), (self.STATE_NAME,))
+            conn.commit()
+        started = time.time()
+        total = 0
+        while True:
+            n = self.catch_up(max_chunks=20)
+            total += n
+            if verbose and n:
+                print(f"   ... {total:,}건 반영 ({time.time() - started:.1f}s)")
+            if n < self.chunk_size * 20:
+                return total
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def flows(self, windows=FLOW_WINDOWS, now: Optional[datetime] = None,
+              symbols: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, dict]]:
+        """
+        전 심볼의 윈도우별 거래소 입금/출금/순유입/전체 고래 거래량을 한 번의 쿼리로 반환합니다.
+        Returns: {symbol: {"1h": {"inflow", "outflow", "netflow", "volume", "count"}, ...}}
+        (윈도우 경계는 시간 버킷 단위: 현재 진행 중인 버킷 + 직전 N-1개 버킷)
+        """
+        self._ensure_ready()
+        now = now or _utcnow()
+        current = datetime.strptime(hour_bucket(now), "%Y-%m-%d %H:%M:%S")
+        starts = [(label, hour_bucket(current - timedelta(hours=hours - 1))) for label, hours in windows]
+        cols, params = [], []
+        for _label, start in starts:
+            cols.append("SUM(CASE WHEN bucket >= %s AND direction = 'in' THEN amount_usd ELSE 0 END)")
+            cols.append("SUM(CASE WHEN bucket >= %s AND direction = 'out' THEN amount_usd ELSE 0 END)")
+            cols.append("SUM(CASE WHEN bucket >= %s THEN amount_usd ELSE 0 END)")
+            cols.append("SUM(CASE WHEN bucket >= %s THEN tx_count ELSE 0 END)")
+            params += [start] * 4
+        sql = f"SELECT symbol, {', '.join(cols)} FROM whale_flow_hourly WHERE bucket >= %s"
+        params.append(min(s for _, s in starts))
+        if symbols:
+            sql += f" AND symbol IN ({', '.join(['%s'] * len(symbols))})"
+            params += list(symbols)
+        sql += " GROUP BY symbol"
+
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(self._q(sql), params)
+            rows = _fetch(cur)
+        self.stats["queries"] += 1
+
+        out = {}
+        for row in rows:
+            per = {}
+            for i, (label, _start) in enumerate(starts):
+                inflow, outflow, volume, count = (float(v or 0) for v in row[1 + i * 4: 5 + i * 4])
+                per[label] = {"inflow": inflow, "outflow": outflow, "netflow": inflow - outflow,
+                              "volume": volume, "count": int(count)}
+            out[row[0]] = per
+        return out
+
+    @staticmethod
+    def _volume_cuts(hours: int, now: Optional[datetime]) -> tuple:
+        """
+        거래량 비교 구간 경계 (t0, t1, t2): 이전 구간 [t0, t1), 최근 구간 [t1, t2)
+        두 구간 모두 완료된 정시 버킷 hours개씩이라 길이가 같습니다. (진행 중인 현재 시간 버킷은 제외)
+        """
+        now = now or _utcnow()
+        t2 = datetime.strptime(hour_bucket(now), "%Y-%m-%d %H:%M:%S")
+        t1 = t2 - timedelta(hours=hours)
+        t0 = t1 - timedelta(hours=hours)
+        return tuple(t.strftime("%Y-%m-%d %H:%M:%S") for t in (t0, t1, t2))
+
+    def volume_windows(self, hours: int = 24, now: Optional[datetime] = None) -> Dict[str, tuple]:
+        """전 심볼의 (최근 hours 시간, 그 이전 hours 시간) 고래 거래량 합계 (거래량 급증 비율 계산용, 정시 버킷 기준)"""
+        self._ensure_ready()
+        t0, t1, t2 = self._volume_cuts(hours, now)
+        sql = ("SELECT symbol, SUM(CASE WHEN bucket >= %s THEN amount_usd ELSE 0 END), "
+               "SUM(CASE WHEN bucket < %s THEN amount_usd ELSE 0 END) "
+               "FROM whale_flow_hourly WHERE bucket >= %s AND bucket < %s GROUP BY symbol")
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(self._q(sql), (t1, t1, t0, t2))
+            rows = _fetch(cur)
+        self.stats["queries"] += 1
+        return {r[0]: (float(r[1] or 0), float(r[2] or 0)) for r in rows}
+
+    def raw_volume_windows(self, hours: int = 24, now: Optional[datetime] = None) -> Dict[str, tuple]:
+        """
+        volume_windows()와 같은 결과(같은 정시 경계)를 원본 whale_transactions에서 직접 집계합니다.
+        (집계 테이블을 쓸 수 없을 때의 폴백. 전 심볼을 한 번의 쿼리로 계산)
+        """
+        t0, t1, t2 = self._volume_cuts(hours, now)
+        sql = ("SELECT symbol, SUM(CASE WHEN timestamp >= %s THEN amount_usd ELSE 0 END), "
+               "SUM(CASE WHEN timestamp < %s THEN amount_usd ELSE 0 END) "
+               "FROM whale_transactions WHERE timestamp >= %s AND timestamp < %s GROUP BY symbol")
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(self._q(sql), (t1, t1, t0, t2))
+            rows = _fetch(cur)
+        self.stats["queries"] += 1
+        return {r[0]: (float(r[1] or 0), float(r[2] or 0)) for r in rows}
+
+    def report(self) -> str:
+        s = self.stats
+        return f"고래 집계 반영 {s['caught_up_rows']:,}건 ({s['catch_ups']}회), 조회 {s['queries']}회"
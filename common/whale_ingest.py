@@ -0,0 +1,394 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+
+# Moralis Stream 서명은 keccak256(body + secret) 입니다. (hashlib의 sha3_256과는 패딩이 달라 별도 구현 필요)
+try:
+    from Crypto.Hash import keccak as _keccak  # pycryptodome
+
+    def _keccak_hex(data: bytes) -> str:
+        return _keccak.new(digest_bits=256, data=data).hexdigest()
+except ImportError:
+    try:
+        from eth_hash.auto import keccak as _eth_keccak
+
+        def _keccak_hex(data: bytes) -> str:
+            return _eth_keccak(data).hex()
+    except ImportError:
+        _keccak_hex = None
+
+_warned_no_keccak = False
+
+
+def verify_moralis_signature(body: bytes, signature: Optional[str], secret: Optional[str]) -> bool:
+    """
+    Moralis Webhook 서명(x-signature) 검증
+    keccak 구현(pycryptodome 또는 eth-hash)이 없거나 시크릿이 없으면 기존처럼 헤더 존재 여부만 확인합니다.
+    """
+    global _warned_no_keccak
+    if not signature:
+        return False
+    if _keccak_hex is None or not secret:
+        if not _warned_no_keccak:
+            _warned_no_keccak = True
+            print("⚠️ [Whale Ingest] keccak 구현 또는 시크릿이 없어 서명 헤더 존재 여부만 확인합니다.", flush=True)
+        return True
+    expected = _keccak_hex(body + secret.encode("utf-8"))
+    return signature.lower().removeprefix("0x") == expected
+
+
+def parse_transfers(payload: dict) -> List[dict]:
+    """Webhook 본문의 erc20Transfers를 MoralisTracker 로그 포맷의 거래 목록으로 변환합니다. (잘못된 항목은 건너뜀)"""
+    block_ts = (payload.get("block") or {}).get("timestamp")
+    txs = []
+    for tx in payload.get("erc20Transfers", []) or []:
+        try:
+            token_decimals = int(tx.get("tokenDecimals", "6"))
+            value_raw = int(tx.get("value", "0"))
+            txs.append({
+                "symbol": tx.get("tokenSymbol", "UNKNOWN"),
+                "amount_usd": value_raw / (10 ** token_decimals),
+                "from": {"owner": tx.get("from"), "owner_type": "wallet"},  # label 정보는 스트림에 없음
+                "to": {"owner": tx.get("to"), "owner_type": "wallet"},
+                "timestamp": block_ts,
+                "transaction_hash": tx.get("transactionHash"),
+            })
+        except (TypeError, ValueError) as e:
+            print(f"  -> ⚠️ 로그 처리 중 오류: {e}", flush=True)
+    return txs
+
+
+def _db_timestamp(iso: Optional[str]) -> Optional[str]:
+    """Moralis 타임스탬프(ISO 8601)를 DB DATETIME 형식으로 변환"""
+    if not iso:
+        return None
+    ts_obj = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    return ts_obj.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ------------------------------------------------------------
+# 저장소 (DAO)
+# ------------------------------------------------------------
+class ConnectionPool:
+    def __init__(self, connect: Callable, size: int = 2, validate: Optional[Callable] = None):
+        """
+        DB 연결 풀: 연결을 미리 만들지 않고 처음 필요할 때 만들어 size개까지 재사용합니다.
+        validate(conn)이 주어지면 꺼낼 때마다 호출해 끊어진 연결을 복구합니다. (pymysql은 ping(reconnect=True))
+        """
+        self.connect = connect
+        self.size = max(1, int(size))
+        self.validate = validate
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(self.size)
+        self.stats = {"opened": 0, "reused": 0, "discarded": 0}
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+                if self.validate:
+                    self.validate(conn)
+                self.stats["reused"] += 1
+            except queue.Empty:
+                conn = self.connect()
+                self.stats["opened"] += 1
+            try:
+                yield conn
+            except Exception:
+                # 오류가 난 연결은 상태를 알 수 없으므로 버리고 다음에 새로 엽니다.
+                self.stats["discarded"] += 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                raise
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def mysql_connect():
+    """환경변수(DB_HOST 등)로 중앙 DB에 접속합니다."""
+    import pymysql
+    return pymysql.connect(
+        host=os.getenv("DB_HOST"),
+        port=int(os.getenv("DB_PORT", 3306)),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        db=os.getenv("DB_NAME"),
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor
+    )
+
+
+_SCHEMA = {
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS whale_transactions (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            symbol VARCHAR(32) NOT NULL,
+            amount_usd DOUBLE NOT NULL,
+            from_address VARCHAR(64),
+            to_address VARCHAR(64),
+            transaction_hash VARCHAR(80) NOT NULL,
+            timestamp DATETIME NOT NULL,
+            UNIQUE KEY uq_whale_tx (transaction_hash, from_address, to_address, amount_usd),
+            KEY ix_whale_symbol_ts (symbol, timestamp)
+        )""",
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS whale_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            amount_usd REAL NOT NULL,
+            from_address TEXT,
+            to_address TEXT,
+            transaction_hash TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            UNIQUE (transaction_hash, from_address, to_address, amount_usd)
+        )""",
+}
+
+_INSERT = {
+    "mysql": ("INSERT IGNORE INTO whale_transactions "
+              "(symbol, amount_usd, from_address, to_address, transaction_hash, timestamp) "
+              "VALUES (%s, %s, %s, %s, %s, %s)"),
+    "sqlite": ("INSERT OR IGNORE INTO whale_transactions "
+               "(symbol, amount_usd, from_address, to_address, transaction_hash, timestamp) "
+               "VALUES (?, ?, ?, ?, ?, ?)"),
+}
+
+
+class SqlWhaleStore:
+    def __init__(self, connect: Callable = mysql_connect, dialect: str = "mysql", pool_size: int = 2):
+        """
+        whale_transactions 테이블 DAO (MySQL 운영 / SQLite 부하 테스트 공용)
+        write_many()는 한 번의 executemany + commit으로 여러 거래를 기록합니다. (중복 거래는 IGNORE)
+        attach_rollup(WhaleFlowRollup)으로 연결하면 기록 후 시간별 집계를 별도 스레드에서 따라잡게 합니다.
+        """
+        if dialect not in _INSERT:
+            raise ValueError(f"지원하지 않는 dialect: {dialect}")
+        self.dialect = dialect
+        validate = (lambda c: c.ping(reconnect=True)) if dialect == "mysql" else None
+        self.pool = ConnectionPool(connect, size=pool_size, validate=validate)
+        self.rollup = None
+
+    def ensure_schema(self):
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(_SCHEMA[self.dialect])
+            conn.commit()
+
+    def write_many(self, txs: List[dict]) -> int:
+        rows = []
+        for tx in txs:
+            try:
+                rows.append((tx["symbol"], tx["amount_usd"], tx["from"]["owner"], tx["to"]["owner"],
+                             tx["transaction_hash"], _db_timestamp(tx["timestamp"])))
+            except (KeyError, TypeError, ValueError) as e:
+                # 한 건 때문에 묶음 전체가 재시도 루프에 갇히지 않도록 건너뜀
+                print(f"  -> ⚠️ 로그 처리 중 오류: {e}", flush=True)
+        if not rows:
+            return 0
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            cur.executemany(_INSERT[self.dialect], rows)
+            conn.commit()
+        if self.rollup is not None:
+            self._rollup_wakeup.set()
+        return len(rows)
+
+    def attach_rollup(self, rollup):
+        """
+        기록 후 시간별 집계를 따라잡을 WhaleFlowRollup을 연결합니다.
+        catch_up은 writer 스레드가 아닌 전용 스레드에서 돌기 때문에, 하이워터마크 0에서 시작하는
+        첫 따라잡기가 원본 전체를 훑는 동안에도 기록은 막히지 않습니다.
+        """
+        self.rollup = rollup
+        self._rollup_wakeup = threading.Event()
+        self._rollup_wakeup.set()  # 기동 직후 한 번 따라잡기
+        threading.Thread(target=self._rollup_loop, name="whale-rollup", daemon=True).start()
+
+    def _rollup_loop(self):
+        while True:
+            self._rollup_wakeup.wait()
+            self._rollup_wakeup.clear()
+            try:
+                self.rollup.catch_up()
+            except Exception as e:
+                # 원본은 이미 기록됐으므로 다음 기록(또는 조회) 때 따라잡습니다.
+                print(f"⚠️ [Whale Ingest] 시간별 집계 갱신 실패: {e}", flush=True)
+
+    def describe(self) -> str:
+        return f"중앙 DB (whale_transactions 테이블, {self.dialect})"
+
+
+class JsonlWhaleStore:
+    def __init__(self, path: str):
+        """MoralisTracker가 읽는 JSON Lines 로그 파일 저장소 (묶음당 파일 열기·쓰기 1회)"""
+        self.path = path
+
+    def write_many(self, txs: List[dict]) -> int:
+        if not txs:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps(tx) + "\n" for tx in txs)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+        return len(txs)
+
+    def describe(self) -> str:
+        return f"로그 파일 {self.path}"
+
+
+# ------------------------------------------------------------
+# 수집기
+# ------------------------------------------------------------
+class WhaleIngestor:
+    def __init__(self, store, batch_size: int = 500, flush_interval_sec: float = 1.0,
+                 max_queue: int = 100_000, retry_backoff_sec: float = 2.0):
+        """
+        Moralis Webhook 거래 수집기: 요청 스레드는 submit()으로 대기열에 넣고 바로 ACK 합니다.
+
+        - 전용 writer 스레드가 batch_size건이 모이거나 flush_interval_sec가 지나면 store.write_many()로 한 번에 기록합니다.
+        - 기록 실패 시 묶음을 버리지 않고 retry_backoff_sec 뒤 다시 시도합니다. (그동안 들어온 거래는 대기열에 쌓임)
+        - 대기열(max_queue)을 넘는 거래는 버리고 dropped로 셉니다. (Webhook 응답이 늦어져 Moralis가 재전송하는 것보다 낫다)
+        - shutdown()/프로세스 종료 시 남은 거래를 마지막으로 기록합니다.
+        """
+        self.store = store
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_sec = float(flush_interval_sec)
+        self.max_queue = max(1, int(max_queue))
+        self.retry_backoff_sec = float(retry_backoff_sec)
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"accepted": 0, "dropped": 0, "written": 0, "batches": 0, "write_errors": 0,
+                      "write_ms_total": 0.0, "write_ms_max": 0.0, "batch_max": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._writer_loop, name="whale-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.shutdown)
+        return self
+
+    def shutdown(self, timeout: float = 10.0):
+        """새 거래 수신은 계속 받되, writer를 멈추기 전에 남은 거래를 timeout 동안 기록합니다."""
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, txs: List[dict]) -> int:
+        """거래 목록을 대기열에 넣고 받아들인 건수를 반환합니다. (절대 블로킹하지 않음)"""
+        if self._thread is None:
+            self.start()
+        accepted = 0
+        for tx in txs:
+            try:
+                self._queue.put_nowait(tx)
+                accepted += 1
+            except queue.Full:
+                break
+        dropped = len(txs) - accepted
+        with self._lock:
+            self.stats["accepted"] += accepted
+            self.stats["dropped"] += dropped
+        if dropped:
+            print(f"⚠️ [Whale Ingest] 대기열 초과 - 거래 {dropped}건 버림", flush=True)
+        return accepted
+
+    # ------------------------------------------------------------
+    # writer
+    # ------------------------------------------------------------
+    def _collect(self, batch: List[dict]) -> None:
+        """batch가 batch_size에 차거나 첫 거래 이후 flush_interval_sec가 지날 때까지 대기열에서 꺼냅니다."""
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=0.5))
+            except queue.Empty:
+                return
+        deadline = time.monotonic() + self.flush_interval_sec
+        while len(batch) < self.batch_size:
+            remaining = 0 if self._stop.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _writer_loop(self):
+        batch: List[dict] = []
+        while True:
+            stopping = self._stop.is_set()
+            self._collect(batch)
+            if batch and not self._flush(batch):
+                if stopping:
+                    # 종료 중 기록이 계속 실패하면 더 기다리지 않음
+                    print(f"❌ [Whale Ingest] 종료 시 기록 실패로 거래 {len(batch) + self.depth()}건 유실", flush=True)
+                    return
+                self._stop.wait(self.retry_backoff_sec)
+                continue
+            batch = []
+            if stopping and self._queue.empty():
+                return
+
+    def _flush(self, batch: List[dict]) -> bool:
+        started = time.perf_counter()
+        try:
+            n = self.store.write_many(batch)
+        except Exception as e:
+            with self._lock:
+                self.stats["write_errors"] += 1
+            print(f"⚠️ [Whale Ingest] {len(batch)}건 기록 실패, 재시도 예정: {e}", flush=True)
+            return False
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.stats["written"] += n
+            self.stats["batches"] += 1
+            self.stats["write_ms_total"] += elapsed
+            self.stats["write_ms_max"] = max(self.stats["write_ms_max"], elapsed)
+            self.stats["batch_max"] = max(self.stats["batch_max"], n)
+        return True
+
+    def report(self) -> str:
+        s = self.stats
+        avg_batch = s["written"] / s["batches"] if s["batches"] else 0.0
+        avg_ms = s["write_ms_total"] / s["batches"] if s["batches"] else 0.0
+        return (f"고래 거래 수신 {s['accepted']}건 (버림 {s['dropped']}), 기록 {s['written']}건 / {s['batches']}회 "
+                f"(평균 {avg_batch:.0f}건, 최대 {s['batch_max']}건, 평균 {avg_ms:.1f}ms / 최대 {s['write_ms_max']:.1f}ms), "
+                f"기록 실패 {s['write_errors']}회, 대기 {self.depth()}건")
+
+
+def handle_webhook(ingestor: WhaleIngestor, body: bytes, signature: Optional[str], secret: Optional[str]):
+    """
+    Webhook 요청 처리 (Flask 라우트 공용): 서명 검증 → 거래 파싱 → 대기열 등록 후 즉시 응답
+    Returns: (응답 dict, HTTP 상태 코드)
+    """
+    if not verify_moralis_signature(body, signature, secret):
+        print("❌ [Webhook] 서명 검증 실패. 요청을 거부합니다.", flush=True)
+        return {"status": "invalid signature"}, 401
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return {"status": "invalid json"}, 400
+    txs = parse_transfers(payload)
+    accepted = ingestor.submit(txs) if txs else 0
+    return {"status": "ok", "accepted": accepted}, 200
@@ -13,6 +13,8 @@ from typing import Dict, List
 import requests
 from dotenv import load_dotenv
 
+from common.news_dedup import MinHashDeduper, cluster_articles
+
 load_dotenv()
 
 SERP_ENDPOINT = "https://serpapi.com/search"
@@ -59,13 +61,25 @@ def _normalize_text(text: str) -> List[str]:
     return tokens
 
 
-def _build_title_tokens(articles: List[Dict]) -> List[set]:
-    token_sets: List[set] = []
-    for art in articles:
-        title = (art.get("title_en") or art.get("title") or "").strip()
-        tokens = set(_normalize_text(title))
-        token_sets.append(tokens)
-    return token_sets
+def _title_of(art: Dict) -> str:
+    return (art.get("title_en") or art.get("title") or "").strip()
+
+
+def _source_weight(source_name: str) -> float:
+    weight = 1.0
+    for key, w in _SOURCE_WEIGHTS.items():
+        if key.lower() in source_name.lower():
+            weight = max(weight, w)
+    return weight
+
+
+def _published_ts(art: Dict) -> float:
+    """SerpAPI 날짜("10/23/2025, 07:00 AM, +0000 UTC")를 epoch로, 실패하면 0"""
+    raw = (art.get("published_at") or "").replace(" UTC", "")
+    try:
+        return datetime.strptime(raw, "%m/%d/%Y, %I:%M %p, %z").timestamp()
+    except ValueError:
+        return 0.0
 
 
 def _rank_articles_by_attention(articles: List[Dict]) -> List[Dict]:
@@ -73,12 +87,15 @@ def _rank_articles_by_attention(articles: List[Dict]) -> List[Dict]:
     - 여러 메이저 매체에서 반복 언급된 이슈일수록 점수 ↑
     - 소스가 유명할수록 점수 ↑
     - 결국 score 기준으로 내림차순 정렬
+
+    [변경] 기사 쌍마다 토큰 Jaccard를 비교하던 O(n²) 군집 계산을 MinHash/LSH 묶음으로 교체하고,
+    같은 이슈의 전재·재송고 기사는 대표 1건(주요 매체 > 최신)만 남깁니다.
+    대표 기사에는 cluster_id / cluster_size / cluster_sources 가 붙습니다.
     """
     if not articles:
         return []
 
-    token_sets = _build_title_tokens(articles)
-    n = len(articles)
+    token_sets = [set(_normalize_text(_title_of(art))) for art in articles]
 
     # 1) 토큰 빈도로 대략적인 "이슈 중심 키워드" 파악
     all_tokens: Counter = Counter()
@@ -88,43 +105,33 @@ def _rank_articles_by_attention(articles: List[Dict]) -> List[Dict]:
     # 자주 등장하는 토큰만 이슈 키워드로 간주
     issue_tokens = {tok for tok, cnt in all_tokens.items() if cnt >= 2}
 
-    scores: List[float] = []
-    for i, art in enumerate(articles):
-        title_tokens = token_sets[i]
-
-        # (1) 이슈 토큰과의 겹침 정도
-        overlap = len(title_tokens & issue_tokens)
-
-        # (2) 다른 기사들과의 유사도 기반 "군집 크기"
-        cluster_size = 1
-        for j in range(n):
-            if i == j:
-                continue
-            other = token_sets[j]
-            if not other or not title_tokens:
-                continue
-            inter = len(title_tokens & other)
-            union = len(title_tokens | other)
-            if union == 0:
-                continue
-            jaccard = inter / union
-            if jaccard >= 0.4:
-                cluster_size += 1
-
-        # (3) 소스 가중치
-        source_name = (art.get("source") or "").strip()
-        weight = 1.0
-        for key, w in _SOURCE_WEIGHTS.items():
-            if key.lower() in source_name.lower():
-                weight = max(weight, w)
-
-        score = weight * (cluster_size + overlap * 0.5)
+    # 2) 유사 기사 묶음 (제목 토큰 Jaccard 0.4 이상, 기존 기준과 동일)
+    clusters = cluster_articles(
+        articles,
+        text=_title_of,
+        shingles=lambda title: set(_normalize_text(title)),
+        rank_key=lambda art: (_source_weight(art.get("source") or ""), _published_ts(art)),
+        # 밴드당 1행: Jaccard 0.4 쌍도 사실상 모두 후보가 됨 (수십 건 입력은 exact_below로 전 쌍 직접 비교)
+        deduper=MinHashDeduper(threshold=0.4, num_perm=64, bands=64),
+    )
+
+    ranked: List[Dict] = []
+    for c in clusters:
+        art = articles[c.representative]
+        overlap = len(token_sets[c.representative] & issue_tokens)
+        # (3) 소스 가중치: 묶음 안에 메이저 매체가 하나라도 있으면 그 가중치
+        weight = max(_source_weight(articles[i].get("source") or "") for i in c.members)
+
+        score = weight * (c.size + overlap * 0.5)
         art["score"] = float(score)
-        scores.append(score)
+        art["cluster_id"] = c.cluster_id
+        art["cluster_size"] = c.size
+        art["cluster_sources"] = c.sources
+        ranked.append(art)
 
     # score 기준 내림차순 정렬, tie-breaker: 원래 순서 유지
     articles_sorted = sorted(
-        articles,
+        ranked,
         key=lambda x: x.get("score", 0.0),
         reverse=True,
     )
@@ -32,6 +32,8 @@ except ImportError:
     print("[ERROR] StrategySelector를 찾을 수 없습니다. 경로를 확인하세요.")
     sys.exit(1)
 
+from common.news_store import ORIGIN_RAW, news_store
+
 load_dotenv(PROJECT_ROOT / ".env")
 
 SERPAPI_ENDPOINT = "https://serpapi.com/search"
@@ -172,6 +174,12 @@ def append_stock_event_news(ref_date: date) -> None:
 
     print(f"✅ 이벤트 뉴스 저장 완료: {raw_path.name} ({len(articles)}건)")
 
+    try:
+        # 클렌징 전 원본이므로 출처를 raw로 기록 (kr_news_cleaner 정제본과 섞이지 않음)
+        news_store.append(articles, ref_date, origin=ORIGIN_RAW)
+    except OSError as e:
+        print(f"[WARN] 뉴스 저장소 추가 실패: {e}")
+
 def main() -> None:
     if len(sys.argv) >= 2:
         ref = datetime.fromisoformat(sys.argv[1]).date()
@@ -19,38 +19,42 @@ from typing import Dict, Any
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from common.llm_cache import llm_cache
+
 # 1. 설정 및 클라이언트 초기화
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key) if api_key else None
+client = OpenAI(api_key=api_key, timeout=float(os.getenv("OPENAI_TIMEOUT", "60"))) if api_key else None
 
 MODEL_DEFAULT = "gpt-4o-mini" # 또는 gpt-3.5-turbo
 OPENAI_MODEL = MODEL_DEFAULT
 
 
 # 2. 기본 헬퍼 함수 (_chat)
-def _chat(system: str, user: str, temperature: float = 0.4, max_tokens: int = 1600) -> str:
+def _chat(system: str, user: str, temperature: float = 0.4, max_tokens: int = 1600, use_cache: bool = True) -> str:
     """
     공통 chat.completions 래퍼.
     시스템/유저 프롬프트를 받아 모델을 호출하고 텍스트 응답을 반환합니다.
+    같은 프롬프트/파라미터의 응답은 common.llm_cache 디스크 캐시에서 재사용합니다. (use_cache=False로 우회)
     """
     if not client:
         logger.warning("OPENAI_API_KEY not found. _chat returns empty string.")
         return ""
 
     try:
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        content = llm_cache.complete(
+            client, OPENAI_MODEL,
+            [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
+            use_cache=use_cache,
             temperature=temperature,
             max_tokens=max_tokens,
         )
-        return resp.choices[0].message.content.strip()
+        return content.strip()
     except Exception as e:
         logger.error(f"[LLM Error] _chat failed: {e}")
         return ""
@@ -152,19 +156,27 @@ def generate_newsletter_bundle(payload: Dict[str, Any]) -> Dict[str, Any]:
     }}
     """
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    params = {"response_format": {"type": "json_object"}, "temperature": 0.7}
     try:
         # JSON 모드 사용 (안전한 파싱을 위해)
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7
-        )
-        content = resp.choices[0].message.content
-        return json.loads(content)
+        content = llm_cache.complete(client, OPENAI_MODEL, messages, **params)
+        try:
+            return json.loads(content)
+        except ValueError:
+            # 깨진 응답이 캐시에 남아 TTL 동안 계속 {}를 반환하지 않도록 지우고, 한 번 새로 호출
+            llm_cache.evict(OPENAI_MODEL, messages, **params)
+            logger.warning("[LLM] generate_newsletter_bundle JSON 파싱 실패 - 캐시를 지우고 재호출합니다.")
+            with llm_cache.refresh():
+                content = llm_cache.complete(client, OPENAI_MODEL, messages, **params)
+            try:
+                return json.loads(content)
+            except ValueError:
+                llm_cache.evict(OPENAI_MODEL, messages, **params)
+                raise
 
     except Exception as e:
         logger.error(f"[LLM Error] generate_newsletter_bundle failed: {e}")
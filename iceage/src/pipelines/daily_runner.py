@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+import posixpath
 import subprocess
 import sys
 import shutil
@@ -21,6 +22,8 @@ from iceage.src.utils.trading_days import (
 )
 
 from common.s3_manager import S3Manager  # <--- 이거 추가!
+from common.data_cache import LocalDataCache
+from common.llm_async import fan_out
 
 # ---- 데이터 경로 & 과거 데이터 체크용 헬퍼 ----
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # .../iceage
@@ -175,28 +178,29 @@ def main() -> None:
     (PROJECT_ROOT / "data/processed").mkdir(parents=True, exist_ok=True)
     
     full_log_path = PROJECT_ROOT / log_file_local
-    s3.download_file(log_file_s3, str(full_log_path)) # 실패해도 괜찮음
+
+    # [성능] 호스트 영구 캐시(ETag 기준)를 거쳐 받으므로, 새 워커라도 변경된 객체만 실제로 전송합니다.
+    data_cache = LocalDataCache()
+    try:
+        s3.sync_down(posixpath.dirname(log_file_s3), str(full_log_path.parent),
+                     include=[full_log_path.name], quiet=True, cache=data_cache)
+    except Exception as e:
+        print(f"⚠️ [S3 Sync] 누적 로그 다운로드 실패 (계속 진행): {e}") # 실패해도 괜찮음
 
     # 2. 괴리율 분석(volume_anomaly)을 위한 과거 시세 데이터 (최근 60일치)
     local_raw_dir = PROJECT_ROOT / "data/raw"
     local_raw_dir.mkdir(parents=True, exist_ok=True)
-    s3_raw_dir = f"s3://{s3.bucket_name}/iceage/data/raw/"
 
     # [개선] 전체 동기화 대신, 필요한 최근 60일치 파일만 특정하여 동기화
     LOOKBACK_DAYS = 60 # volume_anomaly_v2.py에서 사용하는 window_days
-    print(f"   👉 과거 {LOOKBACK_DAYS}일치 시세 데이터 동기화 (aws s3 sync --include)...")
+    print(f"   👉 과거 {LOOKBACK_DAYS}일치 시세 데이터 동기화 (S3Manager.sync_down, ETag 비교)...")
     try:
-        sync_cmd = ["aws", "s3", "sync", s3_raw_dir, str(local_raw_dir), "--exclude", "*", "--quiet"]
-        
-        # 필요한 파일 목록을 --include 옵션으로 추가
-        for i in range(LOOKBACK_DAYS + 1): # ref_date 당일 포함 ~ 60일 전
-            past_date = ref - timedelta(days=i)
-            filename = f"kr_prices_{past_date.isoformat()}.csv"
-            sync_cmd.extend(["--include", filename])
-
-        subprocess.run(sync_cmd, check=True, timeout=300) # 5분 타임아웃
+        # 필요한 파일 목록을 include 패턴으로 지정 (ref_date 당일 포함 ~ 60일 전)
+        include = [f"kr_prices_{(ref - timedelta(days=i)).isoformat()}.csv" for i in range(LOOKBACK_DAYS + 1)]
+        s3.sync_down("iceage/data/raw", str(local_raw_dir), include=include, quiet=True, cache=data_cache)
     except Exception as e:
-        print(f"⚠️ [S3 Sync] 'aws s3 sync' 실패. runner 환경에 aws-cli가 필요합니다. 에러: {e}")
+        print(f"⚠️ [S3 Sync] 과거 시세 동기화 실패. 에러: {e}")
+    data_cache.report("S3 Cache")
 
     print(f"✅ [S3 Sync] 완료")
     # ====================================================
@@ -376,26 +380,24 @@ def main() -> None:
         
     # -----------------------
     # 9) SNS 카드뉴스 이미지 생성 (인스타 카드) ★
+    # [NEW] 커뮤니티용 요약 이미지 생성
+    # [NEW] 주간/월간 리포트용 다이제스트 생성 (발행 시점에 한 번만 요약해 MD 옆에 저장)
     # -----------------------
+    # 아래 스텝들은 모두 완성된 뉴스레터 MD만 입력으로 쓰고 서로 의존하지 않으므로,
+    # 각자의 LLM 왕복 시간을 기다리며 순차 실행하지 않고 동시에 실행합니다.
+    post_steps = {"데일리 다이제스트 생성": ["python", "-m", "iceage.src.pipelines.report_digest", ref_str]}
     if run_cardnews_output:
-        run_step(
-            "SNS 카드뉴스 이미지 생성",
-            ["python", "-m", "iceage.src.pipelines.generate_cardnews_assets", ref_str],
-        )
+        post_steps["SNS 카드뉴스 이미지 생성"] = ["python", "-m", "iceage.src.pipelines.generate_cardnews_assets", ref_str]
     else:
         print("[INFO] RUN_CARDNEWS_OUTPUT!=1 이므로 카드뉴스 생성은 스킵합니다.")
-        
-    # -----------------------
-    # [NEW] 커뮤니티용 요약 이미지 생성
-    # -----------------------
     if run_summary_image_output:
-        run_step(
-            "커뮤니티용 요약 이미지 생성",
-            ["python", "-m", "iceage.src.pipelines.generate_summary_image", ref_str],
-        )
+        post_steps["커뮤니티용 요약 이미지 생성"] = ["python", "-m", "iceage.src.pipelines.generate_summary_image", ref_str]
     else:
         print("[INFO] RUN_SUMMARY_IMAGE_OUTPUT!=1 이므로 요약 이미지 생성은 스킵합니다.")
 
+    # run_step이 실패를 ERRORS에 기록하므로 여기서는 재시도/타임아웃을 두지 않습니다.
+    fan_out({name: (run_step, (name, cmd)) for name, cmd in post_steps.items()}, max_retries=0, timeout=None)
+
 # -----------------------
     # 10) TTS 오디오 생성 (쇼츠 / 데일리) -> [주석 처리: 사용 안 함]
     # -----------------------
@@ -17,8 +17,9 @@ import pandas as pd
 import re
 from pathlib import Path
 from datetime import date, datetime, timedelta
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
+import shutil
 import traceback
 
 try:
@@ -36,6 +37,9 @@ except ImportError:
     print("⚠️ [LLM Import Error] OpenAI 기능이 비활성화될 수 있습니다.")
     _chat = None
 
+from common.card_render import BackgroundBook, CardRenderPool, FontBook, DEFAULT_WORKERS
+from common.media_cache import media_cache, dir_digest
+
 # --- 설정 ---
 ASSETS_DIR = PROJECT_ROOT / "iceage" / "assets"
 FONT_DIR = ASSETS_DIR / "fonts"
@@ -43,6 +47,9 @@ TMPL_DIR = ASSETS_DIR / "templates" / "theme_04"
 OUT_DIR = PROJECT_ROOT / "iceage" / "out"
 CARDNEWS_OUT_DIR = OUT_DIR / "social" / "cardnews"
 
+# 카드 레이아웃(좌표, 색상, 문구 등)을 고치면 올려서 캐시된 카드 이미지를 무효화
+CARD_TEMPLATE_VERSION = "10.1"
+
 # 기본 폰트
 DEFAULT_FONT = "malgun.ttf"
 if sys.platform == "darwin": DEFAULT_FONT = "AppleGothic.ttf"
@@ -58,25 +65,13 @@ C_BLUE = (0, 80, 200)
 C_PURPLE = (120, 0, 120)
 C_BG_BOX = (242, 242, 247)
 
-# --- 헬퍼 함수 ---
-def _find_file_smart(directory: Path, keyword: str, extensions=['.png', '.jpg', '.jpeg', '.ttf', '.otf']):
-    if not directory.exists(): return None
-    for ext in extensions:
-        f = directory / f"{keyword}{ext}"
-        if f.exists(): return f
-    for f in directory.iterdir():
-        if f.is_file() and f.suffix.lower() in extensions:
-            if keyword.lower() in f.name.lower():
-                return f
-    return None
+# 폰트 / 배경은 프로세스(렌더링 워커)당 한 번만 로드
+_FONTS = FontBook(FONT_DIR, DEFAULT_FONT)
+_BACKGROUNDS = BackgroundBook(TMPL_DIR, fill=C_WHITE)
 
+# --- 헬퍼 함수 ---
 def _load_font(stem_name: str, size: int):
-    font_path = _find_file_smart(FONT_DIR, stem_name, ['.ttf', '.otf'])
-    try:
-        return ImageFont.truetype(str(font_path) if font_path else DEFAULT_FONT, size)
-    except IOError:
-        print(f"⚠️ 폰트 '{stem_name}' 로드 실패. 기본 폰트를 사용합니다.")
-        return ImageFont.truetype(DEFAULT_FONT, size)
+    return _FONTS.get(stem_name, size)
 
 def _draw_text_centered(draw, text, font, center_x, y, color=C_BLACK):
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -89,30 +84,37 @@ def _draw_text_right(draw, text, font, right_x, y, color=C_BLACK):
     draw.text((right_x - text_w, y), text, font=font, fill=color)
 
 def create_base_image(bg_keyword: str, width=1080, height=1080) -> Image.Image:
-    bg_path = _find_file_smart(TMPL_DIR, bg_keyword)
-    if bg_path:
-        return Image.open(bg_path).resize((width, height)).convert("RGBA")
-    else:
-        print(f"⚠️ 배경 '{bg_keyword}'을(를) 찾을 수 없어 흰색 배경을 사용합니다.")
-        return Image.new("RGBA", (width, height), C_WHITE)
-
-def load_price_history(stock_code: str, ref_date: date, days: int = 30) -> list[float]:
-    prices = []
+    return _BACKGROUNDS.get(bg_keyword, (width, height))
+
+def load_price_histories(stock_codes, ref_date: date, days: int = 30) -> dict[str, list[float]]:
+    """
+    여러 종목의 최근 days일 종가를 한 번에 읽습니다. (일자 파일당 code/close 두 컬럼만, 종목 수와 무관하게 1회)
+    반환: {code: [오래된 날 → ref_date 순 종가]}
+    """
+    codes = {str(c) for c in stock_codes if c}
+    prices: dict[str, list[float]] = {c: [] for c in codes}
+    if not codes:
+        return prices
     raw_dir = PROJECT_ROOT / "iceage" / "data" / "raw"
     for i in range(days - 1, -1, -1):
-        d = ref_date - timedelta(days=i)
-        d_str = d.isoformat()
-        price_file = raw_dir / f"kr_prices_{d_str}.csv"
-        if price_file.exists():
+        price_file = raw_dir / f"kr_prices_{(ref_date - timedelta(days=i)).isoformat()}.csv"
+        if not price_file.exists():
+            continue
+        try:
+            df = pd.read_csv(price_file, usecols=['code', 'close'], dtype={'code': str}, thousands=',')
+        except Exception:
+            continue
+        rows = df[df['code'].isin(codes)].drop_duplicates('code')
+        for code, close in zip(rows['code'], rows['close']):
             try:
-                df = pd.read_csv(price_file, dtype={'code': str}, thousands=',')
-                stock_row = df[df['code'] == stock_code]
-                if not stock_row.empty:
-                    prices.append(float(stock_row.iloc[0]['close']))
-            except Exception:
+                prices[code].append(float(close))
+            except (TypeError, ValueError):
                 continue
     return prices
 
+def load_price_history(stock_code: str, ref_date: date, days: int = 30) -> list[float]:
+    return load_price_histories([stock_code], ref_date, days).get(str(stock_code), [])
+
 def draw_sparkline(draw, prices: list[float], box: tuple[int, int, int, int], color=C_DARK_GRAY, width=5):
     if len(prices) < 2: return
     x_start, y_start, x_end, y_end = box
@@ -191,12 +193,16 @@ class MarkdownParser:
         return data
 
 class CardNewsFactory:
-    def __init__(self, ref_date: str):
+    def __init__(self, ref_date: str, output_dir: Path | None = None, sparklines: dict | None = None):
+        """
+        sparklines: {종목코드: 30일 종가} - run()이 레이더 종목 전체를 한 번에 읽어 워커에 넘겨줌 (없으면 카드마다 읽음)
+        """
         self.ref_date = ref_date
         self.ref_dt = date.fromisoformat(ref_date)
-        self.output_dir = CARDNEWS_OUT_DIR / self.ref_date
+        self.output_dir = Path(output_dir) if output_dir else CARDNEWS_OUT_DIR / self.ref_date
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.stock_code_map = _get_stock_code_map(ref_date)
+        self.sparklines = sparklines
 
         self.font_title = _load_font("Bold", 80)
         self.font_subtitle = _load_font("Bold", 45)
@@ -322,7 +328,10 @@ class CardNewsFactory:
 
         stock_code = self.stock_code_map.get(name)
         if stock_code:
-            price_history = load_price_history(stock_code, self.ref_dt, days=30) # 30일 데이터
+            if self.sparklines is not None:
+                price_history = self.sparklines.get(stock_code, [])
+            else:
+                price_history = load_price_history(stock_code, self.ref_dt, days=30) # 30일 데이터
             if price_history:
                 chart_box = (100, 750, 980, 900)
                 draw_sparkline(d, price_history, box=chart_box, color=C_MID_GRAY, width=5)
@@ -360,22 +369,67 @@ class CardNewsFactory:
 
         img.save(self.output_dir / f"card_{file_number:02d}.png")
 
-    def run(self, data: dict):
-        print(f"🎨 카드뉴스 생성 시작: {self.ref_date}")
-        num_cards = 0
+    def build_jobs(self, data: dict) -> list:
+        """카드 목록 [(카드 이름, 메서드명, args, kwargs)] - 파일 번호는 여기서 확정"""
+        jobs = [("card_01 cover", "create_cover_card", (data,), {}),
+                ("card_02 briefing", "create_ai_briefing_card", (data,), {})]
+        num_cards = 2
 
-        self.create_cover_card(data); num_cards += 1
-        self.create_ai_briefing_card(data); num_cards += 1
-        
         top_radars = data.get('radar_picks', [])[:3]
         for i, item in enumerate(top_radars):
             item['memo'] = data.get('radar_memos', {}).get(item['name'], "AI 코멘트 생성 실패")
-            self.create_radar_pick_card(item, pick_number=i + 1, file_number=num_cards + 1)
+            jobs.append((f"card_{num_cards + 1:02d} radar#{i + 1}", "create_radar_pick_card", (item,),
+                         {"pick_number": i + 1, "file_number": num_cards + 1}))
             num_cards += 1
-            
-        self.create_news_card(data.get('news', []), file_number=num_cards + 1); num_cards += 1
-        
-        print(f"✅ 카드뉴스 생성 완료 (총 {num_cards}장): {self.output_dir}")
+
+        jobs.append((f"card_{num_cards + 1:02d} news", "create_news_card", (data.get('news', []),),
+                     {"file_number": num_cards + 1}))
+        return jobs
+
+    def _card_key(self, job: tuple, sparklines: dict, assets: dict) -> str:
+        """카드 이미지 캐시 키: 템플릿 버전 + 그리기 인자 + 기준일 + 스파크라인 + 폰트/배경 파일 내용"""
+        name, method, args, kwargs = job
+        inputs = {"method": method, "args": args, "kwargs": kwargs, "ref_date": self.ref_date}
+        if method == "create_radar_pick_card":
+            code = self.stock_code_map.get(args[0].get('name'))
+            inputs["sparkline"] = [code, sparklines.get(code, [])]
+        return media_cache.make_key("card_image", CARD_TEMPLATE_VERSION, inputs, assets)
+
+    def run(self, data: dict, workers: int = DEFAULT_WORKERS):
+        """
+        전체 카드를 프로세스 풀에서 병렬로 그립니다. (CARD_RENDER_WORKERS, 1이면 순차)
+        - 레이더 종목 스파크라인은 여기서 한 번에 읽어 모든 워커에 나눠줍니다.
+        - 입력이 같은 카드는 미디어 캐시에서 바로 복사하고, 나머지만 그립니다.
+        """
+        print(f"🎨 카드뉴스 생성 시작: {self.ref_date}")
+        jobs = self.build_jobs(data)
+
+        codes = [self.stock_code_map.get(item.get('name')) for item in data.get('radar_picks', [])[:3]]
+        sparklines = load_price_histories(codes, self.ref_dt, days=30)
+
+        assets = {"fonts": dir_digest(FONT_DIR), "templates": dir_digest(TMPL_DIR), "default_font": DEFAULT_FONT}
+        pending = []
+        for job in jobs:
+            key = self._card_key(job, sparklines, assets)
+            dest = self.output_dir / f"{job[0].split()[0]}.png"
+            hit = media_cache.lookup("card_image", key, ".png")
+            if hit is not None:
+                shutil.copyfile(hit, dest)
+            else:
+                pending.append((job, key, dest))
+
+        pool = CardRenderPool(CardNewsFactory, (self.ref_date, self.output_dir, sparklines), workers=workers)
+        timings = pool.render([job for job, _, _ in pending]) if pending else {}
+        for job, key, dest in pending:
+            # 이름이 비어 있는 레이더 카드처럼 파일을 만들지 않은 작업은 캐시하지 않음
+            if dest.exists():
+                media_cache.put("card_image", key, dest, timings.get(job[0], 0.0))
+        for name, sec in timings.items():
+            print(f"   - {name}: {sec * 1000:.0f}ms")
+        render_report = pool.report() if pending else "전부 캐시 적중"
+        print(f"✅ 카드뉴스 생성 완료 (총 {len(jobs)}장): {self.output_dir} / {render_report}")
+        media_cache.report("CardNews Cache")
+        return timings
 
 if __name__ == "__main__":
     print("▶️ 아이스에이지 카드뉴스 생성 스크립트를 시작합니다...")
@@ -1,14 +1,6 @@
 # iceage/src/pipelines/generate_summary_image.py
-import os
 import sys
 from pathlib import Path
-import time
-import tempfile
-import markdown
-import requests
-import uuid
-import boto3
-from botocore.exceptions import ClientError
 # --- 경로 설정 ---
 try:
     PROJECT_ROOT = Path(__file__).resolve().parents[3]
@@ -21,6 +13,9 @@ if str(PROJECT_ROOT) not in sys.path:
 from common.env_loader import load_env
 load_env(PROJECT_ROOT)
 
+from common.md_image import LIGHT_THEME, MarkdownImageRenderer
+from common.media_cache import media_cache
+
 # --- 의존성 임포트 ---
 try:
     from iceage.src.llm.openai_driver import _chat
@@ -35,7 +30,7 @@ class SummaryImageGenerator:
         self.md_path = PROJECT_ROOT / "iceage" / "out" / f"Signalist_Daily_{self.ref_date}.md"
         self.output_dir = PROJECT_ROOT / "iceage" / "out" / "summary_images"
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.apiflash_key = os.getenv("APIFLASH_ACCESS_KEY")
+        self.renderer = MarkdownImageRenderer(LIGHT_THEME)
 
     def _summarize_with_llm(self, md_content: str) -> str:
         """LLM을 사용하여 온라인 커뮤니티 스타일의 짧은 요약본을 생성합니다."""
@@ -61,40 +56,6 @@ class SummaryImageGenerator:
             print(f"⚠️ AI 요약 중 오류 발생: {e}")
             return f"### AI 요약 중 오류 발생\n{e}"
 
-    def _wrap_in_html(self, summary_md: str) -> str:
-        """요약된 마크다운을 이미지 렌더링용 HTML로 변환합니다."""
-        body_html = markdown.markdown(summary_md, extensions=['tables', 'fenced_code'])
-        
-        html_template = f"""
-        <!DOCTYPE html>
-        <html lang="ko">
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: 'Malgun Gothic', 'Pretendard', sans-serif;
-                    background-color: #ffffff;
-                    padding: 40px;
-                    width: 720px; /* 최종 이미지 가로 800px */
-                    box-sizing: border-box;
-                }}
-                h1, h2, h3 {{ color: #111827; margin-bottom: 10px; }}
-                h1 {{ font-size: 36px; }}
-                h2 {{ font-size: 28px; border-bottom: 1px solid #eee; padding-bottom: 5px; }}
-                h3 {{ font-size: 22px; }}
-                p, li {{ font-size: 18px; line-height: 1.7; color: #374151; }}
-                strong {{ color: #000; }}
-            </style>
-        </head>
-        <body>
-            {body_html}
-            <p>&nbsp;</p>
-            <p>&nbsp;</p>
-        </body>
-        </html>
-        """
-        return html_template
-
     def run(self):
         """메인 실행 흐름"""
         print(f"🚀 '{self.service_name}' 요약 이미지 생성을 시작합니다. (기준일: {self.ref_date})")
@@ -103,75 +64,17 @@ class SummaryImageGenerator:
             print(f"❌ 원본 뉴스레터 파일을 찾을 수 없습니다: {self.md_path}")
             return
         
-        if not self.apiflash_key:
-            print("❌ APIFLASH_ACCESS_KEY 환경변수가 설정되지 않았습니다. 이미지 생성을 건너뜁니다.")
-            return
-
         md_content = self.md_path.read_text(encoding='utf-8')
         summary_md = self._summarize_with_llm(md_content)
-        summary_html = self._wrap_in_html(summary_md)
-
-        print("📸 ApiFlash API를 사용하여 요약본을 이미지로 변환 중입니다...")
-        
-        local_temp_path = None
-        s3_temp_key = None
-        bucket_name = "fincore-output-storage"
-        s3_client = boto3.client('s3')
 
+        # 외부 스크린샷 API(ApiFlash) 대신 Pillow로 바로 그림 (네트워크·브라우저 불필요)
         try:
-            # 1. 로컬에 임시 HTML 파일 생성
-            with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.html', encoding='utf-8') as temp_f:
-                temp_f.write(summary_html)
-                local_temp_path = temp_f.name
-
-            # 2. S3에 비공개로 업로드
-            unique_id = uuid.uuid4()
-            s3_temp_key = f"iceage/temp_html/{self.ref_date}_{unique_id}.html"
-            s3_client.upload_file(
-                local_temp_path, bucket_name, s3_temp_key,
-                ExtraArgs={'ContentType': 'text/html; charset=utf-8'}
-            )
-            print(f"☁️ [Upload] 임시 HTML 비공개 업로드 완료: {s3_temp_key}")
-
-            # 3. S3 객체에 대한 Pre-signed URL 생성 (유효시간 5분)
-            presigned_url = s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': bucket_name, 'Key': s3_temp_key},
-                ExpiresIn=300
-            )
-            print(f"🌍 생성된 임시 URL (pre-signed): {presigned_url[:100]}...")
-
-            # 4. API 파라미터 구성 및 호출
-            params = {
-                "access_key": self.apiflash_key,
-                "url": presigned_url,
-                "format": "png", "fresh": True, "width": 800,
-            }
-            response = requests.get("https://api.apiflash.com/v1/urltoimage", params=params, timeout=90)
-
-            # 5. 결과 처리
-            if response.status_code == 200 and response.content:
-                output_filename = f"Signalist_Summary_{self.ref_date}.png"
-                local_image_path = self.output_dir / output_filename
-                with open(local_image_path, "wb") as f:
-                    f.write(response.content)
-                print(f"✅ 로컬에 이미지 저장 완료: {local_image_path}")
-            else:
-                error_message = response.text
-                raise Exception(f"ApiFlash 오류 (Status: {response.status_code}): {error_message}")
+            local_image_path = self.renderer.save(summary_md, self.output_dir / f"Signalist_Summary_{self.ref_date}.png",
+                                                  cache=media_cache)
+            print(f"✅ 로컬에 이미지 저장 완료: {local_image_path} ({self.renderer.report()})")
+            media_cache.report("Image Cache")
         except Exception as e:
             print(f"❌ 이미지 생성 프로세스 중 오류 발생: {e}")
-        finally:
-            # 6. 임시 파일 정리
-            if s3_temp_key:
-                try:
-                    s3_client.delete_object(Bucket=bucket_name, Key=s3_temp_key)
-                    print(f"🧹 임시 S3 파일 삭제 완료: {s3_temp_key}")
-                except ClientError as e:
-                    print(f"⚠️ 임시 S3 파일 삭제 실패: {e}")
-            if local_temp_path and os.path.exists(local_temp_path):
-                os.remove(local_temp_path)
-                print(f"🧹 임시 로컬 파일 삭제 완료: {local_temp_path}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -3,16 +3,37 @@ import asyncio
 import sys
 import os
 import platform  # OS 확인용 추가
+import re
+import json
+import time
 from pathlib import Path
 import edge_tts
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from common.media_cache import media_cache
 SOCIAL_DIR = PROJECT_ROOT / "iceage" / "out" / "social"
 AUDIO_DIR = SOCIAL_DIR / "audio"
 
 # [설정] 목소리 (SunHi가 안 될 경우 InJoon으로 변경해볼 것)
 VOICE = "ko-KR-SunHiNeural" 
 
+# 문장 분할·합성 방식이 바뀌면 올려서 캐시된 음성 조각을 무효화
+TTS_VERSION = "1"
+# 동시에 합성할 문장 수 (edge-tts 서버 부하/차단 방지)
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。…])\s+|\n+")
+
+# MP3 (Layer III) 프레임 헤더 비트레이트 표 (kbps)
+_MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),      # MPEG-2 / 2.5
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
 async def _synthesize_edge_tts(text: str, out_path: Path) -> bool:
     """
     Edge TTS로 음성 생성 (Retry 로직 포함)
@@ -37,6 +58,101 @@ async def _synthesize_edge_tts(text: str, out_path: Path) -> bool:
             
     return False
 
+def _split_sentences(text: str) -> list:
+    """
+    문장 단위로 자릅니다. (같은 문장은 날짜·스크립트가 달라도 캐시된 음성을 재사용)
+    너무 짧은 조각(숫자, 기호 등)은 앞 문장에 붙여 어색한 끊김을 줄입니다.
+    """
+    sentences = []
+    for part in _SENTENCE_END.split(text):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        if sentences and len(part) < 4:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def _mp3_duration(data: bytes) -> float:
+    """MP3 재생 길이(초): 프레임 헤더를 따라가며 샘플 수를 더함 (CBR/VBR 모두, 외부 라이브러리 없이)"""
+    i, total = 0, 0.0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        i = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    while i + 4 <= len(data):
+        h = int.from_bytes(data[i:i + 4], "big")
+        version, layer = (h >> 19) & 3, (h >> 17) & 3
+        br_idx, sr_idx, padding = (h >> 12) & 0xF, (h >> 10) & 3, (h >> 9) & 1
+        if (h >> 21) != 0x7FF or version == 1 or layer != 1 or br_idx in (0, 15) or sr_idx == 3:
+            i += 1
+            continue
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[mpeg1][br_idx] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][sr_idx]
+        samples = 1152 if mpeg1 else 576
+        total += samples / sample_rate
+        i += samples // 8 * bitrate // sample_rate + padding
+    return total
+
+
+def _write_cues(sentences: list, clips: list, out_path: Path):
+    """문장별 자막 타이밍 [{text, start, end}] - 영상 단계가 세그먼트마다 자막을 입힐 때 사용"""
+    cues, t = [], 0.0
+    for sentence, data in zip(sentences, clips):
+        dur = _mp3_duration(data)
+        cues.append({"text": sentence, "start": round(t, 3), "end": round(t + dur, 3)})
+        t += dur
+    out_path.write_text(json.dumps(cues, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def _sentence_key(sentence: str) -> str:
+    return media_cache.make_key("tts_sentence", TTS_VERSION, {"text": sentence}, {"voice": VOICE})
+
+
+async def _synthesize_cached(text: str, out_path: Path) -> bool:
+    """
+    문장별 음성을 미디어 캐시에서 찾고, 없는 문장만 동시에 합성한 뒤 순서대로 이어 붙입니다.
+    (edge-tts MP3는 같은 포맷의 프레임 스트림이라 바이트 단위로 이어 붙여도 재생됩니다)
+    """
+    sentences = _split_sentences(text)
+    if not sentences:
+        print("   ❌ 오류: 변환할 텍스트가 비어있습니다.")
+        return False
+
+    keys = [_sentence_key(s) for s in sentences]
+    parts = {k: media_cache.lookup("tts_sentence", k, ".mp3") for k in keys}
+    missing = {k: s for k, s in zip(keys, sentences) if parts[k] is None}
+    print(f"   🧩 문장 {len(sentences)}개 중 캐시 적중 {len(sentences) - len(missing)}개, 합성 {len(missing)}개")
+
+    work_dir = media_cache.cache_dir / "tmp"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    sem = asyncio.Semaphore(TTS_CONCURRENCY)
+
+    async def _build(key: str, sentence: str):
+        tmp = work_dir / f"{key}.{os.getpid()}.mp3"
+        async with sem:
+            started = time.perf_counter()
+            ok = await _synthesize_edge_tts(sentence, tmp)
+            elapsed = time.perf_counter() - started
+        if ok:
+            parts[key] = media_cache.put("tts_sentence", key, tmp, elapsed)
+        tmp.unlink(missing_ok=True)
+
+    await asyncio.gather(*(_build(k, s) for k, s in missing.items()))
+    if any(parts[k] is None for k in keys):
+        return False
+
+    clips = [parts[k].read_bytes() for k in keys]
+    tmp_out = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_out, "wb") as out:
+        for data in clips:
+            out.write(data)
+    os.replace(tmp_out, out_path)
+    _write_cues(sentences, clips, out_path.with_suffix(".subs.json"))
+    return True
+
+
 async def run_async_tts(ref_date: str):
     AUDIO_DIR.mkdir(parents=True, exist_ok=True)
     
@@ -51,7 +167,7 @@ async def run_async_tts(ref_date: str):
         out_path = AUDIO_DIR / f"shorts_{ref_date}.mp3"
         print(f"🎙️ [TTS] Shorts 오디오 생성 시도: {out_path.name}")
         
-        success = await _synthesize_edge_tts(clean_text, out_path)
+        success = await _synthesize_cached(clean_text, out_path)
         if success:
             print("   ✅ 생성 성공")
         else:
@@ -66,10 +182,12 @@ async def run_async_tts(ref_date: str):
         out_path = AUDIO_DIR / f"daily_{ref_date}.mp3"
         print(f"🎙️ [TTS] Daily 오디오 생성 시도: {out_path.name}")
         
-        success = await _synthesize_edge_tts(clean_text, out_path)
+        success = await _synthesize_cached(clean_text, out_path)
         if success:
             print("   ✅ 생성 성공")
 
+    media_cache.report("TTS Cache")
+
 def generate_tts_for_date(ref_date: str):
     # Windows 환경에서 asyncio RuntimeError 방지
     if platform.system() == 'Windows':
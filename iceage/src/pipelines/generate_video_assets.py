@@ -1,21 +1,59 @@
 # iceage/src/pipelines/generate_video_assets.py
 import os
 import sys
+import json
+import shutil
+import textwrap
+import subprocess
 from pathlib import Path
 from dotenv import load_dotenv
 from moviepy.editor import (
-    AudioFileClip, ImageClip, TextClip, CompositeVideoClip, 
-    concatenate_videoclips, ColorClip, vfx
+    AudioFileClip, ImageClip, TextClip, CompositeVideoClip,
+    ColorClip, VideoClip, vfx
 )
 import math
+import numpy as np
+from PIL import Image, ImageDraw
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 load_dotenv(PROJECT_ROOT / ".env")
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from common.card_render import CardRenderPool, FontBook
+from common.media_cache import media_cache, file_digest
 
 SOCIAL_DIR = PROJECT_ROOT / "iceage" / "out" / "social"
 CARD_DIR = SOCIAL_DIR / "cardnews"
 AUDIO_DIR = SOCIAL_DIR / "audio"
 VIDEO_DIR = SOCIAL_DIR / "video"
+FONT_DIR = PROJECT_ROOT / "iceage" / "assets" / "fonts"
+
+# 장면 렌더링 방식(줌 효과, 자막, 코덱 설정 등)이 바뀌면 올려서 캐시된 세그먼트를 무효화
+VIDEO_TEMPLATE_VERSION = "3"
+FPS = 24
+ZOOM = 0.05
+# 세그먼트는 프로세스 풀에서 나눠 인코딩하므로 인코더 스레드는 1개로 고정합니다.
+# (x264 출력은 스레드 수에 따라 달라지므로, 고정해야 장비와 무관하게 같은 입력 → 같은 바이트)
+ENCODER_THREADS = 1
+VIDEO_RENDER_WORKERS = int(os.getenv("VIDEO_RENDER_WORKERS", str(os.cpu_count() or 1)))
+# 모든 세그먼트가 같은 인코딩 설정이어야 concat demuxer로 재인코딩 없이 이어 붙일 수 있습니다.
+SEGMENT_FFMPEG_PARAMS = ["-pix_fmt", "yuv420p", "-profile:v", "high", "-preset", "medium", "-crf", "20",
+                         "-g", str(FPS * 2), "-map_metadata", "-1",
+                         "-fflags", "+bitexact", "-flags:v", "+bitexact"]
+# 자막 스타일
+SUBTITLE_FONT_SIZE = 46
+SUBTITLE_WRAP = 22
+SUBTITLE_MARGIN = 70
+
+
+def _ffmpeg_exe() -> str:
+    """moviepy가 쓰는 imageio-ffmpeg 바이너리 우선, 없으면 PATH의 ffmpeg"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
 
 def _load_audio(kind: str, ref_date: str):
     """
@@ -23,19 +61,167 @@ def _load_audio(kind: str, ref_date: str):
     """
     fname = f"{kind}_{ref_date}.mp3"
     audio_path = AUDIO_DIR / fname
-    
+
     # [Safety Check] 파일 존재 및 크기 확인 (1KB 미만이면 실패로 간주)
     if not audio_path.exists() or audio_path.stat().st_size < 1000:
         print(f"[WARN] 오디오 파일이 없거나 손상되었습니다: {audio_path}")
         return None
-        
+
     try:
         return AudioFileClip(str(audio_path))
     except Exception as e:
         print(f"[ERROR] 오디오 로드 실패: {e}")
         return None
 
-def _make_video(kind: str, ref_date: str):
+def _load_cues(kind: str, ref_date: str) -> list:
+    """TTS 단계가 남긴 문장별 자막 타이밍 [{text, start, end}] (없으면 자막 없이 진행)"""
+    path = AUDIO_DIR / f"{kind}_{ref_date}.subs.json"
+    if not path.exists():
+        return []
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"[WARN] 자막 타이밍 로드 실패: {e}")
+        return []
+
+def _segment_cues(cues: list, start: float, end: float) -> list:
+    """전체 타임라인 자막 중 [start, end) 구간에 걸친 것만 세그먼트 기준 시각으로 잘라 반환"""
+    out = []
+    for cue in cues:
+        s, e = max(cue["start"], start), min(cue["end"], end)
+        if e - s >= 0.05:
+            out.append((round(s - start, 3), round(e - start, 3), cue["text"]))
+    return out
+
+
+class SegmentRenderer:
+    def __init__(self):
+        """
+        장면 세그먼트 렌더러 (워커 프로세스마다 하나, 자막 폰트는 한 번만 로드)
+
+        - 카드 한 장 = 세그먼트 하나: 줌인 효과 + 그 구간에 해당하는 자막을 입힌 무음 mp4
+        - 캔버스 크기·fps·인코딩 설정이 모두 같아서 concat demuxer로 재인코딩 없이 이어집니다.
+        """
+        self.fonts = FontBook(FONT_DIR, "malgun.ttf")
+
+    def subtitle_image(self, text: str, width: int) -> np.ndarray:
+        """반투명 박스 위 흰 글씨 자막 (RGBA 배열, 높이는 줄 수에 맞춤)"""
+        font = self.fonts.get("Bold", SUBTITLE_FONT_SIZE)
+        lines = textwrap.wrap(text, width=SUBTITLE_WRAP) or [text]
+        line_h = int(SUBTITLE_FONT_SIZE * 1.4)
+        pad = 24
+        height = line_h * len(lines) + pad * 2
+        img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        d = ImageDraw.Draw(img)
+        d.rounded_rectangle((40, 0, width - 40, height), radius=24, fill=(0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            w = d.textlength(line, font=font)
+            d.text(((width - w) / 2, pad + i * line_h), line, font=font, fill=(255, 255, 255, 255))
+        return np.array(img)
+
+    @staticmethod
+    def zoom_clip(img_path: str, duration: float) -> VideoClip:
+        """
+        줌인 효과 (Zoom-in) - 끝날 때 ZOOM만큼 확대, 가운데 기준으로 잘림
+        moviepy 1.0.3의 clip.resize는 Pillow 10에서 제거된 Image.ANTIALIAS를 써서 첫 프레임에서 실패하므로,
+        프레임마다 Pillow로 가운데 영역(box)을 원본 크기로 직접 리샘플링합니다. (확대본 전체를 만들지 않음)
+        """
+        with Image.open(img_path) as im:
+            base = im.convert("RGB")
+        w, h = base.size
+
+        def make_frame(t):
+            scale = 1 + ZOOM * (t / duration)
+            cw, ch = w / scale, h / scale
+            left, top = (w - cw) / 2, (h - ch) / 2
+            frame = base.resize((w, h), Image.Resampling.LANCZOS, box=(left, top, left + cw, top + ch))
+            return np.asarray(frame)
+
+        return VideoClip(make_frame, duration=duration)
+
+    def render_segment(self, img_path: str, duration: float, cues: list, out_path: str):
+        clip = self.zoom_clip(str(img_path), duration)
+        w, h = clip.size
+        layers = [clip]
+        for start, end, text in cues:
+            sub = ImageClip(self.subtitle_image(text, w))
+            layers.append(sub.set_start(start).set_end(end)
+                          .set_position(("center", h - sub.h - SUBTITLE_MARGIN)))
+        scene = CompositeVideoClip(layers, size=(w, h)).set_duration(duration)
+        scene.write_videofile(
+            str(out_path),
+            fps=FPS,
+            codec="libx264",
+            audio=False,
+            threads=ENCODER_THREADS,
+            ffmpeg_params=SEGMENT_FFMPEG_PARAMS,
+            logger=None,
+        )
+        scene.close()
+        clip.close()
+
+
+def render_segments(images: list, clip_duration: float, cues: list, workers: int = VIDEO_RENDER_WORKERS) -> list:
+    """
+    장면 세그먼트 경로 목록 (입력 순서대로)
+    - 미디어 캐시에 있는 세그먼트는 그대로 쓰고, 없는 것만 프로세스 풀에서 나눠 인코딩합니다.
+    """
+    segments, pending = [], []
+    work_dir = media_cache.cache_dir / "tmp"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    for i, img_path in enumerate(images):
+        seg_cues = _segment_cues(cues, i * clip_duration, (i + 1) * clip_duration)
+        key = media_cache.make_key(
+            "video_segment", VIDEO_TEMPLATE_VERSION,
+            {"image": file_digest(img_path), "cues": seg_cues},
+            {"duration": round(clip_duration, 3), "fps": FPS, "zoom": ZOOM, "codec": "libx264",
+             "threads": ENCODER_THREADS, "ffmpeg_params": SEGMENT_FFMPEG_PARAMS,
+             "subtitle": [SUBTITLE_FONT_SIZE, SUBTITLE_WRAP, SUBTITLE_MARGIN]},
+        )
+        hit = media_cache.lookup("video_segment", key, ".mp4")
+        segments.append(hit)
+        if hit is None:
+            tmp = work_dir / f"{key}.{os.getpid()}.mp4"
+            pending.append((i, key, tmp, (f"scene_{i + 1:02d}", "render_segment",
+                                          (str(img_path), clip_duration, seg_cues, str(tmp)), {})))
+
+    if pending:
+        pool = CardRenderPool(SegmentRenderer, (), workers=workers)
+        try:
+            timings = pool.render([job for *_, job in pending])
+            for i, key, tmp, job in pending:
+                segments[i] = media_cache.put("video_segment", key, tmp, timings.get(job[0], 0.0))
+        finally:
+            for _, _, tmp, _ in pending:
+                tmp.unlink(missing_ok=True)
+        print(f"[INFO] 세그먼트 {len(pending)}/{len(images)}개 인코딩: {pool.report()}")
+    return segments
+
+
+def _concat_segments(segments: list, audio_path: Path, out_path: Path):
+    """ffmpeg concat demuxer로 세그먼트를 재인코딩 없이 잇고 오디오를 입힙니다."""
+    list_path = out_path.with_name(out_path.stem + "_concat.txt")
+    list_path.write_text("".join(f"file '{p.as_posix()}'\n" for p in segments), encoding="utf-8")
+    cmd = [
+        _ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+        "-i", str(audio_path),
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "copy", "-c:a", "aac", "-b:a", "128k",
+        # 인코더 버전 문자열·생성 시각 등을 빼서 같은 입력이면 같은 바이트가 나오도록
+        "-map_metadata", "-1", "-fflags", "+bitexact", "-flags:a", "+bitexact",
+        "-movflags", "+faststart",
+        str(out_path),
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg concat 실패: {e.stderr.strip()[-500:]}") from e
+    finally:
+        list_path.unlink(missing_ok=True)
+
+
+def _make_video(kind: str, ref_date: str, workers: int = VIDEO_RENDER_WORKERS):
     """
     카드뉴스 이미지 + TTS 오디오 -> 영상 합성
     """
@@ -57,43 +243,33 @@ def _make_video(kind: str, ref_date: str):
         return
 
     print(f"[INFO] 영상 생성 시작 ({kind}): {ref_date}")
-    
+
     # 3. 컷당 지속 시간 계산
     total_duration = audio_clip.duration
     # 앞뒤 여유 1초씩 둠
-    total_duration += 2.0 
-    
+    total_duration += 2.0
+
     clip_duration = total_duration / len(images)
-    
-    # 4. 클립 생성
-    clips = []
-    for img_path in images:
-        clip = ImageClip(str(img_path)).set_duration(clip_duration)
-        # 줌인 효과 (Zoom-in) - 10% 확대
-        clip = clip.resize(lambda t: 1 + 0.05 * (t / clip_duration)) 
-        clips.append(clip)
-        
-    video = concatenate_videoclips(clips, method="compose")
-    video = video.set_audio(audio_clip)
-    
-    # 5. 내보내기
+    audio_clip.close()
+
+    # 4. 장면별 세그먼트 (캐시에 없는 것만 프로세스 풀에서 병렬 인코딩, 자막은 세그먼트마다 입힘)
+    segments = render_segments(images, clip_duration, _load_cues(kind, ref_date), workers=workers)
+
+    # 5. 세그먼트 이어 붙이기 (영상은 스트림 복사, 나레이션은 전체 타임라인에 한 번만 AAC 인코딩)
     VIDEO_DIR.mkdir(parents=True, exist_ok=True)
     out_path = VIDEO_DIR / f"{kind}_{ref_date}.mp4"
-    
-    # 유튜브 쇼츠 포맷 (1080x1920)
-    video.write_videofile(
-        str(out_path),
-        fps=24,
-        codec="libx264",
-        audio_codec="aac",
-        threads=4,
-        logger=None # 지저분한 로그 숨기기
+    audio_path = AUDIO_DIR / f"{kind}_{ref_date}.mp3"
+    key = media_cache.make_key(
+        "video", VIDEO_TEMPLATE_VERSION,
+        {"segments": [p.stem for p in segments], "audio": file_digest(audio_path)},
     )
+    media_cache.fetch_or_build("video", key, out_path, lambda tmp: _concat_segments(segments, audio_path, tmp))
     print(f"✅ 영상 생성 완료: {out_path}")
 
 def generate_videos_for_date(ref_date: str):
     # 쇼츠 영상만 생성 (데일리는 필요시 추가)
     _make_video("shorts", ref_date)
+    media_cache.report("Video Cache")
 
 def main():
     if len(sys.argv) > 1:
@@ -101,8 +277,8 @@ def main():
     else:
         import datetime
         ref_date = datetime.date.today().isoformat()
-        
+
     generate_videos_for_date(ref_date)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
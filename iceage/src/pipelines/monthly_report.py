@@ -20,6 +20,8 @@ except ImportError:
 
 from moneybag.src.pipelines.send_email import EmailSender
 from moneybag.src.utils.slack_notifier import SlackNotifier
+from iceage.src.pipelines.report_digest import build_digest, load_digest, compact_digests
+from common.llm_async import fan_out
 
 class MonthlyReport:
     def __init__(self):
@@ -61,14 +63,23 @@ class MonthlyReport:
             print("❌ 요약할 주간 리포트가 없습니다. 월간 리포트 생성을 중단합니다.")
             return None
 
-        full_summary = ""
-        for i, f_path in enumerate(weekly_files, 1):
-            full_summary += f"\n\n--- [ {last_month}월 {i}주차 리포트 내용 ] ---\n"
-            with open(f_path, 'r', encoding='utf-8') as f:
-                full_summary += f.read()
+        # [map] 주간 리포트 원문 대신 주간 다이제스트 사용 (주간 리포트 생성 시 만들어 둔 것을 재사용)
+        labels = [(f"{last_month}월 {i}주차", f_path) for i, f_path in enumerate(weekly_files, 1)]
+        digests = {label: load_digest(f_path) for label, f_path in labels}
+        missing = {label: (build_digest, (f_path, label, "주간")) for label, f_path in labels if not digests[label]}
+        for label, result in fan_out(missing).items():
+            if isinstance(result, Exception):
+                print(f"⚠️ [Digest] {label} 요약 실패 (제외): {result}")
+            else:
+                digests[label] = result
+        ordered = [digests[label] for label, _ in labels if digests.get(label)]
+        if not ordered:
+            print("❌ 사용할 수 있는 주간 다이제스트가 없습니다. 월간 리포트 생성을 중단합니다.")
+            return None
+        full_summary = compact_digests(ordered)
 
-        # 3. LLM을 이용해 월간 리포트 초안 생성
-        print("🧠 LLM이 월간 리포트를 작성 중입니다...")
+        # 3. [reduce] LLM을 이용해 월간 리포트 초안 생성
+        print(f"🧠 LLM이 월간 리포트를 작성 중입니다... (주간 다이제스트 {len(ordered)}건, {len(full_summary):,}자)")
         system_prompt = f"""
         당신은 "{self.service_name}"의 최고 투자 전략가(Chief Investment Officer)입니다. 지난 한 달간 발행된 주간 리포트들을 바탕으로, 거시적인 관점의 월간 투자 전략 리포트를 작성하는 임무를 받았습니다. 단순 요약을 넘어, 한 달간의 시장 동향을 종합하고 다음 달을 위한 장기적인 투자 방향을 제시해야 합니다.
 
@@ -103,7 +114,7 @@ class MonthlyReport:
         (주)비제이유앤아이 | <a href="https://www.fincore.trade/privacy" style="color: #555555;">개인정보 처리방침</a>
         </div>
         """
-        user_prompt = f"아래는 지난 한 달간의 주간 리포트 모음입니다. 이 내용을 바탕으로 월간 리포트를 작성해주세요.\n\n{full_summary}"
+        user_prompt = f"아래는 지난 한 달간의 주간 리포트 다이제스트(JSON, 주차별 한 줄)입니다. 이 내용을 바탕으로 월간 리포트를 작성해주세요.\n\n{full_summary}"
         report_content = _chat(system_prompt, user_prompt)
 
         # 4. 파일로 저장
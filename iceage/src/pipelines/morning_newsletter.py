@@ -97,6 +97,7 @@ from iceage.src.utils.trading_days import (
     may_run_today,
 )
 from common.s3_manager import S3Manager
+from common.news_store import ORIGIN_RAW, news_store
 
 
 # LLM 캐시
@@ -617,24 +618,37 @@ def _extract_keyword_from_title(title: str, stock_name: str) -> str:
     # 6. 가장 긴 단어 선택
     return max(cleaned_words, key=len)
 
-def _get_internal_events(ref_date: str) -> dict[str, str]:
+def _iter_stock_event_news(ref_date: str):
+    """
+    ref_date 종목 이벤트 뉴스 원본(수집기 출력): 뉴스 저장소 kind 인덱스 우선,
+    저장소 도입 전 날짜이거나 파티션에 원본 행이 없으면(저장소 추가 실패 등) raw 파일 폴백
+    """
+    ref = _date.fromisoformat(ref_date)
+    if news_store.has_range(ref):
+        items = news_store.by_kind("stock_event", ref, origin=ORIGIN_RAW)
+        if items:
+            yield from items
+            return
+
     news_path = PROJECT_ROOT / "iceage" / "data" / "raw" / f"kr_stock_event_news_{ref_date}.jsonl"
-    event_map = {}
-    if not news_path.exists(): return {}
-    
+    if not news_path.exists(): return
     with news_path.open(encoding="utf-8") as f:
         for line in f:
             try:
-                item = json.loads(line)
-                name = item.get("stock_name")
-                title = item.get("title")
-                if name and title:
-                    if name not in event_map:
-                        keyword = _extract_keyword_from_title(title, name)
-                        if keyword and keyword != "-":
-                            event_map[name] = keyword
+                yield json.loads(line)
             # [개선] 무분별한 예외 처리를 방지하고, JSON 파싱 오류만 대상으로 지정
             except json.JSONDecodeError: continue
+
+def _get_internal_events(ref_date: str) -> dict[str, str]:
+    event_map = {}
+    for item in _iter_stock_event_news(ref_date):
+        name = item.get("stock_name") or item.get("name")
+        title = item.get("title")
+        if name and title:
+            if name not in event_map:
+                keyword = _extract_keyword_from_title(title, name)
+                if keyword and keyword != "-":
+                    event_map[name] = keyword
     return event_map
 
 def section_market_thermometer(ref_date: str) -> str:
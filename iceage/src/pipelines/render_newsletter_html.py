@@ -16,6 +16,8 @@ from dotenv import load_dotenv
 
 import markdown
 
+from common.newsletter_render import render_cached
+
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # C:\project\iceage
 OUT_DIR = PROJECT_ROOT / "out"  # 🔧 여기서 iceage 한 번만
@@ -23,6 +25,9 @@ OUT_DIR = PROJECT_ROOT / "out"  # 🔧 여기서 iceage 한 번만
 # 실제 .env 는 C:\project\.env 에 있으므로 parent 기준으로 로드
 load_dotenv(PROJECT_ROOT.parent / ".env")
 
+# 아래 HTML 템플릿/푸터 정리 규칙을 바꾸면 올려서 렌더링 캐시를 무효화합니다.
+TEMPLATE_VERSION = "1"
+
 def _get_newsletter_env_suffix() -> str:
     env = os.getenv("NEWSLETTER_ENV", "prod").strip().lower()
     if env in ("", "prod"):
@@ -32,6 +37,11 @@ def _get_newsletter_env_suffix() -> str:
 
 
 def render_markdown_to_html(ref_date: str) -> Path:
+    """
+    MD -> 이메일 HTML 렌더링 결과를 out/ 에 저장하고 경로를 반환합니다.
+    common.newsletter_render 캐시를 거치므로 같은 MD 내용이면 다시 렌더링하지 않습니다.
+    (이메일 / 웹 아카이브 / 잠금해제 발송이 모두 이 파일 하나를 사용)
+    """
     suffix = _get_newsletter_env_suffix()
 
     # [수정] 변수명에 하이픈(-) 사용 불가 -> 언더바(_)로 변경
@@ -41,7 +51,20 @@ def render_markdown_to_html(ref_date: str) -> Path:
         raise FileNotFoundError(f"Markdown 파일을 찾을 수 없습니다: {md_path}")
 
     md_text = md_path.read_text(encoding="utf-8")
+    html = render_cached(
+        "signalist", ref_date, f"email{suffix}", md_text,
+        lambda text: build_email_html(text, ref_date), template_version=TEMPLATE_VERSION,
+    )
+
+    html_path = OUT_DIR / f"Signalist_Daily_{ref_date}{suffix}.html"
+    # 내용이 같으면 파일을 다시 쓰지 않음 (mtime 유지 -> S3 sync 시 재업로드 방지)
+    if not html_path.exists() or html_path.read_text(encoding="utf-8") != html:
+        html_path.write_text(html, encoding="utf-8")
+    return html_path
+
 
+def build_email_html(md_text: str, ref_date: str) -> str:
+    """마크다운 원문 -> 완성된 이메일 HTML (푸터 정리 + 템플릿 래핑). 캐시 없이 매번 렌더링합니다."""
     # [수정] 마크다운 본문에 포함될 수 있는 낡은 푸터 텍스트를 강제로 제거합니다.
     # 이렇게 하면 어떤 버전의 MD 파일이든 푸터가 중복되지 않습니다.
     old_footer_patterns = [
@@ -232,10 +255,7 @@ def render_markdown_to_html(ref_date: str) -> Path:
 
 
 """
-
-    html_path = OUT_DIR / f"Signalist_Daily_{ref_date}{suffix}.html"
-    html_path.write_text(html_template, encoding="utf-8")
-    return html_path
+    return html_template
 
 
 def main() -> None:
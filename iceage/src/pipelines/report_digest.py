@@ -0,0 +1,172 @@
+# iceage/src/pipelines/report_digest.py
+# -*- coding: utf-8 -*-
+"""
+리포트 다이제스트 (주간/월간 리포트용 map 단계)
+
+데일리(또는 주간) 리포트 MD를 한 번만 요약하여 리포트 옆에 구조화된 JSON으로 저장합니다.
+    Signalist_Daily_2025-11-07.md  ->  Signalist_Daily_2025-11-07.digest.json
+
+주간 리포트는 데일리 원문 대신 이 다이제스트들만 모아 짧은 LLM 호출 1회로 작성하고,
+월간 리포트는 주간 리포트 다이제스트들을 모아 작성합니다. (map-reduce)
+
+사용법:
+    python -m iceage.src.pipelines.report_digest 2025-11-07
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import datetime as dt
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from common.env_loader import load_env
+load_env(PROJECT_ROOT)
+
+try:
+    from iceage.src.llm.openai_driver import _chat, _strip_json_fence
+except ImportError:
+    print("⚠️ [LLM Import Error] OpenAI 기능이 비활성화될 수 있습니다.")
+    _chat = None
+
+OUT_DIR = PROJECT_ROOT / "iceage" / "out"
+
+# 다이제스트 스키마/프롬프트를 바꾸면 올려서 기존 다이제스트를 다시 만듭니다.
+DIGEST_VERSION = 1
+DIGEST_SUFFIX = ".digest.json"
+
+# LLM에 넘기는 원문 길이 상한 (다이제스트는 리포트당 한 번만 만들지만 토큰 폭주 방지)
+MAX_SOURCE_CHARS = int(os.getenv("DIGEST_MAX_SOURCE_CHARS", "12000"))
+
+_SYSTEM_PROMPT = (
+    "너는 증권 리서치 편집자다. 주어진 리포트를 이후 주간/월간 리포트 작성에 재사용할 "
+    "구조화된 다이제스트(JSON)로 압축한다. 수치와 종목명은 원문 그대로 유지하고, 추측은 하지 않는다."
+)
+
+_USER_TEMPLATE = """아래 {kind} 리포트({label})를 다음 JSON 형식으로만 요약해줘. 각 항목은 짧게.
+{{
+  "headline": "리포트 제목/핵심 한 줄",
+  "market_summary": "지수/수급/분위기 요약 (2~3문장)",
+  "themes": ["핵심 테마 (최대 3개)"],
+  "key_stocks": [{{"name": "종목명", "note": "한 줄 메모"}}],
+  "strategy": "리포트가 제시한 결론/전략 (1~2문장)",
+  "risks": ["리스크 요인 (최대 3개)"]
+}}
+
+---
+{body}
+"""
+
+
+def digest_path(md_path) -> Path:
+    md_path = Path(md_path)
+    return md_path.with_name(md_path.stem + DIGEST_SUFFIX)
+
+
+def _source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _extract_headline(md_text: str) -> str:
+    for line in md_text.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return ""
+
+
+def _fallback_digest(md_text: str) -> dict:
+    """LLM을 쓸 수 없을 때: 제목과 섹션 제목/첫 문단만 잘라 담은 축약본"""
+    sections = re.findall(r"^##\s+(.+)$", md_text, re.MULTILINE)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", md_text) if p.strip() and not p.lstrip().startswith(("#", "|"))]
+    return {
+        "headline": _extract_headline(md_text),
+        "market_summary": " ".join(paragraphs[:2])[:600],
+        "themes": sections[:3],
+        "key_stocks": [],
+        "strategy": "",
+        "risks": [],
+    }
+
+
+def load_digest(md_path):
+    """리포트 옆에 저장된 최신 다이제스트를 반환합니다. (원문이 바뀌었거나 버전이 다르면 None)"""
+    md_path = Path(md_path)
+    path = digest_path(md_path)
+    try:
+        digest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if digest.get("version") != DIGEST_VERSION or not digest.get("complete"):
+        return None
+    if md_path.exists() and digest.get("source_sha256") != _source_hash(md_path.read_text(encoding="utf-8")):
+        return None
+    return digest
+
+
+def build_digest(md_path, label: str, kind: str = "데일리") -> dict:
+    """
+    리포트 MD의 다이제스트를 만들어 저장합니다. (map 단계, 리포트당 한 번)
+    이미 같은 원문으로 만든 다이제스트가 있으면 LLM을 호출하지 않고 그대로 반환합니다.
+    """
+    md_path = Path(md_path)
+    cached = load_digest(md_path)
+    if cached:
+        return cached
+
+    md_text = md_path.read_text(encoding="utf-8")
+    body, complete = None, False
+    if _chat:
+        raw = _chat(_SYSTEM_PROMPT, _USER_TEMPLATE.format(kind=kind, label=label, body=md_text[:MAX_SOURCE_CHARS]),
+                    temperature=0.2, max_tokens=900)
+        try:
+            body = json.loads(_strip_json_fence(raw))
+            complete = isinstance(body, dict)
+        except ValueError:
+            print(f"⚠️ [Digest] LLM 응답 파싱 실패, 축약본으로 대체: {md_path.name}")
+    if not complete:
+        body = _fallback_digest(md_text)
+
+    digest = {
+        "version": DIGEST_VERSION,
+        "label": label,
+        "kind": kind,
+        "source": md_path.name,
+        "source_sha256": _source_hash(md_text),
+        # complete=False인 축약본은 다음 실행에서 LLM으로 다시 만듭니다.
+        "complete": complete,
+        **{k: body.get(k) for k in ("headline", "market_summary", "themes", "key_stocks", "strategy", "risks")},
+    }
+    if not digest["headline"]:
+        digest["headline"] = _extract_headline(md_text)
+
+    path = digest_path(md_path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(digest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    print(f"🧾 [Digest] {'생성' if complete else '축약본 생성'}: {path.name}")
+    return digest
+
+
+def compact_digests(digests) -> str:
+    """reduce 단계 입력: 다이제스트 목록을 프롬프트용 짧은 JSON 텍스트로 만듭니다. (메타 필드 제외)"""
+    keep = ("label", "headline", "market_summary", "themes", "key_stocks", "strategy", "risks")
+    return "\n".join(json.dumps({k: d.get(k) for k in keep}, ensure_ascii=False) for d in digests)
+
+
+def main() -> None:
+    ref_date = sys.argv[1] if len(sys.argv) > 1 else dt.date.today().isoformat()
+    env = os.getenv("NEWSLETTER_ENV", "prod").strip().lower()
+    suffix = "" if env in ("", "prod") else f"-{env}"
+    md_path = OUT_DIR / f"Signalist_Daily_{ref_date}{suffix}.md"
+    if not md_path.exists():
+        print(f"❌ 다이제스트를 만들 뉴스레터가 없습니다: {md_path}")
+        sys.exit(1)
+    build_digest(md_path, label=ref_date)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,9 @@ import html as html_lib
 import os
 import sys
 import datetime as dt
-import math
 from pathlib import Path
-from sendgrid import SendGridAPIClient
-# 👇 [수정] Personalization 및 Substitution 모듈 추가
-from sendgrid.helpers.mail import Mail, To, Personalization, Substitution
-from itsdangerous import URLSafeTimedSerializer
 from iceage.src.pipelines.render_newsletter_html import render_markdown_to_html
+from common.email_dispatcher import SendGridDispatcher, iter_db_subscribers
 
 from dotenv import load_dotenv
 
@@ -50,34 +46,23 @@ def load_sns_report_txt(ref_date: str) -> str:
     with open(file_path, "r", encoding="utf-8") as f:
         return f.read()
 
-def get_subscribers(env: str, test_recipient: str, is_auto_send: bool) -> list[str]:
+def get_subscribers(env: str, test_recipient: str, is_auto_send: bool):
+    """발송 대상 이터레이터를 반환합니다. (운영 발송 시 DB에서 스트리밍)"""
     if not is_auto_send or env == 'dev':
         print(f"⚠️ [Mode: {env}] 테스트 수신자에게만 발송합니다.")
         return [test_recipient] if test_recipient else []
 
     # DB에서 실제 구독자 조회
-    try:
-        import pymysql
-        conn = pymysql.connect(
-            host=os.getenv("DB_HOST"), port=int(os.getenv("DB_PORT", 3306)),
-            user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
-            db=os.getenv("DB_NAME"), charset='utf8mb4', cursorclass=pymysql.cursors.SSDictCursor
-        )
-        with conn.cursor() as cursor:
-            # 시그널리스트 구독자(is_signalist=1)만 조회
-            cursor.execute("SELECT email FROM subscribers WHERE is_signalist=1 AND is_active=1")
-            # [성능 개선] SSDictCursor와 함께 사용하여, 모든 결과를 메모리에 올리지 않고 스트리밍
-            emails = [row['email'] for row in cursor]
-            print(f"✅ [DB Load] 시그널리스트 구독자 {len(emails)}명 조회 성공")
-            return emails
-    except Exception as e:
-        print(f"⚠️ [DB Error] 구독자 조회 실패: {e}")
-        return [os.getenv("ADMIN_EMAIL")] if os.getenv("ADMIN_EMAIL") else []
+    # [성능 개선] 구독자를 페이지 단위로 읽어 배치 빌더에 바로 연결 (전체 목록을 메모리에 올리지 않고, 발송 중 결과셋을 열어두지 않음)
+    fallback = [os.getenv("ADMIN_EMAIL")] if os.getenv("ADMIN_EMAIL") else []
+    # 시그널리스트 구독자(is_signalist=1)만 조회
+    return iter_db_subscribers("SELECT email FROM subscribers WHERE is_signalist=1 AND is_active=1", fallback=fallback)
 
 def _extract_headline_from_html(html_content: str) -> str:
     """HTML 콘텐츠에서 제목을 추출합니다."""
     # [수정] 1. <h1> 바로 뒤에 오는 이탤릭체 부제(kicker)를 최우선으로 찾습니다.
-    em_match = re.search(r'</h1>\s*<p><em>(.*?)</em></p>', html_content, re.DOTALL | re.IGNORECASE)
+    # (렌더링 캐시가 CSS를 인라인하므로 태그에 style 속성이 붙어 있을 수 있음)
+    em_match = re.search(r'</h1>\s*<p[^>]*><em[^>]*>(.*?)</em></p>', html_content, re.DOTALL | re.IGNORECASE)
     if em_match:
         kicker = em_match.group(1).strip()
         if kicker:
@@ -101,73 +86,27 @@ def _extract_headline_from_html(html_content: str) -> str:
     
     return "새로운 리포트"
 
-def send_email_with_sendgrid(to_emails: list[str], subject: str, html_body: str, from_email: str) -> bool:
+def send_email_with_sendgrid(to_emails, subject: str, html_body: str, from_email: str, run_id: str = None) -> bool:
     """
     [핵심 수정] SendGrid Personalization을 사용하여 개별 발송 효과 (BCC X, Loop X)
+    - to_emails: 리스트 또는 이터레이터 (common.email_dispatcher가 1,000명 단위 배치로 동시 발송)
+    - run_id: 중복 발송 방지 저널의 캠페인 구분자 (기본값: EMAIL_RUN_ID 환경변수 또는 오늘 날짜)
+      같은 run_id + 제목으로 다시 실행하면 이미 보낸 배치는 건너뜁니다.
     """
     api_key = os.getenv("SENDGRID_API_KEY")
     if not api_key or not api_key.strip().startswith("SG."):
         print("❌ SendGrid API Key가 잘못되었습니다.")
         return False
-    
-    api_key = api_key.strip()
-    sg = SendGridAPIClient(api_key)
-
-    # [추가] 구독 취소 토큰 생성을 위한 Serializer
-    secret_key = os.getenv('SECRET_KEY', 'a-very-secret-key-that-is-secure')
-    serializer = URLSafeTimedSerializer(secret_key)
 
-    # Batch Process (1000명 제한 고려)
-    batch_size = 1000
-    total_batches = math.ceil(len(to_emails) / batch_size)
-    all_success = True
+    run_id = run_id or os.getenv("EMAIL_RUN_ID") or dt.datetime.now().strftime("%Y-%m-%d")
 
-    print(f"📧 총 {len(to_emails)}명에게 발송 (API Personalization)")
-
-    for i in range(total_batches):
-        batch = to_emails[i * batch_size : (i + 1) * batch_size]
-        
-        # 1. 메시지 생성
-        message = Mail(
-            from_email=from_email,
-            subject=subject,
-            html_content=html_body
-        )
-
-        # 2. 개인화 추가 (각자에게 'To'가 찍힘)
-        for email in batch:
-            p = Personalization()
-            p.add_to(To(email))
-
-            # [추가] 각 이메일별 개인화된 구독 취소 링크 생성
-            try:
-                unsubscribe_token = serializer.dumps(email, salt='email-unsubscribe')
-                # [수정] 로컬 테스트를 위해 WEB_BASE_URL 환경변수 사용
-                web_base_url = os.getenv("WEB_BASE_URL", "https://www.fincore.trade")
-                # 서비스명을 'signalist'로 지정
-                unsubscribe_url = f"{web_base_url}/unsubscribe/signalist/{unsubscribe_token}"
-                
-                p.add_substitution(Substitution("-email-", email))
-                p.add_substitution(Substitution("-unsubscribe_url-", unsubscribe_url))
-            except Exception as e:
-                print(f"⚠️ 토큰 생성 실패: {email}, {e}")
-
-            message.add_personalization(p)
-
-        # 3. 전송
-        try:
-            response = sg.send(message)
-            if 200 <= response.status_code < 300:
-                print(f"✅ [Batch {i+1}] 전송 성공")
-            else:
-                print(f"❌ [Batch {i+1}] 전송 실패: {response.status_code}")
-                print(f"   -> SendGrid Body: {response.body}")
-                all_success = False
-        except Exception as e:
-            print(f"❌ [Batch {i+1}] 예외 발생: {e}")
-            all_success = False
-            
-    return all_success
+    # 서비스명을 'signalist'로 지정 (구독 취소 링크 경로)
+    dispatcher = SendGridDispatcher(
+        api_key=api_key, from_email=from_email, service_name="signalist",
+        campaign_id=f"signalist:{run_id}:{subject}",
+    )
+    result = dispatcher.send(to_emails, subject, html_body)
+    return result["failed"] == 0 and result["uncertain"] == 0
 
 if __name__ == '__main__':
     # [단순화] 로컬 테스트를 위해 복잡한 날짜 계산 대신, 가장 최근 파일을 찾거나 인자를 사용합니다.
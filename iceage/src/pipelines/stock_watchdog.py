@@ -8,7 +8,6 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import deque
 from zoneinfo import ZoneInfo
 from typing import Optional, Tuple, List, Dict, Set
 
@@ -44,6 +43,13 @@ COOLDOWN_MIN = 20
 OPEN_BRIEF_TIME = "09:05"
 CLOSE_BRIEF_TIME = "16:05"
 BRIEF_USE_LLM = True
+
+# 감시 루프 주기 / 알림 파이프라인 지표 출력 간격(초)
+STATS_EVERY_SEC = 600
+
+# 뉴스 캐시: TTL(초)과 미리 받아둘 헤드라인 수 (알림/브리핑은 메모리에서 바로 읽음)
+NEWS_TTL_SEC = 180
+NEWS_ITEMS = 5
 # ---------------------------------------------------------------------
 
 
@@ -116,6 +122,36 @@ except Exception as e:
     print(f"⚠️ [LLM Import] {e}", flush=True)
     _chat = None
 
+from common.price_ring import PriceRingBuffer
+from common.alert_pipeline import AlertPipeline, CadenceMonitor
+from common.news_cache import news_cache
+from common.telegram_outbox import get_outbox
+
+
+def _extract_naver_snippet(html: str) -> str:
+    """네이버 기사 본문의 첫 두 문단을 요약으로 사용하고 길이 제한"""
+    content_div = BeautifulSoup(html, "html.parser").find("div", id="newsct_article")
+    if not content_div:
+        return ""
+    snippet = " ".join(p.get_text(strip=True) for p in content_div.find_all("p")[:2])
+    return snippet[:150] + "..." if len(snippet) > 150 else snippet
+
+
+def _fetch_naver_mainnews(limit: int = NEWS_ITEMS) -> List[dict]:
+    """네이버 주요 뉴스 목록 + 기사별 요약 (기사는 동시에, 같은 URL은 한 번만 받음)"""
+    r_list = news_cache.fetch_url("https://m.stock.naver.com/news/mainnews", timeout=10)
+    r_list.raise_for_status()
+    soup_list = BeautifulSoup(r_list.text, "html.parser")
+    anchors = soup_list.select("a.NewsList_item__lO7iA")[:limit]
+
+    def _item(a):
+        href = a.get("href", "")
+        url = (href if href.startswith("http") else "https://m.stock.naver.com" + href) if href else ""
+        summary = news_cache.snippet(url, _extract_naver_snippet) if url else ""
+        return {"title": a.get_text(strip=True), "link": url, "summary": summary}
+
+    return [it for it in news_cache.map(_item, anchors) if isinstance(it, dict)]
+
 
 @dataclass
 class TelegramClient:
@@ -126,14 +162,8 @@ class TelegramClient:
         if not self.token or not self.chat_id:
             print("❌ [Telegram] token/chat_id 비어있음", flush=True)
             return
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        payload = {"chat_id": self.chat_id, "text": text, "disable_web_page_preview": True}
-        try:
-            r = requests.post(url, json=payload, timeout=15)
-            if r.status_code != 200:
-                print(f"❌ [Telegram Error] status={r.status_code} body={r.text[:200]}", flush=True)
-        except Exception as e:
-            print(f"❌ [Telegram Exception] {e}", flush=True)
+        # 토큰별 발신 대기열에 넣고 바로 반환 (속도 제한·429 재시도·스풀은 대기열 워커가 처리)
+        get_outbox(self.token).send(self.chat_id, text, disable_preview=True)
 
 
 class SignalistWatchdog:
@@ -147,7 +177,7 @@ class SignalistWatchdog:
 
         # KIS 클라이언트 제거
 
-        self.hist = {t: deque(maxlen=1200) for t in TICKERS}
+        self.hist = {t: PriceRingBuffer(1200, windows=(600,)) for t in TICKERS}
         self.baseline = {}      # ticker -> (date, price)
         self.sent_levels = {}   # ticker -> (date, set[(sign, level)])
         self.last_alert_time = {t: None for t in TICKERS}
@@ -155,6 +185,11 @@ class SignalistWatchdog:
         self._open_brief_date = None
         self._close_brief_date = None
 
+        # 알림 부수 작업(헤드라인/LLM/텔레그램)은 워커에서 처리하고, 감시 루프는 이벤트만 넘깁니다.
+        self.alerts = AlertPipeline("Signalist", compose=self._compose, send=self.tg.send)
+        self.cadence = CadenceMonitor(expected_sec=POLL_INTERVAL_SEC)
+        news_cache.register("naver_mainnews", _fetch_naver_mainnews, ttl_sec=NEWS_TTL_SEC)
+
         self._stop = False
         signal.signal(signal.SIGTERM, self._on_stop)
         signal.signal(signal.SIGINT, self._on_stop)
@@ -195,20 +230,7 @@ class SignalistWatchdog:
                 return None
 
     def _pct_over_minutes(self, ticker: str, minutes: int) -> Optional[float]:
-        h = self.hist[ticker]
-        if len(h) < 2:
-            return None
-        target_ts = self._now() - timedelta(minutes=minutes)
-        old_price = None
-        for ts, p in h:
-            if ts <= target_ts:
-                old_price = p
-            else:
-                break
-        if old_price is None:
-            return None
-        cur_price = h[-1][1]
-        return ((cur_price - old_price) / old_price) * 100.0
+        return self.hist[ticker].pct_change(minutes * 60, now=self._now())
 
     def _ensure_daily_state(self, ticker: str, price: float):
         today = self._now().date()
@@ -228,49 +250,19 @@ class SignalistWatchdog:
         return crosses
 
     def _fetch_headlines(self, limit: int = 3) -> str:
-        """[수정] 헤드라인 뿐만 아니라, 기사 본문 일부를 함께 수집하여 AI에게 더 풍부한 재료를 제공합니다."""
+        """[수정] 헤드라인 뿐만 아니라, 기사 본문 일부를 함께 수집하여 AI에게 더 풍부한 재료를 제공합니다. (뉴스 캐시에서 읽음)"""
+        items = news_cache.get("naver_mainnews")[:limit]
+        if not items:
+            if news_cache.last_error("naver_mainnews"):
+                return "주요 뉴스 수집에 실패했습니다."
+            return "주요 뉴스를 찾을 수 없습니다."
         news_summaries = []
-        try:
-            # 1. 뉴스 목록 페이지 가져오기
-            list_url = "https://m.stock.naver.com/news/mainnews"
-            r_list = requests.get(list_url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-            r_list.raise_for_status()
-            soup_list = BeautifulSoup(r_list.text, "html.parser")
-            items = soup_list.select("a.NewsList_item__lO7iA")[:limit]
-
-            if not items:
-                return "주요 뉴스를 찾을 수 없습니다."
-
-            # 2. 각 기사 페이지를 방문하여 본문 일부(snippet) 추출
-            for item in items:
-                title = item.get_text(strip=True)
-                href = item.get("href", "")
-                if not href:
-                    news_summaries.append(f"- {title}")
-                    continue
-                
-                article_url = href if href.startswith("http") else "https://m.stock.naver.com" + href
-                
-                try:
-                    r_article = requests.get(article_url, timeout=5, headers={"User-Agent": "Mozilla/5.0"})
-                    r_article.raise_for_status()
-                    soup_article = BeautifulSoup(r_article.text, "html.parser")
-                    
-                    content_div = soup_article.find("div", id="newsct_article")
-                    if content_div:
-                        # 첫 두 문단을 요약으로 사용하고 길이 제한
-                        snippet = " ".join(p.get_text(strip=True) for p in content_div.find_all("p")[:2])
-                        snippet = snippet[:150] + "..." if len(snippet) > 150 else snippet
-                        news_summaries.append(f"- {title}\n  (요약: {snippet})")
-                    else:
-                        news_summaries.append(f"- {title}") # 본문 못찾으면 제목만
-                except Exception:
-                    news_summaries.append(f"- {title}") # 개별 기사 실패 시 제목만
-
-            return "\n".join(news_summaries)
-        except Exception as e:
-            print(f"⚠️ 뉴스 목록 수집 실패: {e}")
-            return "주요 뉴스 수집에 실패했습니다."
+        for item in items:
+            if item["summary"]:
+                news_summaries.append(f"- {item['title']}\n  (요약: {item['summary']})")
+            else:
+                news_summaries.append(f"- {item['title']}")  # 본문 못찾으면 제목만
+        return "\n".join(news_summaries)
 
     def _llm_comment(self, user_prompt: str) -> str:
         if not _chat:
@@ -305,22 +297,33 @@ class SignalistWatchdog:
         today = now.date()
 
         if hhmm == OPEN_BRIEF_TIME and self._open_brief_date != today:
-            self.tg.send(self._format_brief("장 시작 브리핑"))
+            self.alerts.submit("brief:open", {"kind": "brief", "tag": "장 시작 브리핑"})
             self._open_brief_date = today
 
         if hhmm == CLOSE_BRIEF_TIME and self._close_brief_date != today:
-            self.tg.send(self._format_brief("장 마감 브리핑"))
+            self.alerts.submit("brief:close", {"kind": "brief", "tag": "장 마감 브리핑"})
             self._close_brief_date = today
 
+    def _recent_price(self, ticker: str, max_age: float = 60.0) -> Optional[float]:
+        """감시 루프가 방금 기록한 가격이 있으면 재사용하고, 없으면 새로 조회합니다."""
+        last = self.hist[ticker].last()
+        if last and time.time() - last[0] <= max_age:
+            return last[1]
+        return self._get_price(ticker)
+
     def _format_brief(self, tag: str) -> str:
         now = self._now().strftime("%Y-%m-%d %H:%M")
         lines = [f"🟨 {SERVICE_NAME} {tag} ({now} KST)"]
+        today = self._now().date()
         for t, name in TICKERS.items():
-            price = self._get_price(t)
+            price = self._recent_price(t)
             if price is None:
                 continue
-            self._ensure_daily_state(t, price)
-            base = self.baseline[t][1]
+            # 워커 스레드에서 실행되므로 기준가는 읽기만 합니다. (설정은 감시 루프 담당)
+            base_date, base = self.baseline.get(t, (None, None))
+            if base_date != today:
+                lines.append(f"- {name}: {price:,.2f}")
+                continue
             pct = ((price - base) / base) * 100.0
             lines.append(f"- {name}: {price:,.2f} (기준 대비 {pct:+.2f}%)")
 
@@ -375,6 +378,46 @@ class SignalistWatchdog:
             lines += ["", "🤖 AI 코멘트", llm]
         return "\n".join(lines)
 
+    def _compose(self, event: dict) -> str:
+        """알림 파이프라인 워커에서 실행: 헤드라인 수집 + AI 코멘트 + 메시지 작성"""
+        if event["kind"] == "brief":
+            return self._format_brief(event["tag"])
+
+        name, price, pct_base, pct10 = event["name"], event["price"], event["pct_base"], event["pct10"]
+        headlines = self._fetch_headlines(3)
+
+        llm = ""
+        if _chat:
+            try:
+                # [수정] AI 프롬프트를 훨씬 더 구체적으로 개선
+                if event["kind"] == "level":
+                    direction = "상승" if event["sign"] > 0 else "하락"
+                    reason_text = f"새로운 레벨({direction} {event['lv']}%) 돌파"
+                else:
+                    reason_text = "10분 급가속"
+
+                user_prompt = f"""
+아래 정보를 바탕으로 한국 증시 상황을 3~5줄로 간결하게 설명해줘. 투자 조언이 아니라 객관적인 상황 설명만 제공해야 해.
+뉴스 내용과 지수 움직임을 연관지어 설명하면 좋아.
+
+---
+- 지수: {name}
+- 현재가: {price:,.2f}
+- 기준가 대비: {pct_base:+.2f}%
+- 10분 변동: {pct10:+.2f}%
+- 알림 사유: {reason_text}
+- 주요 뉴스:
+{headlines}
+---
+""".strip()
+                llm = self._llm_comment(user_prompt)
+            except Exception as e:
+                llm = f"AI 코멘트 생성 실패: {e}"
+
+        if event["kind"] == "level":
+            return self._format_level_alert(name, price, pct_base, event["sign"], event["lv"], pct10, headlines, llm)
+        return self._format_accel_alert(name, price, pct_base, pct10, headlines, llm)
+
     def run_forever(self):
         print("🦅 [System] Signalist Watchdog 시작", flush=True)
         print("🦅 [System] 주식 감시 루프 진입...", flush=True)
@@ -382,7 +425,14 @@ class SignalistWatchdog:
         # Heartbeat 파일 경로 (watchdogs.py 매니저가 감시함)
         hb_path = os.getenv("ICEAGE_HEARTBEAT_PATH")
 
+        self.alerts.start()
+        news_cache.start_refresher()
+        last_stats = time.monotonic()
         while not self._stop:
+            # 다음 샘플링 시각 기준으로 쉬어서, 가격 조회 시간과 무관하게 POLL_INTERVAL_SEC 주기를 유지
+            cycle_started = time.monotonic()
+            self.cadence.mark()
+
             # ✅ Heartbeat 갱신 (나 살아있음)
             if hb_path:
                 try:
@@ -407,7 +457,7 @@ class SignalistWatchdog:
                 if price is None:
                     continue
 
-                self.hist[ticker].append((now, price))
+                self.hist[ticker].append(now, price)
                 self._ensure_daily_state(ticker, price)
 
                 base = self.baseline[ticker][1]
@@ -430,43 +480,11 @@ class SignalistWatchdog:
                 if not new_levels and not accel_only:
                     continue
 
-                headlines = self._fetch_headlines(3)
-
-                llm = ""
-                if _chat:
-                    try:
-                        # [수정] AI 프롬프트를 훨씬 더 구체적으로 개선
-                        reason_text = ""
-                        if new_levels:
-                            sign, lv = sorted(new_levels, key=lambda x: x[1], reverse=True)[0]
-                            direction = "상승" if sign > 0 else "하락"
-                            reason_text = f"새로운 레벨({direction} {lv}%) 돌파"
-                        elif accel_only:
-                            reason_text = "10분 급가속"
-
-                        user_prompt = f"""
-아래 정보를 바탕으로 한국 증시 상황을 3~5줄로 간결하게 설명해줘. 투자 조언이 아니라 객관적인 상황 설명만 제공해야 해.
-뉴스 내용과 지수 움직임을 연관지어 설명하면 좋아.
-
----
-- 지수: {name}
-- 현재가: {price:,.2f}
-- 기준가 대비: {pct_base:+.2f}%
-- 10분 변동: {pct10:+.2f}%
-- 알림 사유: {reason_text}
-- 주요 뉴스:
-{headlines}
----
-""".strip()
-                        llm = self._llm_comment(user_prompt)
-                    except Exception as e:
-                        llm = f"AI 코멘트 생성 실패: {e}"
-
                 # 레벨 알림이 있으면: “가장 큰 새 레벨 1개”만 보내고 나머지는 sent 처리
+                event = {"name": name, "price": price, "pct_base": pct_base, "pct10": pct10}
                 if new_levels:
-                    new_levels_sorted = sorted(new_levels, key=lambda x: x[1], reverse=True)
-                    sign, lv = new_levels_sorted[0]
-                    self.tg.send(self._format_level_alert(name, price, pct_base, sign, lv, pct10, headlines, llm))
+                    sign, lv = sorted(new_levels, key=lambda x: x[1], reverse=True)[0]
+                    event.update(kind="level", sign=sign, lv=lv)
                     for c in new_levels:
                         sent.add(c)
                     self.sent_levels[ticker] = (today, sent)
@@ -474,11 +492,22 @@ class SignalistWatchdog:
 
                 # 급가속만으로 알림
                 elif accel_only and pct10 is not None:
-                    self.tg.send(self._format_accel_alert(name, price, pct_base, pct10, headlines, llm))
+                    event.update(kind="accel")
                     self.last_alert_time[ticker] = now
+                else:
+                    continue
+
+                # 헤드라인/LLM/전송은 파이프라인 워커에서 (감시 루프는 기다리지 않음)
+                self.alerts.submit(ticker, event)
 
             print(f"\r👀 Signalist 감시 중... ({self._now().strftime('%H:%M:%S')})", end="", flush=True)
-            time.sleep(POLL_INTERVAL_SEC)
+            if cycle_started - last_stats >= STATS_EVERY_SEC:
+                print(f"\n📊 [Watchdog] {self.cadence.report()} / {self.alerts.report()} / {news_cache.report()}", flush=True)
+                last_stats = cycle_started
+            time.sleep(max(0.0, POLL_INTERVAL_SEC - (time.monotonic() - cycle_started)))
+
+        self.alerts.shutdown()
+        print(f"\n📊 [Watchdog] {self.cadence.report()} / {self.alerts.report()} / {news_cache.report()}", flush=True)
 
 
 def main():
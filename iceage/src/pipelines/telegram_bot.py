@@ -21,7 +21,7 @@ class SignalistTelegramBot:
         self.sender = TelegramSender(token=self.token, chat_id=self.chat_id)
 
     async def send_message(self, message):
-        # 비동기 함수지만 내부적으로는 동기 Sender를 호출
+        # Sender는 발신 대기열에 넣고 바로 반환하므로 이벤트 루프를 막지 않음
         try:
             self.sender.send_message(message)
         except Exception as e:
@@ -21,29 +21,62 @@ except ImportError:
 
 from moneybag.src.pipelines.send_email import EmailSender
 from moneybag.src.utils.slack_notifier import SlackNotifier
+from iceage.src.pipelines.report_digest import build_digest, load_digest, compact_digests, DIGEST_SUFFIX
+from common.llm_async import fan_out
 
 class WeeklyReport:
     def __init__(self):
-        # iceage 데일리 리포트가 저장되는 경로
-        self.daily_report_dir = BASE_DIR / "iceage" / "data" / "out"
-        self.output_dir = self.daily_report_dir # 같은 곳에 저장
+        # iceage 데일리 리포트(Signalist_Daily_YYYY-MM-DD.md)가 발행되는 경로
+        self.daily_report_dir = BASE_DIR / "iceage" / "out"
+        # 구형 브리핑(Signalist_Briefing_YYYY.MM.DD.md) 및 주간 리포트 저장 경로
+        self.legacy_report_dir = BASE_DIR / "iceage" / "data" / "out"
+        self.output_dir = self.legacy_report_dir # 월간 리포트가 이 경로에서 주간 리포트를 찾습니다.
         self.service_name = "시그널리스트"
 
+    def _sync_daily_reports(self, dates):
+        """새 워커에서도 지난 주 리포트/다이제스트를 쓸 수 있도록 S3에서 해당 날짜 파일만 받아옵니다."""
+        try:
+            from common.s3_manager import S3Manager
+            include = [f"Signalist_Daily_{d.strftime('%Y-%m-%d')}{ext}" for d in dates for ext in (".md", DIGEST_SUFFIX)]
+            S3Manager().sync_down("iceage/out", str(self.daily_report_dir), include=include, quiet=True)
+        except Exception as e:
+            print(f"⚠️ [S3 Sync] 데일리 리포트 동기화 실패 (로컬 파일로 진행): {e}")
+
     def find_daily_reports(self, start_date, end_date):
-        """지정한 기간의 데일리 리포트 파일들을 찾습니다."""
+        """지정한 기간의 데일리 리포트 파일들을 찾습니다. Returns: [(날짜 문자열, 경로)]"""
         print(f"🔍 {start_date.date()} ~ {end_date.date()} 기간의 데일리 리포트를 검색합니다.")
+        dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        self._sync_daily_reports(dates)
+
         found_files = []
-        delta_days = (end_date - start_date).days
-        for i in range(delta_days + 1):
-            current_date = start_date + timedelta(days=i)
-            # 데일리 리포트 파일명 형식(Signalist_Briefing_YYYY.MM.DD.md)을 가정합니다.
-            filename = f"Signalist_Briefing_{current_date.strftime('%Y.%m.%d')}.md"
-            filepath = self.daily_report_dir / filename
-            if filepath.exists():
-                print(f"  - 발견: {filename}")
-                found_files.append(filepath)
+        for current_date in dates:
+            candidates = [
+                self.daily_report_dir / f"Signalist_Daily_{current_date.strftime('%Y-%m-%d')}.md",
+                self.legacy_report_dir / f"Signalist_Briefing_{current_date.strftime('%Y.%m.%d')}.md",
+            ]
+            for filepath in candidates:
+                if filepath.exists():
+                    print(f"  - 발견: {filepath.name}")
+                    found_files.append((current_date.strftime('%Y.%m.%d'), filepath))
+                    break
         return found_files
 
+    def collect_digests(self, daily_files):
+        """
+        [map] 데일리 리포트별 다이제스트를 모읍니다.
+        발행 시점에 만들어 둔 다이제스트를 그대로 쓰고, 없는 것만 동시에 생성합니다.
+        """
+        digests = {label: load_digest(path) for label, path in daily_files}
+        missing = {label: (build_digest, (path, label)) for label, path in daily_files if not digests[label]}
+        if missing:
+            print(f"🧾 다이제스트가 없는 데일리 리포트 {len(missing)}건을 요약합니다...")
+            for label, result in fan_out(missing).items():
+                if isinstance(result, Exception):
+                    print(f"⚠️ [Digest] {label} 요약 실패 (제외): {result}")
+                else:
+                    digests[label] = result
+        return [digests[label] for label, _ in daily_files if digests.get(label)]
+
     def generate_report(self):
         """주간 리포트를 생성하고 파일로 저장합니다."""
         if not _chat:
@@ -61,15 +94,15 @@ class WeeklyReport:
             print("❌ 요약할 데일리 리포트가 없습니다. 주간 리포트 생성을 중단합니다.")
             return None
 
-        full_summary = ""
-        for f_path in daily_files:
-            date_str = f_path.stem.split('_')[-1]
-            full_summary += f"\n\n--- [ {date_str} 브리핑 내용 ] ---\n"
-            with open(f_path, 'r', encoding='utf-8') as f:
-                full_summary += f.read()
+        # [map] 데일리 원문 전체 대신 리포트별 다이제스트만 사용 (토큰/지연/실패 위험 감소)
+        digests = self.collect_digests(daily_files)
+        if not digests:
+            print("❌ 사용할 수 있는 데일리 다이제스트가 없습니다. 주간 리포트 생성을 중단합니다.")
+            return None
+        full_summary = compact_digests(digests)
 
-        # 3. LLM을 이용해 주간 리포트 초안 생성
-        print("🧠 LLM이 주간 리포트를 작성 중입니다...")
+        # 3. [reduce] LLM을 이용해 주간 리포트 초안 생성 (다이제스트 위에서 짧은 호출 1회)
+        print(f"🧠 LLM이 주간 리포트를 작성 중입니다... (다이제스트 {len(digests)}건, {len(full_summary):,}자)")
         system_prompt = f"""
         당신은 "{self.service_name}"의 수석 애널리스트입니다. 지난 한 주간의 데일리 브리핑 내용을 종합하여, 인사이트가 담긴 주간 리포트를 작성하는 임무를 받았습니다. 단순 요약이 아닌, 한 주간의 시장 흐름을 관통하는 스토리를 만들어내야 합니다.
 
@@ -100,7 +133,7 @@ class WeeklyReport:
         ## 4. 다음 주 전망 및 전략 (Outlook for Next Week)
         (내용)
         """
-        user_prompt = f"아래는 지난 한 주간의 데일리 브리핑 내용입니다. 이 내용을 바탕으로 주간 리포트를 작성해주세요.\n\n{full_summary}"
+        user_prompt = f"아래는 지난 한 주간의 데일리 브리핑 다이제스트(JSON, 하루 한 줄)입니다. 이 내용을 바탕으로 주간 리포트를 작성해주세요.\n\n{full_summary}"
         report_content = _chat(system_prompt, user_prompt)
 
         # 5. 파일로 저장
@@ -111,6 +144,12 @@ class WeeklyReport:
             f.write(report_content)
         
         print(f"✅ [저장 완료] 주간 리포트가 '{output_filepath}'에 저장되었습니다.")
+
+        # 월간 리포트의 map 입력이 되도록 주간 리포트 다이제스트도 바로 만들어 둡니다.
+        try:
+            build_digest(output_filepath, label=date_range_str, kind="주간")
+        except Exception as e:
+            print(f"⚠️ [Digest] 주간 리포트 다이제스트 생성 실패 (월간 리포트 생성 시 재시도): {e}")
         return str(output_filepath)
 
 def run_weekly_routine():
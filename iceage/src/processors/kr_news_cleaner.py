@@ -7,6 +7,22 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from common.news_dedup import MinHashDeduper, char_shingles, cluster_articles
+from common.news_store import news_store
+
+# 같은 기사의 전재본 중 대표로 남길 매체 우선순위 (없으면 0)
+_SOURCE_PRIORITY: Dict[str, int] = {
+    "연합뉴스": 3,
+    "뉴스1": 2,
+    "뉴시스": 2,
+    "한국경제": 2,
+    "매일경제": 2,
+    "머니투데이": 2,
+}
+
+# 제목+요약 글자 3-gram Jaccard 기준 (조사·어순만 바뀐 전재 기사까지 묶음)
+NEAR_DUP_THRESHOLD = 0.5
+
 def _parse_published_at(raw: str) -> str:
     """
     SerpAPI에서 넘어오는 날짜 문자열을 최대한 ISO 형식으로 맞춰보되,
@@ -59,12 +75,49 @@ def _clean_one(a: Dict) -> Optional[Dict]:
 
 
 
+def _source_priority(source: str) -> int:
+    return max((p for key, p in _SOURCE_PRIORITY.items() if key in source), default=0)
+
+
+def _collapse_near_duplicates(cleaned: List[Dict]) -> List[Dict]:
+    """
+    (kind, code) 그룹 안에서 유사 중복 기사를 MinHash/LSH로 묶어 대표 1건만 남긴다.
+    - 대표: 매체 우선순위 → 최신 published_at 순
+    - 대표 기사에 cluster_id / cluster_size 를 붙여 하류에서 보도 범위를 바로 셀 수 있게 한다.
+    - 종목별 뉴스는 같은 기사라도 종목마다 따로 남긴다. (그룹 단위로만 묶음)
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for i, c in enumerate(cleaned):
+        groups.setdefault((c.get("kind"), c.get("code")), []).append(i)
+
+    deduper = MinHashDeduper(threshold=NEAR_DUP_THRESHOLD)
+    keep: Dict[int, Dict] = {}
+    for idxs in groups.values():
+        arts = [cleaned[i] for i in idxs]
+        clusters = cluster_articles(
+            arts,
+            text=lambda a: f"{a.get('title', '')} {a.get('snippet', '')}",
+            shingles=char_shingles,
+            rank_key=lambda a: (_source_priority(a.get("source", "")), a.get("published_at", "")),
+            deduper=deduper,
+        )
+        for c in clusters:
+            art = dict(arts[c.representative])
+            art["cluster_id"] = c.cluster_id
+            art["cluster_size"] = c.size
+            # 원래 순서 유지: 묶음에서 가장 먼저 나온 기사 자리에 대표를 둔다
+            keep[idxs[min(c.members)]] = art
+    return [keep[i] for i in sorted(keep)]
+
+
 def clean_kr_news(ref_date: date) -> Path:
     """
     국내 뉴스 raw(jsonl)를 읽어서
     - _clean_one()으로 필드 정리
     - (title, source) 기준 중복 제거
+    - 유사 중복(전재·재송고) 기사는 MinHash/LSH로 묶어 대표 1건만 유지
     - cleaned jsonl 로 저장
+    - 날짜 파티션 뉴스 저장소(news_store)에도 추가 → 종목/날짜별 조회는 파일 전체를 다시 읽지 않음
 
     raw 파일이 없거나 비어 있어도 예외를 던지지 않고,
     경고 로그만 남기고 빈 cleaned 파일을 생성해서 반환한다.
@@ -105,6 +158,11 @@ def clean_kr_news(ref_date: date) -> Path:
             seen.add(key)
             cleaned.append(c)
 
+    before = len(cleaned)
+    cleaned = _collapse_near_duplicates(cleaned)
+    if before != len(cleaned):
+        print(f"[INFO] 국내 뉴스 유사 중복 {before - len(cleaned)}건 병합 ({before} → {len(cleaned)})")
+
     out_dir = Path("iceage") / "data" / "processed"
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / f"kr_news_cleaned_{ref_date.isoformat()}.jsonl"
@@ -114,6 +172,12 @@ def clean_kr_news(ref_date: date) -> Path:
             f.write(json.dumps(c, ensure_ascii=False) + "\n")
 
     print(f"✅ 국내 뉴스 cleaned 저장 완료: {out_path}")
+
+    try:
+        added = news_store.append(cleaned, ref_date)
+        print(f"✅ 뉴스 저장소 추가: {added}건 (기존 중복 제외)")
+    except OSError as e:
+        print(f"[WARN] 뉴스 저장소 추가 실패 (cleaned 파일은 정상 저장됨): {e}")
     return out_path
 
 
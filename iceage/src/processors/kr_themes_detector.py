@@ -11,6 +11,7 @@ from typing import List, Dict
 import pandas as pd
 
 from iceage.src.data_schemas import KR_PRICE_COLUMNS  # 이미 있음 (안 써도 상관없음)
+from common.keyword_engine import keyword_engine
 
 
 @dataclass
@@ -60,19 +61,20 @@ def detect_themes(ref_date: date) -> Path:
     else:
         df_price = pd.DataFrame(columns=["name", "change_pct"])
 
+    # 뉴스에서 키워드 매칭: 전체 테마 키워드를 공용 키워드 엔진에 등록하고 기사당 한 번만 스캔
+    keyword_engine.register("theme", [(t["name"], t.get("keywords", [])) for t in themes_cfg])
+    mention_counts: Dict[str, int] = {}
+    for art in news:
+        text = art.get("title", "") + " " + art.get("snippet", "")
+        for name in keyword_engine.matched_names(text, "theme"):
+            mention_counts[name] = mention_counts.get(name, 0) + 1
+
     themes_out: List[ThemeAggregate] = []
 
     for t in themes_cfg:
         name = t["name"]
-        keywords = t.get("keywords", [])
         stocks = t.get("stocks", [])
-
-        # 뉴스에서 키워드 매칭
-        count = 0
-        for art in news:
-            text = (art.get("title", "") + " " + art.get("snippet", "")).lower()
-            if any(kw.lower() in text for kw in keywords):
-                count += 1
+        count = mention_counts.get(name, 0)
 
         # 가격 데이터에서 해당 테마 종목 수익률 평균
         avg_ret = 0.0
@@ -10,6 +10,8 @@ from pathlib import Path
 
 from iceage.src.data_sources.kr_prices import load_normalized_prices
 from iceage.src.data_sources.signalist_today import SignalRow
+from common.keyword_engine import keyword_engine
+from common.news_store import news_store
 
 
 def _find_col(df: pd.DataFrame, candidates) -> str | None:
@@ -410,6 +412,9 @@ EVENT_TAG_RULES: List[tuple[str, list[str]]] = [
     ),
 ]
 
+# 전체 태그 키워드를 공용 키워드 엔진(Aho-Corasick)에 등록 → 기사당 한 번의 스캔으로 모든 태그 판정
+keyword_engine.register("event", EVENT_TAG_RULES)
+
 
 
 def _parse_event_published_at(value: str) -> Optional[date]:
@@ -444,57 +449,65 @@ def _parse_event_published_at(value: str) -> Optional[date]:
         return None
 
 
+def _iter_cleaned_news_file(ref_date: date):
+    """kr_news_cleaned_{date}.jsonl 전체를 한 줄씩 파싱 (뉴스 저장소 도입 전 날짜용 폴백)"""
+    path = Path("iceage") / "data" / "processed" / f"kr_news_cleaned_{ref_date.isoformat()}.jsonl"
+    if not path.exists():
+        return
+
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except Exception:
+                continue
+
+
 def _load_stock_event_news(
     ref_date: date,
     window_days: int = 7,
 ) -> tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
     """
-    kr_news_cleaned_{date}.jsonl 에서 kind == 'stock_event' 인 뉴스만
-    종목 code / name 기준으로 묶어서 반환.
+    kind == 'stock_event' 인 뉴스만 종목 code / name 기준으로 묶어서 반환.
+
+    - ref_date 당일 정제본(kr_news_cleaned_{date}.jsonl)만 대상으로 한다.
+      (여러 날 파티션을 합치면 며칠에 걸쳐 수집된 같은 기사가 중복으로 세어짐)
+    - 뉴스 저장소(news_store)에 ref_date 파티션이 있으면 kind 인덱스로
+      stock_event 정제본 기사 바이트만 읽고, 파티션이 없거나 정제본이 없으면 cleaned 파일 전체를 읽는다.
 
     window_days:
         published_at 기준 ref_date ± window_days 안에 있는 기사만 사용.
         (날짜를 파싱할 수 없으면 품질 관점에서 과감히 스킵)
     """
-    base = Path("iceage") / "data" / "processed"
-    path = base / f"kr_news_cleaned_{ref_date.isoformat()}.jsonl"
-
     events_by_code: Dict[str, List[Dict[str, Any]]] = {}
     events_by_name: Dict[str, List[Dict[str, Any]]] = {}
 
-    if not path.exists():
-        return events_by_code, events_by_name
-
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj: Dict[str, Any] = json.loads(line)
-            except Exception:
-                continue
-
-            if obj.get("kind") != "stock_event":
-                continue
+    # 파티션이 있어도 정제본 추가가 실패했을 수 있으므로(수집기 원본만 있는 경우) 비어 있으면 cleaned 파일로 폴백
+    items = news_store.by_kind("stock_event", ref_date) if news_store.has_range(ref_date) else []
+    if not items:
+        items = (obj for obj in _iter_cleaned_news_file(ref_date) if obj.get("kind") == "stock_event")
 
-            pub_raw = obj.get("published_at") or ""
-            pub_date = _parse_event_published_at(pub_raw)
-            if pub_date is None:
-                # 날짜를 알 수 없으면 품질 관점에서 과감히 스킵
-                continue
+    for obj in items:
+        pub_raw = obj.get("published_at") or ""
+        pub_date = _parse_event_published_at(pub_raw)
+        if pub_date is None:
+            # 날짜를 알 수 없으면 품질 관점에서 과감히 스킵
+            continue
 
-            if abs((pub_date - ref_date).days) > window_days:
-                # ref_date ± window_days 밖이면 사용하지 않음
-                continue
+        if abs((pub_date - ref_date).days) > window_days:
+            # ref_date ± window_days 밖이면 사용하지 않음
+            continue
 
-            code = obj.get("code")
-            name = obj.get("name")
+        code = obj.get("code")
+        name = obj.get("name")
 
-            if code:
-                events_by_code.setdefault(str(code), []).append(obj)
-            if name:
-                events_by_name.setdefault(str(name), []).append(obj)
+        if code:
+            events_by_code.setdefault(str(code), []).append(obj)
+        if name:
+            events_by_name.setdefault(str(name), []).append(obj)
 
     return events_by_code, events_by_name
 
@@ -528,11 +541,10 @@ def _infer_internal_event_tag(items: List[Dict[str, Any]]) -> str:
     # 태그별 카운트 초기화
     tag_counts: Dict[str, int] = {tag: 0 for tag, _ in EVENT_TAG_RULES}
 
-    # 기사 텍스트를 돌면서 각 태그가 몇 번 등장했는지 집계
+    # 기사 텍스트를 돌면서 각 태그가 몇 번 등장했는지 집계 (기사당 태그는 1회)
     for doc in texts:
-        for tag, keywords in EVENT_TAG_RULES:
-            if any(kw.lower() in doc for kw in keywords):
-                tag_counts[tag] += 1
+        for tag in keyword_engine.matched_names(doc, "event"):
+            tag_counts[tag] += 1
 
     # 1번도 안 걸린 태그는 버림
     tag_items = [(tag, cnt) for tag, cnt in tag_counts.items() if cnt > 0]
@@ -1,9 +1,8 @@
 import os
-import json
 from flask import Flask, request, abort
-from datetime import datetime, timezone
 # watchdogs.py 또는 moralis_listener.py 의 최상단
 from common.config import config
+from common.whale_ingest import WhaleIngestor, JsonlWhaleStore, handle_webhook
 
 
 
@@ -38,63 +37,28 @@ WHALE_LOG_FILE = os.path.join(PERSISTENT_LOG_DIR, 'whale_transactions.jsonl')
 # [FIX] os.getenv는 ARN을 반환합니다. ensure_secret을 사용해 실제 키 값을 가져옵니다.
 MORALIS_API_KEY = config.ensure_secret("MORALIS_API_KEY")
 
-def verify_signature(request):
-    """Webhook 요청의 서명을 검증합니다."""
-    signature = request.headers.get('x-signature')
-    if not signature:
-        return False
-    
-    # Moralis Python SDK의 서명 검증 로직을 직접 구현하거나,
-    # 간단한 검증을 위해 API 키 존재 여부만 확인할 수도 있습니다.
-    # 여기서는 SDK 없이 간단히 처리합니다.
-    # 실제 프로덕션에서는 Moralis SDK의 `verify_signature` 사용을 권장합니다.
-    # from moralis.streams.helpers import verify_signature
-    # is_valid = verify_signature(body=request.data.decode(), signature=signature, api_key=MORALIS_API_KEY)
-    
-    # 지금은 헤더 존재 여부만 체크
-    return True
+# [수정] 거래마다 파일을 열어 한 줄씩 쓰던 방식 대신,
+# 대기열에 넣고 바로 응답한 뒤 writer 스레드가 묶음 단위로 한 번에 기록합니다.
+ingestor = WhaleIngestor(
+    JsonlWhaleStore(WHALE_LOG_FILE),
+    batch_size=int(os.getenv("WHALE_INGEST_BATCH", "500")),
+    flush_interval_sec=float(os.getenv("WHALE_INGEST_FLUSH_SEC", "1.0")),
+)
 
 
 @app.route('/moralis-webhook', methods=['POST'])
 def moralis_webhook():
-    if not verify_signature(request):
-        print("❌ [Webhook] 서명 검증 실패. 요청을 거부합니다.")
+    body, status = handle_webhook(ingestor, request.get_data(), request.headers.get('x-signature'), MORALIS_API_KEY)
+    if status == 401:
         abort(401)
+    if body.get("accepted"):
+        print(f"🔔 [Webhook] Moralis로부터 거래 {body['accepted']}건 수신 (대기 {ingestor.depth()}건)")
+    return body, status
 
-    payload = request.json
-    print(f"🔔 [Webhook] Moralis로부터 데이터 수신!")
 
-    # 실제 거래 내역(logs) 처리
-    for tx in payload.get('erc20Transfers', []):
-        try:
-            token_symbol = tx.get('tokenSymbol', 'UNKNOWN')
-            token_decimals = int(tx.get('tokenDecimals', '6'))
-            value_raw = int(tx.get('value', '0'))
-            value_usd = value_raw / (10**token_decimals)
-
-            # 데이터 포맷을 기존 MoralisTracker와 유사하게 맞춤
-            whale_tx = {
-                'symbol': token_symbol,
-                'amount_usd': value_usd,
-                'from': {'owner': tx.get('from'), 'owner_type': 'wallet'}, # label 정보는 스트림에 없음
-                'to': {'owner': tx.get('to'), 'owner_type': 'wallet'},
-                'timestamp': payload.get('block', {}).get('timestamp'),
-                'transaction_hash': tx.get('transactionHash')
-            }
-
-            # [수정] 파일에 쓰기 전에 영구 로그 디렉터리가 존재하는지 확인하고 없으면 생성합니다.
-            os.makedirs(PERSISTENT_LOG_DIR, exist_ok=True)
-
-            # 파일에 한 줄씩 추가 (JSON Lines 형식)
-            with open(WHALE_LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(whale_tx) + '\n')
-            
-            print(f"  -> 📝 로그 기록: {whale_tx['symbol']} ${whale_tx['amount_usd']:,.0f}")
-
-        except Exception as e:
-            print(f"  -> ⚠️ 로그 처리 중 오류: {e}")
-
-    return {"status": "ok"}, 200
+@app.route('/moralis-webhook/stats', methods=['GET'])
+def moralis_webhook_stats():
+    return {"report": ingestor.report(), **ingestor.stats}, 200
 
 if __name__ == '__main__':
     # 로그 파일 경로 확인 및 생성
@@ -103,4 +67,4 @@ if __name__ == '__main__':
     print(f"🐋 Moralis 고래 추적 리스너(Webhook 서버)를 시작합니다.")
     print(f"   - 로그 파일: {WHALE_LOG_FILE}")
     print(f"   - 수신 주소: http://0.0.0.0:5001/moralis-webhook")
-    app.run(host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5001)
@@ -2,6 +2,10 @@ import os
 import json
 from datetime import datetime, timedelta, timezone
 
+# 로그는 수신 순서로 쌓이므로 블록 시각이 조금 뒤섞일 수 있습니다. 이만큼 더 과거까지 읽고 멈춥니다.
+TAIL_SLACK = timedelta(hours=1)
+TAIL_BLOCK_BYTES = 64 * 1024
+
 class MoralisTracker:
     """
     [구조 변경] Moralis API를 직접 호출하는 대신,
@@ -21,6 +25,32 @@ class MoralisTracker:
             print(f"⚠️ [MoralisTracker] 로그 파일이 없습니다: {self.log_file_path}")
             print("   -> Webhook 리스너(moralis_listener.py)가 먼저 실행되어야 합니다.")
 
+    def _iter_recent_lines(self, since: datetime):
+        """로그 파일을 끝에서부터 블록 단위로 읽어 since(-여유분) 이후 줄만 최신순으로 돌려줍니다."""
+        stop_at = since - TAIL_SLACK
+        with open(self.log_file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            rest = b''
+            while pos > 0:
+                step = min(TAIL_BLOCK_BYTES, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step) + rest
+                lines = chunk.split(b'\n')
+                rest = lines.pop(0) if pos > 0 else b''  # 블록 경계에 걸친 첫 줄은 다음 블록과 합침
+                for raw in reversed(lines):
+                    if not raw.strip():
+                        continue
+                    line = raw.decode('utf-8', errors='replace')
+                    yield line
+                    try:
+                        ts = json.loads(line).get('timestamp')
+                        if ts and datetime.fromisoformat(ts.replace('Z', '+00:00')) < stop_at:
+                            return
+                    except (ValueError, AttributeError):
+                        continue
+
     def get_large_transactions(self, limit=5, min_value_usd=1000000):
         """
         기록된 로그 파일에서 최근 12시간 내의 대규모 트랜잭션을 읽어옵니다.
@@ -32,28 +62,28 @@ class MoralisTracker:
         twelve_hours_ago = datetime.now(timezone.utc) - timedelta(hours=12)
 
         try:
-            with open(self.log_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        tx = json.loads(line)
-                        
-                        # 타임스탬프 형식 변환 및 시간대 정보 추가
-                        tx_time_str = tx.get('timestamp')
-                        if not tx_time_str: continue
+            # [수정] 파일 전체를 매번 읽는 대신, 끝에서부터 12시간(+여유분) 이전 거래가 나올 때까지만 읽습니다.
+            for line in self._iter_recent_lines(twelve_hours_ago):
+                try:
+                    tx = json.loads(line)
+                    
+                    # 타임스탬프 형식 변환 및 시간대 정보 추가
+                    tx_time_str = tx.get('timestamp')
+                    if not tx_time_str: continue
+                    
+                    # ISO 8601 형식 (예: '2025-12-22T10:30:00.000Z') 처리
+                    tx_time = datetime.fromisoformat(tx_time_str.replace('Z', '+00:00'))
+                    
+                    # 최근 12시간 데이터 & 최소 금액 조건 확인
+                    if tx_time >= twelve_hours_ago and tx.get('amount_usd', 0) >= min_value_usd:
+                        # from/to 주소에 대한 label 정보는 스트림에 없으므로, 'Unknown Wallet'으로 통일
+                        tx['from']['owner'] = tx['from'].get('owner', 'Unknown Wallet')
+                        tx['to']['owner'] = tx['to'].get('owner', 'Unknown Wallet')
+                        all_txs.append(tx)
                         
-                        # ISO 8601 형식 (예: '2025-12-22T10:30:00.000Z') 처리
-                        tx_time = datetime.fromisoformat(tx_time_str.replace('Z', '+00:00'))
-                        
-                        # 최근 12시간 데이터 & 최소 금액 조건 확인
-                        if tx_time >= twelve_hours_ago and tx.get('amount_usd', 0) >= min_value_usd:
-                            # from/to 주소에 대한 label 정보는 스트림에 없으므로, 'Unknown Wallet'으로 통일
-                            tx['from']['owner'] = tx['from'].get('owner', 'Unknown Wallet')
-                            tx['to']['owner'] = tx['to'].get('owner', 'Unknown Wallet')
-                            all_txs.append(tx)
-                            
-                    except (json.JSONDecodeError, KeyError, TypeError) as e:
-                        print(f"⚠️ 로그 라인 파싱 실패: {line.strip()} | 오류: {e}")
-                        continue
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    print(f"⚠️ 로그 라인 파싱 실패: {line.strip()} | 오류: {e}")
+                    continue
 
             # 최신순, 금액순으로 정렬
             sorted_txs = sorted(all_txs, key=lambda x: (x.get('timestamp', ''), x.get('amount_usd', 0)), reverse=True)
@@ -0,0 +1,190 @@
+# moneybag/src/analyzers/universe_scanner.py
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class UniverseAlert:
+    symbol: str
+    price: float
+    pct10: Optional[float]
+    pct15: Optional[float]
+    pct60: Optional[float]
+    rule: int          # 발동한 규칙 인덱스 (rules 순서, 앞쪽이 우선)
+    strength: float    # 기준 대비 배수 (|변동률| / 기준)
+
+
+def _opt(x) -> Optional[float]:
+    return None if np.isnan(x) else float(x)
+
+
+class UniverseAlertScanner:
+    def __init__(self, rules: Sequence[Tuple[int, float]], cooldown_min: float, bypass_pct: float,
+                 sample_sec: float = 1.0, anchor_symbol: str = "BTCUSDT", max_alerts: int = 1,
+                 initial_symbols: int = 512):
+        """
+        전체 시장(수백 심볼) 급변 감시용 벡터화 평가기
+
+        - 가격을 심볼 × 시간 행렬(sample_sec 간격 열, 가장 긴 윈도우만큼 순환)에 보관합니다.
+        - rules: [(윈도우 분, 기준 %), ...] 순서가 곧 우선순위입니다. (예: 10분 급가속 > 15분 > 60분)
+        - 윈도우별 변동률, 기준 돌파, 심볼별 쿨타임/바이패스, 서비스 전체 쿨타임(대표 심볼 기준 바이패스)을
+          모두 배열 연산으로 평가하고 실제로 발동하는 알림만 반환합니다.
+        - 서비스 전체 쿨타임이 열려 있을 때 가장 강한 max_alerts개만 보냅니다. (우루루 방지)
+        """
+        self.rules = [(int(m), float(th)) for m, th in rules]
+        self.cooldown_sec = cooldown_min * 60.0
+        self.bypass_pct = bypass_pct
+        self.sample_ms = int(sample_sec * 1000)
+        self.anchor_symbol = anchor_symbol
+        self.max_alerts = max_alerts
+
+        self._thresholds = np.array([th for _, th in self.rules], dtype=np.float64)
+        longest_ms = max(m for m, _ in self.rules) * 60_000
+        self.n_cols = longest_ms // self.sample_ms + 2
+
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        rows = max(1, initial_symbols)
+        self._prices = np.full((rows, self.n_cols), np.nan)
+        self._col_ts = np.zeros(self.n_cols, dtype=np.int64)
+        self._cols = 0          # 지금까지 기록한 열 수 (열 c의 위치는 c % n_cols)
+        self._last = np.full(rows, np.nan)
+        self._last_alert_ts = np.full(rows, -np.inf)
+        self._last_alert_px = np.full(rows, np.nan)
+
+        self.last_global_alert_ts: Optional[float] = None
+        self.last_global_anchor: Optional[float] = None
+        self.stats = {"evaluations": 0, "last_eval_ms": 0.0, "max_eval_ms": 0.0}
+
+    # ------------------------------------------------------------
+    # 가격 입력
+    # ------------------------------------------------------------
+    def _row(self, symbol: str) -> int:
+        idx = self._index.get(symbol)
+        if idx is not None:
+            return idx
+        idx = len(self.symbols)
+        if idx >= len(self._last):
+            self._grow()
+        self.symbols.append(symbol)
+        self._index[symbol] = idx
+        return idx
+
+    def _grow(self):
+        rows = len(self._last)
+        self._prices = np.vstack([self._prices, np.full((rows, self.n_cols), np.nan)])
+        self._last = np.concatenate([self._last, np.full(rows, np.nan)])
+        self._last_alert_ts = np.concatenate([self._last_alert_ts, np.full(rows, -np.inf)])
+        self._last_alert_px = np.concatenate([self._last_alert_px, np.full(rows, np.nan)])
+
+    def update(self, ticks: Iterable, now: float) -> None:
+        """틱 묶음(symbol, price 속성)으로 최신가를 갱신하고, sample_sec이 지났으면 새 열로 기록합니다."""
+        rows, prices = [], []
+        for tick in ticks:
+            rows.append(self._row(tick.symbol))
+            prices.append(tick.price)
+        if rows:
+            self._last[rows] = prices
+
+        now_ms = int(now * 1000)
+        if self._cols and now_ms - self._col_ts.item((self._cols - 1) % self.n_cols) < self.sample_ms:
+            return
+        c = self._cols % self.n_cols
+        self._prices[:, c] = self._last
+        self._col_ts[c] = now_ms
+        self._cols += 1
+
+    def _col_at_or_before(self, ms: int) -> Optional[int]:
+        """시각 ms 이전(포함)의 마지막 열 위치 (열 시각은 정렬된 두 구간이므로 이진 탐색)"""
+        n = min(self._cols, self.n_cols)
+        if not n:
+            return None
+        head = self._cols % self.n_cols
+        if self._cols <= self.n_cols or head == 0:
+            k = int(np.searchsorted(self._col_ts[:n], ms, side="right")) - 1
+            return k if k >= 0 else None
+        if self._col_ts.item(0) <= ms:
+            return int(np.searchsorted(self._col_ts[:head], ms, side="right")) - 1
+        k = int(np.searchsorted(self._col_ts[head:], ms, side="right")) - 1
+        return head + k if k >= 0 else None
+
+    def pct_matrix(self, now: float) -> np.ndarray:
+        """(규칙 수 × 심볼 수) 변동률 행렬, 비교할 과거 가격이 없으면 NaN"""
+        n = len(self.symbols)
+        cur = self._last[:n]
+        out = np.full((len(self.rules), n), np.nan)
+        now_ms = int(now * 1000)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for r, (minutes, _th) in enumerate(self.rules):
+                c = self._col_at_or_before(now_ms - minutes * 60_000)
+                if c is not None:
+                    ref = self._prices[:n, c]
+                    out[r] = (cur - ref) / ref * 100.0
+        return out
+
+    # ------------------------------------------------------------
+    # 평가
+    # ------------------------------------------------------------
+    def evaluate(self, now: float) -> List[UniverseAlert]:
+        """발동하는 알림만 반환하고, 심볼별/서비스 전체 쿨타임 상태를 갱신합니다."""
+        started = time.perf_counter()
+        try:
+            return self._evaluate(now)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stats["evaluations"] += 1
+            self.stats["last_eval_ms"] = elapsed
+            self.stats["max_eval_ms"] = max(self.stats["max_eval_ms"], elapsed)
+
+    def _evaluate(self, now: float) -> List[UniverseAlert]:
+        n = len(self.symbols)
+        if not n:
+            return []
+        pct = self.pct_matrix(now)
+        with np.errstate(invalid="ignore"):
+            hits = np.abs(pct) >= self._thresholds[:, None]     # NaN은 False
+        triggered = hits.any(axis=0)
+        if not triggered.any():
+            return []
+
+        # ✅ 우루루 방지: 서비스 전체 쿨타임 (대표 심볼이 마지막 알림 이후 추가로 크게 움직였으면 바이패스)
+        anchor_idx = self._index.get(self.anchor_symbol)
+        anchor_px = self._last[anchor_idx] if anchor_idx is not None else np.nan
+        g_last = self.last_global_alert_ts
+        g_ok = g_last is None or (now - g_last) >= self.cooldown_sec
+        if not g_ok and self.last_global_anchor and not np.isnan(anchor_px):
+            g_ok = abs((anchor_px - self.last_global_anchor) / self.last_global_anchor * 100.0) >= self.bypass_pct
+        if not g_ok:
+            return []
+
+        cur = self._last[:n]
+        cooldown_ok = (now - self._last_alert_ts[:n]) >= self.cooldown_sec
+        with np.errstate(divide="ignore", invalid="ignore"):
+            extra = np.abs((cur - self._last_alert_px[:n]) / self._last_alert_px[:n] * 100.0)
+            bypass_ok = extra >= self.bypass_pct
+        fire = np.flatnonzero(triggered & (cooldown_ok | bypass_ok))
+        if not len(fire):
+            return []
+
+        strength = np.nan_to_num(np.abs(pct[:, fire]) / self._thresholds[:, None], nan=0.0).max(axis=0)
+        chosen = fire[np.argsort(-strength)[: self.max_alerts]]
+        rule = hits[:, chosen].argmax(axis=0)   # 첫 번째로 돌파한 규칙 (우선순위 순)
+
+        self._last_alert_ts[chosen] = now
+        self._last_alert_px[chosen] = cur[chosen]
+        self.last_global_alert_ts = now
+        self.last_global_anchor = float(anchor_px) if not np.isnan(anchor_px) else float(cur[chosen[0]])
+
+        by_idx = dict(zip(fire.tolist(), strength.tolist()))
+        alerts = []
+        for i, r in zip(chosen.tolist(), rule.tolist()):
+            col = {m: _opt(pct[k, i]) for k, (m, _th) in enumerate(self.rules)}
+            alerts.append(UniverseAlert(
+                symbol=self.symbols[i], price=float(cur[i]),
+                pct10=col.get(10), pct15=col.get(15), pct60=col.get(60),
+                rule=int(r), strength=by_idx[i],
+            ))
+        return alerts
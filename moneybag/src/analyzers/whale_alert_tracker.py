@@ -1,71 +1,49 @@
-import os
-import pymysql
-from datetime import datetime, timedelta
+import time
+
+from common.whale_flow import WhaleFlowRollup
+
+# 전 심볼 집계 결과 재사용 시간 (뉴스레터가 코인마다 호출해도 쿼리는 한 번)
+WINDOW_CACHE_TTL_SEC = 60
+
 
 class WhaleAlertTracker:
-    def __init__(self):
+    def __init__(self, rollup: WhaleFlowRollup = None):
         # DB 연결 정보는 환경변수에서 로드됩니다.
-        pass
+        # [수정] 심볼마다 새 연결 + 원본 테이블 SUM 스캔 2회 대신,
+        # 시간별 집계 테이블(whale_flow_hourly)을 전 심볼 한 번에 조회하고 연결은 풀에서 재사용합니다.
+        self.rollup = rollup or WhaleFlowRollup()
+        self._windows = {}   # hours -> (조회 시각, {symbol: (현재 구간, 이전 구간)})
 
-    def _get_db_connection(self):
-        """
-        DB 연결 객체를 반환합니다.
-        moralis_listener.py와 동일한 로직을 사용하여 중앙 DB에 접속합니다.
-        """
+    def _volume_windows(self, hours: int):
+        cached = self._windows.get(hours)
+        if cached and time.time() - cached[0] < WINDOW_CACHE_TTL_SEC:
+            return cached[1]
+        try:
+            # 리스너가 아직 반영하지 못한 원본 행이 있으면 먼저 따라잡기 (없으면 하이워터마크 조회 1회)
+            self.rollup.catch_up()
+        except Exception as e:
+            print(f"⚠️ [WhaleAlertTracker] 집계 따라잡기 실패 (기존 집계로 조회): {e}")
         try:
-            return pymysql.connect(
-                host=os.getenv("DB_HOST"),
-                port=int(os.getenv("DB_PORT", 3306)),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                db=os.getenv("DB_NAME"),
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor
-            )
+            data = self.rollup.volume_windows(hours)
         except Exception as e:
-            print(f"❌ [WhaleAlertTracker] DB 연결 실패: {e}")
-            return None
+            print(f"⚠️ [WhaleAlertTracker] 집계 조회 실패, 원본 테이블로 직접 집계합니다: {e}")
+            try:
+                data = self.rollup.raw_volume_windows(hours)
+            except Exception as e:
+                print(f"❌ [WhaleAlertTracker] DB 쿼리 실패: {e}")
+                return None
+        self._windows[hours] = (time.time(), data)
+        return data
 
     def analyze_volume_anomaly(self, pair_future: str, hours: int = 24):
         """
-        [수정] 로컬 파일이나 ccxt 대신, 중앙 DB에서 지난 24시간 거래량을 집계하여 분석합니다.
+        [수정] 로컬 파일이나 ccxt 대신, 중앙 DB의 시간별 집계에서 지난 24시간 거래량을 그 이전 24시간과 비교합니다.
         """
         symbol = pair_future.replace('/USDT', '')
-        conn = self._get_db_connection()
-        if not conn:
+        windows = self._volume_windows(hours)
+        if windows is None:
             return None # DB 연결 실패 시 None 반환
-
-        try:
-            with conn.cursor() as cursor:
-                now = datetime.now()
-                time_threshold = now - timedelta(hours=hours)
-                
-                # 지난 24시간(현재 구간) 거래량 합계 조회
-                sql = """
-                SELECT SUM(amount_usd) as total_volume
-                FROM whale_transactions
-                WHERE symbol = %s AND timestamp >= %s
-                """
-                cursor.execute(sql, (symbol, time_threshold))
-                result = cursor.fetchone()
-                current_volume = result['total_volume'] if result and result['total_volume'] else 0
-
-                # 그 이전 24시간(비교 구간) 거래량 합계 조회
-                prev_time_threshold = time_threshold - timedelta(hours=hours)
-                sql_prev = """
-                SELECT SUM(amount_usd) as total_volume
-                FROM whale_transactions
-                WHERE symbol = %s AND timestamp >= %s AND timestamp < %s
-                """
-                cursor.execute(sql_prev, (symbol, prev_time_threshold, time_threshold))
-                result_prev = cursor.fetchone()
-                previous_volume = result_prev['total_volume'] if result_prev and result_prev['total_volume'] else 0
-        except Exception as e:
-            print(f"❌ [WhaleAlertTracker] DB 쿼리 실패: {e}")
-            return None
-        finally:
-            if conn.open:
-                conn.close()
+        current_volume, previous_volume = windows.get(symbol, (0.0, 0.0))
 
         # 거래량 급증 비율 계산
         if previous_volume == 0:
@@ -78,6 +56,15 @@ class WhaleAlertTracker:
             'vol_spike_ratio': vol_spike_ratio
         }
 
+    def get_exchange_flows(self, symbols=None):
+        """전 심볼(또는 symbols)의 1h/24h/7d 거래소 입금·출금·순유입 (시간별 집계 1회 조회)"""
+        try:
+            self.rollup.catch_up()
+            return self.rollup.flows(symbols=symbols)
+        except Exception as e:
+            print(f"❌ [WhaleAlertTracker] 거래소 흐름 조회 실패: {e}")
+            return {}
+
 # --- 테스트 실행용 ---
 if __name__ == "__main__":
     tracker = WhaleAlertTracker()
@@ -89,4 +76,6 @@ if __name__ == "__main__":
         if res:
             print(f"[{t}] 거래량 스파이크 비율: {res['vol_spike_ratio']:.2f}x")
         else:
-            print(f"[{t}] 데이터 분석 실패")
\ No newline at end of file
+            print(f"[{t}] 데이터 분석 실패")
+    for symbol, per in tracker.get_exchange_flows().items():
+        print(f"[{symbol}] " + " / ".join(f"{w} 순유입 ${v['netflow']:,.0f}" for w, v in per.items()))
@@ -0,0 +1,255 @@
+# moneybag/src/collectors/binance_stream.py
+import os
+import json
+import time
+import random
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+# websocket-client는 선택 의존성입니다. 없으면 REST 폴링만 사용합니다.
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+BINANCE_WS_BASE = os.getenv("BINANCE_WS_BASE", "wss://stream.binance.com:9443")
+BINANCE_REST_BASE = os.getenv("BINANCE_REST_BASE", "https://api.binance.com")
+BINANCE_FUTURES_WS_BASE = os.getenv("BINANCE_FUTURES_WS_BASE", "wss://fstream.binance.com")
+BINANCE_FUTURES_REST_BASE = os.getenv("BINANCE_FUTURES_REST_BASE", "https://fapi.binance.com")
+
+# 시장별 (WebSocket 주소, REST 주소, 24hr 티커 경로)
+MARKETS = {
+    "spot": (BINANCE_WS_BASE, BINANCE_REST_BASE, "/api/v3/ticker/24hr"),
+    "usdt_perp": (BINANCE_FUTURES_WS_BASE, BINANCE_FUTURES_REST_BASE, "/fapi/v1/ticker/24hr"),
+}
+
+# 마지막 메시지 이후 이 시간(초)이 지나면 스트림이 죽은 것으로 보고 REST 폴백으로 전환
+STREAM_STALE_SEC = float(os.getenv("PRICE_STREAM_STALE_SEC", "15"))
+
+
+@dataclass
+class Tick:
+    symbol: str
+    price: float
+    pct_24h: Optional[float]
+    ts: float           # 수신 시각 (epoch 초)
+    source: str         # "ws" | "rest"
+
+
+def _tick_from_payload(data, ts) -> Optional[Tick]:
+    try:
+        symbol = data["s"]
+        price = float(data["c"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    pct = data.get("P")
+    if pct is not None:
+        pct = float(pct)
+    elif data.get("o"):
+        # miniTicker에는 변동률이 없으므로 24시간 시가로 계산
+        open_price = float(data["o"])
+        pct = (price - open_price) / open_price * 100.0 if open_price else None
+    return Tick(symbol=symbol, price=price, pct_24h=pct, ts=ts, source="ws")
+
+
+def parse_stream_messages(raw) -> List[Tick]:
+    """
+    Binance combined stream 메시지(ticker / miniTicker, 전체 시장 !ticker@arr 배열 포함)를 Tick 목록으로 변환합니다.
+    예: {"stream": "btcusdt@ticker", "data": {"e": "24hrTicker", "s": "BTCUSDT", "c": "...", "P": "..."}}
+        {"stream": "!ticker@arr", "data": [{"s": "BTCUSDT", ...}, {"s": "ETHUSDT", ...}]}
+    """
+    try:
+        msg = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        data = msg.get("data", msg) if isinstance(msg, dict) else msg
+    except (ValueError, TypeError):
+        return []
+    now = time.time()
+    payloads = data if isinstance(data, list) else [data]
+    return [t for t in (_tick_from_payload(d, now) for d in payloads if isinstance(d, dict)) if t is not None]
+
+
+def parse_stream_message(raw) -> Optional[Tick]:
+    """단일 심볼 메시지용 (배열 메시지면 첫 번째 틱)"""
+    ticks = parse_stream_messages(raw)
+    return ticks[0] if ticks else None
+
+
+class BinanceTickerStream:
+    def __init__(self, symbols: Optional[Iterable[str]], on_tick: Optional[Callable[[Tick], None]] = None,
+                 stream_type: str = "ticker", ws_base: Optional[str] = None, rest_base: Optional[str] = None,
+                 stale_after: float = STREAM_STALE_SEC, market: str = "spot", quote: str = "USDT",
+                 on_batch: Optional[Callable[[List[Tick]], None]] = None):
+        """
+        Binance 시세 스트림 (combined ticker/miniTicker 구독 + 최신값 메모리 보관)
+
+        - 메시지마다 최신 가격/24h 변동률을 갱신하고 on_tick(틱별) / on_batch(메시지별 목록) 콜백을 호출합니다. (1초 이내 지연)
+        - symbols=None이면 유니버스 모드: 전체 시장 배열 스트림(!ticker@arr) 하나와 24hr 일괄 조회 한 번으로
+          quote(기본 USDT)로 끝나는 모든 심볼을 받습니다. market="usdt_perp"이면 USDT 무기한 선물 시장입니다.
+        - 연결이 끊기면 지터 포함 지수 백오프로 재연결합니다.
+        - is_live()가 False인 동안(미설치/끊김/정체)에는 호출자가 poll_rest()로 폴백합니다.
+        - ws_base를 로컬 리플레이 서버로 바꾸면 오프라인에서 녹화된 틱으로 테스트할 수 있습니다.
+        """
+        if market not in MARKETS:
+            print(f"⚠️ [Stream] 알 수 없는 시장 '{market}' (지원: {', '.join(MARKETS)}) - spot으로 대체합니다.", flush=True)
+            market = "spot"
+        default_ws, default_rest, self.rest_path = MARKETS[market]
+        self.market = market
+        self.universe = symbols is None
+        self.symbols = [] if self.universe else [s.upper() for s in symbols]
+        self._symbol_set = set(self.symbols)
+        self.quote = quote.upper()
+        self.on_tick = on_tick
+        self.on_batch = on_batch
+        self.stream_type = stream_type
+        self.ws_base = (ws_base or default_ws).rstrip("/")
+        self.rest_base = (rest_base or default_rest).rstrip("/")
+        self.stale_after = stale_after
+
+        self._latest: Dict[str, Tick] = {}
+        self._lock = threading.Lock()
+        self._last_message_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._ws = None
+        self.stats = {"messages": 0, "reconnects": 0, "rest_polls": 0}
+
+    # ------------------------------------------------------------
+    # 상태 조회
+    # ------------------------------------------------------------
+    @property
+    def available(self) -> bool:
+        return websocket is not None
+
+    def is_live(self) -> bool:
+        return self.available and (time.time() - self._last_message_at) < self.stale_after
+
+    def latest(self, symbol: str, max_age: Optional[float] = None) -> Optional[Tick]:
+        with self._lock:
+            tick = self._latest.get(symbol.upper())
+        if tick and max_age is not None and time.time() - tick.ts > max_age:
+            return None
+        return tick
+
+    def known_symbols(self) -> List[str]:
+        """지금까지 시세를 받은 심볼 목록 (유니버스 모드에서 신규 상장 포함)"""
+        with self._lock:
+            return sorted(self._latest)
+
+    def stream_url(self) -> str:
+        if self.universe:
+            streams = f"!{self.stream_type}@arr"
+        else:
+            streams = "/".join(f"{s.lower()}@{self.stream_type}" for s in self.symbols)
+        return f"{self.ws_base}/stream?streams={streams}"
+
+    def _accept(self, symbol: str) -> bool:
+        # 유니버스 모드: USDT 무기한만 (분기물 BTCUSDT_250328 등은 제외)
+        if self.universe:
+            return symbol.endswith(self.quote)
+        return symbol in self._symbol_set
+
+    # ------------------------------------------------------------
+    # 스트림 수명 주기
+    # ------------------------------------------------------------
+    def start(self):
+        if not self.available:
+            print("⚠️ [Stream] websocket-client 미설치 - REST 폴링으로만 동작합니다.", flush=True)
+            return self
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="binance-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.stream_url(),
+                on_message=lambda _ws, raw: self._on_message(raw),
+                on_error=lambda _ws, err: print(f"⚠️ [Stream] 오류: {err}", flush=True),
+            )
+            started = time.time()
+            try:
+                self._ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                print(f"⚠️ [Stream] 연결 예외: {e}", flush=True)
+            if self._stop.is_set():
+                break
+            # 한동안 정상 수신했다면 백오프를 초기화
+            attempt = 0 if time.time() - started > 60 else attempt + 1
+            delay = min(30.0, 2 ** attempt) * (0.5 + random.random())
+            self.stats["reconnects"] += 1
+            print(f"🔌 [Stream] 연결 종료, {delay:.1f}s 후 재연결 (누적 {self.stats['reconnects']}회)", flush=True)
+            self._stop.wait(delay)
+
+    def _on_message(self, raw):
+        ticks = [t for t in parse_stream_messages(raw) if self._accept(t.symbol)]
+        if not ticks:
+            return
+        self._last_message_at = ticks[0].ts
+        self._store(ticks)
+
+    def _store(self, ticks: List[Tick]):
+        with self._lock:
+            for tick in ticks:
+                self._latest[tick.symbol] = tick
+            self.stats["messages"] += 1
+        try:
+            if self.on_tick:
+                for tick in ticks:
+                    self.on_tick(tick)
+            if self.on_batch:
+                self.on_batch(ticks)
+        except Exception as e:
+            print(f"⚠️ [Stream] 틱 콜백 처리 실패: {e}", flush=True)
+
+    # ------------------------------------------------------------
+    # REST 폴백
+    # ------------------------------------------------------------
+    def poll_rest(self, symbols: Optional[List[str]] = None) -> List[Tick]:
+        """
+        24hr 티커를 한 번의 요청으로 일괄 조회하여 최신값을 갱신하고 콜백을 호출합니다.
+        (심볼마다 /ticker/price를 호출하던 방식 대체, 유니버스 모드는 전체 시장을 한 번에 조회)
+        """
+        symbols = [s.upper() for s in (symbols or self.symbols)]
+        # 선물 24hr 티커는 symbols 파라미터가 없으므로 전체를 받아 거릅니다.
+        params = {"symbols": json.dumps(symbols, separators=(",", ":"))} if symbols and self.market == "spot" else None
+        try:
+            r = requests.get(f"{self.rest_base}{self.rest_path}", params=params, timeout=10)
+            r.raise_for_status()
+            rows = r.json()
+        except Exception as e:
+            print(f"⚠️ [Price] REST 일괄 조회 실패: {e}", flush=True)
+            return []
+
+        self.stats["rest_polls"] += 1
+        now = time.time()
+        wanted = set(symbols)
+        ticks = []
+        for row in rows:
+            try:
+                tick = Tick(symbol=row["symbol"], price=float(row["lastPrice"]),
+                            pct_24h=float(row["priceChangePercent"]), ts=now, source="rest")
+            except (KeyError, ValueError, TypeError):
+                continue
+            if (tick.symbol in wanted) if wanted else self._accept(tick.symbol):
+                ticks.append(tick)
+        if ticks:
+            self._store(ticks)
+        return ticks
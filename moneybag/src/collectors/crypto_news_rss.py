@@ -1,10 +1,12 @@
-import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from email.utils import parsedate_to_datetime # RSS 날짜 파싱용
 import html
 import re
 
+from common.news_cache import news_cache
+from common.keyword_engine import keyword_engine
+
 class CryptoNewsRSS:
     def __init__(self):
         self.rss_feeds = {
@@ -19,11 +21,14 @@ class CryptoNewsRSS:
         }
         
         self.keywords = ["ETF", "SEC", "Fed", "Rate", "Binance", "BlackRock", "Regulation", "Hack", "Approval"]
+        # 키워드마다 제목/요약을 훑는 대신 공용 키워드 엔진으로 한 번에 스캔
+        keyword_engine.register("crypto_news", [(k, [k]) for k in self.keywords])
 
     def fetch_feed(self, source_name, url):
         try:
             headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=5)
+            # 공용 뉴스 수집기: 연결 재사용 + 호스트별 동시 요청 제한
+            response = news_cache.fetch_url(url, headers=headers, timeout=5)
             if response.status_code != 200: return []
 
             root = ET.fromstring(response.content)
@@ -51,10 +56,8 @@ class CryptoNewsRSS:
                 
                 summary = self._clean_html(desc) if desc else ""
                 
-                score = 0
-                for k in self.keywords:
-                    if k.lower() in title.lower(): score += 2
-                    if k.lower() in summary.lower(): score += 1
+                score = (2 * len(keyword_engine.matched_rules(title, "crypto_news"))
+                         + len(keyword_engine.matched_rules(summary, "crypto_news")))
                 
                 news_list.append({
                     "source": source_name,
@@ -74,13 +77,18 @@ class CryptoNewsRSS:
         text = re.sub(r'<[^>]+>', '', text)
         return text.strip()
 
-    def collect_all(self):
-        print(f"🌍 글로벌 뉴스 소스 {len(self.rss_feeds)}개 스캔 중...")
+    def collect_all(self, verbose=True):
+        if verbose:
+            print(f"🌍 글로벌 뉴스 소스 {len(self.rss_feeds)}개 스캔 중...")
+        # 피드들을 동시에 수집 (fetch_feed는 실패 시 빈 목록을 반환)
+        feeds = list(self.rss_feeds.items())
+        results = news_cache.map(lambda kv: self.fetch_feed(*kv), feeds)
         all_news = []
-        for name, url in self.rss_feeds.items():
-            print(f"   📡 {name}...", end=" ")
-            items = self.fetch_feed(name, url)
-            print(f"{len(items)}건")
+        for (name, _url), items in zip(feeds, results):
+            if isinstance(items, Exception):
+                items = []
+            if verbose:
+                print(f"   📡 {name}... {len(items)}건")
             all_news.extend(items)
         
         all_news.sort(key=lambda x: x['score'], reverse=True)
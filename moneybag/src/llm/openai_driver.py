@@ -3,6 +3,8 @@ import json
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from common.llm_cache import llm_cache
+
 # 환경변수 로드 (API Key)
 # 현재 위치 기준 프로젝트 루트 찾기 (moneybag/src/llm/ -> ../../../)
 from pathlib import Path
@@ -10,23 +12,24 @@ BASE_DIR = Path(__file__).resolve().parents[3]
 load_dotenv(BASE_DIR / ".env")
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key) if api_key else None
+client = OpenAI(api_key=api_key, timeout=float(os.getenv("OPENAI_TIMEOUT", "60"))) if api_key else None
 
-def _chat(system_prompt, user_prompt, model="gpt-4o-mini"):
-    """OpenAI API 호출 래퍼"""
+def _chat(system_prompt, user_prompt, model="gpt-4o-mini", use_cache=True):
+    """OpenAI API 호출 래퍼 (같은 요청은 common.llm_cache에서 재사용, 재시도 루프에서 비용 중복 방지)"""
     if not client:
         return "🚫 [오류] OpenAI API Key가 설정되지 않았습니다."
     
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
+        content = llm_cache.complete(
+            client, model,
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
+            use_cache=use_cache,
             temperature=0.7 # 창의성 조절 (0.7 정도가 적당)
         )
-        return response.choices[0].message.content.strip()
+        return content.strip()
     except Exception as e:
         return f"❌ [AI 에러] : {e}"
 
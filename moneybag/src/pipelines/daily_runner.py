@@ -8,7 +8,6 @@ now = datetime.now(ZoneInfo("Asia/Seoul"))
 
 
 import time
-import subprocess
 
 # 경로 설정
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -24,10 +23,13 @@ from moneybag.src.pipelines.generate_summary_image import SummaryImageGenerator
 from moneybag.src.pipelines.send_email import EmailSender
 from moneybag.src.pipelines.report_postprocessor import ReportPostProcessor
 from moneybag.src.utils.slack_notifier import SlackNotifier
+from common.llm_cache import llm_cache
+from common.llm_async import fan_out
 
 # [추가] S3 매니저 가져오기
 try:
     from common.s3_manager import S3Manager
+    from common.data_cache import LocalDataCache
 except ImportError:
     print("⚠️ [Import Error] common.s3_manager를 찾을 수 없습니다. (로컬 테스트 중?)")
     S3Manager = None
@@ -66,19 +68,13 @@ def run_routine(mode="morning"):
             local_data_dir = BASE_DIR / "moneybag" / "data"
             local_data_dir.mkdir(parents=True, exist_ok=True)
             
-            # S3 경로
-            s3_data_dir = f"s3://{s3.bucket_name}/moneybag/data/"
-            
-            # aws-cli를 사용하여 S3와 로컬 디렉토리 동기화 (iceage 방식과 동일)
+            # S3Manager의 병렬 동기화 엔진으로 S3와 로컬 디렉토리 동기화 (변경된 파일만 다운로드)
             # 이 명령은 whale_transactions.jsonl 및 PostProcessor에 필요한 과거 데이터 모두를 가져옵니다.
-            sync_cmd = ["aws", "s3", "sync", s3_data_dir, str(local_data_dir), "--quiet"]
-            subprocess.run(sync_cmd, check=True, timeout=300)
+            # 호스트 영구 캐시(ETag 기준)를 거쳐 새 워커에서도 변경된 객체만 실제로 전송합니다.
+            data_cache = LocalDataCache()
+            s3.sync_down("moneybag/data", str(local_data_dir), quiet=True, cache=data_cache)
+            data_cache.report("S3 Cache")
             print("   -> 동기화 완료.")
-        except FileNotFoundError:
-            # aws-cli가 설치되지 않은 로컬 환경 등에서 발생할 수 있음
-            print(f"⚠️ [S3 Sync Warning] 'aws' 명령을 찾을 수 없습니다. aws-cli가 설치되어 있는지 확인하세요.")
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️ [S3 Sync Error] 데이터 동기화 실패 (aws s3 sync): {e}")
         except Exception as e:
             print(f"⚠️ [S3 Sync Warning] 데이터 동기화 중 예외 발생 (계속 진행): {e}")
     
@@ -107,7 +103,12 @@ def run_routine(mode="morning"):
         try:
             print(f"\n1️⃣ 뉴스레터 생성 중... (시도 {attempt+1}/{max_retries})")
             # [수정] 생성된 파일 경로와 함께, 후처리에 필요한 원본 전략 리스트를 받음
-            generated_md_path, all_strategies_from_newsletter = newsletter.generate(mode)
+            if attempt == 0:
+                generated_md_path, all_strategies_from_newsletter = newsletter.generate(mode)
+            else:
+                # 재시도에서는 LLM 캐시를 읽지 않음 (검증에 실패한 같은 응답을 다시 받지 않도록, 새 응답으로 덮어씀)
+                with llm_cache.refresh():
+                    generated_md_path, all_strategies_from_newsletter = newsletter.generate(mode)
             
             # 🔍 검증
             if generated_md_path and generated_md_path.exists():
@@ -145,33 +146,25 @@ def run_routine(mode="morning"):
         print(f"⚠️ [Warning] 페널티 적용 실패 (계속 진행): {e}")
 
     # ---------------------------------------------------------
-    # 2단계: 카드뉴스 생성
-    # ---------------------------------------------------------
-    step_start_time = time.time()
-    try:
-        print("\n2️⃣ 카드뉴스 생성 중...")
-        card_factory.run() # 최신 파일을 자동으로 읽어서 처리
-        print(f"   -> ⏱️ 소요 시간: {time.time() - step_start_time:.2f}초")
-    except Exception as e:
-        print(f"⚠️ [Warning] 카드뉴스 생성 실패 (계속 진행): {e}")
-
-    # ---------------------------------------------------------
-    # 2.5단계: 커뮤니티용 요약 이미지 생성
+    # 2단계: 카드뉴스 생성 + 2.5단계: 커뮤니티용 요약 이미지 생성
     # ---------------------------------------------------------
+    # 두 작업 모두 후처리된 시크릿 노트만 입력으로 쓰고 서로 의존하지 않으므로 동시에 실행합니다.
+    # (요약 이미지의 LLM 왕복 시간 동안 카드뉴스 렌더링이 함께 진행됨)
     step_start_time = time.time()
+    side_jobs = {"카드뉴스 생성": card_factory.run} # 최신 파일을 자동으로 읽어서 처리
     # [개선] iceage와 동일하게 환경변수로 제어할 수 있도록 기능 추가
     run_summary_image_output = os.getenv("RUN_SUMMARY_IMAGE_OUTPUT", "1") == "1"
     if run_summary_image_output:
-        try:
-            print("\n2️⃣-2️⃣ 커뮤니티용 요약 이미지 생성 중...")
-            summary_image_generator = SummaryImageGenerator(mode=mode)
-            summary_image_generator.run()
-            print(f"   -> ⏱️ 소요 시간: {time.time() - step_start_time:.2f}초")
-        except Exception as e:
-            print(f"⚠️ [Warning] 요약 이미지 생성 실패 (계속 진행): {e}")
+        side_jobs["요약 이미지 생성"] = lambda: SummaryImageGenerator(mode=mode).run()
     else:
         print("[INFO] RUN_SUMMARY_IMAGE_OUTPUT!=1 이므로 요약 이미지 생성은 스킵합니다.")
 
+    print(f"\n2️⃣ {' / '.join(side_jobs)} 중...")
+    for name, result in fan_out(side_jobs, max_retries=0, timeout=None).items():
+        if isinstance(result, Exception):
+            print(f"⚠️ [Warning] {name} 실패 (계속 진행): {result}")
+    print(f"   -> ⏱️ 소요 시간: {time.time() - step_start_time:.2f}초")
+
     # ---------------------------------------------------------
     # 3단계: 이메일 발송 (경로 전달 필수!)
     # ---------------------------------------------------------
@@ -223,6 +216,7 @@ def run_routine(mode="morning"):
         except Exception as e:
             print(f"⚠️ [S3 Error] 백업 중 오류 발생: {e}")
 
+    llm_cache.report("LLM Cache")
     print(f"\n🏃 [Runner] {mode.upper()} 루틴 정상 종료! (총 소요 시간: {time.time() - routine_start_time:.2f}초)")
 
 
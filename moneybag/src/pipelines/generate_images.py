@@ -1,18 +1,21 @@
 import os
-from html2image import Html2Image
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from moneybag.src.pipelines.send_email import EmailSender
+from common.card_render import FontBook
+from common.md_image import LIGHT_THEME, MarkdownImageRenderer
+from common.media_cache import media_cache
 
 BASE_DIR = Path(__file__).resolve().parents[3]
 load_dotenv(BASE_DIR / ".env")
 
 class ImageGenerator:
     def __init__(self):
-        # 크롬 경로 자동 탐색을 위해 별도 설정 없이 시도
-        self.hti = Html2Image(output_path=str(BASE_DIR / "moneybag/data/out/images"))
-        self.email_sender = EmailSender()
+        # 크롬(Html2Image) 대신 Pillow로 바로 그림 - 브라우저 없이 동작, 이미지 높이는 내용에 맞춤
+        self.output_dir = BASE_DIR / "moneybag/data/out/images"
+        self.renderer = MarkdownImageRenderer(replace(LIGHT_THEME, width=750, background="#f4f5f7"),
+                                              FontBook(BASE_DIR / "moneybag" / "assets", "malgun.ttf"))
 
     def generate_images(self, md_file_path):
         if not os.path.exists(md_file_path): return
@@ -20,8 +23,6 @@ class ImageGenerator:
         with open(md_file_path, "r", encoding="utf-8") as f:
             md_text = f.read()
 
-        full_html = self.email_sender.convert_md_to_html(md_text)
-        
         # Summary 생성 로직 (헤드라인 + 대시보드 + 결론)
         lines = md_text.split('\n')
         summary_lines = []
@@ -40,21 +41,19 @@ class ImageGenerator:
                 summary_lines.append(line)
             elif capture:
                 summary_lines.append(line)
-        
-        summary_html = self.email_sender.convert_md_to_html("\n".join(summary_lines))
 
         filename = os.path.basename(md_file_path).replace(".md", "")
         print(f"📸 이미지 생성 중... ({filename})")
+
+        self.renderer.save(md_text, self.output_dir / f"{filename}_full.png", cache=media_cache)
+        self.renderer.save("\n".join(summary_lines), self.output_dir / f"{filename}_summary.png", cache=media_cache)
         
-        # [수정] 높이를 5000으로 대폭 늘려 잘림 방지
-        self.hti.screenshot(html_str=full_html, save_as=f"{filename}_full.png", size=(750, 5000))
-        self.hti.screenshot(html_str=summary_html, save_as=f"{filename}_summary.png", size=(750, 3000))
-        
-        print(f"✅ 이미지 생성 완료: {filename}_*.png")
+        print(f"✅ 이미지 생성 완료: {filename}_*.png ({self.renderer.report()})")
+        media_cache.report("Image Cache")
 
 if __name__ == "__main__":
     out_dir = BASE_DIR / "moneybag" / "data" / "out"
     files = sorted(out_dir.glob("SecretNote_*.md"), key=os.path.getmtime, reverse=True)
     if files:
         gen = ImageGenerator()
-        gen.generate_images(files[0])
\ No newline at end of file
+        gen.generate_images(files[0])
@@ -3,13 +3,6 @@ import os
 import sys
 import re
 from pathlib import Path
-import time
-import tempfile
-import markdown
-import requests
-import uuid
-import boto3
-from botocore.exceptions import ClientError
 # --- 경로 설정 ---
 try:
     PROJECT_ROOT = Path(__file__).resolve().parents[3]
@@ -18,6 +11,10 @@ except IndexError:
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from common.card_render import FontBook
+from common.md_image import DARK_THEME, MarkdownImageRenderer
+from common.media_cache import media_cache
+
 # --- 의존성 임포트 ---
 try:
     from moneybag.src.llm.openai_driver import _chat
@@ -36,7 +33,7 @@ class SummaryImageGenerator:
             self.ref_date = date_str_match.group(1).replace('.', '-') if date_str_match else "latest"
         else:
             self.ref_date = "unknown"
-        self.apiflash_key = os.getenv("APIFLASH_ACCESS_KEY")
+        self.renderer = MarkdownImageRenderer(DARK_THEME, FontBook(PROJECT_ROOT / "moneybag" / "assets", "malgun.ttf"))
 
         self.output_dir = PROJECT_ROOT / "moneybag" / "data" / "out" / "summary_images"
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -74,50 +71,6 @@ class SummaryImageGenerator:
             print(f"⚠️ AI 요약 중 오류 발생: {e}")
             return f"### AI 요약 중 오류 발생\n{e}"
 
-    def _wrap_in_html(self, summary_md: str) -> str:
-        """요약된 마크다운을 다크모드 이미지 렌더링용 HTML로 변환합니다."""
-        body_html = markdown.markdown(summary_md, extensions=['tables', 'fenced_code'])
-        
-        html_template = f"""
-        <!DOCTYPE html>
-        <html lang="ko">
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: 'Malgun Gothic', 'Pretendard', sans-serif;
-                    background-color: #191c24; /* 다크 배경 */
-                    color: #ebeeef; /* 밝은 텍스트 */
-                    padding: 40px;
-                    width: 720px; /* 최종 이미지 가로 800px */
-                    box-sizing: border-box;
-                }}
-                h1, h2, h3 {{ color: #ffffff; margin-bottom: 10px; }}
-                h1 {{ font-size: 36px; }}
-                h2 {{ font-size: 28px; border-bottom: 1px solid #3a3f51; padding-bottom: 5px; }}
-                h3 {{ font-size: 22px; color: #b46eff; }}
-                p, li {{ font-size: 18px; line-height: 1.7; color: #c5c8d3; }}
-                strong {{ color: #ffffff; }}
-                blockquote {{
-                    border-left: 3px solid #b46eff;
-                    background-color: #262a35;
-                    padding: 15px;
-                    margin: 20px 0;
-                    border-radius: 4px;
-                }}
-            </style>
-        </head>
-        <body>
-            {body_html}
-            <p>&nbsp;</p>
-            <p>&nbsp;</p>
-            <p>&nbsp;</p>
-            <p>&nbsp;</p>
-        </body>
-        </html>
-        """
-        return html_template
-
     def run(self):
         """메인 실행 흐름"""
         print(f"🚀 '{self.service_name}' 요약 이미지 생성을 시작합니다. (모드: {self.mode})")
@@ -126,79 +79,17 @@ class SummaryImageGenerator:
             print(f"❌ 원본 뉴스레터 파일을 찾을 수 없습니다. (모드: {self.mode})")
             return
         
-        if not self.apiflash_key:
-            print("❌ APIFLASH_ACCESS_KEY 환경변수가 설정되지 않았습니다. 이미지 생성을 건너뜁니다.")
-            return
-
-        # [디버깅] 실제로 사용하려는 키가 무엇인지 안전하게 로깅
-        key_to_log = f"{self.apiflash_key[:4]}...{self.apiflash_key[-4:]}" if self.apiflash_key and len(self.apiflash_key) > 8 else "Invalid or short key"
-        print(f"🔑 Using ApiFlash Key: {key_to_log}")
-
         md_content = self.md_path.read_text(encoding='utf-8')
         summary_md = self._summarize_with_llm(md_content)
-        summary_html = self._wrap_in_html(summary_md)
-
-        print("📸 ApiFlash API를 사용하여 요약본을 이미지로 변환 중입니다...")
-        
-        local_temp_path = None
-        s3_temp_key = None
-        bucket_name = "fincore-output-storage"
-        s3_client = boto3.client('s3')
 
+        # 외부 스크린샷 API(ApiFlash) 대신 Pillow로 바로 그림 (네트워크·브라우저 불필요)
         try:
-            # 1. 로컬에 임시 HTML 파일 생성
-            with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.html', encoding='utf-8') as temp_f:
-                temp_f.write(summary_html)
-                local_temp_path = temp_f.name
-            
-            # 2. S3에 비공개로 업로드 (ContentType 명시)
-            unique_id = uuid.uuid4()
-            s3_temp_key = f"moneybag/temp_html/{self.ref_date}_{self.mode}_{unique_id}.html"
-            s3_client.upload_file(
-                local_temp_path, bucket_name, s3_temp_key,
-                ExtraArgs={'ContentType': 'text/html; charset=utf-8'}
-            )
-            print(f"☁️ [Upload] 임시 HTML 비공개 업로드 완료: {s3_temp_key}")
-
-            # 3. S3 객체에 대한 Pre-signed URL 생성 (유효시간 5분)
-            presigned_url = s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': bucket_name, 'Key': s3_temp_key},
-                ExpiresIn=300
-            )
-            print(f"🌍 생성된 임시 URL (pre-signed): {presigned_url[:100]}...")
-
-            # 4. API 파라미터 구성 및 호출
-            params = {
-                "access_key": self.apiflash_key,
-                "url": presigned_url,
-                "format": "png", "fresh": True, "width": 800,
-            }
-            response = requests.get("https://api.apiflash.com/v1/urltoimage", params=params, timeout=90)
-
-            # 5. 결과 처리
-            if response.status_code == 200 and response.content:
-                output_filename = f"WhaleHunter_Summary_{self.ref_date}_{self.mode}.png"
-                local_image_path = self.output_dir / output_filename
-                with open(local_image_path, "wb") as f:
-                    f.write(response.content)
-                print(f"✅ 로컬에 이미지 저장 완료: {local_image_path}")
-            else:
-                error_message = response.text
-                raise Exception(f"ApiFlash 오류 (Status: {response.status_code}): {error_message}")
+            output_path = self.output_dir / f"WhaleHunter_Summary_{self.ref_date}_{self.mode}.png"
+            local_image_path = self.renderer.save(summary_md, output_path, cache=media_cache)
+            print(f"✅ 로컬에 이미지 저장 완료: {local_image_path} ({self.renderer.report()})")
+            media_cache.report("Image Cache")
         except Exception as e:
             print(f"❌ 이미지 생성 프로세스 중 오류 발생: {e}")
-        finally:
-            # 6. 임시 파일 정리
-            if s3_temp_key:
-                try:
-                    s3_client.delete_object(Bucket=bucket_name, Key=s3_temp_key)
-                    print(f"🧹 임시 S3 파일 삭제 완료: {s3_temp_key}")
-                except Exception as e:
-                    print(f"⚠️ 임시 HTML 파일 삭제 실패: {e}")
-            if local_temp_path and os.path.exists(local_temp_path):
-                os.remove(local_temp_path)
-                print(f"🧹 임시 로컬 파일 삭제 완료: {local_temp_path}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
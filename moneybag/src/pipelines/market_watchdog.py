@@ -3,11 +3,11 @@ import os
 import sys
 import time
 import json
+import queue
 import signal
 from dataclasses import dataclass
 import re
 from datetime import datetime, timedelta
-from collections import deque
 from zoneinfo import ZoneInfo
 from typing import Optional, Tuple, List, Dict, Set
 
@@ -21,7 +21,16 @@ TZ = ZoneInfo("Asia/Seoul")
 
 SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"]
 
-POLL_INTERVAL_SEC = 10
+# 유니버스 모드: "usdt_perp"이면 위 SYMBOLS 대신 USDT 무기한 선물 전 종목을 감시 (빈 값이면 비활성)
+WATCH_UNIVERSE = os.getenv("MONEYBAG_WATCH_UNIVERSE", "").strip().lower()
+
+POLL_INTERVAL_SEC = 10  # REST 폴백 주기 (스트림이 살아있으면 사용하지 않음)
+
+# 가격 스트림 사용 여부 (0이면 예전처럼 REST 폴링만 사용)
+USE_PRICE_STREAM = os.getenv("MONEYBAG_PRICE_STREAM", "1") == "1"
+
+# 심볼별 가격 이력 크기 (스트림 1초 틱 기준 60분 윈도우 + 여유분)
+HIST_CAPACITY = 4096
 
 # “의미 있는 움직임” 기준 (15분 / 60분)
 TH_15M_PCT = 1.5     # 예: 0.8% 이상이면 알림 고려
@@ -30,6 +39,13 @@ TH_60M_PCT = 3.0     # 예: 2.5% 이상이면 알림 고려
 # 10분 급가속(추세 가속) 기준
 ACCEL_10M_PCT = 2.0  # 예: 10분에 1.2% 이상이면 “급가속” 알림
 
+# (윈도우 분, 기준 %, 사유) - 위에서부터 우선 적용
+ALERT_RULES = [
+    (10, ACCEL_10M_PCT, "10분 급가속"),
+    (15, TH_15M_PCT, "15분 급변"),
+    (60, TH_60M_PCT, "60분 급변"),
+]
+
 # 같은 심볼 연속 알림 쿨타임 (기본 30분)
 COOLDOWN_MIN = 30
 
@@ -41,6 +57,12 @@ COOLDOWN_BYPASS_PCT = 2.0
 BRIEF_TIMES = ["09:00", "15:00", "21:00"]
 BRIEF_USE_LLM = False
 BRIEF_ON_START = False
+
+# 감시 루프 주기 / 알림 파이프라인 지표 출력 간격(초)
+STATS_EVERY_SEC = 600
+
+# 뉴스 캐시 TTL(초) - 백그라운드에서 미리 갱신하므로 알림 시점에는 메모리에서 바로 읽음
+NEWS_TTL_SEC = 300
 # ---------------------------------------------------------------------
 
 
@@ -107,6 +129,13 @@ try:
 except Exception:
     _chat = None
 
+from moneybag.src.collectors.binance_stream import BinanceTickerStream
+from common.price_ring import PriceRingBuffer
+from common.alert_pipeline import AlertPipeline, CadenceMonitor
+from common.news_cache import news_cache
+from common.telegram_outbox import get_outbox
+from moneybag.src.analyzers.universe_scanner import UniverseAlertScanner
+
 
 
 @dataclass
@@ -118,14 +147,8 @@ class TelegramClient:
         if not self.token or not self.chat_id:
             print("❌ [Telegram] token/chat_id 비어있음", flush=True)
             return
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        payload = {"chat_id": self.chat_id, "text": text, "disable_web_page_preview": True}
-        try:
-            r = requests.post(url, json=payload, timeout=15)
-            if r.status_code != 200:
-                print(f"❌ [Telegram Error] status={r.status_code} body={r.text[:200]}", flush=True)
-        except Exception as e:
-            print(f"❌ [Telegram Exception] {e}", flush=True)
+        # 토큰별 발신 대기열에 넣고 바로 반환 (속도 제한·429 재시도·스풀은 대기열 워커가 처리)
+        get_outbox(self.token).send(self.chat_id, text, disable_preview=True)
 
 
 class MarketWatchdog:
@@ -138,8 +161,10 @@ class MarketWatchdog:
 
 
         self.news = CryptoNewsRSS() if CryptoNewsRSS else None
+        if self.news:
+            news_cache.register("crypto_rss", lambda: self.news.collect_all(verbose=False), ttl_sec=NEWS_TTL_SEC)
 
-        self.price_hist = {s: deque(maxlen=1200) for s in SYMBOLS}
+        self.price_hist = {s: PriceRingBuffer(HIST_CAPACITY, windows=(600, 900, 3600)) for s in SYMBOLS}
         self.last_alert_time = {s: None for s in SYMBOLS}
         self.last_alert_price = {s: None for s in SYMBOLS}
 
@@ -153,6 +178,22 @@ class MarketWatchdog:
         self.last_global_alert_time = None
         self.last_global_alert_anchor = None  # 기준 가격(대표 심볼 가격)
 
+        # 알림 부수 작업(뉴스/LLM/텔레그램)은 워커에서 처리하고, 감시 루프는 이벤트만 넘깁니다.
+        self.alerts = AlertPipeline("Moneybag", compose=self._compose, send=self.tg.send)
+        self.cadence = CadenceMonitor(expected_sec=1.0)
+
+        # 시세 피드: 스트림 스레드가 메시지 단위 틱 묶음을 큐에 넣고, 메인 루프가 꺼내 알림을 평가합니다. (상태는 메인 스레드만 변경)
+        self._ticks = queue.Queue()
+        if WATCH_UNIVERSE:
+            # 전 종목: 배열 스트림 하나(REST 폴백도 일괄 조회 한 번) + 심볼 × 시간 행렬 벡터 평가
+            self.feed = BinanceTickerStream(None, market=WATCH_UNIVERSE, on_batch=self._ticks.put)
+            self.scanner = UniverseAlertScanner(
+                [(m, th) for m, th, _ in ALERT_RULES], cooldown_min=COOLDOWN_MIN, bypass_pct=COOLDOWN_BYPASS_PCT,
+            )
+        else:
+            self.feed = BinanceTickerStream(SYMBOLS, on_batch=self._ticks.put)
+            self.scanner = None
+
     def _on_stop(self, *_):
         self._stop = True
 
@@ -169,6 +210,17 @@ class MarketWatchdog:
             print(f"⚠️ [Price] {symbol} 조회 실패: {e}", flush=True)
             return None
 
+    def _current_price(self, symbol: str) -> Optional[float]:
+        """피드에 신선한 값이 있으면 그대로 사용하고, 없을 때만 REST로 조회합니다."""
+        tick = self.feed.latest(symbol, max_age=self.feed.stale_after)
+        return tick.price if tick else self._binance_price(symbol)
+
+    def _current_24h(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
+        tick = self.feed.latest(symbol, max_age=self.feed.stale_after)
+        if tick and tick.pct_24h is not None:
+            return tick.price, tick.pct_24h
+        return self._binance_24h(symbol)
+
     def _binance_24h(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
         url = "https://api.binance.com/api/v3/ticker/24hr"
         try:
@@ -180,20 +232,7 @@ class MarketWatchdog:
             return None, None
 
     def _pct_over_minutes(self, symbol: str, minutes: int) -> Optional[float]:
-        hist = self.price_hist[symbol]
-        if len(hist) < 2:
-            return None
-        target_ts = self._now() - timedelta(minutes=minutes)
-        old_price = None
-        for ts, p in hist:
-            if ts <= target_ts:
-                old_price = p
-            else:
-                break
-        if old_price is None:
-            return None
-        cur_price = hist[-1][1]
-        return ((cur_price - old_price) / old_price) * 100.0
+        return self.price_hist[symbol].pct_change(minutes * 60, now=self._now())
 
     def _should_brief_now(self) -> List[str]:
         now = self._now()
@@ -211,7 +250,7 @@ class MarketWatchdog:
         now = self._now().strftime("%Y-%m-%d %H:%M")
         lines = [f"🟨 {SERVICE_NAME} 정기 브리핑 ({now} KST)"]
         for sym in SYMBOLS:
-            p, chg24 = self._binance_24h(sym)
+            p, chg24 = self._current_24h(sym)
             if p is None:
                 continue
             if chg24 is None:
@@ -237,7 +276,7 @@ class MarketWatchdog:
         if not self.news:
             return "뉴스 수집기가 없습니다."
         try:
-            items = self.news.fetch(limit=5)
+            items = news_cache.get("crypto_rss")
             summaries = []
             for item in items[:3]:
                 title = item.get("title", "제목 없음")
@@ -273,134 +312,202 @@ class MarketWatchdog:
             lines += ["", "🤖 AI 코멘트", llm_comment.strip()]
         return "\n".join(lines)
 
+    def _housekeeping(self, hb_path: Optional[str]) -> None:
+        """Heartbeat 갱신 + 정기 브리핑 (1초에 한 번)"""
+        # ✅ Heartbeat 갱신 (나 살아있음)
+        if hb_path:
+            try:
+                with open(hb_path, 'a'):
+                    os.utime(hb_path, None)
+            except Exception:
+                pass
+
+        # (A) 정기 브리핑 (작성/전송은 알림 파이프라인에서)
+        for t in self._should_brief_now():
+            self.alerts.submit(f"brief:{t}", {"kind": "brief"})
+            self._mark_brief_sent(t)
+
+    def _compose(self, event: dict) -> str:
+        """알림 파이프라인 워커에서 실행: 이벤트를 텔레그램 메시지로 작성"""
+        if event["kind"] == "brief":
+            return self._compose_brief()
+        return self._compose_alert(event)
+
+    def _compose_brief(self) -> str:
+        msg = self._format_brief()
+        if BRIEF_USE_LLM and _chat:
+            try:
+                # [수정] AI 프롬프트 개선
+                system = "너는 'The Whale Hunter'의 시장 브리핑 작성자다. 투자 조언 금지. 요약만."
+                user = "아래 암호화폐 시장(24h 변동) 및 최신 뉴스 정보를 바탕으로, 현재 시장 상황을 한 문단으로 요약해줘.\n" + msg
+                msg += "\n\n🤖 AI 요약\n" + (_chat(system, user) or "")
+            except Exception:
+                pass
+        return msg
+
+    def _on_price(self, sym: str, price: float, now: datetime) -> None:
+        """(B) 가격 업데이트 + 알림 체크 (틱마다 호출)"""
+        if sym not in self.price_hist:
+            return
+        self.price_hist[sym].append(now, price)
+
+        pct10 = self._pct_over_minutes(sym, 10)
+        pct15 = self._pct_over_minutes(sym, 15)
+        pct60 = self._pct_over_minutes(sym, 60)
+
+        pcts = {10: pct10, 15: pct15, 60: pct60}
+        reason = None
+        for minutes, th, label in ALERT_RULES:
+            pct = pcts.get(minutes)
+            if pct is not None and abs(pct) >= th:
+                reason = f"{label}(≥ {th:.2f}%)"
+                break
+
+        if not reason:
+            return
+
+        last_t = self.last_alert_time.get(sym)
+        last_p = self.last_alert_price.get(sym)
+        cooldown_ok = (last_t is None) or ((now - last_t) >= timedelta(minutes=COOLDOWN_MIN))
+
+        bypass_ok = False
+        if not cooldown_ok and last_p:
+            extra_move = ((price - last_p) / last_p) * 100.0
+            if abs(extra_move) >= COOLDOWN_BYPASS_PCT:
+                bypass_ok = True
+
+        # ✅ 우루루 방지: 서비스 전체 쿨타임
+        g_last_t = self.last_global_alert_time
+        g_last_p = self.last_global_alert_anchor
+        g_cooldown_ok = (g_last_t is None) or ((now - g_last_t) >= timedelta(minutes=COOLDOWN_MIN))
+
+        g_bypass_ok = False
+        if not g_cooldown_ok and g_last_p:
+            # 버그 수정: 글로벌 바이패스는 대표 심볼(BTC) 기준으로 계산
+            btc_price = self._current_price("BTCUSDT")
+            if btc_price:
+                extra_move_global = ((btc_price - g_last_p) / g_last_p) * 100.0
+                if abs(extra_move_global) >= COOLDOWN_BYPASS_PCT:
+                    g_bypass_ok = True
+
+        if not (g_cooldown_ok or g_bypass_ok):
+            return
+
+        if cooldown_ok or bypass_ok:
+            self._send_alert(sym, price, pct10, pct15, pct60, reason)
+
+            # (기존) 심볼별 마지막 알림 기록
+            self.last_alert_time[sym] = now
+            self.last_alert_price[sym] = price
+
+            # ✅ (추가) 서비스 전체 마지막 알림 기록 (우루루 방지)
+            self.last_global_alert_time = now
+            self.last_global_alert_anchor = self._current_price("BTCUSDT") or price # 기준은 BTC, 실패 시 현재가
+
+    def _on_universe(self, ticks, now: datetime) -> None:
+        """(B') 유니버스 모드: 틱 묶음을 행렬에 반영하고 발동한 알림만 전송 (쿨타임 상태는 scanner가 관리)"""
+        ts = now.timestamp()
+        self.scanner.update(ticks, ts)
+        for alert in self.scanner.evaluate(ts):
+            _minutes, th, label = ALERT_RULES[alert.rule]
+            self._send_alert(alert.symbol, alert.price, alert.pct10, alert.pct15, alert.pct60, f"{label}(≥ {th:.2f}%)")
+
+    def _send_alert(self, sym: str, price: float, pct10: Optional[float], pct15: Optional[float],
+                    pct60: Optional[float], reason: str) -> None:
+        """알림 이벤트를 파이프라인에 넘기고 바로 반환 (같은 심볼의 미처리 이벤트는 최신 값으로 병합)"""
+        self.alerts.submit(sym, {"kind": "alert", "sym": sym, "price": price,
+                                 "pct10": pct10, "pct15": pct15, "pct60": pct60, "reason": reason})
+
+    def _compose_alert(self, event: dict) -> str:
+        """뉴스 수집 + AI 코멘트 + 메시지 작성"""
+        sym, price, reason = event["sym"], event["price"], event["reason"]
+        pct10, pct15, pct60 = event["pct10"], event["pct15"], event["pct60"]
+        extra_news = self._collect_news()
+
+        # --- AI 프롬프트 생성 ---
+        _p, p24h = self._current_24h(sym)
+        prompt_lines = [
+            "아래 정보를 바탕으로 현재 암호화폐 시장 상황을 3~5줄로 간결하게 설명해줘. 너는 'The Whale Hunter'의 시장 관측 애널리스트이며, 투자 조언이 아니라 시장 상황에 대한 건조한 설명만 제공해야 해.",
+            "뉴스 내용과 코인 가격 움직임을 연관지어 설명하면 좋아.",
+            "---",
+            f"- 심볼: {sym}",
+            f"- 현재가: {price:,.4f}",
+            f"- 알림 사유: {reason}"
+        ]
+        if p24h is not None:
+            prompt_lines.append(f"- 24시간 변동: {p24h:+.2f}%")
+        if pct10 is not None:
+            prompt_lines.append(f"- 10분 변동: {pct10:+.2f}%")
+        if pct15 is not None:
+            prompt_lines.append(f"- 15분 변동: {pct15:+.2f}%")
+        if pct60 is not None:
+            prompt_lines.append(f"- 60분 변동: {pct60:+.2f}%")
+        if extra_news:
+            prompt_lines.append(f"- 관련 뉴스:\n{extra_news}")
+        prompt_lines.append("---")
+
+        llm_comment = self._maybe_llm("\n".join(prompt_lines))
+        # --- AI 프롬프트 생성 끝 ---
+
+        return self._format_alert(sym, price, pct15, pct60, pct10, reason, extra_news, llm_comment)
+
     def run_forever(self):
         print("🦅 [System] Moneybag(=The Whale Hunter) Watchdog 시작", flush=True)
 
         # Heartbeat 파일 경로 (watchdogs.py 매니저가 감시함)
         hb_path = os.getenv("MONEYBAG_HEARTBEAT_PATH")
 
+        if USE_PRICE_STREAM:
+            self.feed.start()
+
+        self.alerts.start()
+        if self.news:
+            news_cache.start_refresher()
         if BRIEF_ON_START and not self._startup_brief_sent:
-            self.tg.send(self._format_brief())
+            self.alerts.submit("brief:start", {"kind": "brief"})
             self._startup_brief_sent = True
 
-        while not self._stop:
-            # ✅ Heartbeat 갱신 (나 살아있음)
-            if hb_path:
-                try:
-                    with open(hb_path, 'a'):
-                        os.utime(hb_path, None)
-                except Exception:
-                    pass
-
-            now = self._now()
-
-            # (A) 정기 브리핑
-            for t in self._should_brief_now():
-                msg = self._format_brief()
-                if BRIEF_USE_LLM and _chat:
-                    try:
-                        # [수정] AI 프롬프트 개선
-                        system = "너는 'The Whale Hunter'의 시장 브리핑 작성자다. 투자 조언 금지. 요약만."
-                        user = "아래 암호화폐 시장(24h 변동) 및 최신 뉴스 정보를 바탕으로, 현재 시장 상황을 한 문단으로 요약해줘.\n" + msg
-                        msg += "\n\n🤖 AI 요약\n" + (_chat(system, user) or "")
-                    except Exception:
-                        pass
-                self.tg.send(msg)
-                self._mark_brief_sent(t)
-
-            # (B) 가격 업데이트 + 알림 체크
-            for sym in SYMBOLS:
-                price = self._binance_price(sym)
-                if price is None:
-                    continue
-
-                self.price_hist[sym].append((now, price))
-
-                pct10 = self._pct_over_minutes(sym, 10)
-                pct15 = self._pct_over_minutes(sym, 15)
-                pct60 = self._pct_over_minutes(sym, 60)
-
-                reason = None
-                if pct10 is not None and abs(pct10) >= ACCEL_10M_PCT:
-                    reason = f"10분 급가속(≥ {ACCEL_10M_PCT:.2f}%)"
-                elif pct15 is not None and abs(pct15) >= TH_15M_PCT:
-                    reason = f"15분 급변(≥ {TH_15M_PCT:.2f}%)"
-                elif pct60 is not None and abs(pct60) >= TH_60M_PCT:
-                    reason = f"60분 급변(≥ {TH_60M_PCT:.2f}%)"
+        last_housekeeping = 0.0
+        last_stats = time.monotonic()
+        last_rest_poll = 0.0
+        was_live = False
+        try:
+            while not self._stop:
+                mono = time.monotonic()
+                if mono - last_housekeeping >= 1.0:
+                    self.cadence.mark()
+                    self._housekeeping(hb_path)
+                    last_housekeeping = mono
+                    mode = "stream" if self.feed.is_live() else "REST"
+                    if self.scanner is not None:
+                        mode += f", {len(self.scanner.symbols)}개 심볼 / 평가 {self.scanner.stats['last_eval_ms']:.1f}ms"
+                    print(f"\r👀 Moneybag 감시 중... ({self._now().strftime('%H:%M:%S')}, {mode})", end="", flush=True)
+                    if mono - last_stats >= STATS_EVERY_SEC:
+                        print(f"\n📊 [Watchdog] {self.cadence.report()} / {self.alerts.report()} / {news_cache.report()}", flush=True)
+                        last_stats = mono
+
+                # 스트림이 끊기거나 정체되면 REST 일괄 조회로 자동 폴백
+                live = USE_PRICE_STREAM and self.feed.is_live()
+                if live != was_live:
+                    print(f"\n🔀 [Feed] {'스트림 수신 중' if live else 'REST 폴링으로 전환'}", flush=True)
+                    was_live = live
+                if not live and mono - last_rest_poll >= POLL_INTERVAL_SEC:
+                    self.feed.poll_rest()
+                    last_rest_poll = mono
 
-                if not reason:
+                try:
+                    ticks = self._ticks.get(timeout=1.0)
+                except queue.Empty:
                     continue
-
-                last_t = self.last_alert_time.get(sym)
-                last_p = self.last_alert_price.get(sym)
-                cooldown_ok = (last_t is None) or ((now - last_t) >= timedelta(minutes=COOLDOWN_MIN))
-
-                bypass_ok = False
-                if not cooldown_ok and last_p:
-                    extra_move = ((price - last_p) / last_p) * 100.0
-                    if abs(extra_move) >= COOLDOWN_BYPASS_PCT:
-                        bypass_ok = True
-
-                # ✅ 우루루 방지: 서비스 전체 쿨타임
-                g_last_t = self.last_global_alert_time
-                g_last_p = self.last_global_alert_anchor
-                g_cooldown_ok = (g_last_t is None) or ((now - g_last_t) >= timedelta(minutes=COOLDOWN_MIN))
-
-                g_bypass_ok = False
-                if not g_cooldown_ok and g_last_p:
-                    # 버그 수정: 글로벌 바이패스는 대표 심볼(BTC) 기준으로 계산
-                    btc_price = self._binance_price("BTCUSDT")
-                    if btc_price:
-                        extra_move_global = ((btc_price - g_last_p) / g_last_p) * 100.0
-                        if abs(extra_move_global) >= COOLDOWN_BYPASS_PCT:
-                            g_bypass_ok = True
-
-                if not (g_cooldown_ok or g_bypass_ok):
+                if self.scanner is not None:
+                    self._on_universe(ticks, datetime.fromtimestamp(ticks[0].ts, TZ))
                     continue
-                
-                if cooldown_ok or bypass_ok:
-                    extra_news = self._collect_news()
-                    
-                    # --- AI 프롬프트 생성 ---
-                    _p, p24h = self._binance_24h(sym)
-                    prompt_lines = [
-                        "아래 정보를 바탕으로 현재 암호화폐 시장 상황을 3~5줄로 간결하게 설명해줘. 너는 'The Whale Hunter'의 시장 관측 애널리스트이며, 투자 조언이 아니라 시장 상황에 대한 건조한 설명만 제공해야 해.",
-                        "뉴스 내용과 코인 가격 움직임을 연관지어 설명하면 좋아.",
-                        "---",
-                        f"- 심볼: {sym}",
-                        f"- 현재가: {price:,.4f}",
-                        f"- 알림 사유: {reason}"
-                    ]
-                    if p24h is not None:
-                        prompt_lines.append(f"- 24시간 변동: {p24h:+.2f}%")
-                    if pct10 is not None:
-                        prompt_lines.append(f"- 10분 변동: {pct10:+.2f}%")
-                    if pct15 is not None:
-                        prompt_lines.append(f"- 15분 변동: {pct15:+.2f}%")
-                    if pct60 is not None:
-                        prompt_lines.append(f"- 60분 변동: {pct60:+.2f}%")
-                    if extra_news:
-                        prompt_lines.append(f"- 관련 뉴스:\n{extra_news}")
-                    prompt_lines.append("---")
-                    
-                    llm_comment = self._maybe_llm("\n".join(prompt_lines))
-                    # --- AI 프롬프트 생성 끝 ---
-
-                    alert_msg = self._format_alert(sym, price, pct15, pct60, pct10, reason, extra_news, llm_comment)
-
-                    self.tg.send(alert_msg)
-
-                    # (기존) 심볼별 마지막 알림 기록
-                    self.last_alert_time[sym] = now
-                    self.last_alert_price[sym] = price
-
-                    # ✅ (추가) 서비스 전체 마지막 알림 기록 (우루루 방지)
-                    self.last_global_alert_time = now
-                    self.last_global_alert_anchor = self._binance_price("BTCUSDT") or price # 기준은 BTC, 실패 시 현재가
-
-
-            print(f"\r👀 Moneybag 감시 중... ({self._now().strftime('%H:%M:%S')})", end="", flush=True)
-            time.sleep(POLL_INTERVAL_SEC)
+                for tick in ticks:
+                    self._on_price(tick.symbol, tick.price, datetime.fromtimestamp(tick.ts, TZ))
+        finally:
+            self.feed.stop()
+            self.alerts.shutdown()
+            print(f"\n📊 [Watchdog] {self.cadence.report()} / {self.alerts.report()} / {news_cache.report()}", flush=True)
 
 
 def main():
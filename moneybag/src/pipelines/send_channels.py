@@ -1,7 +1,14 @@
 import os
-import requests
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+BASE_DIR = Path(__file__).resolve().parents[3]
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from common.telegram_outbox import get_outbox
+
 # 환경변수 로드 (안전을 위해 추가)
 load_dotenv()
 
@@ -18,25 +25,13 @@ class TelegramSender:
         if not self.chat_id:
             print("❌ [TelegramSender] 초기화 실패: Chat ID가 없습니다.")
         
-        # URL 생성
-        if self.token:
-            self.base_url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        else:
-            self.base_url = ""
+        # 토큰별 공용 발신 대기열 (속도 제한·재시도·스풀은 common.telegram_outbox가 담당)
+        self.outbox = get_outbox(self.token) if self.token else None
 
     def send_message(self, text):
-        if not self.token or not self.chat_id:
+        if not self.outbox or not self.chat_id:
             print("❌ [Telegram] 전송 불가: 토큰/ID 누락")
             return
 
-        payload = {
-            "chat_id": self.chat_id,
-            "text": text,
-            "parse_mode": "Markdown"
-        }
-        try:
-            resp = requests.post(self.base_url, json=payload, timeout=5)
-            if resp.status_code != 200:
-                print(f"❌ [Telegram Error] {resp.text}")
-        except Exception as e:
-            print(f"❌ [Telegram Exception] {e}")
\ No newline at end of file
+        # 대기열에 넣고 바로 반환 (전송 실패·429는 워커가 재시도, 프로세스 종료 시 남은 메시지를 보내고 끝남)
+        self.outbox.send(self.chat_id, text, parse_mode="Markdown", disable_preview=False)
@@ -1,15 +1,9 @@
 import os
 import markdown
-import time
-import math
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
 from dotenv import load_dotenv
-from sendgrid import SendGridAPIClient
-# 👇 [수정] Personalization 및 Substitution 모듈 추가
-from sendgrid.helpers.mail import Mail, To, Personalization, Substitution
-from itsdangerous import URLSafeTimedSerializer
 import re
 # [추가] SSH 터널링 라이브러리
 try:
@@ -21,8 +15,16 @@ except ImportError:
 BASE_DIR = Path(__file__).resolve().parents[3]
 load_dotenv(BASE_DIR / ".env")
 
+from common.email_dispatcher import SendGridDispatcher, iter_subscriber_pages
+from common.newsletter_render import render_cached
+
 OUTPUT_DIR = BASE_DIR / "moneybag" / "data" / "out"
 
+# 이메일 템플릿(_wrap_body_in_template)/마크다운 전처리를 바꾸면 올려서 렌더링 캐시를 무효화합니다.
+TEMPLATE_VERSION = "1"
+
+SUBSCRIBER_SQL = "SELECT email FROM subscribers WHERE is_active=1 AND is_moneybag=1"
+
 class EmailSender:
     def __init__(self):
         self.api_key = os.getenv("SENDGRID_API_KEY")
@@ -30,20 +32,16 @@ class EmailSender:
         sender_addr = os.getenv("MONEYBAG_SENDER_ADDRESS", "admin@fincore.co.kr")
         self.from_email = f"{sender_name} <{sender_addr}>"
         
-        # [추가] 구독 취소 토큰 생성을 위한 Serializer (SECRET_KEY는 application.py와 동일해야 함)
-        secret_key = os.getenv('SECRET_KEY', 'a-very-secret-key-that-is-secure')
-        self.serializer = URLSafeTimedSerializer(secret_key)
-        
-        # 실제 구독자 리스트 가져오기
-        self.to_emails = self._fetch_subscribers_from_db() 
+        # 수신자 목록. None이면 발송 시점에 DB에서 스트리밍합니다. (테스트 발송 시 리스트로 덮어씀)
+        self.to_emails = None
 
-    def _fetch_subscribers_from_db(self):
-        """DB에서 구독자 이메일 리스트를 가져옵니다."""
+    def _iter_subscribers_from_db(self):
+        """DB에서 구독자 이메일을 페이지 단위로 읽어 내보냅니다. (발송 백오프 중 결과셋을 열어두지 않음)"""
         try:
             import pymysql
         except ImportError:
             print("⚠️ [EmailSender] pymysql 모듈이 설치되지 않았습니다.")
-            return []
+            return
 
         # [추가] SSH 터널링 사용 여부 결정
         use_ssh_tunnel = os.getenv("USE_SSH_TUNNEL", "0") == "1"
@@ -54,6 +52,7 @@ class EmailSender:
         db_password = os.getenv("DB_PASSWORD")
         db_name = os.getenv("DB_NAME")
 
+        count = 0  # 이미 내보낸 구독자 수 (0일 때만 테스트 수신자로 폴백)
         try:
             # SSH 터널링을 사용하는 경우
             if use_ssh_tunnel and SSHTunnelForwarder:
@@ -76,30 +75,39 @@ class EmailSender:
                     conn = pymysql.connect(
                         host='127.0.0.1', port=tunnel.local_bind_port,
                         user=db_user, password=db_password,
-                        db=db_name, charset='utf8mb4', cursorclass=pymysql.cursors.SSDictCursor
+                        db=db_name, charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor
                     )
-                    with conn.cursor() as cursor:
-                        cursor.execute("SELECT email FROM subscribers WHERE is_active=1 AND is_moneybag=1")
-                        emails = [row['email'] for row in cursor]
-                        print(f"✅ [DB Load] 구독자 {len(emails)}명 조회 성공 (SSH 터널 경유)")
-                        return emails
+                    try:
+                        for email in iter_subscriber_pages(conn, SUBSCRIBER_SQL):
+                            count += 1
+                            yield email
+                    finally:
+                        conn.close()
+                    print(f"✅ [DB Load] 구독자 {count}명 조회 성공 (SSH 터널 경유)")
             else:
                 # 기존 직접 연결 방식
                 conn = pymysql.connect(
                     host=db_host, port=db_port,
                     user=db_user, password=db_password,
-                    db=db_name, charset='utf8mb4', cursorclass=pymysql.cursors.SSDictCursor
+                    db=db_name, charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor
                 )
-                with conn.cursor() as cursor:
-                    cursor.execute("SELECT email FROM subscribers WHERE is_active=1 AND is_moneybag=1")
-                    emails = [row['email'] for row in cursor]
-                    print(f"✅ [DB Load] 구독자 {len(emails)}명 조회 성공")
-                    return emails
+                try:
+                    for email in iter_subscriber_pages(conn, SUBSCRIBER_SQL):
+                        count += 1
+                        yield email
+                finally:
+                    conn.close()
+                print(f"✅ [DB Load] 구독자 {count}명 조회 성공")
         except Exception as e:
+            if count:
+                # 이미 실제 구독자에게 일부 발송된 뒤의 오류: 테스트 수신자로 대체하지 않고 실패로 올려보냄
+                print(f"❌ [DB Error] 구독자 조회 중단 ({count}명 이후): {e}")
+                raise
             print(f"⚠️ [DB Error] 구독자 조회 실패: {e}")
             # DB 연결 실패 시 테스트 수신자 반환
             test_recipient = os.getenv("TEST_RECIPIENT")
-            return [test_recipient] if test_recipient else []
+            if test_recipient:
+                yield test_recipient
 
     def _extract_headline_from_html(self, html_content: str) -> str:
         """HTML 콘텐츠에서 제목을 추출합니다."""
@@ -264,58 +272,25 @@ class EmailSender:
             return None
 
     def send_html_content(self, html_content: str, subject: str):
-        """[NEW] HTML 콘텐츠를 직접 받아서 발송하는 심플 버전"""
+        """[NEW] HTML 콘텐츠를 직접 받아서 발송하는 심플 버전 (common.email_dispatcher로 배치 동시 발송)"""
         if not self.api_key: 
             print("❌ SendGrid API Key가 없습니다.")
             return
 
-        if not self.to_emails:
+        recipients = self.to_emails if self.to_emails is not None else self._iter_subscribers_from_db()
+        if isinstance(recipients, list) and not recipients:
             print("❌ 수신자가 없어 메일을 보내지 않습니다.")
             return
 
-        sg = SendGridAPIClient(self.api_key)
-        batch_size = 1000
-        total_batches = math.ceil(len(self.to_emails) / batch_size)
-        total_sent = 0
-        total_failed = 0
-
-        print(f"📧 총 {len(self.to_emails)}명에게 '{subject}' 발송 시작... ({total_batches}개 배치)")
-
-        for i in range(total_batches):
-            batch_start_time = time.time()
-            batch_emails = self.to_emails[i * batch_size : (i + 1) * batch_size]
-            message = Mail(from_email=self.from_email, subject=subject, html_content=html_content)
-            for email in batch_emails:
-                p = Personalization()
-                p.add_to(To(email))
-
-                # [추가] 각 이메일별 개인화된 구독 취소 링크 생성
-                try:
-                    # [수정] 로컬 테스트를 위해 WEB_BASE_URL 환경변수 사용
-                    web_base_url = os.getenv("WEB_BASE_URL", "https://www.fincore.co.kr")
-                    unsubscribe_token = self.serializer.dumps(email, salt='email-unsubscribe')
-                    unsubscribe_url = f"{web_base_url}/unsubscribe/moneybag/{unsubscribe_token}"
-                    
-                    # [추가] SendGrid Substitution 기능으로 동적 값 주입
-                    p.add_substitution(Substitution("-email-", email))
-                    p.add_substitution(Substitution("-unsubscribe_url-", unsubscribe_url))
-                except Exception as e:
-                    print(f"⚠️ 토큰 생성 실패: {email}, {e}")
-                message.add_personalization(p)
-            try:
-                response = sg.send(message)
-                if 200 <= response.status_code < 300:
-                    total_sent += len(batch_emails)
-                    print(f"✅ [Batch {i+1}/{total_batches}] {len(batch_emails)}명 발송 성공 (소요 시간: {time.time() - batch_start_time:.2f}초, Status: {response.status_code})")
-                else:
-                    total_failed += len(batch_emails)
-                    print(f"❌ [Batch {i+1}/{total_batches}] 발송 실패 (Status: {response.status_code})")
-                    print(f"   -> SendGrid Body: {response.body}")
-            except Exception as e:
-                total_failed += len(batch_emails)
-                print(f"❌ [Batch {i+1}] API 호출 실패: {e}")
-        
-        print(f"🏁 발송 완료. 성공: {total_sent}, 실패: {total_failed}")
+        print(f"📧 '{subject}' 발송 시작...")
+        dispatcher = SendGridDispatcher(
+            api_key=self.api_key, from_email=self.from_email, service_name="moneybag",
+            campaign_id=f"moneybag:{os.getenv('EMAIL_RUN_ID') or datetime.now().strftime('%Y-%m-%d')}:{subject}",
+        )
+        result = dispatcher.send(recipients, subject, html_content)
+        if result["sent"] == 0 and result["skipped"] == 0 and result["failed"] == 0:
+            print("❌ 수신자가 없어 메일을 보내지 않았습니다.")
+        return result
 
     def send(self, file_path, mode="morning"):
         with open(file_path, "r", encoding="utf-8") as f:
@@ -326,9 +301,13 @@ class EmailSender:
             headline = lines[0].strip().replace("# ", "").replace("🐋 ", "").replace("💰 ", "")
         
         md_text = "".join(lines)
-        html_content = self._wrap_body_in_template(self._render_markdown(md_text))
-        
         today_str = datetime.now().strftime("%Y-%m-%d")
+        # 같은 (날짜, 모드, MD 내용)이면 캐시된 렌더링 결과(CSS 인라인 + 미니파이)를 그대로 사용
+        html_content = render_cached(
+            "moneybag", today_str, mode, md_text, self.convert_md_to_html,
+            template_version=f"{TEMPLATE_VERSION}:{os.getenv('WEB_BASE_URL', '')}",
+        )
+        
         self.save_html(html_content, today_str, mode)
         subject = f"[Secret Note] 🐋 {headline}"
 
@@ -377,7 +356,7 @@ if __name__ == "__main__":
         print(f"📧 [Single Send Mode] 단건 발송 시작 -> {final_test_recipient}")
         sender.to_emails = [final_test_recipient]
     elif is_auto_send:
-        print(f"✅ [Production Mode] DB에 등록된 구독자 {len(sender.to_emails)}명에게 발송합니다.")
+        print("✅ [Production Mode] DB에 등록된 구독자에게 발송합니다.")
     else:
         print("⚠️ [Safe Mode] 실제 발송이 비활성화되었습니다. (NEWSLETTER_AUTO_SEND=1 설정 필요)")
         print(f"-> 테스트 발송을 원하시면 이메일 주소를 인자로 전달하세요.")
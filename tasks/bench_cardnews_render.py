@@ -0,0 +1,65 @@
+"""
+카드뉴스 렌더링 벤치마크: 전체 세트(커버 + 브리핑 + 레이더 3장 + 뉴스)를 순차 / 프로세스 풀로 그려
+카드별 시간과 전체 소요 시간을 비교합니다. (출력은 임시 폴더, LLM 호출 없음)
+
+사용법:
+    python -m tasks.bench_cardnews_render --workers 4 --rounds 3
+    python -m tasks.bench_cardnews_render --md iceage/out/Signalist_Daily_2025-11-20.md
+"""
+import sys
+import time
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.media_cache import media_cache
+from iceage.src.pipelines.generate_cardnews_assets import CardNewsFactory, MarkdownParser
+
+
+def sample_data() -> dict:
+    picks = [{"name": name, "close": "71,200", "change": "+4.21%", "sigma": "3.2σ",
+              "sentiment": "매수 우위 (대형주 수급 유입)", "keyword": "실적"}
+             for name in ("삼성전자", "SK하이닉스", "한미반도체")]
+    return {
+        "title": "Signalist Daily", "subtitle": "",
+        "ai_summary": "외국인 순매수가 반도체 대형주에 집중되며 지수를 끌어올렸고, 2차전지는 차익 실현 매물에 약세를 보였습니다.",
+        "market_temp": {"status": "☀️ 맑음 (Greed)", "gauge": "[🟥🟥🟥⬜⬜]", "comment": "투자 심리가 살아났습니다."},
+        "radar_picks": picks,
+        "radar_memos": {p["name"]: "거래대금이 평소의 3배로 늘며 전고점 돌파를 시도하는 중입니다." for p in picks},
+        "news": [{"title": f"반도체 수출 회복세 지속, 외국인 순매수 {i}일째 이어져", "source": "연합뉴스"} for i in range(4)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카드뉴스 렌더링 벤치마크")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--md", help="실제 뉴스레터 마크다운 (없으면 합성 데이터)")
+    args = parser.parse_args()
+
+    # 렌더링 자체를 재려는 벤치마크이므로 미디어 캐시는 끔 (캐시 효과는 tasks.media_cache bench)
+    media_cache.enabled = False
+    data = MarkdownParser(Path(args.md).read_text(encoding="utf-8")).parse() if args.md else sample_data()
+    ref_date = date.today().isoformat()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in (1, args.workers):
+            walls = []
+            for r in range(args.rounds):
+                out = Path(tmp) / f"w{workers}_{r}"
+                factory = CardNewsFactory(ref_date, output_dir=out)
+                started = time.perf_counter()
+                timings = factory.run(dict(data), workers=workers)
+                walls.append(time.perf_counter() - started)
+            label = "순차" if workers == 1 else f"프로세스 풀 ×{workers}"
+            per_card = ", ".join(f"{name.split()[0]} {sec * 1000:.0f}ms" for name, sec in timings.items())
+            print(f"🧪 {label}: 전체 {min(walls) * 1000:.0f}ms (최선) / 첫 회 {walls[0] * 1000:.0f}ms")
+            print(f"   카드별 (마지막 회): {per_card}")
+
+
+if __name__ == "__main__":
+    main()
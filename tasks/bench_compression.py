@@ -0,0 +1,99 @@
+"""
+데이터셋 압축 벤치마크 (평문 vs gzip vs zstd)
+
+iceage/data 아래 압축 대상 데이터셋(kr_prices_*.csv, naver_themes_*.csv, 뉴스 JSONL 등)을 대상으로
+디스크 용량, 압축/해제 시간, 예상 S3 동기화 시간, 파싱 시간을 비교합니다.
+
+사용법:
+    python -m tasks.bench_compression --data-dir iceage/data --days 365 --mbps 100
+"""
+import io
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import date, timedelta
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common import compressed_io
+from common.compressed_io import should_compress, compress_bytes, decompress_bytes
+
+
+def collect_files(data_dir: Path, days: int):
+    """최근 days일 이내 날짜가 파일명에 포함된 압축 대상 파일 목록 (날짜 없는 파일은 항상 포함)"""
+    cutoff = (date.today() - timedelta(days=days)).isoformat()
+    files = []
+    for path in data_dir.rglob("*"):
+        if not path.is_file() or not should_compress(path.name):
+            continue
+        stem_date = next((tok for tok in path.stem.split("_") if len(tok) == 10 and tok[4] == "-"), None)
+        if stem_date and stem_date < cutoff:
+            continue
+        files.append(path)
+    return sorted(files)
+
+
+def _parse(data: bytes, name: str):
+    if name.endswith(".csv"):
+        import pandas as pd
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig", dtype=str)
+    return [line for line in data.decode("utf-8-sig").splitlines() if line.strip()]
+
+
+def bench(files, codecs, mbps):
+    raw_blobs = [(p.name, p.read_bytes()) for p in files]
+    raw_total = sum(len(b) for _, b in raw_blobs)
+    bytes_per_sec = mbps * 1024 * 1024 / 8
+
+    started = time.perf_counter()
+    for name, blob in raw_blobs:
+        _parse(blob, name)
+    raw_parse = time.perf_counter() - started
+
+    print(f"\n📂 대상 파일: {len(files)}개 / 평문 {raw_total / 1024 / 1024:,.1f} MB")
+    print(f"{'codec':<8}{'size(MB)':>10}{'ratio':>8}{'comp(s)':>10}{'decomp(s)':>11}{'sync(s)':>10}{'parse(s)':>10}")
+    print(f"{'plain':<8}{raw_total / 1024 / 1024:>10.1f}{1.0:>8.2f}{0.0:>10.2f}{0.0:>11.2f}"
+          f"{raw_total / bytes_per_sec:>10.1f}{raw_parse:>10.2f}")
+
+    for codec in codecs:
+        if codec == "zstd" and compressed_io.zstandard is None:
+            print(f"{'zstd':<8} (zstandard 모듈 없음 - 건너뜀)")
+            continue
+        started = time.perf_counter()
+        packed = [(name, compress_bytes(blob, codec)) for name, blob in raw_blobs]
+        comp_sec = time.perf_counter() - started
+        packed_total = sum(len(b) for _, b in packed)
+
+        started = time.perf_counter()
+        for _, blob in packed:
+            decompress_bytes(blob)
+        decomp_sec = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for name, blob in packed:
+            _parse(decompress_bytes(blob), name)
+        parse_sec = time.perf_counter() - started
+
+        print(f"{codec:<8}{packed_total / 1024 / 1024:>10.1f}{raw_total / max(packed_total, 1):>8.2f}"
+              f"{comp_sec:>10.2f}{decomp_sec:>11.2f}{packed_total / bytes_per_sec:>10.1f}{parse_sec:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터셋 압축 벤치마크")
+    parser.add_argument("--data-dir", default=str(BASE_DIR / "iceage" / "data"))
+    parser.add_argument("--days", type=int, default=365, help="최근 N일치 파일만 대상")
+    parser.add_argument("--mbps", type=float, default=100.0, help="예상 S3 전송 대역폭 (Mbps)")
+    parser.add_argument("--codecs", default="gzip,zstd")
+    args = parser.parse_args()
+
+    files = collect_files(Path(args.data_dir), args.days)
+    if not files:
+        print(f"⚠️ 대상 파일이 없습니다: {args.data_dir}")
+        return
+    bench(files, [c.strip() for c in args.codecs.split(",") if c.strip()], args.mbps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+SendGrid 배치 발송기 부하 테스트 (로컬 HTTP 스탠드인 사용, 실제 메일 발송 없음)
+
+가짜 /v3/mail/send 서버를 띄워 응답 지연과 429 비율을 흉내 내고,
+동시성 수준별로 N명 발송에 걸리는 시간을 비교합니다.
+배치 수가 아니라 동시성에 따라 전체 시간이 줄어드는지 확인하는 용도입니다.
+
+사용법:
+    python -m tasks.bench_email_dispatch --subscribers 50000 --latency 0.5 --concurrency 1,4,8
+"""
+import sys
+import time
+import json
+import random
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.email_dispatcher import SendGridDispatcher
+
+
+def start_stand_in(latency, rate_429):
+    stats = {"requests": 0, "personalizations": 0, "throttled": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                throttled = random.random() < rate_429
+                if throttled:
+                    stats["throttled"] += 1
+                else:
+                    stats["personalizations"] += len(json.loads(body)["personalizations"])
+            if throttled:
+                self.send_response(429)
+                self.send_header("Retry-After", "0.2")
+            else:
+                self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SendGrid 발송기 부하 테스트")
+    parser.add_argument("--subscribers", type=int, default=50000)
+    parser.add_argument("--latency", type=float, default=0.5, help="스탠드인 응답 지연(초)")
+    parser.add_argument("--rate-429", type=float, default=0.05, help="429 응답 비율")
+    parser.add_argument("--concurrency", default="1,4,8")
+    args = parser.parse_args()
+
+    server, stats = start_stand_in(args.latency, args.rate_429)
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"🧪 스탠드인: {api_base} (지연 {args.latency}s, 429 {args.rate_429:.0%})")
+
+    for level in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+        recipients = (f"user{i}@example.com" for i in range(args.subscribers))
+        dispatcher = SendGridDispatcher(
+            api_key="SG.bench", from_email="Bench <bench@example.com>", service_name="bench",
+            campaign_id=f"bench:{level}:{time.time()}", concurrency=level, rate_per_sec=1000,
+            api_base=api_base, journal_dir=tempfile.mkdtemp(),
+        )
+        result = dispatcher.send(recipients, "bench", "<p>-email-</p>")
+        timings = sorted(result["batch_timings"]) or [0.0]
+        print(f"   👉 동시성 {level}: {result['elapsed']:.2f}초 / 배치 {result['batches']}개 / "
+              f"p50 {timings[len(timings) // 2]:.2f}s / max {timings[-1]:.2f}s / 실패 {result['failed']}")
+
+    print(f"📊 스탠드인 수신: 요청 {stats['requests']} / 수신자 {stats['personalizations']} / 429 {stats['throttled']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+키워드 엔진 벤치마크: 10만 건 헤드라인에 이벤트 태그 + 테마 + 크립토 키워드 판정 비용 측정
+
+기존 방식(규칙마다 `any(kw.lower() in doc ...)`)과 공용 Aho-Corasick 엔진(순수 파이썬 / pyahocorasick)의
+전체 처리 시간을 비교하고, 문서별 판정 결과가 완전히 같은지 확인합니다.
+
+사용법:
+    python -m tasks.bench_keyword_engine --docs 100000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.keyword_engine import KeywordEngine, _ahocorasick
+from iceage.src.signals.signal_volume_pattern import EVENT_TAG_RULES
+from iceage.src.processors.kr_themes_detector import _load_themes_configs
+from moneybag.src.collectors.crypto_news_rss import CryptoNewsRSS
+
+FILLER = ["삼성전자", "코스피", "외국인", "순매수", "개장", "하루", "만에", "투자자", "시장", "관심", "증권가",
+          "목표주가", "상향", "글로벌", "업황", "회복", "신규", "사업", "추진", "발표", "market", "stocks", "rally"]
+
+
+def rule_sets():
+    themes = [(t["name"], t.get("keywords", [])) for t in _load_themes_configs()]
+    crypto = [(k, [k]) for k in CryptoNewsRSS().keywords]
+    return {"event": EVENT_TAG_RULES, "theme": themes, "crypto_news": crypto}
+
+
+def make_corpus(n, sets, seed=7):
+    rnd = random.Random(seed)
+    keywords = [kw for rules in sets.values() for _, kws in rules for kw in kws]
+    docs = []
+    for _ in range(n):
+        words = rnd.choices(FILLER, k=rnd.randint(8, 16))
+        for _ in range(rnd.choice([0, 0, 1, 1, 2])):
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(keywords))
+        docs.append(" ".join(words))
+    return docs
+
+
+def naive(docs, sets):
+    out = []
+    for doc in docs:
+        low = doc.lower()
+        out.append({ns: [name for name, kws in rules if any(kw.lower() in low for kw in kws)]
+                    for ns, rules in sets.items()})
+    return out
+
+
+def engine_run(engine, docs, sets):
+    out = []
+    for doc in docs:
+        found = {ns: [] for ns in sets}
+        for rule in engine.matched_rules(doc):
+            found[rule.namespace].append(rule.name)
+        out.append(found)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키워드 엔진 벤치마크")
+    parser.add_argument("--docs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sets = rule_sets()
+    docs = make_corpus(args.docs, sets)
+    n_kw = sum(len(kws) for rules in sets.values() for _, kws in rules)
+    print(f"🧪 헤드라인 {len(docs):,}건, 규칙 {sum(len(r) for r in sets.values())}개 / 키워드 {n_kw}개")
+
+    started = time.perf_counter()
+    expected = naive(docs, sets)
+    base = time.perf_counter() - started
+    print(f"  기존 (규칙별 부분 문자열 검사): {base:.2f}s ({base / len(docs) * 1e6:.1f}µs/건)")
+
+    backends = [("순수 파이썬", False)] + ([("pyahocorasick", True)] if _ahocorasick else [])
+    for label, use_c in backends:
+        engine = KeywordEngine(use_c_extension=use_c)
+        started = time.perf_counter()
+        for ns, rules in sets.items():
+            engine.register(ns, rules)
+        engine.matched_rules("")  # 빌드
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        got = engine_run(engine, docs, sets)
+        elapsed = time.perf_counter() - started
+        verdict = "✅ 결과 일치" if got == expected else "❌ 결과 불일치"
+        print(f"  Aho-Corasick ({label}): 빌드 {build * 1000:.1f}ms, 스캔 {elapsed:.2f}s "
+              f"({elapsed / len(docs) * 1e6:.1f}µs/건, {base / elapsed:.1f}배) {verdict}")
+    if not _ahocorasick:
+        print("  (pyahocorasick 미설치 - C 확장 측정 생략)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+LLM 응답 캐시 점검 스크립트 (로컬 가짜 OpenAI 엔드포인트 사용, 실제 API 비용 없음)
+
+가짜 /v1/chat/completions 서버를 띄워 응답 지연을 흉내 내고 다음을 확인합니다.
+  1) 같은 요청을 다시 보내면 디스크 캐시에서 응답 (서버 호출 없음)
+  2) 같은 요청을 동시에 N개 보내면 서버에는 1번만 도달 (in-flight 중복 제거)
+  3) use_cache=False 호출은 항상 서버로 전달
+  4) TTL이 지난 항목은 다시 호출
+
+사용법:
+    python -m tasks.bench_llm_cache --latency 0.5 --concurrent 8
+"""
+import sys
+import time
+import json
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from openai import OpenAI
+
+from common.llm_cache import LLMResponseCache
+
+
+def start_fake_openai(latency):
+    stats = {"requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                seq = stats["requests"]
+            user = body["messages"][-1]["content"]
+            payload = json.dumps({
+                "id": f"chatcmpl-fake-{seq}", "object": "chat.completion", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"echo #{seq}: {user[:40]}"}}],
+                "usage": {"prompt_tokens": len(user), "completion_tokens": 12, "total_tokens": len(user) + 12},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def _check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 응답 캐시 점검")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 엔드포인트 응답 지연(초)")
+    parser.add_argument("--concurrent", type=int, default=8, help="동시에 보낼 동일 요청 수")
+    args = parser.parse_args()
+
+    server, stats = start_fake_openai(args.latency)
+    client = OpenAI(api_key="sk-fake", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", max_retries=0)
+    cache = LLMResponseCache(cache_dir=tempfile.mkdtemp(), ttl_seconds=3600, enabled=True)
+    messages = [{"role": "system", "content": "system"}, {"role": "user", "content": "오늘 시장 요약"}]
+    print(f"🧪 가짜 OpenAI 엔드포인트: {client.base_url} (지연 {args.latency}s)")
+
+    results = []
+
+    started = time.time()
+    first = cache.complete(client, "gpt-4o-mini", messages, temperature=0.4, max_tokens=100)
+    cold = time.time() - started
+    started = time.time()
+    second = cache.complete(client, "gpt-4o-mini", messages, temperature=0.4, max_tokens=100)
+    warm = time.time() - started
+    results.append(_check(f"재실행 캐시 적중 (첫 호출 {cold:.2f}s -> 재호출 {warm * 1000:.1f}ms)",
+                          first == second and stats["requests"] == 1))
+
+    results.append(_check("파라미터가 다르면 다른 키", cache.complete(
+        client, "gpt-4o-mini", messages, temperature=0.9, max_tokens=100) != first and stats["requests"] == 2))
+
+    before = stats["requests"]
+    burst = [{"role": "system", "content": "system"}, {"role": "user", "content": "동시 요청"}]
+    with ThreadPoolExecutor(max_workers=args.concurrent) as pool:
+        answers = list(pool.map(lambda _: cache.complete(client, "gpt-4o-mini", burst, temperature=0.4),
+                                range(args.concurrent)))
+    results.append(_check(f"동시 {args.concurrent}건 -> 서버 호출 {stats['requests'] - before}회",
+                          len(set(answers)) == 1 and stats["requests"] - before == 1))
+
+    before = stats["requests"]
+    cache.complete(client, "gpt-4o-mini", messages, use_cache=False, temperature=0.4, max_tokens=100)
+    results.append(_check("use_cache=False는 항상 서버 호출", stats["requests"] - before == 1))
+
+    cache.ttl_seconds = 0
+    before = stats["requests"]
+    cache.complete(client, "gpt-4o-mini", messages, temperature=0.4, max_tokens=100)
+    results.append(_check("TTL 만료 시 재호출", stats["requests"] - before == 1))
+
+    cache.report("LLM Cache")
+    log_lines = (cache.cache_dir / "calls.jsonl").read_text(encoding="utf-8").splitlines()
+    print(f"📝 호출 기록 {len(log_lines)}건 (예: {log_lines[0]})")
+    server.shutdown()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
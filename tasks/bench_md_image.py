@@ -0,0 +1,93 @@
+"""
+요약 이미지 렌더러(common.md_image) 벤치마크 + 골든 이미지 확인
+
+- 샘플 요약 마크다운(라이트/다크 테마)을 여러 번 그려 장당 렌더링 시간을 측정합니다.
+- 같은 입력을 두 번 그려 PNG 바이트가 완전히 같은지(결정적 출력) 확인합니다.
+- --golden DIR: DIR의 골든 PNG와 비교합니다. (--update면 골든 이미지를 새로 저장)
+
+사용법:
+    python -m tasks.bench_md_image --rounds 50
+    python -m tasks.bench_md_image --golden /tmp/md_golden --update
+    python -m tasks.bench_md_image --golden /tmp/md_golden
+"""
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.md_image import DARK_THEME, LIGHT_THEME, MarkdownImageRenderer
+
+SAMPLE_MD = """# 📈 오늘의 시그널리스트 요약
+_장 마감 기준 커뮤니티 요약본_
+
+오늘 코스피는 **외국인 순매수** 덕분에 1.2% 올랐음 ㅋㅋ 반도체가 혼자 다 했고, 2차전지는 차익 실현에 밀려서 조용했음.
+
+## 🔥 레이더 포착 종목
+- **삼성전자**: 거래대금 평소의 3배 ㄷㄷ 전고점 돌파 시도 중
+- **SK하이닉스**: HBM 수주 기대감에 3거래일 연속 상승
+  - 단, 단기 과열 신호도 같이 켜짐
+
+> *"추격 매수보다는 차익 실현을 고려할 구간입니다."*
+
+| 종목명 | 종가 | 등락률 | 강도 |
+|---|---|---|---|
+| 삼성전자 | 71,200 | +4.21% | 3.2σ |
+| SK하이닉스 | 182,500 | +2.80% | 2.1σ |
+| 한미반도체 | 98,400 | -1.35% | 1.7σ |
+
+---
+### 📰 핵심 뉴스
+1. 반도체 수출 회복세 지속, 외국인 순매수 5일째
+2. 금리 동결 기대감에 성장주 반등
+"""
+
+
+def digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요약 이미지 렌더러 벤치마크")
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--golden", help="골든 이미지 폴더")
+    parser.add_argument("--update", action="store_true", help="골든 이미지를 새로 저장")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, theme in (("light", LIGHT_THEME), ("dark", DARK_THEME)):
+            renderer = MarkdownImageRenderer(theme)
+            first = renderer.save(SAMPLE_MD, Path(tmp) / f"{name}_1.png")  # 폰트·글리프 캐시 준비
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                renderer.render(SAMPLE_MD)
+            per = (time.perf_counter() - started) / args.rounds * 1000
+            second = renderer.save(SAMPLE_MD, Path(tmp) / f"{name}_2.png")
+            same = digest(first) == digest(second)
+            failed |= not same
+            print(f"🧪 {name}: 장당 {per:.1f}ms (첫 장 포함 평균 {renderer.stats['render_ms'] / renderer.stats['images']:.1f}ms), "
+                  f"{'✅ 결정적 출력' if same else '❌ 렌더링마다 결과가 다름'}")
+
+            if args.golden:
+                golden = Path(args.golden) / f"summary_{name}.png"
+                if args.update:
+                    golden.parent.mkdir(parents=True, exist_ok=True)
+                    golden.write_bytes(first.read_bytes())
+                    print(f"   💾 골든 이미지 저장: {golden}")
+                elif not golden.exists():
+                    print(f"   ⚠️ 골든 이미지 없음: {golden} (--update로 생성)")
+                    failed = True
+                else:
+                    match = digest(golden) == digest(first)
+                    failed |= not match
+                    print(f"   {'✅ 골든 이미지 일치' if match else '❌ 골든 이미지와 다름'}: {golden}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+뉴스 유사 중복 묶음 벤치마크: 쌍별 토큰 Jaccard(O(n²)) vs MinHash/LSH
+
+통신사 기사 하나를 여러 매체가 조금씩 고쳐 전재한 합성 헤드라인 말뭉치를 만들고,
+- 기존 방식: 모든 기사 쌍의 제목 토큰 Jaccard 비교
+- 새 방식: MinHash 서명 + LSH 밴딩 후보만 검증
+의 처리 시간과, 정확한 쌍별 비교로 구한 묶음 대비 재현율(같은 묶음이어야 할 쌍을 얼마나 묶었는지)을 비교합니다.
+
+사용법:
+    python -m tasks.bench_news_dedup --sizes 2000,10000,50000 --exact-max 5000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from itertools import combinations
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.news_dedup import MinHashDeduper, _jaccard
+from iceage.src.collectors.global_news_serpapi import _normalize_text
+
+VOCAB = [f"w{i}" for i in range(5000)]
+EDITS = ["reports", "says", "update", "breaking", "exclusive", "analysis", "live", "report"]
+
+
+def make_corpus(n, seed=7):
+    """원문 1건당 평균 3건의 전재본(단어 1~2개 추가/삭제/교체)을 섞은 헤드라인 목록"""
+    rnd = random.Random(seed)
+    titles = []
+    while len(titles) < n:
+        base = rnd.sample(VOCAB, rnd.randint(8, 14))
+        titles.append(" ".join(base))
+        for _ in range(rnd.choice([0, 1, 2, 3, 4, 5, 6])):
+            words = list(base)
+            for _ in range(rnd.randint(1, 2)):
+                op = rnd.random()
+                if op < 0.4:
+                    words.insert(rnd.randrange(len(words) + 1), rnd.choice(EDITS))
+                elif op < 0.7 and len(words) > 6:
+                    words.pop(rnd.randrange(len(words)))
+                else:
+                    words[rnd.randrange(len(words))] = rnd.choice(VOCAB)
+            titles.append(" ".join(words))
+    rnd.shuffle(titles)
+    return titles[:n]
+
+
+def exact_clusters(sets, threshold):
+    """모든 쌍을 비교해 Jaccard ≥ threshold 간선의 연결 요소 (기존 방식의 비용 기준)"""
+    n = len(sets)
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in combinations(range(n), 2):
+        if _jaccard(sets[i], sets[j]) >= threshold:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+    return [find(i) for i in range(n)]
+
+
+def same_pairs(labels):
+    groups = {}
+    for i, l in enumerate(labels):
+        groups.setdefault(l, []).append(i)
+    return {p for g in groups.values() if len(g) > 1 for p in combinations(g, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="뉴스 유사 중복 묶음 벤치마크")
+    parser.add_argument("--sizes", default="2000,10000,50000")
+    parser.add_argument("--exact-max", type=int, default=5000, help="쌍별 비교를 실제로 돌릴 최대 기사 수")
+    parser.add_argument("--threshold", type=float, default=0.4)
+    args = parser.parse_args()
+
+    for n in [int(x) for x in args.sizes.split(",")]:
+        titles = make_corpus(n)
+        sets = [set(_normalize_text(t)) for t in titles]
+        # 대량 입력의 LSH 경로를 재기 위해 exact_below=0 (global_news_serpapi와 같은 밴드 구성)
+        deduper = MinHashDeduper(threshold=args.threshold, num_perm=64, bands=64, exact_below=0)
+        started = time.perf_counter()
+        labels = deduper.cluster(sets)
+        lsh = time.perf_counter() - started
+        print(f"🧪 기사 {n:,}건: MinHash/LSH {lsh:.2f}s, 묶음 {len(set(labels)):,}개, "
+              f"후보 쌍 {deduper.stats['candidate_pairs']:,}")
+
+        if n <= args.exact_max:
+            started = time.perf_counter()
+            truth = exact_clusters(sets, args.threshold)
+            exact = time.perf_counter() - started
+            want, got = same_pairs(truth), same_pairs(labels)
+            recall = len(want & got) / len(want) if want else 1.0
+            precision = len(want & got) / len(got) if got else 1.0
+            print(f"   쌍별 비교 {exact:.2f}s ({exact / lsh:.1f}배 느림), "
+                  f"재현율 {recall * 100:.1f}% / 정밀도 {precision * 100:.1f}%")
+        else:
+            est = (n / args.exact_max) ** 2
+            print(f"   쌍별 비교 생략 (≈ {args.exact_max:,}건 측정치의 {est:.0f}배 예상)")
+
+
+if __name__ == "__main__":
+    main()
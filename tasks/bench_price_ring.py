@@ -0,0 +1,127 @@
+"""
+왓치독 가격 이력 벤치마크: deque 선형 탐색 vs PriceRingBuffer (1초 틱 × 500 심볼)
+
+워밍업으로 각 심볼에 warmup분 분량의 1초 틱을 채운 뒤,
+1초마다 전 심볼에 대해 [틱 추가 + 10/15/60분 변동률 + 60분 min/max/VWAP]을 평가하는 시간을 잽니다.
+기존 방식(deque 선형 탐색)은 느리므로 측정 구간을 따로 짧게 잡습니다.
+
+사용법:
+    python -m tasks.bench_price_ring --symbols 500 --warmup 60 --seconds 30 --baseline-seconds 3
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from collections import deque
+from datetime import datetime, timedelta
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.price_ring import PriceRingBuffer
+
+WINDOWS_MIN = (10, 15, 60)
+CAPACITY = 4096
+
+
+def _deque_pct(hist, now, minutes):
+    """기존 _pct_over_minutes 구현 (비교 기준)"""
+    if len(hist) < 2:
+        return None
+    target_ts = now - timedelta(minutes=minutes)
+    old_price = None
+    for ts, p in hist:
+        if ts <= target_ts:
+            old_price = p
+        else:
+            break
+    if old_price is None:
+        return None
+    return (hist[-1][1] - old_price) / old_price * 100.0
+
+
+def _deque_stats(hist, now, minutes):
+    target_ts = now - timedelta(minutes=minutes)
+    prices = [p for ts, p in hist if ts >= target_ts]
+    return min(prices), max(prices)
+
+
+def _walk(symbols, start, seconds):
+    """(시각, [심볼별 가격]) 1초 랜덤워크"""
+    prices = [100.0 + i for i in range(symbols)]
+    for k in range(seconds):
+        prices = [p * (1 + random.gauss(0, 0.0005)) for p in prices]
+        yield start + timedelta(seconds=k), prices
+
+
+def bench_ring(args, start):
+    bufs = [PriceRingBuffer(CAPACITY, windows=tuple(m * 60 for m in WINDOWS_MIN)) for _ in range(args.symbols)]
+    for now, prices in _walk(args.symbols, start, args.warmup * 60):
+        for buf, p in zip(bufs, prices):
+            buf.append(now, p, random.random())
+
+    rounds = []
+    measure_start = start + timedelta(minutes=args.warmup)
+    for now, prices in _walk(args.symbols, measure_start, args.seconds):
+        t0 = time.perf_counter()
+        for buf, p in zip(bufs, prices):
+            buf.append(now, p, random.random())
+            for m in WINDOWS_MIN:
+                buf.pct_change(m * 60, now=now)
+            buf.window_stats(3600)
+        rounds.append(time.perf_counter() - t0)
+    return rounds
+
+
+def bench_deque(args, start):
+    hists = [deque(maxlen=CAPACITY) for _ in range(args.symbols)]
+    for now, prices in _walk(args.symbols, start, args.warmup * 60):
+        for h, p in zip(hists, prices):
+            h.append((now, p))
+
+    rounds = []
+    measure_start = start + timedelta(minutes=args.warmup)
+    for now, prices in _walk(args.symbols, measure_start, args.baseline_seconds):
+        t0 = time.perf_counter()
+        for h, p in zip(hists, prices):
+            h.append((now, p))
+            for m in WINDOWS_MIN:
+                _deque_pct(h, now, m)
+            _deque_stats(h, now, 60)
+        rounds.append(time.perf_counter() - t0)
+    return rounds
+
+
+def _summary(rounds, symbols):
+    rounds = sorted(rounds)
+    p50 = rounds[len(rounds) // 2]
+    p99 = rounds[min(len(rounds) - 1, int(len(rounds) * 0.99))]
+    return f"1초 평가 p50 {p50 * 1000:.2f}ms / p99 {p99 * 1000:.2f}ms (심볼당 {p50 / symbols * 1e6:.1f}µs)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PriceRingBuffer 벤치마크")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=60, help="워밍업 분량(분)")
+    parser.add_argument("--seconds", type=int, default=30, help="링 버퍼 측정 구간(초)")
+    parser.add_argument("--baseline-seconds", type=int, default=3, help="deque 측정 구간(초), 0이면 생략")
+    args = parser.parse_args()
+
+    random.seed(7)
+    start = datetime(2025, 1, 1, 9, 0)
+    print(f"🧪 {args.symbols}개 심볼 × 1초 틱, 워밍업 {args.warmup}분")
+
+    t0 = time.perf_counter()
+    ring = bench_ring(args, start)
+    print(f"✅ [PriceRingBuffer] {_summary(ring, args.symbols)} - 전체 {time.perf_counter() - t0:.1f}s")
+
+    if args.baseline_seconds:
+        t0 = time.perf_counter()
+        base = bench_deque(args, start)
+        print(f"🐢 [deque 선형 탐색] {_summary(base, args.symbols)} - 전체 {time.perf_counter() - t0:.1f}s")
+        print(f"⚡ 속도 향상: {sorted(base)[len(base) // 2] / sorted(ring)[len(ring) // 2]:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
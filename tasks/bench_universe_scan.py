@@ -0,0 +1,72 @@
+"""
+유니버스 감시 벤치마크: 전 종목(USDT 무기한) 벡터화 알림 평가 시간 측정
+
+심볼 × 시간 행렬을 워밍업 분량만큼 1초 열로 채운 뒤, 1초마다 [틱 묶음 반영 + 10/15/60분 기준 +
+쿨타임/바이패스 평가]에 걸리는 시간을 잽니다. 일부 심볼에 급등을 넣어 실제로 알림이 발동하는지도 확인합니다.
+목표: 300+ 심볼 기준 틱당 10ms 미만
+
+사용법:
+    python -m tasks.bench_universe_scan --symbols 400 --warmup 60 --seconds 120
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from moneybag.src.collectors.binance_stream import Tick
+from moneybag.src.analyzers.universe_scanner import UniverseAlertScanner
+from moneybag.src.pipelines.market_watchdog import ALERT_RULES, COOLDOWN_MIN, COOLDOWN_BYPASS_PCT
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유니버스 벡터 평가 벤치마크")
+    parser.add_argument("--symbols", type=int, default=400)
+    parser.add_argument("--warmup", type=int, default=60, help="워밍업 분량(분)")
+    parser.add_argument("--seconds", type=int, default=120, help="측정 구간(초)")
+    parser.add_argument("--spikes", type=int, default=5, help="측정 구간에 급등시킬 심볼 수")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    symbols = ["BTCUSDT"] + [f"SYM{i:03d}USDT" for i in range(args.symbols - 1)]
+    prices = 100.0 * np.exp(rng.normal(0, 1, len(symbols)))
+    scanner = UniverseAlertScanner([(m, th) for m, th, _ in ALERT_RULES],
+                                   cooldown_min=COOLDOWN_MIN, bypass_pct=COOLDOWN_BYPASS_PCT)
+    spiking = set(random.Random(7).sample(range(1, len(symbols)), min(args.spikes, len(symbols) - 1)))
+
+    t = 1_700_000_000.0
+    print(f"🧪 {len(symbols)}개 심볼 × 1초 틱, 워밍업 {args.warmup}분")
+    for _ in range(args.warmup * 60):
+        prices *= 1 + rng.normal(0, 0.0003, len(prices))
+        scanner.update([Tick(s, p, None, t, "ws") for s, p in zip(symbols, prices.tolist())], t)
+        t += 1
+
+    timings, fired = [], []
+    for k in range(args.seconds):
+        prices *= 1 + rng.normal(0, 0.0003, len(prices))
+        for i in spiking:
+            prices[i] *= 1.0005  # 초당 +0.05% 누적 급등 (약 40초 뒤 10분 급가속 기준 돌파)
+        ticks = [Tick(s, p, None, t, "ws") for s, p in zip(symbols, prices.tolist())]
+        started = time.perf_counter()
+        scanner.update(ticks, t)
+        alerts = scanner.evaluate(t)
+        timings.append(time.perf_counter() - started)
+        fired += [(k, a.symbol, ALERT_RULES[a.rule][2]) for a in alerts]
+        t += 1
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+    verdict = "✅" if p99 < 10 else "⚠️"
+    print(f"{verdict} 틱당 반영+평가 p50 {p50:.2f}ms / p99 {p99:.2f}ms / 최대 {timings[-1] * 1000:.2f}ms (목표 10ms)")
+    print(f"🚨 발동 알림 {len(fired)}건 (서비스 전체 쿨타임 {COOLDOWN_MIN}분 적용): "
+          + ", ".join(f"{k}s {s} {r}" for k, s, r in fired[:5]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+쇼츠 영상 세그먼트 렌더링 벤치마크: 합성 카드뉴스 + 무음 나레이션으로 세그먼트를 순차 / 프로세스 풀로 인코딩해
+전체 시간을 비교하고, 같은 입력으로 두 번 만든 최종 mp4가 바이트 단위로 같은지 확인합니다.
+(moviepy / ffmpeg 필요, 출력은 임시 폴더, 미디어 캐시 조회는 끔)
+
+사용법:
+    python -m tasks.bench_video_render --workers 4
+    python -m tasks.bench_video_render --workers 8 --seconds 60
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import subprocess
+import tempfile
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영상 세그먼트 렌더링 벤치마크")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=40.0, help="나레이션 길이 (초)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # 모듈 공용 캐시가 임시 폴더를 쓰도록 임포트 전에 지정
+        os.environ["MEDIA_CACHE_DIR"] = str(tmp / "cache")
+        os.environ["MEDIA_CACHE"] = "0"
+        from iceage.src.pipelines.generate_cardnews_assets import CardNewsFactory
+        from iceage.src.pipelines.generate_video_assets import _concat_segments, _ffmpeg_exe, render_segments
+        from tasks.bench_cardnews_render import sample_data
+
+        cards = tmp / "cards"
+        CardNewsFactory(date.today().isoformat(), output_dir=cards).run(sample_data(), workers=1)
+        images = sorted(cards.glob("*.png"))
+        audio = tmp / "narration.mp3"
+        subprocess.run([_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "lavfi", "-i", "anullsrc=r=24000:cl=mono",
+                        "-t", str(args.seconds), "-b:a", "48k", str(audio)], check=True)
+
+        clip_duration = (args.seconds + 2.0) / len(images)
+        cues = [{"text": f"{i + 1}번째 문장 자막입니다. 외국인 순매수가 이어졌습니다.", "start": i * 4.0, "end": i * 4.0 + 3.8}
+                for i in range(int(args.seconds // 4))]
+
+        digests = []
+        for workers in (1, args.workers):
+            started = time.perf_counter()
+            segments = render_segments(images, clip_duration, cues, workers=workers)
+            out = tmp / f"video_w{workers}.mp4"
+            _concat_segments(segments, audio, out)
+            elapsed = time.perf_counter() - started
+            digests.append(hashlib.sha256(out.read_bytes()).hexdigest())
+            label = "순차" if workers == 1 else f"프로세스 풀 ×{workers}"
+            print(f"🧪 {label}: 세그먼트 {len(images)}개 + 이어 붙이기 {elapsed:.1f}s")
+
+        verdict = "✅ 바이트 동일" if len(set(digests)) == 1 else "❌ 출력이 다름"
+        print(f"   두 결과 sha256 {digests[0][:16]} / {digests[-1][:16]} {verdict}")
+
+
+if __name__ == "__main__":
+    main()
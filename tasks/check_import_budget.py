@@ -0,0 +1,125 @@
+"""
+웹 워커 부팅 시 임포트 예산 점검 스크립트
+
+`python -X importtime`으로 application 모듈을 임포트하여,
+파이프라인 전용 무거운 의존성(pandas, numpy, openai 등)이 웹 부팅 경로에 섞여 들어오면 실패(exit 1)합니다.
+추가로 웹 부팅만 했을 때와 tasks.runner까지 임포트했을 때의 워커당 메모리(max RSS)를 비교합니다.
+
+사용법:
+    python -m tasks.check_import_budget            # 점검 + 메모리 비교
+    python -m tasks.check_import_budget --budget-ms 1500
+"""
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# 웹 부팅 시 절대 임포트되면 안 되는 최상위 모듈 목록
+FORBIDDEN_MODULES = [
+    "pandas", "numpy", "yfinance", "ccxt", "moviepy", "PIL", "openai",
+    "html2image", "edge_tts", "iceage", "moneybag", "tasks.runner",
+]
+
+_RSS_SNIPPET = (
+    "import resource, sys\n"
+    "import application\n"
+    "if len(sys.argv) > 1:\n"
+    "    import tasks.runner\n"
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "print(rss if sys.platform != 'darwin' else rss // 1024)\n"
+)
+
+
+def _child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(BASE_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def profile_web_boot():
+    """application 임포트의 importtime 로그를 파싱해 {모듈명: 누적 μs} 딕셔너리를 반환합니다."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import application"],
+        cwd=BASE_DIR, env=_child_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"application 임포트 실패:\n{proc.stderr[-2000:]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            # 형식: "import time:  self_us | cumulative_us |   module.name"
+            _self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+            timings[name.strip()] = int(cumulative_us)
+        except ValueError:
+            continue
+    return timings
+
+
+def find_violations(timings):
+    hits = []
+    for name in timings:
+        for forbidden in FORBIDDEN_MODULES:
+            if name == forbidden or name.startswith(forbidden + "."):
+                hits.append(name)
+                break
+    return sorted(hits)
+
+
+def measure_rss_kb(with_runner=False):
+    args = [sys.executable, "-c", _RSS_SNIPPET] + (["runner"] if with_runner else [])
+    proc = subprocess.run(args, cwd=BASE_DIR, env=_child_env(), capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    try:
+        return int(proc.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="웹 워커 임포트 예산 점검")
+    parser.add_argument("--budget-ms", type=float, default=None, help="application 임포트 누적 시간 상한(ms)")
+    parser.add_argument("--skip-memory", action="store_true", help="메모리 비교 생략")
+    args = parser.parse_args()
+
+    timings = profile_web_boot()
+    total_ms = timings.get("application", 0) / 1000
+    print(f"⏱️ [Import] application 누적 임포트 시간: {total_ms:,.1f} ms")
+
+    top = sorted(timings.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    for name, us in top:
+        print(f"   - {name:<40} {us / 1000:>8.1f} ms")
+
+    failed = False
+    violations = find_violations(timings)
+    if violations:
+        failed = True
+        print(f"❌ [Import] 웹 부팅 경로에 파이프라인 의존성이 포함되었습니다: {', '.join(violations[:20])}")
+    else:
+        print("✅ [Import] 파이프라인 의존성 없음")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failed = True
+        print(f"❌ [Import] 예산 초과: {total_ms:,.1f} ms > {args.budget_ms:,.1f} ms")
+
+    if not args.skip_memory:
+        web_kb = measure_rss_kb(with_runner=False)
+        full_kb = measure_rss_kb(with_runner=True)
+        if web_kb:
+            print(f"🧠 [Memory] 웹 부팅만: {web_kb / 1024:,.1f} MB")
+        if full_kb:
+            print(f"🧠 [Memory] tasks.runner 포함(기존 방식): {full_kb / 1024:,.1f} MB")
+        if web_kb and full_kb:
+            print(f"   👉 워커당 절감: {(full_kb - web_kb) / 1024:,.1f} MB")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
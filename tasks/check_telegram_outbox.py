@@ -0,0 +1,165 @@
+"""
+텔레그램 발신 대기열(common.telegram_outbox)을 로컬 가짜 Bot API 서버로 점검합니다. (실제 텔레그램 호출 없음)
+
+- burst: 여러 채팅방에 알림을 한꺼번에 넣고 채팅방별 순서 / 최소 간격 / 429 retry_after 대기 /
+         긴 메시지 나눔 / 밀린 메시지 합침 / Markdown 파싱 실패 시 일반 텍스트 재전송을 확인합니다.
+- restart: 서버가 죽어 있는 동안 넣은 메시지가 스풀에 남았다가, 새 대기열이 기동하면서 모두 전송되는지 확인합니다.
+
+사용법:
+    python -m tasks.check_telegram_outbox
+    python -m tasks.check_telegram_outbox --messages 200
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.telegram_outbox import MAX_MESSAGE_LEN, TelegramOutbox
+
+TOKEN = "123456:TEST"
+
+
+class FakeBotAPI:
+    def __init__(self, rate_limit_every: int = 0, retry_after: int = 1):
+        """sendMessage만 흉내 내는 Bot API 서버 (rate_limit_every번째 요청마다 429 응답)"""
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.received = []          # (수신 시각, chat_id, text, parse_mode)
+        self.requests = 0
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, resp = api.handle(self.path, body)
+                raw = json.dumps(resp).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, path, body):
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+        if path != f"/bot{TOKEN}/sendMessage":
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            return 429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                         "parameters": {"retry_after": self.retry_after}}
+        text = body.get("text", "")
+        if len(text) > MAX_MESSAGE_LEN:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}
+        if body.get("parse_mode") and "_bad_" in text:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: can't parse entities"}
+        with self._lock:
+            self.received.append((time.time(), str(body["chat_id"]), text, body.get("parse_mode")))
+        return 200, {"ok": True, "result": {"message_id": n}}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _ok(cond, label):
+    print(f"  {'✅' if cond else '❌'} {label}")
+    return cond
+
+
+def check_burst(spool: Path, messages: int) -> bool:
+    api = FakeBotAPI(rate_limit_every=4, retry_after=1)
+    box = TelegramOutbox(TOKEN, api_base=api.base, spool_dir=spool,
+                         chat_interval_sec=0.2, group_per_minute=150, global_per_sec=50)
+    chats = ["1001", "1002", "-1009"]
+    started = time.time()
+    for i in range(messages):
+        box.send(chats[i % len(chats)], f"[{i:04d}] 알림 #{i}", parse_mode="Markdown")
+    box.send("1001", "긴 리포트 줄입니다\n" * 1000)
+    box.send("1002", "밑줄 _bad_ 마크다운", parse_mode="Markdown")
+    enqueue_ms = (time.time() - started) * 1000
+    done = box.flush(timeout=120)
+    elapsed = time.time() - started
+    api.close()
+
+    by_chat = defaultdict(list)
+    for ts, chat, text, _ in api.received:
+        by_chat[chat].append((ts, text))
+    seq = {c: [int(line[1:5]) for _, text in rows for line in text.split("\n\n") if line.startswith("[")]
+           for c, rows in by_chat.items()}
+    expected = {c: [i for i in range(messages) if chats[i % len(chats)] == c] for c in chats}
+    gaps = {c: min((b[0] - a[0] for a, b in zip(rows, rows[1:])), default=1.0) for c, rows in by_chat.items()}
+    long_parts = [t for _, t in by_chat["1001"] if t.startswith("긴 리포트")]
+
+    print(f"🧪 burst: 메시지 {messages + 2}건 등록 {enqueue_ms:.0f}ms (호출자 블로킹 없음), 전송 완료 {elapsed:.1f}s")
+    print(f"   {box.report()}")
+    results = [
+        _ok(done and box.depth() == 0, "대기열 비움"),
+        _ok(all(seq.get(c) == expected[c] for c in chats), "채팅방별 순서 유지, 누락·중복 없음"),
+        _ok(gaps["1001"] >= 0.19 and gaps["1002"] >= 0.19, f"개인 채팅 최소 간격 0.2s (실측 {min(gaps['1001'], gaps['1002']):.2f}s)"),
+        _ok(gaps["-1009"] >= 0.39, f"그룹 최소 간격 0.4s (실측 {gaps['-1009']:.2f}s)"),
+        _ok(box.stats["rate_limited"] > 0 and box.stats["failed"] == 0, f"429 {box.stats['rate_limited']}회 → retry_after 후 재전송"),
+        _ok(len(long_parts) >= 3 and all(len(t) <= MAX_MESSAGE_LEN for t in long_parts), f"긴 메시지 {len(long_parts)}조각으로 나눔"),
+        _ok(box.stats["merged"] > 0, f"밀린 메시지 {box.stats['merged']}건 합쳐 보냄 (요청 {box.stats['requests']}회)"),
+        _ok(any("_bad_" in t and pm is None for _, _, t, pm in api.received), "Markdown 파싱 실패 → 일반 텍스트 재전송"),
+    ]
+    box.shutdown(timeout=1)
+    return all(results)
+
+
+def check_restart(spool: Path) -> bool:
+    # 1) 서버가 없는 주소로 보내면 재시도만 반복 → 종료 시 스풀에 남음
+    dead = TelegramOutbox(TOKEN, api_base="http://127.0.0.1:9", spool_dir=spool, backoff_base=30.0, timeout=1.0)
+    for i in range(5):
+        dead.send("1001", f"[{i:04d}] 재시작 후 보내야 할 알림")
+    dead.shutdown(timeout=1.5)
+    spooled = len(list(dead.spool_dir.glob("*.json")))
+
+    # 2) 새 대기열(재시작한 프로세스 역할)이 스풀을 읽어 전송
+    api = FakeBotAPI()
+    box = TelegramOutbox(TOKEN, api_base=api.base, spool_dir=spool, chat_interval_sec=0.05)
+    box.start()
+    box.flush(timeout=30)
+    api.close()
+    texts = [t for _, _, t, _ in api.received]
+    sent = [line for t in texts for line in t.split("\n\n")]
+    print(f"🧪 restart: 스풀에 남은 메시지 {spooled}건 → 재기동 후 {len(sent)}건 전송 ({box.report()})")
+    results = [
+        _ok(spooled == 5, "전송 실패 중 종료해도 스풀에 보존"),
+        _ok(sent == [f"[{i:04d}] 재시작 후 보내야 할 알림" for i in range(5)], "재기동 후 순서대로 전송"),
+        _ok(not list(box.spool_dir.glob("*.json")), "전송 완료 후 스풀 정리"),
+    ]
+    box.shutdown(timeout=1)
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텔레그램 발신 대기열 점검 (가짜 Bot API)")
+    parser.add_argument("--messages", type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = check_burst(Path(tmp) / "burst", args.messages)
+        ok = check_restart(Path(tmp) / "restart") and ok
+    print("✅ 모든 점검 통과" if ok else "❌ 실패한 점검이 있습니다")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
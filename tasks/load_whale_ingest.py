@@ -0,0 +1,153 @@
+"""
+Moralis Webhook 수집 경로 부하 테스트 (SQLite를 MySQL 스탠드인으로 사용, 실제 DB 접속 없음)
+
+같은 DAO(SqlWhaleStore)를 SQLite 파일에 연결하고, 여러 스레드가 Webhook 본문을 동시에 흘려보내며
+- 기존 방식: 요청마다 연결 열기 + 거래마다 INSERT/commit 후 응답
+- 새 방식: 서명 검증·파싱 후 대기열에 넣고 즉시 응답, writer가 executemany로 묶어 기록
+두 경로의 초당 처리 거래 수, 응답(ACK) 지연, 최종 기록 건수를 비교합니다.
+
+사용법:
+    python -m tasks.load_whale_ingest --transfers 50000 --per-webhook 20 --senders 8
+    python -m tasks.load_whale_ingest --mode batched --store jsonl
+"""
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.whale_ingest import (
+    WhaleIngestor, SqlWhaleStore, JsonlWhaleStore, handle_webhook, parse_transfers, _db_timestamp, _INSERT,
+)
+
+
+def make_bodies(transfers: int, per_webhook: int):
+    """erc20Transfers를 per_webhook건씩 담은 Webhook 본문 목록 (거래 해시는 모두 고유)"""
+    bodies = []
+    for start in range(0, transfers, per_webhook):
+        txs = [{
+            "tokenSymbol": "USDT" if i % 3 else "USDC", "tokenDecimals": "6",
+            "value": str((1_000_000 + i % 5000) * 10 ** 6),
+            "from": f"0x{i:040x}", "to": f"0x{i * 7:040x}",
+            "transactionHash": f"0x{i:064x}",
+        } for i in range(start, min(start + per_webhook, transfers))]
+        payload = {"block": {"timestamp": "2025-12-22T10:30:00.000Z"}, "erc20Transfers": txs}
+        bodies.append(json.dumps(payload).encode())
+    return bodies
+
+
+def sqlite_connect(path):
+    def _connect():
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    return _connect
+
+
+def legacy_handler(connect):
+    """기존 리스너와 같은 방식: 요청마다 연결, 거래마다 INSERT + commit"""
+    def _handle(body: bytes):
+        for tx in parse_transfers(json.loads(body)):
+            conn = connect()
+            try:
+                conn.execute(_INSERT["sqlite"], (tx["symbol"], tx["amount_usd"], tx["from"]["owner"],
+                                                 tx["to"]["owner"], tx["transaction_hash"],
+                                                 _db_timestamp(tx["timestamp"])))
+                conn.commit()
+            finally:
+                conn.close()
+        return {"status": "ok"}, 200
+    return _handle
+
+
+def drive(handler, bodies, senders: int):
+    """senders개 스레드가 본문을 나눠 호출하고 (경과 시간, ACK 지연 목록)을 반환"""
+    latencies = []
+    lock = threading.Lock()
+
+    def _sender(chunk):
+        local = []
+        for body in chunk:
+            started = time.perf_counter()
+            _, status = handler(body)
+            local.append(time.perf_counter() - started)
+            assert status == 200
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=_sender, args=(bodies[i::senders],)) for i in range(senders)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def summarize(label, transfers, elapsed, latencies, done_elapsed, rows):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"  {label}: 응답 완료 {elapsed:.2f}s ({transfers / elapsed:,.0f}건/s), "
+          f"기록 완료 {done_elapsed:.2f}s ({transfers / done_elapsed:,.0f}건/s), "
+          f"ACK p50 {p50:.2f}ms / p99 {p99:.2f}ms, 저장 {rows:,}건")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moralis Webhook 수집 부하 테스트")
+    parser.add_argument("--transfers", type=int, default=50000)
+    parser.add_argument("--per-webhook", type=int, default=20, help="Webhook 1회당 거래 수")
+    parser.add_argument("--senders", type=int, default=8, help="동시 요청 스레드 수")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--flush-sec", type=float, default=0.5)
+    parser.add_argument("--mode", choices=["both", "legacy", "batched"], default="both")
+    parser.add_argument("--store", choices=["sqlite", "jsonl"], default="sqlite")
+    args = parser.parse_args()
+
+    bodies = make_bodies(args.transfers, args.per_webhook)
+    n = args.transfers
+    print(f"🧪 거래 {n:,}건 (Webhook {len(bodies):,}회 × {args.per_webhook}건), 동시 요청 {args.senders}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.mode in ("both", "legacy") and args.store == "sqlite":
+            path = str(Path(tmp) / "legacy.db")
+            connect = sqlite_connect(path)
+            SqlWhaleStore(connect, dialect="sqlite").ensure_schema()
+            elapsed, lat = drive(legacy_handler(connect), bodies, args.senders)
+            rows = connect().execute("SELECT COUNT(*) FROM whale_transactions").fetchone()[0]
+            summarize("기존 (요청마다 연결·건별 commit)", n, elapsed, lat, elapsed, rows)
+
+        if args.mode in ("both", "batched"):
+            if args.store == "sqlite":
+                path = str(Path(tmp) / "batched.db")
+                connect = sqlite_connect(path)
+                store = SqlWhaleStore(connect, dialect="sqlite", pool_size=1)
+                store.ensure_schema()
+            else:
+                store = JsonlWhaleStore(str(Path(tmp) / "whale_transactions.jsonl"))
+            ingestor = WhaleIngestor(store, batch_size=args.batch, flush_interval_sec=args.flush_sec,
+                                     max_queue=max(100_000, n))
+            started = time.perf_counter()
+            elapsed, lat = drive(lambda body: handle_webhook(ingestor, body, "0xsig", None), bodies, args.senders)
+            while ingestor.depth() or ingestor.stats["written"] < ingestor.stats["accepted"]:
+                time.sleep(0.01)
+            done_elapsed = time.perf_counter() - started
+            ingestor.shutdown()
+            if args.store == "sqlite":
+                rows = connect().execute("SELECT COUNT(*) FROM whale_transactions").fetchone()[0]
+            else:
+                with open(store.path, encoding="utf-8") as f:
+                    rows = sum(1 for _ in f)
+            summarize(f"새 방식 (대기열 + executemany, {args.store})", n, elapsed, lat, done_elapsed, rows)
+            print(f"  📊 {ingestor.report()}")
+            verdict = "✅" if rows == n else "❌"
+            print(f"{verdict} 저장 건수 {rows:,} / 기대 {n:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+미디어 캐시(common.media_cache) 관리 도구
+
+- stats: 종류별 blob 수 / 용량 / 저장 당시 빌드 시간 합계
+- runs: 최근 파이프라인 실행별 적중률과 아낀 시간 (runs.jsonl)
+- prune: MEDIA_CACHE_MAX_GB(또는 --max-gb)를 넘는 부분을 오래 안 쓴 순서로 삭제
+- bench: 카드뉴스 + 요약 이미지를 빈 캐시(첫 실행)와 채워진 캐시(재실행)로 각각 만들어 시간을 비교합니다. (임시 디렉터리 사용)
+
+사용법:
+    python -m tasks.media_cache stats
+    python -m tasks.media_cache runs --last 10
+    python -m tasks.media_cache prune --max-gb 2
+    python -m tasks.media_cache bench
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+
+def cmd_stats(cache):
+    kinds = defaultdict(lambda: {"count": 0, "bytes": 0, "build_sec": 0.0})
+    for meta_path in cache.blob_dir.glob("??/*.json"):
+        blob = meta_path.with_suffix("")
+        if not blob.exists():
+            continue
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        row = kinds[meta.get("kind", "?")]
+        row["count"] += 1
+        row["bytes"] += blob.stat().st_size
+        row["build_sec"] += float(meta.get("build_sec", 0.0))
+    if not kinds:
+        print(f"ℹ️ 캐시가 비어 있습니다: {cache.cache_dir}")
+        return
+    for kind, row in sorted(kinds.items()):
+        print(f"  {kind:<16} {row['count']:>6,}개  {row['bytes'] / 1e6:>9.1f}MB  빌드 시간 합계 {row['build_sec']:>8.1f}s")
+    total = sum(r["bytes"] for r in kinds.values())
+    print(f"✅ 전체 {total / 1e6:.1f}MB / 한도 {cache.max_bytes / 1e9:.1f}GB ({cache.cache_dir})")
+
+
+def cmd_runs(cache, last: int):
+    log_path = cache.cache_dir / "runs.jsonl"
+    if not log_path.exists():
+        print("ℹ️ 실행 기록이 없습니다.")
+        return
+    lines = log_path.read_text(encoding="utf-8").splitlines()[-last:]
+    for line in lines:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        stats = rec.get("stats", {})
+        hits = sum(s.get("hits", 0) for s in stats.values())
+        total = hits + sum(s.get("misses", 0) for s in stats.values())
+        saved = sum(s.get("saved_sec", 0.0) for s in stats.values())
+        when = datetime.fromtimestamp(rec.get("ts", 0)).strftime("%Y-%m-%d %H:%M")
+        print(f"  {when}  {rec.get('label', ''):<16} 적중 {hits}/{total}  절약 {saved:.1f}s")
+
+
+def cmd_prune(cache, max_gb):
+    if max_gb is not None:
+        cache.max_bytes = int(max_gb * 1024 ** 3)
+    removed = cache.prune()
+    print(f"✅ 정리 완료: {removed}개 삭제 (한도 {cache.max_bytes / 1e9:.1f}GB)")
+
+
+def cmd_bench():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # 모듈 공용 인스턴스가 임시 캐시를 쓰도록 임포트 전에 경로 지정
+        os.environ["MEDIA_CACHE_DIR"] = str(tmp / "cache")
+        from common.media_cache import media_cache
+        from common.md_image import MarkdownImageRenderer
+        from iceage.src.pipelines.generate_cardnews_assets import CardNewsFactory
+        from tasks.bench_cardnews_render import sample_data
+
+        md = "\n".join(["# Signalist Daily", "", "## 시장 요약", "",
+                        "- **코스피** 2,650 (+1.2%) 외국인 순매수 지속", "- 반도체 대형주 강세, 2차전지 약세", "",
+                        "| 종목 | 종가 | 등락 |", "|---|---|---|", "| 삼성전자 | 71,200 | +4.21% |",
+                        "| SK하이닉스 | 182,000 | +3.10% |", "", "> 거래대금이 평소의 3배로 늘었습니다."])
+        renderer = MarkdownImageRenderer()
+        ref_date = date.today().isoformat()
+
+        results = []
+        for label in ("첫 실행 (빈 캐시)", "재실행 (캐시 적중)"):
+            media_cache.reset_stats()
+            out = tmp / label.split()[0]
+            started = time.perf_counter()
+            CardNewsFactory(ref_date, output_dir=out / "cards").run(sample_data(), workers=1)
+            renderer.save(md, out / "summary.png", cache=media_cache)
+            elapsed = time.perf_counter() - started
+            results.append((label, elapsed, media_cache.hit_ratio(), out))
+
+        (_, base, _, cold_dir), (_, warm, _, warm_dir) = results
+        same = all((warm_dir / p.relative_to(cold_dir)).read_bytes() == p.read_bytes()
+                   for p in cold_dir.rglob("*.png"))
+        print()
+        for label, elapsed, ratio, _ in results:
+            print(f"🧪 {label}: {elapsed * 1000:.0f}ms, 적중률 {ratio:.0%}")
+        verdict = "✅ 산출물 바이트 동일" if same else "❌ 산출물 불일치"
+        print(f"   재실행 {base / warm:.1f}배 빠름 {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="미디어 캐시 관리")
+    parser.add_argument("command", choices=["stats", "runs", "prune", "bench"])
+    parser.add_argument("--last", type=int, default=20, help="runs: 표시할 실행 수")
+    parser.add_argument("--max-gb", type=float, help="prune: 캐시 한도 (기본 MEDIA_CACHE_MAX_GB)")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        cmd_bench()
+        return
+
+    from common.media_cache import media_cache
+    if args.command == "stats":
+        cmd_stats(media_cache)
+    elif args.command == "runs":
+        cmd_runs(media_cache, args.last)
+    else:
+        cmd_prune(media_cache, args.max_gb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+날짜 파티션 뉴스 저장소(common.news_store) 관리 도구
+
+- import: 기존 kr_news_cleaned_*.jsonl / kr_stock_event_news_*.jsonl 파일을 저장소로 옮겨 담습니다. (최초 도입 시, 중복은 건너뜀)
+- compact: 작은 세그먼트를 합칩니다. (--min-bytes 미만 세그먼트 대상, 기본 NEWS_STORE_COMPACT_MIN_BYTES)
+- stats: 파티션별 세그먼트 수 / 기사 수 / 바이트 / 종목 수
+- lookup: 종목 코드의 최근 N일 기사를 조회하고 읽은 바이트를 보여줍니다.
+- bench: 합성 데이터로 "종목 X의 최근 N일 기사" 조회를 파일 전체 스캔과 비교합니다. (임시 디렉터리 사용)
+
+사용법:
+    python -m tasks.news_store import --days 30
+    python -m tasks.news_store compact
+    python -m tasks.news_store lookup 005930 --days 7
+    python -m tasks.news_store bench --days 30 --per-day 5000
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.news_store import COMPACT_MIN_BYTES, ORIGIN_CLEANED, ORIGIN_RAW, NewsStore, news_store
+
+DATA_DIR = BASE_DIR / "iceage" / "data"
+
+
+def _read_jsonl(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def cmd_import(store: NewsStore, days: int):
+    total = 0
+    for i in range(days, -1, -1):
+        d = date.today() - timedelta(days=i)
+        sources = [(DATA_DIR / "processed" / f"kr_news_cleaned_{d.isoformat()}.jsonl", ORIGIN_CLEANED),
+                   (DATA_DIR / "raw" / f"kr_stock_event_news_{d.isoformat()}.jsonl", ORIGIN_RAW)]
+        for path, origin in sources:
+            if path.exists():
+                n = store.append(_read_jsonl(path), d, origin=origin)
+                total += n
+                print(f"  📥 {path.name}: {n}건 추가")
+    print(f"✅ 가져오기 완료: {total:,}건")
+
+
+def cmd_compact(store: NewsStore, min_bytes: int):
+    started = time.time()
+    merged = store.compact_all(min_bytes)
+    for d, n in merged.items():
+        print(f"  🗜️ {d}: 세그먼트 {n}개 병합 → {store.describe(d)['segments']}개")
+    print(f"✅ 압축 완료: 파티션 {len(merged)}개 ({time.time() - started:.1f}s)")
+
+
+def cmd_stats(store: NewsStore):
+    for d in store.dates():
+        info = store.describe(d)
+        print(f"  {d}  세그먼트 {info['segments']:>3}개  기사 {info['articles']:>6,}건  "
+              f"{info['bytes'] / 1024:>8.1f}KB  종목 {info['codes']:,}개")
+
+
+def cmd_lookup(store: NewsStore, code: str, days: int):
+    started = time.perf_counter()
+    rows = store.by_code(code, days=days)
+    elapsed = (time.perf_counter() - started) * 1000
+    for r in rows:
+        print(f"  [{r.get('published_at', '')[:16]}] {r.get('source', '')} | {r.get('title', '')}")
+    print(f"✅ {code} 최근 {days}일 {len(rows)}건 ({elapsed:.1f}ms, {store.report()})")
+
+
+def cmd_bench(days: int, per_day: int, codes: int):
+    rnd = random.Random(7)
+    universe = [f"{i:06d}" for i in range(codes)]
+    ref = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        store = NewsStore(tmp / "store")
+        flat_files = []
+        for i in range(days):
+            d = ref - timedelta(days=i)
+            arts = [{"title": f"기사 {d} #{j} " + "본문 " * rnd.randint(10, 40),
+                     "snippet": "요약 " * rnd.randint(20, 60), "source": rnd.choice(["연합뉴스", "뉴스1", "한국경제"]),
+                     "link": f"https://news.example/{d}/{j}", "published_at": f"{d.isoformat()}T09:00:00",
+                     "kind": rnd.choice(["stock_event", "market"]), "code": rnd.choice(universe)}
+                    for j in range(per_day)]
+            path = tmp / f"kr_news_cleaned_{d.isoformat()}.jsonl"
+            path.write_text("".join(json.dumps(a, ensure_ascii=False) + "\n" for a in arts), encoding="utf-8")
+            flat_files.append(path)
+            # 하루에도 수집 배치가 여러 번 들어오는 상황을 흉내 (작은 세그먼트 다수)
+            for k in range(0, per_day, max(1, per_day // 8)):
+                store.append(arts[k:k + max(1, per_day // 8)], d)
+
+        targets = rnd.sample(universe, 20)
+        print(f"🧪 {days}일 × {per_day:,}건, 종목 {codes:,}개, 조회 대상 {len(targets)}종목 × 최근 7일")
+
+        started = time.perf_counter()
+        scanned_bytes, expected = 0, {}
+        for code in targets:
+            hits = []
+            for path in flat_files[:8]:
+                scanned_bytes += path.stat().st_size
+                hits.extend(a for a in _read_jsonl(path) if a.get("code") == code)
+            expected[code] = len(hits)
+        base = time.perf_counter() - started
+        print(f"  기존 (일자 파일 전체 스캔): {base * 1000:.1f}ms, 읽은 바이트 {scanned_bytes / 1e6:.1f}MB")
+
+        for label in ("저장소 (압축 전)", "저장소 (압축 후)"):
+            if "후" in label:
+                store.compact_all()
+            store.stats.update(bytes_read=0, reads=0)
+            started = time.perf_counter()
+            got = {code: len(store.by_code(code, days=7, ref_date=ref)) for code in targets}
+            elapsed = time.perf_counter() - started
+            verdict = "✅ 결과 일치" if got == expected else "❌ 결과 불일치"
+            print(f"  {label}: {elapsed * 1000:.1f}ms ({base / elapsed:.1f}배), "
+                  f"읽은 바이트 {store.stats['bytes_read'] / 1e6:.2f}MB / {store.stats['reads']:,}회 {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날짜 파티션 뉴스 저장소 관리")
+    parser.add_argument("command", choices=["import", "compact", "stats", "lookup", "bench"])
+    parser.add_argument("code", nargs="?", help="lookup: 종목 코드")
+    parser.add_argument("--root", help="저장소 경로 (기본 NEWS_STORE_DIR)")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--min-bytes", type=int, default=COMPACT_MIN_BYTES, help="compact: 이 크기 미만 세그먼트를 병합")
+    parser.add_argument("--per-day", type=int, default=5000, help="bench: 하루 기사 수")
+    parser.add_argument("--codes", type=int, default=2000, help="bench: 종목 수")
+    args = parser.parse_args()
+
+    store = NewsStore(args.root) if args.root else news_store
+    if args.command == "import":
+        cmd_import(store, args.days)
+    elif args.command == "compact":
+        cmd_compact(store, args.min_bytes)
+    elif args.command == "stats":
+        cmd_stats(store)
+    elif args.command == "lookup":
+        if not args.code:
+            parser.error("lookup에는 종목 코드가 필요합니다.")
+        cmd_lookup(store, args.code, args.days)
+    else:
+        cmd_bench(args.days, args.per_day, args.codes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Binance 시세 스트림 리플레이 서버 (오프라인 테스트용, 표준 라이브러리 WebSocket 서버)
+
+녹화된 틱(JSONL)이나 합성 랜덤워크를 Binance combined stream 형식으로 내보냅니다.
+market_watchdog의 BINANCE_WS_BASE를 이 서버로 바꾸면 실제 거래소 없이 스트림 경로를 시험할 수 있습니다.
+
+사용법:
+    # 1) 실제 스트림 녹화 (websocket-client 필요)
+    python -m tasks.replay_price_stream record --out ticks.jsonl --seconds 300
+    # 2) 녹화본 리플레이 (--speed 10: 10배속)
+    python -m tasks.replay_price_stream serve --file ticks.jsonl --port 8765 --speed 10
+    # 3) 합성 틱 (BTC 급등 구간 포함)
+    python -m tasks.replay_price_stream serve --synthetic --port 8765
+    # 4) 스트림 클라이언트 점검: 수신 틱 수 / 지연 측정
+    python -m tasks.replay_price_stream check --synthetic --seconds 5
+    # 5) 유니버스 모드(!ticker@arr): 합성 심볼 300개를 1초마다 배열 메시지로 전송
+    python -m tasks.replay_price_stream serve --synthetic --universe 300 --port 8765
+    MONEYBAG_WATCH_UNIVERSE=usdt_perp BINANCE_FUTURES_WS_BASE=ws://127.0.0.1:8765 python -m moneybag.src.pipelines.market_watchdog
+
+    BINANCE_WS_BASE=ws://127.0.0.1:8765 python -m moneybag.src.pipelines.market_watchdog
+"""
+import sys
+import json
+import time
+import base64
+import random
+import socket
+import struct
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+DEFAULT_SYMBOLS = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"]
+
+
+# ------------------------------------------------------------
+# 틱 소스
+# ------------------------------------------------------------
+def load_recording(path):
+    """record 명령으로 저장한 JSONL: {"t": 시작 후 경과초, "msg": combined stream 원문}"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_ticks(symbols, seconds, rate=1.0, spike_at=None, spike_pct=3.0):
+    """심볼별 랜덤워크 틱. spike_at(초) 이후 60초 동안 첫 심볼이 spike_pct% 급등합니다."""
+    prices = {s: 100.0 * (i + 1) for i, s in enumerate(symbols)}
+    opens = dict(prices)
+    ticks = []
+    step = 1.0 / rate
+    t = 0.0
+    while t < seconds:
+        for sym in symbols:
+            drift = 0.0
+            if spike_at is not None and sym == symbols[0] and spike_at <= t < spike_at + 60:
+                drift = spike_pct / 100.0 / (60 * rate)
+            prices[sym] *= 1 + drift + random.gauss(0, 0.0003)
+            pct = (prices[sym] - opens[sym]) / opens[sym] * 100.0
+            data = {"e": "24hrTicker", "E": int(time.time() * 1000), "s": sym,
+                    "c": f"{prices[sym]:.6f}", "o": f"{opens[sym]:.6f}", "P": f"{pct:.3f}"}
+            ticks.append({"t": round(t, 3), "msg": {"stream": f"{sym.lower()}@ticker", "data": data}})
+        t += step
+    return ticks
+
+
+# ------------------------------------------------------------
+# 최소 WebSocket 서버 (RFC 6455: 핸드셰이크, 텍스트 프레임 송신, ping/close 처리)
+# ------------------------------------------------------------
+def _send_frame(conn, payload: bytes, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 65536:
+        header += bytes([126]) + struct.pack("!H", n)
+    else:
+        header += bytes([127]) + struct.pack("!Q", n)
+    conn.sendall(header + payload)
+
+
+def _recv_exact(conn, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("closed")
+        buf += chunk
+    return buf
+
+
+def _read_client_frames(conn, send_lock, closed):
+    """클라이언트 프레임(마스킹됨)을 읽어 ping에는 pong, close에는 종료로 응답합니다."""
+    try:
+        while not closed.is_set():
+            b1, b2 = _recv_exact(conn, 2)
+            opcode, length = b1 & 0x0F, b2 & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", _recv_exact(conn, 2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", _recv_exact(conn, 8))[0]
+            mask = _recv_exact(conn, 4) if b2 & 0x80 else b"\0\0\0\0"
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(_recv_exact(conn, length)))
+            if opcode == 0x9:
+                with send_lock:
+                    _send_frame(conn, payload, opcode=0xA)
+            elif opcode == 0x8:
+                break
+    except (ConnectionError, OSError, ValueError):
+        pass
+    finally:
+        closed.set()
+
+
+def _handshake(conn):
+    request = b""
+    while b"\r\n\r\n" not in request:
+        chunk = conn.recv(4096)
+        if not chunk:
+            raise ConnectionError("handshake closed")
+        request += chunk
+    lines = request.decode("latin-1").split("\r\n")
+    path = lines[0].split(" ")[1]
+    headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+    accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()).decode()
+    conn.sendall((
+        "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+    ).encode())
+    streams = parse_qs(urlparse(path).query).get("streams", [""])[0]
+    return {s for s in streams.split("/") if s}
+
+
+def _as_array_stream(ticks, stream):
+    """같은 시각의 틱을 전체 시장 배열 메시지(!ticker@arr) 하나로 묶습니다."""
+    grouped = {}
+    for tick in ticks:
+        grouped.setdefault(tick["t"], []).append(tick["msg"]["data"])
+    return [{"t": t, "msg": {"stream": stream, "data": rows}} for t, rows in sorted(grouped.items())]
+
+
+def _stamp(data):
+    now_ms = int(time.time() * 1000)
+    return [dict(d, E=now_ms) for d in data] if isinstance(data, list) else dict(data, E=now_ms)
+
+
+def _serve_client(conn, ticks, speed, loop):
+    send_lock, closed = threading.Lock(), threading.Event()
+    try:
+        wanted = _handshake(conn)
+        array_streams = [w for w in wanted if w.startswith("!")]
+        if array_streams:
+            ticks, wanted = _as_array_stream(ticks, array_streams[0]), set()
+        threading.Thread(target=_read_client_frames, args=(conn, send_lock, closed), daemon=True).start()
+        while not closed.is_set():
+            started = time.monotonic()
+            for tick in ticks:
+                if closed.is_set():
+                    break
+                msg = tick["msg"]
+                if wanted and msg.get("stream") not in wanted:
+                    continue
+                delay = tick["t"] / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+                msg = dict(msg, data=_stamp(msg["data"]))
+                with send_lock:
+                    _send_frame(conn, json.dumps(msg).encode("utf-8"))
+            if not loop:
+                break
+        with send_lock:
+            _send_frame(conn, struct.pack("!H", 1000), opcode=0x8)
+    except (ConnectionError, OSError, KeyError, IndexError):
+        pass
+    finally:
+        closed.set()
+        conn.close()
+
+
+def start_replay_server(ticks, port=0, speed=1.0, loop=True):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", port))
+    sock.listen(16)
+
+    def _accept():
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=_serve_client, args=(conn, ticks, speed, loop), daemon=True).start()
+
+    threading.Thread(target=_accept, daemon=True).start()
+    return sock, sock.getsockname()[1]
+
+
+# ------------------------------------------------------------
+# 명령
+# ------------------------------------------------------------
+def cmd_record(args):
+    from moneybag.src.collectors.binance_stream import BinanceTickerStream
+    started, count = time.time(), 0
+    with open(args.out, "w", encoding="utf-8") as f:
+        def _on_raw(raw):
+            nonlocal count
+            f.write(json.dumps({"t": round(time.time() - started, 3), "msg": json.loads(raw)}) + "\n")
+            count += 1
+        stream = BinanceTickerStream(args.symbols.split(","))
+        stream._on_message = _on_raw
+        stream.start()
+        time.sleep(args.seconds)
+        stream.stop()
+    print(f"💾 {count}개 틱 녹화 완료: {args.out}")
+
+
+def _ticks_from_args(args):
+    if args.file:
+        return load_recording(args.file)
+    symbols = args.symbols.split(",")
+    if args.universe:
+        symbols += [f"SYN{i:03d}USDT" for i in range(max(0, args.universe - len(symbols)))]
+    return synthetic_ticks(symbols, args.seconds, rate=args.rate,
+                           spike_at=args.seconds / 3, spike_pct=args.spike_pct)
+
+
+def cmd_serve(args):
+    ticks = _ticks_from_args(args)
+    sock, port = start_replay_server(ticks, port=args.port, speed=args.speed, loop=not args.once)
+    print(f"📡 리플레이 서버: ws://127.0.0.1:{port} (틱 {len(ticks)}개, {args.speed}배속) - Ctrl+C로 종료")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sock.close()
+
+
+def cmd_check(args):
+    from moneybag.src.collectors.binance_stream import BinanceTickerStream
+    ticks = _ticks_from_args(args)
+    sock, port = start_replay_server(ticks, speed=args.speed, loop=False)
+    latencies = []
+
+    def _on_tick(tick):
+        latencies.append(tick.ts - tick_event_time.get(tick.symbol, tick.ts))
+
+    tick_event_time = {}
+    stream = BinanceTickerStream(args.symbols.split(","), on_tick=_on_tick, ws_base=f"ws://127.0.0.1:{port}")
+    original = stream._on_message
+
+    def _capture(raw):
+        data = json.loads(raw)["data"]
+        tick_event_time[data["s"]] = data["E"] / 1000.0
+        original(raw)
+
+    stream._on_message = _capture
+    stream.start()
+    deadline = time.time() + args.seconds / args.speed + 5
+    while time.time() < deadline and len(latencies) < len(ticks):
+        time.sleep(0.2)
+    live = stream.is_live()
+    stream.stop()
+    sock.close()
+
+    latencies.sort()
+    if not latencies:
+        print("❌ 수신한 틱이 없습니다.")
+        sys.exit(1)
+    print(f"✅ 수신 {len(latencies)}/{len(ticks)} 틱, live={live}, "
+          f"지연 p50 {latencies[len(latencies) // 2] * 1000:.1f}ms / max {latencies[-1] * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binance 시세 스트림 리플레이 서버")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("record", "serve", "check"):
+        p = sub.add_parser(name)
+        p.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS))
+        p.add_argument("--seconds", type=float, default=120)
+        if name == "record":
+            p.add_argument("--out", required=True)
+        else:
+            p.add_argument("--file", help="record로 녹화한 JSONL")
+            p.add_argument("--synthetic", action="store_true", help="합성 랜덤워크 틱 사용")
+            p.add_argument("--universe", type=int, default=0, help="합성 틱: 전체 심볼 수 (합성 심볼로 채움)")
+            p.add_argument("--rate", type=float, default=1.0, help="합성 틱: 심볼당 초당 틱 수")
+            p.add_argument("--spike-pct", type=float, default=3.0, help="합성 틱: 급등 폭(%)")
+            p.add_argument("--speed", type=float, default=1.0)
+            p.add_argument("--port", type=int, default=8765)
+            p.add_argument("--once", action="store_true", help="한 번만 재생하고 연결 종료")
+    args = parser.parse_args()
+    {"record": cmd_record, "serve": cmd_serve, "check": cmd_check}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from datetime import date, timedelta
 import logging
 
 # application.py에 정의된 통합 설정 로더를 가져옵니다.
-from common.config import config
+from common.config import config, DB_SECRET_KEYS
 
 # 기존 모듈 임포트 (경로가 실제와 다를 경우 수정이 필요할 수 있습니다)
 import iceage.src.pipelines.daily_runner as iceage_runner
@@ -14,8 +14,9 @@ from iceage.src.collectors import krx_listing_collector, krx_index_collector, kr
 def run_iceage_task(arg=None):
     """run_iceage.sh를 대체하는 파이썬 함수"""
     # 이 함수가 실행되기 전에 필요한 모든 시크릿을 로드합니다.
-    for k in ["KRX_AUTH_KEY", "SERPAPI_KEY", "OPENAI_API_KEY", "DB_PASSWORD", "SENDGRID_API_KEY"]:
+    for k in ["KRX_AUTH_KEY", "SERPAPI_KEY", "OPENAI_API_KEY", "SENDGRID_API_KEY"]:
         config.ensure_secret(k)
+    config.ensure_secrets(DB_SECRET_KEYS)
     
     # 셸 스크립트 대신, 직접 파이썬 모듈의 main 함수를 호출합니다.
     logging.info(f"Starting IceAge task with arg: {arg}")
@@ -26,8 +27,9 @@ def run_iceage_task(arg=None):
 
 def run_moneybag_task(mode="morning"):
     """run_moneybag.sh를 대체하는 파이썬 함수"""
-    for k in ["OPENAI_API_KEY", "SENDGRID_API_KEY", "TELEGRAM_BOT_TOKEN_MONEYBAG", "DB_PASSWORD"]:
+    for k in ["OPENAI_API_KEY", "SENDGRID_API_KEY", "TELEGRAM_BOT_TOKEN_MONEYBAG"]:
         config.ensure_secret(k)
+    config.ensure_secrets(DB_SECRET_KEYS)
 
     logging.info(f"Starting Moneybag task with mode: {mode}")
     if hasattr(moneybag_runner, 'main'):
@@ -37,7 +39,7 @@ def run_moneybag_task(mode="morning"):
 def run_krx_batch_task(days=3):
     """run_krx_batch.sh의 3일치 데이터 수집 로직을 대체하는 파이썬 함수"""
     config.ensure_secret("KRX_AUTH_KEY")
-    config.ensure_secret("DB_PASSWORD") # DB 접속에 필요
+    config.ensure_secrets(DB_SECRET_KEYS) # DB 접속에 필요
     
     today = date.today()
     results = []
@@ -62,8 +64,8 @@ def run_krx_batch_task(days=3):
 
 def run_iceage_weekly_task():
     """run_iceage_weekly.sh를 대체하는 파이썬 함수"""
-    for k in ["DB_PASSWORD", "SENDGRID_API_KEY"]: # 주간 리포트에 필요한 시크릿
-        config.ensure_secret(k)
+    config.ensure_secret("SENDGRID_API_KEY") # 주간 리포트에 필요한 시크릿
+    config.ensure_secrets(DB_SECRET_KEYS)
     
     logging.info("Starting IceAge Weekly Report task...")
     if hasattr(iceage_weekly_runner, 'main'):
@@ -72,8 +74,8 @@ def run_iceage_weekly_task():
 
 def run_iceage_monthly_task():
     """run_iceage_monthly.sh를 대체하는 파이썬 함수"""
-    for k in ["DB_PASSWORD", "SENDGRID_API_KEY"]: # 월간 리포트에 필요한 시크릿
-        config.ensure_secret(k)
+    config.ensure_secret("SENDGRID_API_KEY") # 월간 리포트에 필요한 시크릿
+    config.ensure_secrets(DB_SECRET_KEYS)
 
     logging.info("Starting IceAge Monthly Report task...")
     if hasattr(iceage_monthly_runner, 'main'):
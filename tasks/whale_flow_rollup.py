@@ -0,0 +1,62 @@
+"""
+고래 거래 시간별 집계(whale_flow_hourly) 관리 도구
+
+- backfill: 집계와 하이워터마크를 비우고 whale_transactions 원본 전체로 다시 만듭니다. (최초 도입·거래소 주소 목록 변경 시)
+- catch-up: 하이워터마크 이후 원본만 반영합니다. (리스너가 멈춰 있었을 때)
+- show: 전 심볼의 1h/24h/7d 거래소 입금·출금·순유입을 출력합니다.
+- --sqlite PATH로 로컬 SQLite 파일(부하 테스트용 스탠드인)에 대해 실행할 수 있습니다.
+
+사용법:
+    python -m tasks.whale_flow_rollup backfill
+    python -m tasks.whale_flow_rollup show --top 10
+    python -m tasks.whale_flow_rollup backfill --sqlite /tmp/whale.db
+"""
+import sys
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from common.whale_ingest import ConnectionPool
+from common.whale_flow import WhaleFlowRollup
+
+
+def build_rollup(sqlite_path=None) -> WhaleFlowRollup:
+    if sqlite_path:
+        pool = ConnectionPool(lambda: sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30), size=1)
+        return WhaleFlowRollup(pool, dialect="sqlite")
+    return WhaleFlowRollup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="고래 거래 시간별 집계 관리")
+    parser.add_argument("command", choices=["backfill", "catch-up", "show"])
+    parser.add_argument("--sqlite", help="MySQL 대신 사용할 SQLite 파일 경로")
+    parser.add_argument("--top", type=int, default=20, help="show: 24h 순유입 절댓값 상위 N개 심볼")
+    args = parser.parse_args()
+
+    rollup = build_rollup(args.sqlite)
+    rollup.ensure_schema()
+    started = time.time()
+
+    if args.command == "backfill":
+        print("🐳 고래 흐름 집계 재구성 시작 (원본 전체)")
+        n = rollup.backfill()
+        print(f"✅ 원본 {n:,}건 → 시간별 집계 재구성 완료 ({time.time() - started:.1f}s)")
+    elif args.command == "catch-up":
+        n = rollup.catch_up()
+        print(f"✅ 신규 원본 {n:,}건 반영 ({time.time() - started:.1f}s)")
+    else:
+        flows = rollup.flows()
+        ranked = sorted(flows.items(), key=lambda kv: -abs(kv[1]["24h"]["netflow"]))[: args.top]
+        print(f"📊 거래소 순유입 상위 {len(ranked)}개 (조회 {(time.time() - started) * 1000:.1f}ms)")
+        for symbol, per in ranked:
+            print(f"  {symbol:<8} " + " | ".join(
+                f"{w} 입금 ${v['inflow']:,.0f} 출금 ${v['outflow']:,.0f} 순 ${v['netflow']:,.0f}" for w, v in per.items()))
+
+
+if __name__ == "__main__":
+    main()